@@ -6,8 +6,10 @@
 import numpy as np
 
 from .interpolator import FinInterpolator, FinInterpTypes, interpolate
+from .interpolator import _interpolateSensitivities
 
 from ...utils.date import Date
+from ...utils.date_vector import DateVector
 from ...utils.FinError import FinError
 from ...utils.global_vars import gDaysInYear, gSmall
 from ...utils.frequency import annual_frequency, FrequencyTypes
@@ -22,6 +24,21 @@ from ...utils.helpers import labelToString
 ###############################################################################
 
 
+def _toDateVector(dts: (DateVector, np.ndarray, list, Date)):
+    """ Return the dates as a DateVector. These can be a DateVector, a Date,
+    a list of Dates or an integer or float array of whole day excel serial
+    numbers. """
+
+    if isinstance(dts, DateVector):
+        return dts
+    elif isinstance(dts, Date):
+        return DateVector([dts])
+    else:
+        return DateVector(dts)
+
+###############################################################################
+
+
 class DiscountCurve():
     """ This is a base discount curve which has an internal representation of
     a vector of times and discount factors and an interpolation scheme for
@@ -181,6 +198,9 @@ class DiscountCurve():
         if isinstance(day_count_type, DayCountTypes) is False:
             raise FinError("Invalid Day Count type.")
 
+        if isinstance(dts, DateVector):
+            return self.zeroRateVector(dts, freq_type, day_count_type)
+
         dfs = self.df(dts)
         zeroRates = self._dfToZero(dfs, dts, freq_type, day_count_type)
 
@@ -193,6 +213,37 @@ class DiscountCurve():
 
     ###############################################################################
 
+    def zeroRateVector(self,
+                       dts: (DateVector, np.ndarray),
+                       freq_type: FrequencyTypes = FrequencyTypes.CONTINUOUS,
+                       day_count_type: DayCountTypes = DayCountTypes.ACT_360):
+        """ Batch version of zeroRate for a DateVector or an array of excel
+        serial numbers. The discount factors and the year fractions are each
+        computed in a single vectorised step and a Numpy array is returned. """
+
+        if isinstance(freq_type, FrequencyTypes) is False:
+            raise FinError("Invalid Frequency type.")
+
+        if isinstance(day_count_type, DayCountTypes) is False:
+            raise FinError("Invalid Day Count type.")
+
+        dts = _toDateVector(dts)
+        dfs = self.dfVector(dts)
+        times = timesFromDates(dts, self._valuation_date, day_count_type)
+        t = np.maximum(times, gSmall)
+
+        if freq_type == FrequencyTypes.CONTINUOUS:
+            zeroRates = -np.log(dfs) / t
+        elif freq_type == FrequencyTypes.SIMPLE:
+            zeroRates = (1.0 / dfs - 1.0) / t
+        else:
+            f = annual_frequency(freq_type)
+            zeroRates = (np.power(dfs, -1.0 / (t * f)) - 1.0) * f
+
+        return zeroRates
+
+    ###############################################################################
+
     def ccRate(self,
                dts: (list, Date),
                day_count_type: DayCountTypes = DayCountTypes.SIMPLE):
@@ -294,6 +345,19 @@ class DiscountCurve():
 
     ###############################################################################
 
+    def dfVector(self,
+                 dts: (DateVector, np.ndarray)):
+        """ Fast path for discount factors on many dates at once. The dates
+        can be a DateVector or an integer or float array of whole day excel
+        serial numbers. They are converted to times in one vectorised step so
+        no Date objects are created. Always returns a Numpy array. """
+
+        dts = _toDateVector(dts)
+        dfs = self.df(dts)
+        return np.atleast_1d(np.asarray(dfs, dtype=np.float64))
+
+    ###############################################################################
+
     def _df(self,
             t: (float, np.ndarray)):
         """ Hidden function to calculate a discount factor from a time or a
@@ -316,6 +380,35 @@ class DiscountCurve():
 
     ###############################################################################
 
+    def curveJacobian(self):
+        """ Return the matrix of derivatives of the grid discount factors with
+        respect to the market quotes that the curve was built from. A curve
+        that is given its discount factors directly has no market quotes so
+        this is only provided by the curves that are fitted to instruments. """
+
+        raise FinError("Curve " + type(self).__name__ +
+                       " is not built from market quotes.")
+
+    ###############################################################################
+
+    def dfQuoteSensitivity(self,
+                           dts: (DateVector, np.ndarray, list, Date)):
+        """ Return the matrix of derivatives of the discount factors on a set
+        of dates with respect to the market quotes that the curve was built
+        from. Multiplying the cash flows on these dates by this matrix gives
+        the bucketed risk of a product from one valuation. """
+
+        dts = _toDateVector(dts)
+        times = timesFromDates(dts, self._valuation_date, self._day_count_type)
+        times = np.atleast_1d(np.asarray(times, dtype=np.float64))
+
+        _, dfSens = _interpolateSensitivities(times, self._times, self._dfs,
+                                              self._interp_type)
+
+        return dfSens @ self.curveJacobian()
+
+    ###############################################################################
+
     def survProb(self,
                  dt: Date):
         """ This returns a survival probability to a specified date based on
@@ -336,6 +429,9 @@ class DiscountCurve():
         the time increment dt. I am assuming continuous compounding over the
         one date. """
 
+        if isinstance(dts, DateVector):
+            return self.fwdVector(dts)
+
         if isinstance(dts, Date):
             dtsPlusOneDays = [dts.addDays(1)]
         else:
@@ -358,6 +454,21 @@ class DiscountCurve():
 
     ###############################################################################
 
+    def fwdVector(self,
+                  dts: (DateVector, np.ndarray)):
+        """ Batch version of fwd for a DateVector or an array of excel serial
+        numbers. Returns the continuously compounded one day forward rates as
+        a Numpy array. """
+
+        dts = _toDateVector(dts)
+        df1 = self.dfVector(dts)
+        df2 = self.dfVector(dts.addDays(1))
+        dt = 1.0 / gDaysInYear
+        fwd = np.log(df1 / df2) / dt
+        return fwd
+
+    ###############################################################################
+
     def _fwd(self,
              times: (np.ndarray, float)):
         """ Calculate the continuously compounded forward rate at the forward
@@ -407,6 +518,10 @@ class DiscountCurve():
         first date is specified and the second is given as a date or as a tenor
         which is added to the first date. """
 
+        if isinstance(start_date, DateVector):
+            return self.fwd_rateVector(start_date, date_or_tenor,
+                                       day_count_type)
+
         if isinstance(start_date, Date):
             start_dates = []
             start_dates.append(start_date)
@@ -442,6 +557,36 @@ class DiscountCurve():
 
     ###############################################################################
 
+    def fwd_rateVector(self,
+                       start_dates: (DateVector, np.ndarray),
+                       date_or_tenor: (DateVector, np.ndarray, Date, str),
+                       day_count_type: DayCountTypes = DayCountTypes.ACT_360):
+        """ Batch version of fwd_rate. The start dates are a DateVector or an
+        array of excel serial numbers. The end dates are a tenor added to each
+        start date, a single Date or a vector of dates of the same length. """
+
+        start_dates = _toDateVector(start_dates)
+
+        if isinstance(date_or_tenor, str):
+            end_dates = start_dates.addTenor(date_or_tenor)
+        elif isinstance(date_or_tenor, Date):
+            end_dates = DateVector(np.full(len(start_dates),
+                                           date_or_tenor._excelDate))
+        else:
+            end_dates = _toDateVector(date_or_tenor)
+
+        if len(end_dates) != len(start_dates):
+            raise FinError("Start and end dates must have the same length.")
+
+        dayCount = DayCount(day_count_type)
+        year_frac = dayCount.year_frac(start_dates, end_dates)[0]
+        df1 = self.dfVector(start_dates)
+        df2 = self.dfVector(end_dates)
+        fwd_rates = (df1 / df2 - 1.0) / year_frac
+        return fwd_rates
+
+    ###############################################################################
+
     def __repr__(self):
 
         s = labelToString("OBJECT TYPE", type(self).__name__)
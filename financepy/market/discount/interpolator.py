@@ -78,12 +78,9 @@ def _uinterpolate(t, times, dfs, method):
     if t == times[0]:
         return dfs[0]
 
-    i = 0
-    while times[i] < t and i < num_points - 1:
-        i = i + 1
-
-    if t > times[i]:
-        i = num_points
+    # Index of the first grid time that is not below t or num_points if t is
+    # after the last grid time. This is found by bisection.
+    i = np.searchsorted(times, t)
 
     yvalue = 0.0
 
@@ -168,6 +165,223 @@ def _uinterpolate(t, times, dfs, method):
 
 ###############################################################################
 
+
+@njit(fastmath=True, cache=True, nogil=True)
+def _uinterpolateLastDf(t, times, dfs, method):
+    """ Return the interpolated discount factor at time t together with its
+    derivative with respect to the last discount factor on the grid. This is
+    what a bootstrap needs when it solves for the last grid point as all of
+    the earlier points are held fixed. Only the local schemes supported by
+    _uinterpolate are handled and the value returned is identical to it. """
+
+    small = 1e-10
+    num_points = times.size
+    last = num_points - 1
+
+    yvalue = _uinterpolate(t, times, dfs, method)
+
+    if t == times[0] or last == 0:
+        return yvalue, 0.0
+
+    # Index of the first grid time that is not below t or num_points if t is
+    # after the last grid time. This is found by bisection.
+    i = np.searchsorted(times, t)
+
+    x = dfs[last]
+    dydx = 0.0
+
+    if method == FinInterpTypes.LINEAR_ZERO_RATES.value:
+
+        if i == 1:
+            if last == 1:
+                dydx = yvalue * t / (x * times[1])
+        elif i == last:
+            w = (t - times[i-1]) / (times[i] - times[i-1])
+            dydx = yvalue * t * w / (x * times[last])
+        elif i == num_points:
+            dydx = yvalue * t / (x * times[last])
+
+    elif method == FinInterpTypes.FLAT_FWD_RATES.value:
+
+        if i >= last:
+            w = (t - times[last-1]) / (times[last] - times[last-1])
+            dydx = yvalue * w / x
+
+    elif method == FinInterpTypes.LINEAR_FWD_RATES.value:
+
+        if i == 1:
+            if last == 1:
+                dydx = yvalue * t / ((times[1] + small) * (x + small))
+        elif i == last:
+            dt = times[i] - times[i-1]
+            tau = t - times[i-1]
+            dydx = yvalue * tau * tau / (x * dt * dt)
+        elif i == num_points:
+            dt = times[last] - times[last-1]
+            dydx = yvalue * (1.0 + (t - times[last]) / dt) / x
+
+    else:
+        raise FinError("Invalid interpolation scheme.")
+
+    return yvalue, dydx
+
+###############################################################################
+
+@njit(float64[:](float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _nodeCoefficients(times, dfs, method):
+    """ Return the values at the grid nodes that each of the local schemes
+    interpolates. These are the zero rates for LINEAR_ZERO_RATES, the log
+    discount factors for FLAT_FWD_RATES and the forward rate of the interval
+    ending at each node for LINEAR_FWD_RATES. They are computed once so that
+    each interpolated value only needs a lookup and one exponential. """
+
+    num_points = times.size
+    coeffs = np.zeros(num_points)
+
+    if method == FinInterpTypes.LINEAR_ZERO_RATES.value:
+
+        for i in range(0, num_points):
+            if times[i] != 0.0:
+                coeffs[i] = -np.log(dfs[i])/times[i]
+
+    elif method == FinInterpTypes.FLAT_FWD_RATES.value:
+
+        for i in range(0, num_points):
+            coeffs[i] = -np.log(dfs[i])
+
+    elif method == FinInterpTypes.LINEAR_FWD_RATES.value:
+
+        for i in range(1, num_points):
+            coeffs[i] = -np.log(dfs[i]/dfs[i-1])/(times[i]-times[i-1])
+
+    else:
+        raise FinError("Invalid interpolation scheme.")
+
+    return coeffs
+
+###############################################################################
+
+
+@njit(int64[:](float64[:], float64[:]), cache=True, nogil=True)
+def _intervalIndices(t, times):
+    """ Return the index of the first grid time that is not below each of the
+    times t, or the number of grid points if t is after the last one. Sorted
+    times are merged with the grid in a single pass and unsorted times are
+    located by bisection. """
+
+    n = t.size
+    num_points = times.size
+
+    isSorted = True
+    for j in range(1, n):
+        if t[j] < t[j-1]:
+            isSorted = False
+            break
+
+    if isSorted is False:
+        return np.searchsorted(times, t)
+
+    indices = np.empty(n, dtype=np.int64)
+
+    i = 0
+    for j in range(0, n):
+        while i < num_points and times[i] < t[j]:
+            i = i + 1
+        indices[j] = i
+
+    return indices
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], float64[:], float64[:], int64),
+      fastmath=True, cache=True, nogil=True)
+def _vinterpolateFitted(t, times, dfs, coeffs, method):
+    """ Return the interpolated discount factors at the times t given the
+    node coefficients of the scheme from _nodeCoefficients. This gives the
+    same values as _uinterpolate but does not recompute the logarithms of
+    the grid discount factors or scan the grid for each time. """
+
+    small = 1e-10
+    n = t.size
+    num_points = times.size
+    yvalues = np.empty(n)
+
+    indices = _intervalIndices(t, times)
+
+    for j in range(0, n):
+
+        tj = t[j]
+        i = indices[j]
+
+        # Times before the grid and degenerate grids use the original scheme
+        if tj == times[0]:
+            yvalues[j] = dfs[0]
+            continue
+        elif i == 0 or num_points < 2:
+            yvalues[j] = _uinterpolate(tj, times, dfs, method)
+            continue
+
+        if method == FinInterpTypes.LINEAR_ZERO_RATES.value:
+
+            if i == 1:
+                r1 = coeffs[i]
+                r2 = coeffs[i]
+                dt = times[i] - times[i-1]
+                rvalue = ((times[i]-tj)*r1 + (tj-times[i-1])*r2)/dt
+            elif i < num_points:
+                r1 = coeffs[i-1]
+                r2 = coeffs[i]
+                dt = times[i] - times[i-1]
+                rvalue = ((times[i]-tj)*r1 + (tj-times[i-1])*r2)/dt
+            else:
+                r1 = coeffs[i-1]
+                r2 = coeffs[i-1]
+                dt = times[i-1] - times[i-2]
+                rvalue = ((times[i-1]-tj)*r1 + (tj-times[i-2])*r2)/dt
+
+            yvalues[j] = np.exp(-rvalue*tj)
+
+        elif method == FinInterpTypes.FLAT_FWD_RATES.value:
+
+            if i < num_points:
+                rt1 = coeffs[i-1]
+                rt2 = coeffs[i]
+                dt = times[i] - times[i-1]
+                rtvalue = ((times[i]-tj)*rt1 + (tj-times[i-1])*rt2)/dt
+            else:
+                rt1 = coeffs[i-2]
+                rt2 = coeffs[i-1]
+                dt = times[i-1] - times[i-2]
+                rtvalue = ((times[i-1]-tj)*rt1 + (tj-times[i-2])*rt2)/dt
+
+            yvalues[j] = np.exp(-rtvalue)
+
+        elif method == FinInterpTypes.LINEAR_FWD_RATES.value:
+
+            if i == 1:
+                y2 = -np.log(dfs[i] + small)
+                yvalue = tj * y2 / (times[i] + small)
+                yvalues[j] = np.exp(-yvalue)
+            elif i < num_points:
+                fwd1 = coeffs[i-1]
+                fwd2 = coeffs[i]
+                dt = times[i] - times[i-1]
+                fwd = ((times[i]-tj)*fwd1 + (tj-times[i-1])*fwd2)/dt
+                yvalues[j] = dfs[i - 1] * np.exp(-fwd * (tj - times[i - 1]))
+            else:
+                fwd = coeffs[i-1]
+                yvalues[j] = dfs[i-1] * np.exp(-fwd * (tj - times[i-1]))
+
+        else:
+            raise FinError("Invalid interpolation scheme.")
+
+    return yvalues
+
+###############################################################################
+
+
 @njit(float64[:](float64[:], float64[:], float64[:], int64),
       fastmath=True, cache=True, nogil=True)
 def _vinterpolate(xValues,
@@ -177,14 +391,11 @@ def _vinterpolate(xValues,
     """ Return the interpolated values of y given x and a vector of x and y.
     The values of x must be monotonic and increasing. The different schemes for
     interpolation are linear in y (as a function of x), linear in log(y) and
-    piecewise flat in the continuously compounded forward y rate. """
+    piecewise flat in the continuously compounded forward y rate. The node
+    coefficients are computed once for all of the values of x. """
 
-    n = xValues.size
-    yvalues = np.empty(n)
-    for i in range(0, n):
-        yvalues[i] = _uinterpolate(xValues[i], xvector, dfs, method)
-
-    return yvalues
+    coeffs = _nodeCoefficients(xvector, dfs, method)
+    return _vinterpolateFitted(xValues, xvector, dfs, coeffs, method)
 
 ###############################################################################
 
@@ -198,6 +409,7 @@ class FinInterpolator():
         self._interpFn = None
         self._times = None
         self._dfs = None
+        self._coeffs = None
         self._refitCurve = False
         
     ###########################################################################
@@ -205,10 +417,23 @@ class FinInterpolator():
     def fit(self,
             times: np.ndarray,
             dfs: np.ndarray):
+        """ Fit the interpolator to the grid of times and discount factors.
+        For the local schemes the node coefficients of each interval are
+        computed here and reused by every call to interpolate. The grid must
+        therefore be fitted again if the discount factors are changed. """
 
         self._times = times
         self._dfs = dfs
 
+        if self._interp_type in (FinInterpTypes.FLAT_FWD_RATES,
+                                 FinInterpTypes.LINEAR_FWD_RATES,
+                                 FinInterpTypes.LINEAR_ZERO_RATES):
+
+            self._times = np.asarray(times, dtype=np.float64)
+            self._dfs = np.asarray(dfs, dtype=np.float64)
+            self._coeffs = _nodeCoefficients(self._times, self._dfs,
+                                             self._interp_type.value)
+
         if len(times) == 1:
             return
 
@@ -337,8 +562,8 @@ class FinInterpolator():
 
         else:
 
-            out = _vinterpolate(tvec, self._times, self._dfs,
-                                self._interp_type.value)
+            out = _vinterpolateFitted(tvec, self._times, self._dfs,
+                                      self._coeffs, self._interp_type.value)
 
         if type(t) is float or type(t) is np.float64:
             return out[0]
@@ -346,3 +571,117 @@ class FinInterpolator():
             return out
 
 ###############################################################################
+
+
+def _splineNodeValues(times: np.ndarray,
+                      dfs: np.ndarray,
+                      interp_type: FinInterpTypes):
+    """ Return the values at the grid nodes that the spline schemes of the
+    FinInterpolator are fitted to. These are either log discount factors or
+    zero rates with the zero rate at time zero set to the next one. """
+
+    if interp_type in (FinInterpTypes.PCHIP_LOG_DISCOUNT,
+                       FinInterpTypes.NATCUBIC_LOG_DISCOUNT):
+        return np.log(dfs)
+
+    zeroRates = -np.log(dfs) / (times + gSmall)
+
+    if times[0] == 0.0:
+        zeroRates[0] = zeroRates[1]
+
+    return zeroRates
+
+###############################################################################
+
+
+def _interpolateSensitivities(t: np.ndarray,
+                              times: np.ndarray,
+                              dfs: np.ndarray,
+                              interp_type: FinInterpTypes):
+    """ Return the interpolated discount factors at a vector of times t and
+    the matrix of their derivatives with respect to each grid discount factor.
+    The first grid point is the anchor at the valuation date and is held
+    fixed so its column is zero. The cubic splines are linear in their node
+    values so their weights are obtained by fitting to the unit vectors and
+    the derivatives are exact. For the other schemes we bump the grid with
+    central differences. Each of them is local so that a grid point only
+    moves the interpolated values in the four intervals around it. Grid
+    points four apart are therefore bumped at the same time which needs just
+    eight evaluations for any grid size. """
+
+    numTimes = len(t)
+    n = len(times)
+
+    if interp_type in (FinInterpTypes.NATCUBIC_LOG_DISCOUNT,
+                       FinInterpTypes.NATCUBIC_ZERO_RATES,
+                       FinInterpTypes.FINCUBIC_ZERO_RATES):
+
+        if interp_type == FinInterpTypes.FINCUBIC_ZERO_RATES:
+            bc_type = ((2, np.zeros(n)), (1, np.zeros(n)))
+        else:
+            bc_type = 'natural'
+
+        weights = CubicSpline(times, np.eye(n), bc_type=bc_type)(t)
+        y = _splineNodeValues(times, dfs, interp_type)
+
+        if interp_type == FinInterpTypes.NATCUBIC_LOG_DISCOUNT:
+            values = np.exp(weights @ y)
+            dydx = 1.0 / dfs
+            sensitivities = values[:, None] * weights * dydx[None, :]
+            sensitivities[:, 0] = 0.0
+        else:
+            if times[0] == 0.0:
+                weights[:, 1] += weights[:, 0]
+                weights[:, 0] = 0.0
+            values = np.exp(-t * (weights @ y))
+            dydx = -1.0 / (dfs * (times + gSmall))
+            sensitivities = -(t * values)[:, None] * weights * dydx[None, :]
+
+        return values, sensitivities
+
+    bump = 1e-6
+    stride = 4
+    groups = [np.arange(g, n, stride) for g in range(1, min(n, stride + 1))]
+
+    dfsBumped = [dfs]
+    for group in groups:
+        dfsUp = dfs.copy()
+        dfsUp[group] *= 1.0 + bump
+        dfsDown = dfs.copy()
+        dfsDown[group] *= 1.0 - bump
+        dfsBumped.append(dfsUp)
+        dfsBumped.append(dfsDown)
+
+    if interp_type in (FinInterpTypes.PCHIP_LOG_DISCOUNT,
+                       FinInterpTypes.PCHIP_ZERO_RATES):
+
+        y = np.column_stack([_splineNodeValues(times, x, interp_type)
+                             for x in dfsBumped])
+        f = PchipInterpolator(times, y)(t)
+
+        if interp_type == FinInterpTypes.PCHIP_LOG_DISCOUNT:
+            allValues = np.exp(f)
+        else:
+            allValues = np.exp(-t[:, None] * f)
+
+    else:
+
+        allValues = np.column_stack([_vinterpolate(t, times, x,
+                                                   interp_type.value)
+                                     for x in dfsBumped])
+
+    values = allValues[:, 0]
+    sensitivities = np.zeros((numTimes, n))
+
+    # Interval index of each time with extrapolation using the last interval
+    k = np.clip(np.searchsorted(times, t), 1, n - 1)
+
+    for iGroup, group in enumerate(groups):
+        dv = allValues[:, 2*iGroup+1] - allValues[:, 2*iGroup+2]
+        for c in group:
+            inBand = (k >= c - 1) & (k <= c + 2)
+            sensitivities[inBand, c] = dv[inBand] / (2.0 * bump * dfs[c])
+
+    return values, sensitivities
+
+###############################################################################
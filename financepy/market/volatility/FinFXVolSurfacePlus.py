@@ -39,6 +39,9 @@ from ...utils.distribution import FinDistribution
 from ...utils.FinSolvers1D import newton_secant
 from ...utils.FinSolversNM import nelder_mead
 from ...utils.global_types import FinSolverTypes
+from ...models.smile_calibration import fitResidualsLM
+from ...models.smile_calibration import gSmileCalibrationMaxIter
+from .surface_interp import volatilityFromStrikeTimeVect
 
 ###############################################################################
 # ISSUES
@@ -110,10 +113,12 @@ def _interpolateGap(k, strikes, gaps):
 ###############################################################################
 # Do not cache this function
 @njit(fastmath=True) #, cache=True)
-def _obj(params, *args):
-    """ Return a function that is minimised when the ATM, MS and RR vols have
-    been best fitted using the parametric volatility curve represented by
-    params and specified by the volTypeValue
+def _objTerms(params, *args):
+    """ Return the differences between the curve and the market for the ATM
+    vol, the 25D market strangle value and risk reversal vol and the 10D
+    market strangle value and risk reversal vol using the parametric
+    volatility curve represented by params and specified by the volTypeValue.
+    The terms for quotes that have not been provided are zero.
     """
 
     s = args[0]
@@ -148,7 +153,7 @@ def _obj(params, *args):
     atmCurveVol = volFunction(volTypeValue, params, strikesNULL, gapsNULL, 
                                   f, K_ATM, t)
 
-    termATM = (atmVol - atmCurveVol)**2
+    termATM = atmVol - atmCurveVol
 
     ###########################################################################
     # Match the market strangle value but this has to be at the MS 25D strikes
@@ -171,7 +176,7 @@ def _obj(params, *args):
                              FinOptionTypes.EUROPEAN_PUT.value)
     
         V_25D_MS = V_25D_C_MS + V_25D_P_MS
-        term25D_1 = (V_25D_MS - V_25D_MS_target)**2
+        term25D_1 = V_25D_MS - V_25D_MS_target
 
     else:
         
@@ -204,7 +209,7 @@ def _obj(params, *args):
                                         f, K_25D_P, t)
     
         sigma_25D_RR = (sigma_K_25D_C - sigma_K_25D_P)
-        term25D_2 = (sigma_25D_RR - target25DRRVol)**2
+        term25D_2 = sigma_25D_RR - target25DRRVol
 
     else:
         
@@ -231,7 +236,7 @@ def _obj(params, *args):
                              FinOptionTypes.EUROPEAN_PUT.value)
     
         V_10D_MS = V_10D_C_MS + V_10D_P_MS
-        term10D_1 = (V_10D_MS - V_10D_MS_target)**2
+        term10D_1 = V_10D_MS - V_10D_MS_target
 
     else:
         
@@ -264,22 +269,52 @@ def _obj(params, *args):
                                         f, K_10D_P, t)
     
         sigma_10D_RR = (sigma_K_10D_C - sigma_K_10D_P)
-        term10D_2 = (sigma_10D_RR - target10DRRVol)**2
+        term10D_2 = sigma_10D_RR - target10DRRVol
 
     else:
         
         term10D_2 = 0.0
 
+    return np.array([termATM, term25D_1, term25D_2, term10D_1, term10D_2])
+
+###############################################################################
+# Do not cache this function
+@njit(fastmath=True) #, cache=True)
+def _obj(params, *args):
+    """ Return a function that is minimised when the ATM, MS and RR vols have
+    been best fitted using the parametric volatility curve represented by
+    params and specified by the volTypeValue
+    """
+
+    alpha = args[16]
+    terms = _objTerms(params, *args)
+
     ###########################################################################
     # Alpha interpolates between fitting only ATM and 25D when alpha = 0.0 and
     # fitting only ATM and 10D when alpha = 1.0. Equal when alpha = 0.50.
     ###########################################################################
 
-    tot = termATM
-    tot = tot + (1.0 - alpha) * (term25D_1 + term25D_2)
-    tot = tot + alpha * (term10D_1 + term10D_2)
+    tot = terms[0]**2
+    tot = tot + (1.0 - alpha) * (terms[1]**2 + terms[2]**2)
+    tot = tot + alpha * (terms[3]**2 + terms[4]**2)
     return tot
 
+###############################################################################
+# Do not cache this function
+@njit(fastmath=True) #, cache=True)
+def _objResiduals(params, *args):
+    """ Return the residuals whose sum of squares is the _obj function. These
+    are fitted by the LEVENBERG_MARQUARDT solver. """
+
+    alpha = args[16]
+    terms = _objTerms(params, *args)
+
+    w25 = np.sqrt(1.0 - alpha)
+    w10 = np.sqrt(alpha)
+
+    return np.array([terms[0], w25 * terms[1], w25 * terms[2],
+                     w10 * terms[3], w10 * terms[4]])
+
 ###############################################################################
 # Do not cache this function as it leads to complaints
 ###############################################################################
@@ -570,6 +605,10 @@ def _solveToHorizon(s, t, rd, rf,
         elif finSolverType == FinSolverTypes.CONJUGATE_GRADIENT:
             opt = minimize(_obj, xinits, args, method="CG", tol=tol)
             xopt = opt.x
+        elif finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+            xopt = fitResidualsLM(_objResiduals, volTypeValue,
+                                  np.array(xinits, dtype=float), args, tol,
+                                  gSmileCalibrationMaxIter)
     except:
          # If convergence fails try again with CG if necessary
          if finSolverType != FinSolverTypes.CONJUGATE_GRADIENT:
@@ -690,6 +729,26 @@ def volFunction(volFunctionTypeValue, params, strikes, gaps, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](int64[:], float64[:], int64, float64[:, :],
+                 float64[:, :], float64[:, :], float64[:], float64[:]),
+      cache=True, fastmath=True)
+def _smileVolsVect(index, strikes, volTypeValue, parameters, smileStrikes,
+                   gaps, texp, fwds):
+    """ Return the smile volatility of slice index[j] at strikes[j]. """
+
+    n = len(strikes)
+    vols = np.empty(n)
+
+    for j in range(0, n):
+        i = index[j]
+        vols[j] = volFunction(volTypeValue, parameters[i], smileStrikes[i],
+                              gaps[i], fwds[i], strikes[j], texp[i])
+
+    return vols
+
+###############################################################################
+
+
 @njit(cache=True, fastmath=True)
 def _deltaFit(k, *args):
     """ This is the objective function used in the determination of the FX
@@ -872,11 +931,14 @@ class FinFXVolSurfacePlus():
                  deltaMethod:FinFXDeltaMethod=FinFXDeltaMethod.SPOT_DELTA,
                  volatilityFunctionType:FinVolFunctionTypes=FinVolFunctionTypes.CLARK,
                  finSolverType:FinSolverTypes=FinSolverTypes.NELDER_MEAD,
-                 tol:float=1e-8):
+                 tol:float=1e-8,
+                 initialParameters=None):
         """ Create the FinFXVolSurfacePlus object by passing in market vol data
         for ATM, 25 Delta and 10 Delta strikes. The alpha weight shifts the
         fitting between 25D and 10D. Alpha = 0.0 is 100% 25D while alpha = 1.0
-        is 100% 10D. An alpha of 0.50 is equally weighted. """
+        is 100% 10D. An alpha of 0.50 is equally weighted. The calibration
+        can be warm started from the _parameters of an earlier surface by
+        passing them in as initialParameters. """
 
         # I want to allow Nones for some of the market inputs
         if mktStrangle10DeltaVols is None:
@@ -993,7 +1055,8 @@ class FinFXVolSurfacePlus():
             expiry_date = valuation_date.addTenor(tenors[i])
             self._expiry_dates.append(expiry_date)
 
-        self._buildVolSurface(finSolverType=finSolverType, tol=tol)
+        self._buildVolSurface(finSolverType=finSolverType, tol=tol,
+                              initialParameters=initialParameters)
 
 ###############################################################################
 
@@ -1081,6 +1144,22 @@ class FinFXVolSurfacePlus():
 
         return volt
 
+###############################################################################
+
+    def volatilityFromStrikeTimeVect(self, strikes, times):
+        """ Interpolates the Black-Scholes volatilities from the surface for
+        arrays of strikes and of expiry times in years. See the function of
+        the same name in surface_interp. """
+
+        return volatilityFromStrikeTimeVect(self._texp, strikes, times,
+                                            _smileVolsVect,
+                                            self._volatilityFunctionType.value,
+                                            self._parameters,
+                                            self._strikes,
+                                            self._gaps,
+                                            self._texp,
+                                            self._F0T)
+
 ###############################################################################
 
     def deltaToStrike(self, callDelta, expiry_date, deltaMethod):
@@ -1296,8 +1375,13 @@ class FinFXVolSurfacePlus():
 
 ###############################################################################
 
-    def _buildVolSurface(self, finSolverType=FinSolverTypes.NELDER_MEAD, tol=1e-8):
-        """ Main function to construct the vol surface. """
+    def _buildVolSurface(self, finSolverType=FinSolverTypes.NELDER_MEAD, tol=1e-8,
+                         initialParameters=None):
+        """ Main function to construct the vol surface. If initialParameters
+        are given then each expiry slice starts from its row of these instead
+        of the starting values implied from the market quotes. The
+        LEVENBERG_MARQUARDT solver fits the ATM, strangle and risk reversal
+        quotes of each slice as a vector of residuals. """
 
         s = self._spotFXRate
         numVolCurves = self._numVolCurves
@@ -1500,6 +1584,17 @@ class FinFXVolSurfacePlus():
             xinits.append(xinit)
             ginits.append(ginit)
 
+        if initialParameters is not None:
+
+            initialParameters = np.array(initialParameters, dtype=float)
+
+            if initialParameters.shape != self._parameters.shape:
+                raise FinError("Initial parameters must have one row of "
+                               + str(numParameters)
+                               + " parameters per expiry date.")
+
+            xinits = list(initialParameters)
+
         deltaMethodValue = self._deltaMethod.value
         volTypeValue = self._volatilityFunctionType.value
 
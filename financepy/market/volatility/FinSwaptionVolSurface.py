@@ -42,6 +42,11 @@ from ...utils.FinSolvers1D import newton_secant
 from ...utils.FinSolversNM import nelder_mead
 from ...utils.global_types import FinSolverTypes
 
+from ...models.smile_calibration import calibrateSmilesLM
+from ...models.smile_calibration import smileInitialGuesses
+from ...models.smile_calibration import gSmileCalibrationMaxIter
+from .surface_interp import volatilityFromStrikeTimeVect
+
 ###############################################################################
 # ISSUES
 # sabr does not fit inverted skew discount like eurjpy
@@ -231,6 +236,24 @@ def volFunction(volFunctionTypeValue, params, f, k, t):
 ###############################################################################
 
 
+@njit(float64[:](int64[:], float64[:], int64, float64[:, :], float64[:],
+                 float64[:]), cache=True, fastmath=True)
+def _smileVolsVect(index, strikes, volTypeValue, parameters, texp, fwds):
+    """ Return the smile volatility of slice index[j] at strikes[j]. """
+
+    n = len(strikes)
+    vols = np.empty(n)
+
+    for j in range(0, n):
+        i = index[j]
+        vols[j] = volFunction(volTypeValue, parameters[i], fwds[i],
+                              strikes[j], texp[i])
+
+    return vols
+
+###############################################################################
+
+
 #@njit(cache=True, fastmath=True)
 # def _deltaFit(k, *args):
 #     """ This is the objective function used in the determination of the FX
@@ -395,9 +418,12 @@ class FinSwaptionVolSurface():
                  strikeGrid: (np.ndarray),
                  volatilityGrid: (np.ndarray),
                  volatilityFunctionType:FinVolFunctionTypes=FinVolFunctionTypes.SABR,
-                 finSolverType:FinSolverTypes=FinSolverTypes.NELDER_MEAD):
+                 finSolverType:FinSolverTypes=FinSolverTypes.NELDER_MEAD,
+                 initialParameters=None):
         """ Create the FinSwaptionVolSurface object by passing in market vol 
-        data for a list of strikes and expiry dates. """
+        data for a list of strikes and expiry dates. The calibration can be
+        warm started from the _parameters of an earlier surface by passing them
+        in as initialParameters. """
 
         check_argument_types(self.__init__, locals())
 
@@ -429,7 +455,8 @@ class FinSwaptionVolSurface():
 
         self._fwdSwapRates = fwdSwapRates
 
-        self._buildVolSurface(finSolverType=finSolverType)
+        self._buildVolSurface(finSolverType=finSolverType,
+                              initialParameters=initialParameters)
 
 ###############################################################################
 
@@ -515,6 +542,21 @@ class FinSwaptionVolSurface():
 
         return volt
 
+###############################################################################
+
+    def volatilityFromStrikeTimeVect(self, strikes, times):
+        """ Interpolates the Black-Scholes volatilities from the surface for
+        arrays of strikes and of expiry times in years. See the function of
+        the same name in surface_interp. """
+
+        return volatilityFromStrikeTimeVect(self._texp, strikes, times,
+                                            _smileVolsVect,
+                                            self._volatilityFunctionType.value,
+                                            self._parameters,
+                                            self._texp,
+                                            np.asarray(self._fwdSwapRates,
+                                                       float))
+
 ###############################################################################
 
     # def deltaToStrike(self, callDelta, expiry_date, deltaMethod):
@@ -730,8 +772,12 @@ class FinSwaptionVolSurface():
 
 ###############################################################################
 
-    def _buildVolSurface(self, finSolverType=FinSolverTypes.NELDER_MEAD):
-        """ Main function to construct the vol surface. """
+    def _buildVolSurface(self, finSolverType=FinSolverTypes.NELDER_MEAD,
+                         initialParameters=None):
+        """ Main function to construct the vol surface. Each expiry slice is
+        fitted starting from its row of initialParameters if these are given,
+        for example the parameters of the same surface at an earlier time. The
+        LEVENBERG_MARQUARDT solver fits all of the slices in parallel. """
 
         if self._volatilityFunctionType == FinVolFunctionTypes.CLARK:
             numParameters = 3
@@ -774,10 +820,48 @@ class FinSwaptionVolSurface():
 
         volTypeValue = self._volatilityFunctionType.value
 
+        if initialParameters is not None:
+
+            initialParameters = np.array(initialParameters, dtype=float)
+
+            if initialParameters.shape != self._parameters.shape:
+                raise FinError("Initial parameters must have one row of "
+                               + str(numParameters)
+                               + " parameters per expiry date.")
+
+        fwds = np.array(self._fwdSwapRates, dtype=float)
+
+        if finSolverType == FinSolverTypes.LEVENBERG_MARQUARDT:
+
+            strikes = np.array(self._strikeGrid, dtype=float).T.copy()
+            vols = np.array(self._volatilityGrid, dtype=float).T.copy()
+
+            if initialParameters is None:
+                initialParameters = smileInitialGuesses(volTypeValue,
+                                                        numParameters,
+                                                        self._texp,
+                                                        fwds,
+                                                        strikes,
+                                                        vols)
+
+            self._parameters = calibrateSmilesLM(volTypeValue,
+                                                 self._texp,
+                                                 fwds,
+                                                 strikes,
+                                                 vols,
+                                                 initialParameters,
+                                                 1e-12,
+                                                 gSmileCalibrationMaxIter)
+            return
+
         xinits = []
         xinit = np.zeros(numParameters)
         xinits.append(xinit)
 
+        # Warm starts replace the previous slice as the starting point
+        if initialParameters is not None:
+            xinits = list(initialParameters)
+
         for i in range(0, numExpiryDates):
 
             t = self._texp[i]
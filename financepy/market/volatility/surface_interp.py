@@ -0,0 +1,117 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, float64, int64
+
+from ...utils.FinError import FinError
+
+###############################################################################
+# Array lookup of volatilities from a surface of expiry slices. The slices
+# that bracket each expiry time are found by binary search and the two smile
+# volatilities are linearly interpolated in variance. Only the evaluation of
+# the smile of a slice depends on the surface, so each surface provides a
+# compiled function that returns the smile volatilities of a set of slices.
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def expiryBrackets(texp, times):
+    """ Return the indices of the expiry slices before and after each time.
+    Before the first slice and after the last slice both indices are those
+    of the nearest slice. """
+
+    numCurves = len(texp)
+    n = len(times)
+    index0 = np.empty(n, dtype=np.int64)
+    index1 = np.empty(n, dtype=np.int64)
+
+    for j in range(0, n):
+
+        i1 = np.searchsorted(texp, times[j])
+
+        if i1 == 0 or numCurves == 1:
+            i0 = 0
+            i1 = 0
+        elif i1 == numCurves:
+            i0 = numCurves - 1
+            i1 = numCurves - 1
+        else:
+            i0 = i1 - 1
+
+        index0[j] = i0
+        index1[j] = i1
+
+    return index0, index1
+
+###############################################################################
+
+
+@njit(float64[:](float64[:], float64[:], int64[:], int64[:], float64[:],
+                 float64[:]), cache=True, fastmath=True)
+def interpolateVariance(texp, times, index0, index1, vol0, vol1):
+    """ Linearly interpolate the total variance between the smile vols vol0
+    and vol1 of the bracketing slices and return the volatilities. """
+
+    n = len(times)
+    vols = np.empty(n)
+
+    for j in range(0, n):
+
+        t = times[j]
+        t0 = texp[index0[j]]
+        t1 = texp[index1[j]]
+
+        if np.abs(t1-t0) > 1e-6:
+
+            vart0 = vol0[j]*vol0[j]*t0
+            vart1 = vol1[j]*vol1[j]*t1
+            vart = ((t-t0) * vart1 + (t1-t) * vart0) / (t1 - t0)
+
+            if vart < 0.0:
+                raise FinError("Negative variance.")
+
+            vols[j] = np.sqrt(vart/t)
+
+        else:
+            vols[j] = vol1[j]
+
+    return vols
+
+###############################################################################
+
+
+def volatilityFromStrikeTimeVect(texp, strikes, times, smileVols, *args):
+    """ Interpolates the Black-Scholes volatilities from a surface with
+    expiry slices at times texp for arrays of strikes and of expiry times in
+    years from the valuation date. The arrays are broadcast against each
+    other, so a vector of strikes and a column of times give a grid. The
+    interpolation is the same as volatilityFromStrikeDate but it is done in
+    compiled loops with no Python call per point. The compiled function
+    smileVols(index, strikes, *args) returns the smile volatility of slice
+    index[j] at strikes[j]. Returns an array of the broadcast shape. """
+
+    (strikes, times) = np.broadcast_arrays(np.asarray(strikes, float),
+                                           np.asarray(times, float))
+
+    if np.any(times <= 0.0):
+        raise FinError("Expiry times must be positive.")
+
+    shape = strikes.shape
+    strikes = strikes.ravel().copy()
+    times = times.ravel().copy()
+
+    (index0, index1) = expiryBrackets(texp, times)
+
+    vol0 = smileVols(index0, strikes, *args)
+
+    # Only the times between two slices need the second smile
+    vol1 = vol0.copy()
+    between = index1 != index0
+    vol1[between] = smileVols(index1[between], strikes[between], *args)
+
+    vols = interpolateVariance(texp, times, index0, index1, vol0, vol1)
+    return vols.reshape(shape)
+
+###############################################################################
@@ -15,6 +15,7 @@ from .FinModel import FinModel
 from .equity_crr_tree import crrTreeValAvg
 from .black_scholes_analytic import bawValue
 from .black_scholes_analytic import bsValue
+from .black_scholes_pde import bsPDEValue
 
 from enum import Enum
 
@@ -23,6 +24,7 @@ class FinModelBlackScholesTypes(Enum):
         ANALYTICAL = 1
         CRR_TREE = 2
         BARONE_ADESI = 3
+        PDE = 4
 
 ###############################################################################
 
@@ -70,6 +72,13 @@ class FinModelBlackScholes(FinModel):
 
                 return v
 
+            elif self._implementationType == FinModelBlackScholesTypes.PDE:
+
+                v = self._valuePDE(spotPrice, timeToExpiry, strikePrice,
+                                   riskFreeRate, dividendRate, optionType)
+
+                return v
+
             else:
                 
                 raise FinError("Implementation not available for this product")
@@ -102,6 +111,13 @@ class FinModelBlackScholes(FinModel):
 
                 return v
 
+            elif self._implementationType == FinModelBlackScholesTypes.PDE:
+
+                v = self._valuePDE(spotPrice, timeToExpiry, strikePrice,
+                                   riskFreeRate, dividendRate, optionType)
+
+                return v
+
             else:
                 
                 raise FinError("Implementation not available for this product")
@@ -112,3 +128,42 @@ class FinModelBlackScholes(FinModel):
 
 ###############################################################################
 
+    def _valuePDE(self,
+                  spotPrice,
+                  timeToExpiry,
+                  strikePrice,
+                  riskFreeRate,
+                  dividendRate,
+                  optionType):
+        """ Value a European or American call or put with the finite
+        difference PDE solver using num_steps_per_year time steps for each
+        year and twice as many stock price steps as time steps. """
+
+        if optionType == FinOptionTypes.EUROPEAN_CALL \
+                or optionType == FinOptionTypes.AMERICAN_CALL:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        def payoff(s):
+            return np.maximum(phi * (s - strikePrice), 0.0)
+
+        if optionType == FinOptionTypes.AMERICAN_CALL \
+                or optionType == FinOptionTypes.AMERICAN_PUT:
+            exercise = payoff
+        else:
+            exercise = None
+
+        numTimeSteps = max(int(self._num_steps_per_year * timeToExpiry), 10)
+
+        v = bsPDEValue(spotPrice, timeToExpiry, riskFreeRate, dividendRate,
+                       self._volatility, payoff, exercise,
+                       points=[strikePrice], numTimeSteps=numTimeSteps,
+                       numSpaceSteps=2 * numTimeSteps)['value']
+
+        if np.ndim(v) == 0:
+            v = float(v)
+
+        return v
+
+###############################################################################
@@ -3,12 +3,13 @@
 ##############################################################################
 
 import numpy as np
+from math import erfc, exp, log, sqrt
 from numba import float64, int64, vectorize, njit
 from scipy import optimize
 
 from ..utils.global_types import FinOptionTypes
 from ..utils.global_vars import gSmall
-from ..utils.math import NVect, NPrimeVect
+from ..utils.math import NVect, NPrimeVect, norminvcdf, INVROOT2PI
 from ..utils.FinError import FinError
 from ..utils.FinSolvers1D import bisection, newton, newton_secant
 
@@ -321,6 +322,151 @@ def bsImpliedVolatility(s, t, k, r, q, price, optionTypeValue):
 
     return sigma
 
+###############################################################################
+# Implied volatility of whole option chains. The price is normalised to the
+# undiscounted Black price divided by sqrt(F K) which only depends on the log
+# moneyness x = ln(F/K) and the total volatility s = sigma * sqrt(t). The
+# initial guess uses Jaeckel's rational approximations either side of the
+# inflexion point s = sqrt(2|x|) and is then improved by a fixed number of
+# third order Householder steps. Below the inflexion point the steps are taken
+# on the log of the price which is close to linear in 1/s there. These
+# kernels are not compiled with fastmath so that NaN results are preserved.
+###############################################################################
+
+gImpliedVolNumIterations = 3
+gImpliedVolTolerance = 1e-10
+gImpliedVolMinTimeValue = 1e-12
+INVROOT2 = 0.7071067811865475
+
+###############################################################################
+
+
+@njit(float64(float64), cache=True)
+def _normcdf(x):
+    """ Normal CDF from the complementary error function so that it keeps
+    its relative accuracy far into the lower tail. """
+    return 0.5 * erfc(-x * INVROOT2)
+
+###############################################################################
+
+
+@njit(float64(float64, float64), cache=True)
+def _normalisedCall(x, s):
+    """ Undiscounted Black call price divided by sqrt(F K) for log moneyness
+    x and total volatility s. """
+
+    return exp(0.5 * x) * _normcdf(x / s + 0.5 * s) \
+        - exp(-0.5 * x) * _normcdf(x / s - 0.5 * s)
+
+###############################################################################
+
+
+@njit(float64(float64, float64, float64, float64, float64, float64, int64),
+      cache=True)
+def _bsImpliedVolatilityFast(s, t, k, r, q, price, optionTypeValue):
+    """ Black-Scholes implied volatility of a European vanilla option. It
+    returns NaN if the price has no implied volatility or if the solution
+    has not converged. """
+
+    if optionTypeValue == FinOptionTypes.EUROPEAN_CALL.value:
+        theta = 1.0
+    elif optionTypeValue == FinOptionTypes.EUROPEAN_PUT.value:
+        theta = -1.0
+    else:
+        return np.nan
+
+    if not (t > 0.0 and s > 0.0 and k > 0.0 and price >= 0.0):
+        return np.nan
+
+    fwd = s * exp((r - q) * t)
+    x = log(fwd / k)
+    b = price * exp(r * t) / sqrt(fwd * k)
+
+    # Flip ITM call option to be OTM put and vice-versa using put call parity
+    if theta * x > 0.0:
+        bITM = b
+        b = b - theta * (exp(0.5 * x) - exp(-0.5 * x))
+
+        # The time value is lost in the rounding of the price
+        if b < gImpliedVolMinTimeValue * bITM:
+            return np.nan
+
+    # An OTM put is an OTM call with the sign of the moneyness reversed
+    x = -abs(x)
+    bmax = exp(0.5 * x)
+
+    if b == 0.0:
+        return 0.0
+
+    if not (b > 0.0 and b < bmax):
+        return np.nan
+
+    # Total volatility and price at the point of inflexion of the price
+    sc = sqrt(2.0 * abs(x))
+
+    if x == 0.0:
+        bc = 0.0
+    else:
+        bc = _normalisedCall(x, sc)
+
+    lowerBranch = b < bc
+
+    p = min((bmax - b) / (bmax - bc) * _normcdf(-0.5 * sc), 0.5)
+    sv = -2.0 * norminvcdf(p)
+
+    if lowerBranch:
+        # The lower guess is poor close to the money so the better is used
+        svLower = sqrt(2.0 * x * x / (abs(x) - 4.0 * log(b / bc)))
+        errLower = abs(log(_normalisedCall(x, svLower) / b))
+        if sv <= 0.0 or abs(log(_normalisedCall(x, sv) / b)) >= errLower:
+            sv = svLower
+
+    for _ in range(0, gImpliedVolNumIterations):
+
+        bv = _normalisedCall(x, sv)
+
+        # Derivatives of the price with respect to s relative to the first
+        vega = exp(-0.5 * (x * x / (sv * sv) + 0.25 * sv * sv)) * INVROOT2PI
+        g2 = x * x / (sv * sv * sv) - 0.25 * sv
+        g3 = g2 * g2 - 3.0 * x * x / (sv * sv * sv * sv) - 0.25
+
+        if lowerBranch:
+            lam = vega / bv
+            nu = -(log(bv) - log(b)) / lam
+            gamma = g2 - lam
+            delta = g3 - 3.0 * g2 * lam + 2.0 * lam * lam
+        else:
+            nu = -(bv - b) / vega
+            gamma = g2
+            delta = g3
+
+        step = nu * (1.0 + 0.5 * gamma * nu) \
+            / (1.0 + nu * (gamma + delta * nu / 6.0))
+
+        # Do not let a step take the volatility to zero or below
+        sv = max(sv + step, 0.5 * sv)
+
+    bv = _normalisedCall(x, sv)
+
+    if not (abs(bv - b) <= gImpliedVolTolerance * b):
+        return np.nan
+
+    return sv / sqrt(t)
+
+###############################################################################
+
+
+@vectorize([float64(float64, float64, float64, float64, float64, float64,
+                    int64)], cache=True)
+def bsImpliedVolatilityVect(s, t, k, r, q, price, optionTypeValue):
+    """ Calculate the Black-Scholes implied volatility of arrays of European
+    vanilla options such as a whole option chain. The arguments broadcast
+    like those of bsValue. Options whose price is outside the no-arbitrage
+    bounds or for which the solver does not converge are given a NaN
+    volatility rather than raising an error. """
+
+    return _bsImpliedVolatilityFast(s, t, k, r, q, price, optionTypeValue)
+
 ###############################################################################
 ###############################################################################
 # This module contains a number of analytical approximations for the price of
@@ -10,6 +10,8 @@ from numba import njit, float64, int64, prange
 from ..utils.global_types import FinOptionTypes
 from ..utils.FinError import FinError
 from ..models.sobol import getGaussianSobol
+from ..models.monte_carlo_engine import getNumChunks
+from ..models.monte_carlo_engine import gMonteCarloChunkSize
 from math import exp
 
 ###############################################################################
@@ -172,12 +174,57 @@ def _valueMC_NUMBA_ONLY(s, t, K, optionType, r, q, v, num_paths, seed, useSobol)
 
 ###############################################################################
 
-@njit(float64(float64, float64, float64, int64, float64, float64, float64, 
-             int64, int64, int64), fastmath=True, cache=True, parallel=True)
+@njit(fastmath=True, cache=True)
+def _blackScholesChunk(params, num_paths):
+    """ Sum and sum of squares of the antithetic pair payoffs of a European
+    option for one chunk of paths. The params are the stock price, time to
+    expiry, strike, option type value, rates and volatility. """
+
+    s = params[0]
+    t = params[1]
+    K = params[2]
+    optionType = params[3]
+    r = params[4]
+    q = params[5]
+    v = params[6]
+
+    vsqrtt = v * np.sqrt(t)
+    ss = s * np.exp((r - q - v * v / 2.0) * t)
+    g = np.random.standard_normal(num_paths)
+
+    isCall = int(optionType) == FinOptionTypes.EUROPEAN_CALL.value
+
+    total = 0.0
+    totalSq = 0.0
+
+    for i in range(0, num_paths):
+        s_1 = ss * exp(+g[i] * vsqrtt)
+        s_2 = ss * exp(-g[i] * vsqrtt)
+        if isCall:
+            payoff = (max(s_1 - K, 0.0) + max(s_2 - K, 0.0)) / 2.0
+        else:
+            payoff = (max(K - s_1, 0.0) + max(K - s_2, 0.0)) / 2.0
+        total += payoff
+        totalSq += payoff * payoff
+
+    return (total, totalSq)
+
+###############################################################################
+
+@njit(float64(float64, float64, float64, int64, float64, float64, float64,
+              int64, int64, int64), fastmath=True, cache=True, parallel=True)
 def _valueMC_NUMBA_PARALLEL(s, t, K,  optionType, r, q, v, num_paths, seed, useSobol):
-    # No use of Numpy vectorisation but NUMBA 
+    # The random numbers are drawn as before from one seeded stream. The paths
+    # are then valued in fixed chunks on all cores and the chunk sums are
+    # added in chunk order so the value does not depend on the number of
+    # threads. Use FinMonteCarloEngine for independent streams per chunk.
 
     num_paths = int(num_paths)
+
+    if optionType != FinOptionTypes.EUROPEAN_CALL.value and \
+       optionType != FinOptionTypes.EUROPEAN_PUT.value:
+        raise FinError("Unknown option type.")
+
     np.random.seed(seed)
     mu = r - q
     v2 = v**2
@@ -190,29 +237,27 @@ def _valueMC_NUMBA_PARALLEL(s, t, K,  optionType, r, q, v, num_paths, seed, useS
 
     ss = s * np.exp((mu - v2 / 2.0) * t)
 
-    payoff1 = 0.0
-    payoff2 = 0.0
+    numChunks = getNumChunks(num_paths, gMonteCarloChunkSize)
+    chunkPayoffs = np.zeros(numChunks)
 
-    if optionType == FinOptionTypes.EUROPEAN_CALL.value:
-        
-        for i in prange(0, num_paths):
+    for iChunk in prange(0, numChunks):
+        start = iChunk * gMonteCarloChunkSize
+        end = min(start + gMonteCarloChunkSize, num_paths)
+        payoff = 0.0
+        for i in range(start, end):
             s_1 = ss * exp(+g[i] * vsqrtt)
             s_2 = ss * exp(-g[i] * vsqrtt)
-            payoff1 += max(s_1 - K, 0.0)
-            payoff2 += max(s_2 - K, 0.0)
-
-    elif optionType == FinOptionTypes.EUROPEAN_PUT.value:
+            if optionType == FinOptionTypes.EUROPEAN_CALL.value:
+                payoff += max(s_1 - K, 0.0) + max(s_2 - K, 0.0)
+            else:
+                payoff += max(K - s_1, 0.0) + max(K - s_2, 0.0)
+        chunkPayoffs[iChunk] = payoff
 
-        for i in prange(0, num_paths):
-            s_1 = ss * exp(+g[i] * vsqrtt)
-            s_2 = ss * exp(-g[i] * vsqrtt)
-            payoff1 += max(K - s_1, 0.0)
-            payoff2 += max(K - s_2, 0.0)
-
-    else:
-        raise FinError("Unknown option type.")
+    totalPayoff = 0.0
+    for iChunk in range(0, numChunks):
+        totalPayoff += chunkPayoffs[iChunk]
 
-    averagePayoff = (payoff1 + payoff2) / 2.0 / num_paths
+    averagePayoff = totalPayoff / 2.0 / num_paths
     v = averagePayoff * np.exp(-r * t)
     return v
 
@@ -0,0 +1,398 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit
+
+from ..utils.math import cholesky
+
+###############################################################################
+# These kernels compute the Monte-Carlo value of an option under Black-Scholes
+# together with its delta, gamma, vega and rho in the same simulation pass.
+# There is no bump and revalue, so each Greek uses the same random numbers as
+# the price and costs only a few extra multiplications per path.
+#
+# For payoffs that are continuous in the stock price (baskets, rainbows and
+# Asians) the Greeks use the pathwise method. It differentiates each path's
+# payoff with respect to the input with the random numbers held fixed. The
+# gamma is the derivative of the pathwise delta, using the likelihood ratio
+# (LR) weight of the first Gaussian step (Glasserman, Monte Carlo Methods in
+# Financial Engineering, section 7.3).
+#
+# Digital and barrier payoffs jump, so pathwise derivatives are zero almost
+# everywhere. Their Greeks instead multiply the payoff by the derivative of
+# the log-density of the path, which is the LR method.
+#
+# Rho is the derivative with respect to the continuously compounded rate to
+# expiry. That rate sets both the drift and the discount factor.
+###############################################################################
+
+gMCGreeksBasket = 1
+gMCGreeksNthAsset = 2
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _terminalGreeksNUMBA(payoffType,
+                         phi,
+                         K,
+                         nth,
+                         t,
+                         r,
+                         qs,
+                         stock_prices,
+                         volatilities,
+                         corrMatrix,
+                         num_paths,
+                         seed):
+    """ Value a call (phi=1) or put (phi=-1) on the terminal values of
+    correlated GBM assets. It returns the value and arrays of the deltas,
+    gammas and vegas by asset, plus the rho. If the payoffType is
+    gMCGreeksBasket the underlying is the equally weighted basket. If it is
+    gMCGreeksNthAsset the underlying is the nth largest asset price. Antithetic
+    paths are used. """
+
+    np.random.seed(seed)
+
+    numAssets = len(stock_prices)
+    sqrtT = np.sqrt(t)
+    df = np.exp(-r * t)
+    c = cholesky(corrMatrix)
+
+    fwds = np.empty(numAssets)
+    for ia in range(0, numAssets):
+        fwds[ia] = stock_prices[ia] * \
+            np.exp((r - qs[ia] - volatilities[ia]**2 / 2.0) * t)
+
+    y = np.empty(numAssets)
+    u = np.empty(numAssets)
+    s = np.empty(numAssets)
+    grad = np.zeros(numAssets)
+
+    value = 0.0
+    rho = 0.0
+    deltas = np.zeros(numAssets)
+    gammas = np.zeros(numAssets)
+    vegas = np.zeros(numAssets)
+
+    for _ in range(0, num_paths):
+
+        z = np.random.standard_normal(numAssets)
+
+        # Correlated normals y = L z and the LR weights u solving L^T u = z
+        for ia in range(0, numAssets):
+            y[ia] = 0.0
+            for ib in range(0, ia + 1):
+                y[ia] += c[ia, ib] * z[ib]
+
+        for ia in range(numAssets - 1, -1, -1):
+            u[ia] = z[ia]
+            for ib in range(ia + 1, numAssets):
+                u[ia] -= c[ib, ia] * u[ib]
+            u[ia] /= c[ia, ia]
+
+        for sign in (1.0, -1.0):
+
+            for ia in range(0, numAssets):
+                s[ia] = fwds[ia] * np.exp(sign * y[ia] *
+                                          volatilities[ia] * sqrtT)
+                grad[ia] = 0.0
+
+            if payoffType == gMCGreeksBasket:
+                underlying = np.mean(s)
+                payoff = max(phi * (underlying - K), 0.0)
+                if payoff > 0.0:
+                    for ia in range(0, numAssets):
+                        grad[ia] = phi / numAssets
+            else:
+                index = np.argsort(s)[numAssets - nth]
+                payoff = max(phi * (s[index] - K), 0.0)
+                if payoff > 0.0:
+                    grad[index] = phi
+
+            if payoff == 0.0:
+                continue
+
+            value += payoff
+
+            for ia in range(0, numAssets):
+                if grad[ia] == 0.0:
+                    continue
+                vsqrtT = volatilities[ia] * sqrtT
+                dfds = grad[ia] * s[ia]
+                deltas[ia] += dfds
+                gammas[ia] += dfds * (sign * u[ia] / vsqrtT - 1.0)
+                vegas[ia] += dfds * (sign * y[ia] * sqrtT -
+                                     volatilities[ia] * t)
+                rho += dfds * t
+
+    n = 2.0 * num_paths
+    value = df * value / n
+    rho = df * rho / n - t * value
+
+    for ia in range(0, numAssets):
+        s0 = stock_prices[ia]
+        deltas[ia] = df * deltas[ia] / n / s0
+        gammas[ia] = df * gammas[ia] / n / s0 / s0
+        vegas[ia] = df * vegas[ia] / n
+
+    return value, deltas, gammas, vegas, rho
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _asianGreeksNUMBA(t0,
+                      t,
+                      tau,
+                      K,
+                      n,
+                      phi,
+                      stock_price,
+                      r,
+                      q,
+                      volatility,
+                      num_paths,
+                      seed,
+                      accruedAverage):
+    """ Value an arithmetic average rate call (phi=1) or put (phi=-1) with n
+    equally spaced observations in [t0, t]. It returns the value, delta,
+    gamma, vega and rho. If t0 is negative then the averaging has started and
+    the strike and notional are rescaled for the accrued average in the same
+    way as the Monte-Carlo valuation of FinEquityAsianOption. """
+
+    np.random.seed(seed)
+    multiplier = 1.0
+
+    if t0 < 0.0:
+        K = (K * tau + accruedAverage * t0) / t
+        multiplier = t / tau
+        t0 = 0.0
+        n = int(n * t / tau + 0.5) + 1
+
+    mu = r - q
+    v2 = volatility**2
+    dt = (t - t0) / n
+    sqrt_dt = np.sqrt(dt)
+    sqrt_t0 = np.sqrt(t0)
+    df = np.exp(-r * t)
+
+    # The LR weight for gamma comes from the first non-empty step
+    if t0 > 0.0:
+        vsqrtH = volatility * sqrt_t0
+    else:
+        vsqrtH = volatility * sqrt_dt
+
+    value = 0.0
+    delta = 0.0
+    gamma = 0.0
+    vega = 0.0
+    rho = 0.0
+
+    for _ in range(0, num_paths):
+
+        g0 = np.random.standard_normal()
+        g = np.random.standard_normal(n)
+
+        if t0 > 0.0:
+            z1 = g0
+        else:
+            z1 = g[0]
+
+        for sign in (1.0, -1.0):
+
+            w = sign * g0 * sqrt_t0
+            tk = t0
+            sAvg = 0.0
+            dsdvAvg = 0.0
+            dsdrAvg = 0.0
+
+            for obs in range(0, n):
+                w += sign * g[obs] * sqrt_dt
+                tk += dt
+                s = stock_price * np.exp((mu - v2 / 2.0) * tk +
+                                         volatility * w)
+                sAvg += s
+                dsdvAvg += s * (w - volatility * tk)
+                dsdrAvg += s * tk
+
+            sAvg /= n
+            payoff = max(phi * (sAvg - K), 0.0)
+
+            if payoff == 0.0:
+                continue
+
+            value += payoff
+            delta += phi * sAvg
+            gamma += phi * sAvg * (sign * z1 / vsqrtH - 1.0)
+            vega += phi * dsdvAvg / n
+            rho += phi * dsdrAvg / n
+
+    scale = multiplier * df / num_paths / 2.0
+    value = value * scale
+    delta = delta * scale / stock_price
+    gamma = gamma * scale / stock_price / stock_price
+    vega = vega * scale
+    rho = rho * scale - t * value
+
+    return value, delta, gamma, vega, rho
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _digitalGreeksNUMBA(isAssetOrNothing,
+                        phi,
+                        K,
+                        t,
+                        stock_price,
+                        r,
+                        q,
+                        volatility,
+                        num_paths,
+                        seed):
+    """ Value a digital call (phi=1) or put (phi=-1) that pays one unit of
+    cash or one unit of the asset if the stock ends beyond K. It returns the
+    value, delta, gamma, vega and rho. The Greeks use LR weights of the
+    terminal Gaussian. """
+
+    np.random.seed(seed)
+
+    sqrtT = np.sqrt(t)
+    vsqrtT = volatility * sqrtT
+    fwd = stock_price * np.exp((r - q - volatility**2 / 2.0) * t)
+    df = np.exp(-r * t)
+
+    value = 0.0
+    delta = 0.0
+    gamma = 0.0
+    vega = 0.0
+    rho = 0.0
+
+    for _ in range(0, num_paths):
+
+        g = np.random.standard_normal()
+
+        for sign in (1.0, -1.0):
+
+            z = sign * g
+            s = fwd * np.exp(z * vsqrtT)
+
+            if phi * (s - K) <= 0.0:
+                continue
+
+            if isAssetOrNothing:
+                payoff = s
+            else:
+                payoff = 1.0
+
+            value += payoff
+            delta += payoff * z
+            gamma += payoff * (z * z - 1.0 - z * vsqrtT)
+            vega += payoff * ((z * z - 1.0) / volatility - z * sqrtT)
+            rho += payoff * z
+
+    scale = df / num_paths / 2.0
+    value = value * scale
+    delta = delta * scale / stock_price / vsqrtT
+    gamma = gamma * scale / (stock_price * vsqrtT)**2
+    vega = vega * scale
+    rho = rho * scale * sqrtT / volatility - t * value
+
+    return value, delta, gamma, vega, rho
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _barrierGreeksNUMBA(isDown,
+                        isKnockIn,
+                        isKnockedIn,
+                        phi,
+                        K,
+                        B,
+                        t,
+                        numTimeSteps,
+                        stock_price,
+                        r,
+                        q,
+                        volatility,
+                        num_paths,
+                        seed):
+    """ Value a call (phi=1) or put (phi=-1) with a knock-in or knock-out
+    barrier B that is observed at the end of each of numTimeSteps equal time
+    steps. If isKnockedIn is True then a knock-in option has already been
+    triggered. It returns the value, delta, vega and rho. The Greeks use LR
+    weights of the Gaussian path steps. The delta weight only depends on the
+    first step so its variance grows as the observation interval shrinks. The
+    vega weight is a sum over all of the steps. As it has a mean of zero the
+    mean payoff is subtracted from each payoff which removes most of its
+    variance. """
+
+    np.random.seed(seed)
+
+    dt = t / numTimeSteps
+    sqrt_dt = np.sqrt(dt)
+    vsqrt_dt = volatility * sqrt_dt
+    m = (r - q - volatility**2 / 2.0) * dt
+    logB = np.log(B)
+    df = np.exp(-r * t)
+
+    value = 0.0
+    delta = 0.0
+    vega = 0.0
+    rho = 0.0
+    vegaWeight = 0.0
+
+    for _ in range(0, num_paths):
+
+        g = np.random.standard_normal(numTimeSteps)
+        vegaWeight += 2.0 * (np.sum(g * g) - numTimeSteps) / volatility
+
+        for sign in (1.0, -1.0):
+
+            logS = np.log(stock_price)
+            crossed = isKnockedIn
+            sumZ = 0.0
+            sumZ2 = 0.0
+
+            for it in range(0, numTimeSteps):
+                z = sign * g[it]
+                sumZ += z
+                sumZ2 += z * z
+                logS += m + z * vsqrt_dt
+                if isDown:
+                    if logS <= logB:
+                        crossed = True
+                else:
+                    if logS >= logB:
+                        crossed = True
+
+            if crossed != isKnockIn:
+                continue
+
+            payoff = max(phi * (np.exp(logS) - K), 0.0)
+
+            if payoff == 0.0:
+                continue
+
+            value += payoff
+            delta += payoff * sign * g[0]
+            vega += payoff * ((sumZ2 - numTimeSteps) / volatility -
+                              sumZ * sqrt_dt)
+            rho += payoff * sumZ
+
+    # The odd weights sum to zero over each antithetic pair of paths
+    vega -= value * vegaWeight / num_paths / 2.0
+
+    scale = df / num_paths / 2.0
+    value = value * scale
+    delta = delta * scale / stock_price / vsqrt_dt
+    vega = vega * scale
+    rho = rho * scale * sqrt_dt / volatility - t * value
+
+    return value, delta, vega, rho
+
+###############################################################################
@@ -0,0 +1,457 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, float64, int64, boolean
+
+from ..utils.FinError import FinError
+
+###############################################################################
+# Finite difference solution of the Black-Scholes PDE
+#
+#   dV/dt + 0.5 sigma^2 S^2 d2V/dS2 + (r - q) S dV/dS - r V = 0
+#
+# on a non-uniform grid of stock prices that is concentrated around the strike
+# and spot. The PDE is rolled back from expiry with the Crank-Nicolson scheme.
+# The first steps are replaced by fully implicit half steps (Rannacher) so
+# that the kink in the payoff does not produce oscillations in the Greeks.
+#
+# A barrier is the edge of the grid and has a Dirichlet condition with a value
+# that may depend on the time to expiry. Without a barrier the lower edge is
+# S = 0 and the value at the upper edge is assumed to be linear in S. Early
+# exercise is handled with the Brennan-Schwartz algorithm in which the floor
+# is applied during the back substitution of the tridiagonal solve, starting
+# in the exercise region. Cash dividends are jump conditions at the ex-dates.
+#
+# The tridiagonal matrix is only factorised again when the time step changes,
+# so a step costs one pass over the grid to build the right hand side and one
+# forward and backward sweep to solve.
+###############################################################################
+
+gPDEGridWidth = 0.1
+gPDEGridWeight = 10.0
+
+###############################################################################
+
+
+def pdeGrid(sMin, sMax, numSpaceSteps, points, pinnedPoints=()):
+    """ Create a grid of numSpaceSteps + 1 stock prices from sMin to sMax
+    whose spacing is smallest close to each of the points. The density of the
+    nodes is one plus a Lorentzian of height gPDEGridWeight and width
+    gPDEGridWidth x (sMax - sMin) at each point. Each of the pinnedPoints that
+    is inside the grid is then placed exactly on a node. """
+
+    if sMax <= sMin:
+        raise FinError("Grid maximum must be above the grid minimum.")
+
+    if numSpaceSteps < 4:
+        raise FinError("Number of space steps must be at least 4.")
+
+    width = gPDEGridWidth * (sMax - sMin)
+    z = np.linspace(sMin, sMax, 20 * numSpaceSteps + 1)
+    density = np.ones(len(z))
+    for p in points:
+        density += gPDEGridWeight / (1.0 + ((z - p) / width)**2)
+
+    cumDensity = np.zeros(len(z))
+    cumDensity[1:] = np.cumsum(0.5 * (density[1:] + density[:-1]) *
+                               np.diff(z))
+    cumDensity = cumDensity / cumDensity[-1]
+
+    # Move the pinned points to the nearest node by stretching the uniform
+    # index between them, which keeps the spacing smooth on each side
+    knotIndex = [0.0]
+    knotNode = [0.0]
+    for p in sorted(pinnedPoints):
+        if p <= sMin or p >= sMax:
+            continue
+        f = numSpaceSteps * np.interp(p, z, cumDensity)
+        m = int(round(f))
+        if m <= knotNode[-1] or m >= numSpaceSteps:
+            continue
+        knotIndex.append(f)
+        knotNode.append(m)
+    knotIndex.append(numSpaceSteps)
+    knotNode.append(numSpaceSteps)
+
+    u = np.interp(np.arange(0, numSpaceSteps + 1), knotNode, knotIndex)
+    s = np.interp(u / numSpaceSteps, cumDensity, z)
+    s[0] = sMin
+    s[-1] = sMax
+    return s
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _tridiagonalFactor(a, b, c):
+    """ Forward elimination of the tridiagonal matrix with sub-diagonal a,
+    diagonal b and super-diagonal c. Returns the modified super-diagonal and
+    the inverse pivots so that right hand sides can be solved in O(n). """
+
+    n = len(b)
+    cp = np.zeros(n)
+    m = np.zeros(n)
+
+    m[0] = 1.0 / b[0]
+    cp[0] = c[0] * m[0]
+
+    for i in range(1, n):
+        m[i] = 1.0 / (b[i] - a[i] * cp[i - 1])
+        cp[i] = c[i] * m[i]
+
+    return cp, m
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _tridiagonalSolve(a, cp, m, d, floor, useFloor):
+    """ Solve the factorised tridiagonal system for the right hand side d. If
+    useFloor is true the solution is floored during the back substitution,
+    which is the Brennan-Schwartz algorithm for early exercise. """
+
+    n = len(d)
+    dp = np.zeros(n)
+    x = np.zeros(n)
+
+    dp[0] = d[0] * m[0]
+    for i in range(1, n):
+        dp[i] = (d[i] - a[i] * dp[i - 1]) * m[i]
+
+    x[n - 1] = dp[n - 1]
+    if useFloor:
+        x[n - 1] = max(x[n - 1], floor[n - 1])
+
+    for i in range(n - 2, -1, -1):
+        x[i] = dp[i] - cp[i] * x[i + 1]
+        if useFloor:
+            x[i] = max(x[i], floor[i])
+
+    return x
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:], float64[:], float64, float64, float64,
+                    float64[:], float64[:], boolean, boolean, float64[:],
+                    boolean, float64[:], int64[:], float64[:], int64),
+      cache=True, fastmath=True)
+def _pdeRollback(s, times, r, q, volatility, payoff, exercise, isAmerican,
+                 isLowerBarrier, lowerValues, isUpperBarrier, upperValues,
+                 dividendIndices, dividendAmounts, numRannacherSteps):
+    """ Roll the payoff at the last of the times back to the first time on
+    the grid s. The barrier values are given at each of the times. A cash
+    dividend paid at times[dividendIndices[k]] has amount dividendAmounts[k].
+    Returns the values at the first two times. """
+
+    n = len(s)
+    numTimes = len(times)
+
+    # Spatial operator L V = l V[i-1] + d V[i] + u V[i+1]
+    lo = np.zeros(n)
+    di = np.zeros(n)
+    up = np.zeros(n)
+
+    a2 = 0.5 * volatility * volatility
+    mu = r - q
+
+    for i in range(1, n - 1):
+        hm = s[i] - s[i - 1]
+        hp = s[i + 1] - s[i]
+        diff = a2 * s[i] * s[i]
+        conv = mu * s[i]
+        lo[i] = 2.0 * diff / (hm * (hm + hp)) - conv * hp / (hm * (hm + hp))
+        up[i] = 2.0 * diff / (hp * (hm + hp)) + conv * hm / (hp * (hm + hp))
+        di[i] = -2.0 * diff / (hm * hp) + conv * (hp - hm) / (hm * hp) - r
+
+    # At S = 0 the PDE reduces to dV/dt = r V
+    di[0] = -r
+
+    # The value is linear in S at the top of the grid
+    h = s[n - 1] - s[n - 2]
+    lo[n - 1] = -mu * s[n - 1] / h
+    di[n - 1] = mu * s[n - 1] / h - r
+
+    # The Brennan-Schwartz back substitution must start in the exercise region
+    # so if this is at the bottom of the grid the system is solved in reverse
+    reverse = isAmerican and exercise[0] > exercise[n - 1]
+
+    floor = exercise.copy()
+    if reverse:
+        floor = floor[::-1].copy()
+
+    v = payoff.copy()
+    vPrev = payoff.copy()
+    rhs = np.zeros(n)
+    a = np.zeros(n)
+    b = np.zeros(n)
+    c = np.zeros(n)
+    aS = np.zeros(n)
+    cp = np.zeros(n)
+    m = np.zeros(n)
+
+    lastDt = -1.0
+    lastTheta = -1.0
+
+    numSteps = numTimes - 1
+    iDiv = len(dividendIndices) - 1
+
+    for k in range(numSteps - 1, -1, -1):
+
+        dtStep = times[k + 1] - times[k]
+        stepNum = numSteps - 1 - k
+
+        if stepNum < numRannacherSteps:
+            numSub = 2
+            theta = 1.0
+        else:
+            numSub = 1
+            theta = 0.5
+
+        dt = dtStep / numSub
+
+        # Rounding in the time grid should not force a new factorisation
+        if abs(dt - lastDt) > 1e-10 * dt or theta != lastTheta:
+
+            for i in range(0, n):
+                a[i] = -theta * dt * lo[i]
+                b[i] = 1.0 - theta * dt * di[i]
+                c[i] = -theta * dt * up[i]
+
+            if isLowerBarrier:
+                a[0] = 0.0
+                b[0] = 1.0
+                c[0] = 0.0
+
+            if isUpperBarrier:
+                a[n - 1] = 0.0
+                b[n - 1] = 1.0
+                c[n - 1] = 0.0
+
+            if reverse:
+                aS = c[::-1].copy()
+                cp, m = _tridiagonalFactor(aS, b[::-1].copy(),
+                                           a[::-1].copy())
+            else:
+                aS = a.copy()
+                cp, m = _tridiagonalFactor(aS, b, c)
+
+            lastDt = dt
+            lastTheta = theta
+
+        for iSub in range(0, numSub):
+
+            w = (1.0 - theta) * dt
+
+            rhs[0] = v[0] + w * (di[0] * v[0] + up[0] * v[1])
+            for i in range(1, n - 1):
+                rhs[i] = v[i] + w * (lo[i] * v[i - 1] + di[i] * v[i] +
+                                     up[i] * v[i + 1])
+            rhs[n - 1] = v[n - 1] + w * (lo[n - 1] * v[n - 2] +
+                                         di[n - 1] * v[n - 1])
+
+            # Barrier values at the end of the sub-step
+            frac = (numSub - 1 - iSub) / numSub
+            if isLowerBarrier:
+                rhs[0] = lowerValues[k] + frac * (lowerValues[k + 1] -
+                                                  lowerValues[k])
+            if isUpperBarrier:
+                rhs[n - 1] = upperValues[k] + frac * (upperValues[k + 1] -
+                                                      upperValues[k])
+
+            if reverse:
+                x = _tridiagonalSolve(aS, cp, m, rhs[::-1].copy(), floor,
+                                      isAmerican)
+                v = x[::-1].copy()
+            else:
+                v = _tridiagonalSolve(aS, cp, m, rhs, floor, isAmerican)
+
+        # Cash dividend paid at times[k] so the stock drops by its amount
+        if iDiv >= 0 and dividendIndices[iDiv] == k:
+
+            vJump = np.interp(np.maximum(s - dividendAmounts[iDiv], s[0]),
+                              s, v)
+
+            if isAmerican:
+                vJump = np.maximum(vJump, exercise)
+
+            if isLowerBarrier:
+                vJump[0] = v[0]
+            if isUpperBarrier:
+                vJump[n - 1] = v[n - 1]
+
+            v = vJump
+            iDiv -= 1
+
+        # The values one step after the start are kept for the theta
+        if k == 1:
+            vPrev = v.copy()
+
+    out = np.zeros((2, n))
+    out[0, :] = v
+    out[1, :] = vPrev
+    return out
+
+###############################################################################
+
+
+def _quadraticInterp(s, v, x):
+    """ Value and first and second derivatives at x of the quadratic through
+    the three grid points closest to each x. """
+
+    n = len(s)
+    i = np.clip(np.searchsorted(s, x), 1, n - 1)
+    closer = (s[i] - x) < (x - s[i - 1])
+    i = np.clip(np.where(closer, i, i - 1), 1, n - 2)
+
+    x0 = s[i - 1]
+    x1 = s[i]
+    x2 = s[i + 1]
+    y0 = v[i - 1]
+    y1 = v[i]
+    y2 = v[i + 1]
+
+    d01 = (y1 - y0) / (x1 - x0)
+    d12 = (y2 - y1) / (x2 - x1)
+    d012 = (d12 - d01) / (x2 - x0)
+
+    value = y0 + d01 * (x - x0) + d012 * (x - x0) * (x - x1)
+    delta = d01 + d012 * (2.0 * x - x0 - x1)
+    gamma = 2.0 * d012
+
+    return value, delta, gamma
+
+###############################################################################
+
+
+def bsPDEValue(stock_price,
+               texp,
+               r,
+               q,
+               volatility,
+               payoff,
+               exercise=None,
+               lowerBarrier=None,
+               lowerValue=0.0,
+               upperBarrier=None,
+               upperValue=0.0,
+               dividendTimes=None,
+               dividendAmounts=None,
+               points=(),
+               numTimeSteps: int = 200,
+               numSpaceSteps: int = 200,
+               numStdDevs: float = 5.0,
+               numRannacherSteps: int = 2):
+    """ Value a derivative under Black-Scholes by solving the PDE on a grid.
+    The payoff at expiry is a function of an array of stock prices and the
+    exercise value, if the option is American, is another. A lower or upper
+    barrier is an edge of the grid at which the value is lowerValue or
+    upperValue. These are numbers or functions of an array of times to expiry.
+    Cash dividends of dividendAmounts are paid at dividendTimes in years. The
+    grid is concentrated around the points, which are usually strikes, and
+    the spot. The stock_price may be an array and all of its values are read
+    off the one grid. Returns a dictionary of the value, delta, gamma and
+    theta. """
+
+    s0 = np.asarray(stock_price, dtype=float)
+
+    if np.any(s0 <= 0.0):
+        raise FinError("Stock price must be greater than zero.")
+
+    if texp <= 0.0:
+        raise FinError("Time to expiry must be positive.")
+
+    if volatility <= 0.0:
+        raise FinError("Volatility must be positive.")
+
+    if numTimeSteps < 2:
+        raise FinError("Number of time steps must be at least 2.")
+
+    if lowerBarrier is not None and np.any(s0 <= lowerBarrier):
+        raise FinError("Stock price must be above the lower barrier.")
+
+    if upperBarrier is not None and np.any(s0 >= upperBarrier):
+        raise FinError("Stock price must be below the upper barrier.")
+
+    if dividendTimes is None:
+        dividendTimes = []
+        dividendAmounts = []
+
+    dividendTimes = np.asarray(dividendTimes, dtype=float)
+    dividendAmounts = np.asarray(dividendAmounts, dtype=float)
+
+    if len(dividendTimes) != len(dividendAmounts):
+        raise FinError("Dividend times and amounts must have the same size.")
+
+    # Dividends on or after expiry do not affect the option
+    keep = (dividendTimes > 0.0) & (dividendTimes < texp)
+    dividendTimes = dividendTimes[keep]
+    dividendAmounts = dividendAmounts[keep]
+
+    ###########################################################################
+    # Stock price grid
+    ###########################################################################
+
+    sRef = max(np.max(s0), max(points, default=0.0))
+    sMax = sRef * np.exp((r - q) * texp + numStdDevs * volatility *
+                         np.sqrt(texp))
+    sMin = 0.0
+
+    if lowerBarrier is not None:
+        sMin = lowerBarrier
+
+    if upperBarrier is not None:
+        sMax = upperBarrier
+
+    if s0.size == 1:
+        pinned = list(points) + [float(s0.ravel()[0])]
+    else:
+        pinned = list(points)
+
+    gridPoints = list(points) + [float(np.mean(s0))]
+    s = pdeGrid(sMin, sMax, numSpaceSteps, gridPoints, pinned)
+
+    ###########################################################################
+    # Time grid with a node at each dividend date
+    ###########################################################################
+
+    times = np.linspace(0.0, texp, numTimeSteps + 1)
+    times = np.unique(np.concatenate((times, dividendTimes)))
+    dividendIndices = np.searchsorted(times, dividendTimes).astype(np.int64)
+    order = np.argsort(dividendIndices)
+    dividendIndices = dividendIndices[order]
+    dividendAmounts = dividendAmounts[order].astype(float)
+
+    tau = texp - times
+
+    def boundary(value):
+        if callable(value):
+            return np.asarray(value(tau), dtype=float) * np.ones(len(tau))
+        return float(value) * np.ones(len(tau))
+
+    lowerValues = boundary(lowerValue)
+    upperValues = boundary(upperValue)
+
+    vT = np.asarray(payoff(s), dtype=float) * np.ones(len(s))
+
+    isAmerican = exercise is not None
+    if isAmerican:
+        ex = np.asarray(exercise(s), dtype=float) * np.ones(len(s))
+    else:
+        ex = np.zeros(len(s))
+
+    out = _pdeRollback(s, times, r, q, volatility, vT, ex, isAmerican,
+                       lowerBarrier is not None, lowerValues,
+                       upperBarrier is not None, upperValues,
+                       dividendIndices, dividendAmounts,
+                       numRannacherSteps)
+
+    (v0, delta, gamma) = _quadraticInterp(s, out[0], s0)
+    (v1, _, _) = _quadraticInterp(s, out[1], s0)
+    theta = (v1 - v0) / times[1]
+
+    return {'value': v0, 'delta': delta, 'gamma': gamma, 'theta': theta}
+
+###############################################################################
@@ -2,46 +2,153 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-# TODO: Use Numba to speed this up more.
-
 import numpy as np
+from numba import njit, float64, int64
 
-from ..utils.math import N
-from ..utils.helpers import uniformToDefaultTime
+from ..utils.math import NVect
 
 ###############################################################################
-# TODO:
+# Default times are found by inverting each issuer survival curve Q(t). The
+# curves are packed into arrays of times and cumulative hazards -log(Q) so
+# that all issuers and trials can be mapped in compiled code. A uniform u is
+# placed on its curve segment by a binary search on -log(u) and the time is
+# then interpolated linearly in log survival probability. This is the same
+# mapping as helpers.uniformToDefaultTime. The trials are generated in chunks
+# so that memory does not grow with the number of trials.
 ###############################################################################
 
+gDefaultTimesChunkSize = 50000
 
-def default_timesGC(issuer_curves,
-                   correlationMatrix,
-                   num_trials,
-                   seed):
-    """ Generate a matrix of default times by credit and trial using a
-    Gaussian copula model using a full rank correlation matrix. """
+###############################################################################
+
+
+def survivalCurveSegments(issuer_curves):
+    """ Pack the survival curves of the issuers into arrays of times and
+    cumulative hazards -log(Q(t)) by credit. Shorter curves are padded with
+    their last point. Returns the times, hazards and number of points of
+    each curve. """
 
-    np.random.seed(seed)
     num_credits = len(issuer_curves)
-    x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
-    c = np.linalg.cholesky(correlationMatrix)
-    y = np.dot(c, x)
+    num_points = np.array([len(c._times) for c in issuer_curves],
+                          dtype=np.int64)
+    maxPoints = np.max(num_points)
 
-    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+    times = np.zeros((num_credits, maxPoints))
+    hazards = np.zeros((num_credits, maxPoints))
 
     for iCredit in range(0, num_credits):
-        issuer_curve = issuer_curves[iCredit]
+        n = num_points[iCredit]
+        times[iCredit, :n] = issuer_curves[iCredit]._times
+        hazards[iCredit, :n] = -np.log(issuer_curves[iCredit]._values)
+        times[iCredit, n:] = times[iCredit, n - 1]
+        hazards[iCredit, n:] = hazards[iCredit, n - 1]
+
+    return times, hazards, num_points
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :], float64[:, :], float64[:, :], int64[:]),
+      cache=True)
+def uniformsToDefaultTimes(u, times, hazards, num_points):
+    """ Map a matrix of uniforms by credit and trial to default times by
+    inverting each issuer survival curve. A uniform above the last survival
+    probability is mapped using the average hazard rate of the curve. """
+
+    num_credits, num_trials = u.shape
+    tau = np.empty((num_credits, num_trials))
+
+    for iCredit in range(0, num_credits):
+
+        n = num_points[iCredit]
+        t = times[iCredit, :n]
+        h = hazards[iCredit, :n]
+
         for iTrial in range(0, num_trials):
-            g = y[iCredit, iTrial]
-            u1 = 1.0 - N(g)
-            u2 = 1.0 - u1
-            times = issuer_curve._times
-            values = issuer_curve._values
-            t1 = uniformToDefaultTime(u1, times, values)
-            t2 = uniformToDefaultTime(u2, times, values)
-            corrTimes[iCredit, iTrial] = t1
-            corrTimes[iCredit, num_trials + iTrial] = t2
 
+            x = u[iCredit, iTrial]
+
+            if x == 0.0:
+                tau[iCredit, iTrial] = 99999.0
+                continue
+
+            if x == 1.0:
+                tau[iCredit, iTrial] = 0.0
+                continue
+
+            hu = -np.log(x)
+            index = np.searchsorted(h, hu, side='right')
+
+            if index < n:
+                t1 = t[index - 1]
+                h1 = h[index - 1]
+                t2 = t[index]
+                h2 = h[index]
+            else:
+                t1 = t[n - 1]
+                h1 = h[n - 1]
+                t2 = t[0]
+                h2 = h[0]
+
+            tau[iCredit, iTrial] = t1 + (t2 - t1) * (hu - h1) / (h2 - h1)
+
+    return tau
+
+###############################################################################
+
+
+def _antitheticDefaultTimes(u1, times, hazards, num_points):
+    """ Default times for the uniforms u1 followed by those for 1 - u1. """
+
+    num_credits, num_trials = u1.shape
+    u2 = 1.0 - u1
+
+    corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
+    corrTimes[:, :num_trials] = uniformsToDefaultTimes(u1, times, hazards,
+                                                       num_points)
+    corrTimes[:, num_trials:] = uniformsToDefaultTimes(u2, times, hazards,
+                                                       num_points)
     return corrTimes
 
+###############################################################################
+
+
+def default_timesGC_Chunks(issuer_curves,
+                           correlationMatrix,
+                           num_trials,
+                           seed,
+                           chunkSize=gDefaultTimesChunkSize):
+    """ Generate the default times of the Gaussian copula in chunks of at
+    most chunkSize trials. Each chunk is a matrix by credit and trial with
+    the antithetic trials in its second half. If num_trials is no more than
+    chunkSize the one chunk is the same as the result of default_timesGC. """
+
+    np.random.seed(seed)
+    num_credits = len(issuer_curves)
+    c = np.linalg.cholesky(correlationMatrix)
+    (times, hazards, num_points) = survivalCurveSegments(issuer_curves)
+
+    numDone = 0
+    while numDone < num_trials:
+        n = min(chunkSize, num_trials - numDone)
+        x = np.random.normal(0.0, 1.0, size=(num_credits, n))
+        y = np.dot(c, x)
+        u1 = 1.0 - NVect(y)
+        yield _antitheticDefaultTimes(u1, times, hazards, num_points)
+        numDone += n
+
+###############################################################################
+
+
+def default_timesGC(issuer_curves,
+                    correlationMatrix,
+                    num_trials,
+                    seed):
+    """ Generate a matrix of default times by credit and trial using a
+    Gaussian copula model using a full rank correlation matrix. """
+
+    chunks = default_timesGC_Chunks(issuer_curves, correlationMatrix,
+                                    num_trials, seed, max(num_trials, 1))
+    return next(chunks)
+
 ##########################################################################
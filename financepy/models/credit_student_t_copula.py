@@ -2,47 +2,113 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
-from math import sqrt
 import numpy as np
-from scipy.stats import t as student
+from numba import njit, float64, int64
+from scipy.special import stdtr
 
-from ..utils.helpers import uniformToDefaultTime
+from .credit_gaussian_copula import survivalCurveSegments
+from .credit_gaussian_copula import _antitheticDefaultTimes
+from .credit_gaussian_copula import gDefaultTimesChunkSize
+
+###############################################################################
+
+
+@njit(float64[:, :](float64[:, :], int64), cache=True)
+def studentTCDF(x, dof):
+    """ Cumulative distribution function of the Student-t distribution with
+    an integer number of degrees of freedom applied to a matrix. This uses
+    the finite series in theta = atan(x/sqrt(dof)) given in Abramowitz and
+    Stegun 26.7.3 and 26.7.4 which is much faster than the incomplete beta
+    function for the small dof values used in copula models. """
+
+    numRows, numCols = x.shape
+    cdf = np.empty((numRows, numCols))
+
+    for i in range(0, numRows):
+        for j in range(0, numCols):
+
+            t = x[i, j]
+            theta = np.arctan(t / np.sqrt(dof))
+            s = np.sin(theta)
+            c2 = np.cos(theta) ** 2
+
+            if dof % 2 == 1:
+                a = theta
+                if dof > 1:
+                    term = np.cos(theta)
+                    total = term
+                    for k in range(1, (dof - 1) // 2):
+                        term *= c2 * (2.0 * k) / (2.0 * k + 1.0)
+                        total += term
+                    a += s * total
+                a *= 2.0 / np.pi
+            else:
+                term = 1.0
+                total = 1.0
+                for k in range(1, dof // 2):
+                    term *= c2 * (2.0 * k - 1.0) / (2.0 * k)
+                    total += term
+                a = s * total
+
+            cdf[i, j] = 0.5 + 0.5 * a
+
+    return cdf
 
 ###############################################################################
 
 
 class FinModelStudentTCopula():
 
-    def default_times(self,
-                     issuer_curves,
-                     correlationMatrix,
-                     degreesOfFreedom,
-                     num_trials,
-                     seed):
+    def default_timesChunks(self,
+                            issuer_curves,
+                            correlationMatrix,
+                            degreesOfFreedom,
+                            num_trials,
+                            seed,
+                            chunkSize=gDefaultTimesChunkSize):
+        """ Generate the default times of the Student-t copula in chunks of
+        at most chunkSize trials. Each chunk is a matrix by credit and trial
+        with the antithetic trials in its second half. If num_trials is no
+        more than chunkSize the one chunk is the same as the result of
+        default_times. """
 
         np.random.seed(seed)
         num_credits = len(issuer_curves)
-        x = np.random.normal(0.0, 1.0, size=(num_credits, num_trials))
         c = np.linalg.cholesky(correlationMatrix)
-        y = np.dot(c, x)
-
-        corrTimes = np.empty(shape=(num_credits, 2 * num_trials))
-
-        for iTrial in range(0, num_trials):
-            chi2 = np.random.chisquare(degreesOfFreedom)
-            c = sqrt(chi2 / degreesOfFreedom)
-            for iCredit in range(0, num_credits):
-                issuer_curve = issuer_curves[iCredit]
-                g = y[iCredit, iTrial] / c
-                u1 = student.cdf(g, degreesOfFreedom)
-                u2 = 1.0 - u1
-                times = issuer_curve._times
-                values = issuer_curve._values
-                t1 = uniformToDefaultTime(u1, times, values)
-                t2 = uniformToDefaultTime(u2, times, values)
-                corrTimes[iCredit, iTrial] = t1
-                corrTimes[iCredit, iTrial + num_trials] = t2
-
-        return corrTimes
+        (times, hazards, num_points) = survivalCurveSegments(issuer_curves)
+
+        # The series form of the distribution needs whole degrees of freedom
+        intDoF = degreesOfFreedom >= 1 and \
+            float(degreesOfFreedom).is_integer()
+
+        numDone = 0
+        while numDone < num_trials:
+            n = min(chunkSize, num_trials - numDone)
+            x = np.random.normal(0.0, 1.0, size=(num_credits, n))
+            y = np.dot(c, x)
+            chi2 = np.random.chisquare(degreesOfFreedom, size=n)
+            g = y / np.sqrt(chi2 / degreesOfFreedom)
+            if intDoF:
+                u1 = studentTCDF(g, int(degreesOfFreedom))
+            else:
+                u1 = stdtr(degreesOfFreedom, g)
+            yield _antitheticDefaultTimes(u1, times, hazards, num_points)
+            numDone += n
+
+###############################################################################
+
+    def default_times(self,
+                      issuer_curves,
+                      correlationMatrix,
+                      degreesOfFreedom,
+                      num_trials,
+                      seed):
+        """ Generate a matrix of default times by credit and trial using a
+        Student-t copula model with a full rank correlation matrix. """
+
+        chunks = self.default_timesChunks(issuer_curves, correlationMatrix,
+                                          degreesOfFreedom, num_trials, seed,
+                                          max(num_trials, 1))
+        return next(chunks)
 
 ###############################################################################
@@ -5,21 +5,24 @@
 import numpy as np
 from numba import njit, float64, int64
 from ..utils.math import cholesky
+from .process_simulator import _getGBMPathStatistics, FinGBMNumericalScheme
+from .process_simulator import _accumulatorCodes, _updateAccumulators
+from .process_simulator import FinPathAccumulatorTypes
+from .random_draw_cache import getCachedGaussians, getNormals
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64, float64, int64),
-      cache=True, fastmath=True)
-def getPaths(num_paths,
-             numTimeSteps,
-             t,
-             mu,
-             stock_price,
-             volatility,
-             seed):
-    """ Get the simulated GBM process for a single asset with many paths and
-    time steps. Inputs include the number of time steps, paths, the drift mu,
-    stock price, volatility and a seed. """
+@njit(cache=True, fastmath=True)
+def _getPaths(num_paths,
+              numTimeSteps,
+              t,
+              mu,
+              stock_price,
+              volatility,
+              seed,
+              normals):
+    """ Simulate the GBM paths of getPaths using a cached block of normals or
+    new normals from the seed if the block is empty. """
 
     np.random.seed(seed)
     dt = t / numTimeSteps
@@ -30,7 +33,7 @@ def getPaths(num_paths,
     # This should be less memory intensive as we only generate randoms per step
     Sall[:, 0] = stock_price
     for it in range(1, numTimeSteps + 1):
-        g1D = np.random.standard_normal((num_paths))
+        g1D = getNormals(normals, (it - 1) * num_paths, num_paths)
         for ip in range(0, num_paths):
             w = np.exp(g1D[ip] * vsqrt_dt)
             Sall[ip, it] = Sall[ip, it - 1] * m * w
@@ -41,21 +44,38 @@ def getPaths(num_paths,
 ###############################################################################
 
 
-@njit(float64[:, :, :](int64, int64, int64, float64, float64[:], float64[:],
-                       float64[:], float64[:, :], int64),
+@njit(float64[:, :](int64, int64, float64, float64, float64, float64, int64),
       cache=True, fastmath=True)
-def getPathsAssets(numAssets,
-                   num_paths,
-                   numTimeSteps,
-                   t,
-                   mus,
-                   stock_prices,
-                   volatilities,
-                   corrMatrix,
-                   seed):
-    """ Get the simulated GBM process for a number of assets and paths and num
-    time steps. Inputs include the number of assets, paths, the vector of mus,
-    stock prices, volatilities, a correlation matrix and a seed. """
+def getPaths(num_paths,
+             numTimeSteps,
+             t,
+             mu,
+             stock_price,
+             volatility,
+             seed):
+    """ Get the simulated GBM process for a single asset with many paths and
+    time steps. Inputs include the number of time steps, paths, the drift mu,
+    stock price, volatility and a seed. """
+
+    return _getPaths(num_paths, numTimeSteps, t, mu, stock_price, volatility,
+                     seed, np.empty(0))
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _getPathsAssets(numAssets,
+                    num_paths,
+                    numTimeSteps,
+                    t,
+                    mus,
+                    stock_prices,
+                    volatilities,
+                    corrMatrix,
+                    seed,
+                    normals):
+    """ Simulate the GBM paths of getPathsAssets using a cached block of
+    normals or new normals from the seed if the block is empty. """
 
     np.random.seed(seed)
     dt = t / numTimeSteps
@@ -64,7 +84,11 @@ def getPathsAssets(numAssets,
 
     Sall = np.empty((2 * num_paths, numTimeSteps + 1, numAssets))
 
-    g = np.random.standard_normal((num_paths, numTimeSteps + 1, numAssets))
+    if len(normals) == 0:
+        g = np.random.standard_normal((num_paths, numTimeSteps + 1,
+                                       numAssets))
+    else:
+        g = normals.reshape((num_paths, numTimeSteps + 1, numAssets))
     c = cholesky(corrMatrix)
     gCorr = np.empty((num_paths, numTimeSteps + 1, numAssets))
 
@@ -96,6 +120,103 @@ def getPathsAssets(numAssets,
 ###############################################################################
 
 
+@njit(float64[:, :, :](int64, int64, int64, float64, float64[:], float64[:],
+                       float64[:], float64[:, :], int64),
+      cache=True, fastmath=True)
+def getPathsAssets(numAssets,
+                   num_paths,
+                   numTimeSteps,
+                   t,
+                   mus,
+                   stock_prices,
+                   volatilities,
+                   corrMatrix,
+                   seed):
+    """ Get the simulated GBM process for a number of assets and paths and num
+    time steps. Inputs include the number of assets, paths, the vector of mus,
+    stock prices, volatilities, a correlation matrix and a seed. """
+
+    return _getPathsAssets(numAssets, num_paths, numTimeSteps, t, mus,
+                           stock_prices, volatilities, corrMatrix, seed,
+                           np.empty(0))
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _getPathStatisticsAssets(numAssets,
+                             num_paths,
+                             numTimeSteps,
+                             t,
+                             mus,
+                             stock_prices,
+                             volatilities,
+                             corrMatrix,
+                             accumulators,
+                             chunkSize,
+                             seed,
+                             normals):
+    """ Simulate the antithetic GBM paths of getPathsAssets in chunks of
+    chunkSize paths and return the running statistics of each path and asset.
+    The normals of each chunk follow those of the previous chunk so they are
+    the same as those drawn by getPathsAssets for the same seed. If the block
+    of cached normals is not empty the normals are read from it. """
+
+    np.random.seed(seed)
+    dt = t / numTimeSteps
+    vsqrt_dts = volatilities * np.sqrt(dt)
+    m = np.exp((mus - volatilities * volatilities / 2.0) * dt)
+    c = cholesky(corrMatrix)
+
+    numAcc = len(accumulators)
+    stats = np.empty((2 * num_paths, numAssets, numAcc))
+    s = np.empty(numAssets)
+    sa = np.empty(numAssets)
+    numDraws = (numTimeSteps + 1) * numAssets
+
+    for start in range(0, num_paths, chunkSize):
+
+        n = min(chunkSize, num_paths - start)
+
+        if len(normals) == 0:
+            g = np.random.standard_normal((n, numTimeSteps + 1, numAssets))
+        else:
+            g = normals[start * numDraws:(start + n) * numDraws]
+            g = g.reshape((n, numTimeSteps + 1, numAssets))
+
+        for ip in range(0, n):
+
+            ip1 = start + ip
+            ip2 = num_paths + start + ip
+
+            for ia in range(0, numAssets):
+                s[ia] = stock_prices[ia]
+                sa[ia] = stock_prices[ia]
+                for k in range(0, numAcc):
+                    if accumulators[k] == FinPathAccumulatorTypes.SUM.value:
+                        stats[ip1, ia, k] = 0.0
+                        stats[ip2, ia, k] = 0.0
+                    else:
+                        stats[ip1, ia, k] = stock_prices[ia]
+                        stats[ip2, ia, k] = stock_prices[ia]
+
+            for it in range(1, numTimeSteps + 1):
+                for ia in range(0, numAssets):
+                    z = 0.0
+                    for ib in range(0, numAssets):
+                        z += g[ip, it, ib] * c[ia, ib]
+                    w = np.exp(z * vsqrt_dts[ia])
+                    v = m[ia]
+                    s[ia] = s[ia] * v * w
+                    sa[ia] = sa[ia] * v / w
+                    _updateAccumulators(stats[ip1], ia, s[ia], accumulators)
+                    _updateAccumulators(stats[ip2], ia, sa[ia], accumulators)
+
+    return stats
+
+###############################################################################
+
+
 #@njit(float64[:, :](int64, int64, float64, float64[:], float64[:], float64[:],
 #                   float64[:, :], int64),
 #                   cache=True, fastmath=True)
@@ -107,17 +228,24 @@ def getAssets(numAssets,
               stock_prices,
               volatilities,
               corrMatrix,
-              seed):
+              seed,
+              normals=None):
     
     """ Get the simulated GBM process for a number of assets and paths for one
     time step. Inputs include the number of assets, paths, the vector of mus,
-    stock prices, volatilities, a correlation matrix and a seed. """
+    stock prices, volatilities, a correlation matrix and a seed. A block of
+    cached normals can be used in place of new normals from the seed. """
 
     np.random.seed(seed)
     vsqrt_dts = volatilities * np.sqrt(t)
     m = np.exp((mus - volatilities * volatilities / 2.0) * t)
     Sall = np.empty((2 * num_paths, numAssets))
-    g = np.random.standard_normal((num_paths, numAssets))
+
+    if normals is None:
+        g = np.random.standard_normal((num_paths, numAssets))
+    else:
+        g = normals.reshape((num_paths, numAssets))
+
     c = cholesky(corrMatrix)
     gCorr = np.empty((num_paths, numAssets))
 
@@ -149,16 +277,58 @@ class FinGBMProcess():
                  mu: float,
                  stock_price: float,
                  volatility: float,
-                 seed: int):
+                 seed: int,
+                 randomCache=None):
         """ Get a matrix of simulated GBM asset values by path and time step.
         Inputs are the number of paths and time steps, the time horizon and
-        the initial asset value, volatility and random number seed. """
+        the initial asset value, volatility and random number seed. If a
+        FinRandomDrawCache is given the normals for the seed are taken from
+        it. """
 
-        paths = getPaths(num_paths, numTimeSteps,
-                         t, mu, stock_price, volatility, seed)
+        if randomCache is None:
+            return getPaths(num_paths, numTimeSteps,
+                            t, mu, stock_price, volatility, seed)
+
+        normals = getCachedGaussians(randomCache, seed, num_paths,
+                                     numTimeSteps, 1)
+
+        paths = _getPaths(num_paths, numTimeSteps,
+                          t, mu, stock_price, volatility, seed, normals)
 
         return paths
 
+###############################################################################
+
+    def getPathStatistics(self,
+                          num_paths: int,
+                          numTimeSteps: int,
+                          t: float,
+                          mu: float,
+                          stock_price: float,
+                          volatility: float,
+                          seed: int,
+                          accumulators: list,
+                          chunkSize: int = 10000,
+                          randomCache=None):
+        """ Get a matrix of running statistics of the antithetic paths of
+        getPaths with one row per path and one column per accumulator in the
+        list of FinPathAccumulatorTypes. The paths are not stored so memory
+        does not grow with the number of time steps. If a FinRandomDrawCache
+        is given the normals for the seed are taken from it. """
+
+        accumulatorCodes = _accumulatorCodes(accumulators, chunkSize)
+
+        normals = getCachedGaussians(randomCache, seed, num_paths,
+                                     numTimeSteps, 1)
+
+        stats = _getGBMPathStatistics(num_paths, numTimeSteps,
+                                      t / numTimeSteps, mu, stock_price,
+                                      volatility,
+                                      FinGBMNumericalScheme.ANTITHETIC.value,
+                                      accumulatorCodes, chunkSize, seed,
+                                      normals)
+        return stats
+
 ###############################################################################
 
     def getPathsAssets(self,
@@ -170,19 +340,64 @@ class FinGBMProcess():
                        stock_prices,
                        volatilities,
                        corrMatrix,
-                       seed):
+                       seed,
+                       randomCache=None):
         """ Get a matrix of simulated GBM asset values by asset, path and time
         step. Inputs are the number of assets, paths and time steps, the time-
-        horizon and the initial asset values, volatilities and betas. """
+        horizon and the initial asset values, volatilities and betas. If a
+        FinRandomDrawCache is given the normals for the seed are taken from
+        it. """
 
         if numTimeSteps == 2:
-            paths = getAssets(numAssets, num_paths,
-                              t, mus, stock_prices,
-                              volatilities, corrMatrix, seed)
+            if randomCache is None:
+                paths = getAssets(numAssets, num_paths,
+                                  t, mus, stock_prices,
+                                  volatilities, corrMatrix, seed)
+            else:
+                normals = getCachedGaussians(randomCache, seed, num_paths, 1,
+                                             numAssets)
+                paths = getAssets(numAssets, num_paths,
+                                  t, mus, stock_prices,
+                                  volatilities, corrMatrix, seed, normals)
         else:
-            paths = getPathsAssets(numAssets, num_paths, numTimeSteps,
-                                   t, mus, stock_prices,
-                                   volatilities, corrMatrix, seed)
+            normals = getCachedGaussians(randomCache, seed, num_paths,
+                                         numTimeSteps + 1, numAssets)
+            paths = _getPathsAssets(numAssets, num_paths, numTimeSteps,
+                                    t, mus, stock_prices,
+                                    volatilities, corrMatrix, seed, normals)
         return paths
 
+###############################################################################
+
+    def getPathStatisticsAssets(self,
+                                numAssets: int,
+                                num_paths: int,
+                                numTimeSteps: int,
+                                t: float,
+                                mus: np.ndarray,
+                                stock_prices: np.ndarray,
+                                volatilities: np.ndarray,
+                                corrMatrix: np.ndarray,
+                                seed: int,
+                                accumulators: list,
+                                chunkSize: int = 10000,
+                                randomCache=None):
+        """ Get the running statistics of the antithetic paths of
+        getPathsAssets as an array indexed by path, asset and accumulator in
+        the list of FinPathAccumulatorTypes. The normals are drawn in chunks
+        of chunkSize paths so memory does not grow with the number of time
+        steps. If a FinRandomDrawCache is given the normals for the seed are
+        taken from it. """
+
+        accumulatorCodes = _accumulatorCodes(accumulators, chunkSize)
+
+        normals = getCachedGaussians(randomCache, seed, num_paths,
+                                     numTimeSteps + 1, numAssets)
+
+        stats = _getPathStatisticsAssets(numAssets, num_paths, numTimeSteps,
+                                         t, mus, stock_prices, volatilities,
+                                         corrMatrix, accumulatorCodes,
+                                         chunkSize, seed, normals)
+        return stats
+
 ###############################################################################
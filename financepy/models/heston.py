@@ -37,52 +37,48 @@ class FinHestonNumericalScheme(Enum):
 ###############################################################################
 
 
-@njit(float64[:, :](float64, float64, float64, float64, float64, float64,
-                    float64, float64, float64, float64, int64, int64, int64),
-      cache=True, fastmath=True)
-def getPaths(s0, r, q, v0, kappa, theta, sigma, rho, t, dt, num_paths,
-             seed, scheme):
-
-    np.random.seed(seed)
-    num_steps = int(t / dt)
-    sPaths = np.zeros(shape=(num_paths, num_steps))
-    sPaths[:, 0] = s0
+@njit(cache=True, fastmath=True)
+def _getPath(sPath, s0, r, q, v0, kappa, theta, sigma, rho, dt, scheme, z, u):
+    """ Fill sPath with one Heston stock price path. The two Gaussians of
+    time step iStep are z[iStep-1, 0] and z[iStep-1, 1] and the uniform used
+    by the QUADEXP scheme is u[iStep-1]. """
+
+    num_steps = len(sPath)
+    sPath[0] = s0
     sdt = np.sqrt(dt)
     rhohat = np.sqrt(1.0 - rho * rho)
     sigma2 = sigma * sigma
 
     if scheme == FinHestonNumericalScheme.EULER.value:
         # Basic scheme to first order with truncation on variance
-        for iPath in range(0, num_paths):
-            s = s0
-            v = v0
-            for iStep in range(1, num_steps):
-                z1 = np.random.normal(0.0, 1.0) * sdt
-                z2 = np.random.normal(0.0, 1.0) * sdt
-                zV = z1
-                zS = rho * z1 + rhohat * z2
-                vplus = max(v, 0.0)
-                rtvplus = np.sqrt(vplus)
-                v += kappa * (theta - vplus) * dt + sigma * \
-                    rtvplus * zV + 0.25 * sigma2 * (zV * zV - dt)
-                s += (r - q) * s * dt + rtvplus * s * \
-                    zS + 0.5 * s * vplus * (zV * zV - dt)
-                sPaths[iPath, iStep] = s
+        s = s0
+        v = v0
+        for iStep in range(1, num_steps):
+            z1 = z[iStep - 1, 0] * sdt
+            z2 = z[iStep - 1, 1] * sdt
+            zV = z1
+            zS = rho * z1 + rhohat * z2
+            vplus = max(v, 0.0)
+            rtvplus = np.sqrt(vplus)
+            v += kappa * (theta - vplus) * dt + sigma * \
+                rtvplus * zV + 0.25 * sigma2 * (zV * zV - dt)
+            s += (r - q) * s * dt + rtvplus * s * \
+                zS + 0.5 * s * vplus * (zV * zV - dt)
+            sPath[iStep] = s
 
     elif scheme == FinHestonNumericalScheme.EULERLOG.value:
         # Basic scheme to first order with truncation on variance
-        for iPath in range(0, num_paths):
-            x = log(s0)
-            v = v0
-            for iStep in range(1, num_steps):
-                zV = np.random.normal(0.0, 1.0) * sdt
-                zS = rho * zV + rhohat * np.random.normal(0.0, 1.0) * sdt
-                vplus = max(v, 0.0)
-                rtvplus = np.sqrt(vplus)
-                x += (r - q - 0.5 * vplus) * dt + rtvplus * zS
-                v += kappa * (theta - vplus) * dt + sigma * \
-                    rtvplus * zV + sigma2 * (zV * zV - dt) / 4.0
-                sPaths[iPath, iStep] = exp(x)
+        x = log(s0)
+        v = v0
+        for iStep in range(1, num_steps):
+            zV = z[iStep - 1, 0] * sdt
+            zS = rho * zV + rhohat * z[iStep - 1, 1] * sdt
+            vplus = max(v, 0.0)
+            rtvplus = np.sqrt(vplus)
+            x += (r - q - 0.5 * vplus) * dt + rtvplus * zS
+            v += kappa * (theta - vplus) * dt + sigma * \
+                rtvplus * zV + sigma2 * (zV * zV - dt) / 4.0
+            sPath[iStep] = exp(x)
 
     elif scheme == FinHestonNumericalScheme.QUADEXP.value:
         # Due to Leif Andersen(2006)
@@ -100,50 +96,303 @@ def getPaths(s0, r, q, v0, kappa, theta, sigma, rho, t, dt, num_paths,
         c1 = sigma2 * Q * (1.0 - Q) / kappa
         c2 = theta * sigma2 * ((1.0 - Q)**2) / 2.0 / kappa
 
-        for iPath in range(0, num_paths):
-            x = log(s0)
-            vn = v0
-            for iStep in range(1, num_steps):
-                zV = np.random.normal(0, 1)
-                zS = rho * zV + rhohat * np.random.normal(0, 1)
-                m = theta + (vn - theta) * Q
-                m2 = m * m
-                s2 = c1 * vn + c2
-                psi = s2 / m2
-                u = np.random.uniform(0.0, 1.0)
-
-                if psi <= psic:
-                    b2 = 2.0 / psi - 1.0 + \
-                        np.sqrt((2.0 / psi) * (2.0 / psi - 1.0))
-                    a = m / (1.0 + b2)
-                    b = np.sqrt(b2)
-                    zV = norminvcdf(u)
-                    vnp = a * ((b + zV)**2)
-                    d = (1.0 - 2.0 * A * a)
-                    M = exp((A * b2 * a) / d) / np.sqrt(d)
-                    K0 = -log(M) - (K1 + 0.5 * K3) * vn
+        x = log(s0)
+        vn = v0
+        for iStep in range(1, num_steps):
+            zV = z[iStep - 1, 0]
+            zS = rho * zV + rhohat * z[iStep - 1, 1]
+            m = theta + (vn - theta) * Q
+            m2 = m * m
+            s2 = c1 * vn + c2
+            psi = s2 / m2
+            uu = u[iStep - 1]
+
+            if psi <= psic:
+                b2 = 2.0 / psi - 1.0 + \
+                    np.sqrt((2.0 / psi) * (2.0 / psi - 1.0))
+                a = m / (1.0 + b2)
+                b = np.sqrt(b2)
+                zV = norminvcdf(uu)
+                vnp = a * ((b + zV)**2)
+                d = (1.0 - 2.0 * A * a)
+                M = exp((A * b2 * a) / d) / np.sqrt(d)
+                K0 = -log(M) - (K1 + 0.5 * K3) * vn
+            else:
+                p = (psi - 1.0) / (psi + 1.0)
+                beta = (1.0 - p) / m
+
+                if uu <= p:
+                    vnp = 0.0
                 else:
-                    p = (psi - 1.0) / (psi + 1.0)
-                    beta = (1.0 - p) / m
-
-                    if u <= p:
-                        vnp = 0.0
-                    else:
-                        vnp = log((1.0 - p) / (1.0 - u)) / beta
+                    vnp = log((1.0 - p) / (1.0 - uu)) / beta
 
-                    M = p + beta * (1.0 - p) / (beta - A)
-                    K0 = -log(M) - (K1 + 0.5 * K3) * vn
+                M = p + beta * (1.0 - p) / (beta - A)
+                K0 = -log(M) - (K1 + 0.5 * K3) * vn
 
-                x += mu * dt + K0 + (K1 * vn + K2 * vnp) + \
-                    np.sqrt(K3 * vn + K4 * vnp) * zS
-                sPaths[iPath, iStep] = exp(x)
-                vn = vnp
+            x += mu * dt + K0 + (K1 * vn + K2 * vnp) + \
+                np.sqrt(K3 * vn + K4 * vnp) * zS
+            sPath[iStep] = exp(x)
+            vn = vnp
     else:
         raise FinError("Unknown FinHestonNumericalSchme")
 
+###############################################################################
+
+
+@njit(float64[:, :](float64, float64, float64, float64, float64, float64,
+                    float64, float64, float64, float64, int64, int64, int64),
+      cache=True, fastmath=True)
+def getPaths(s0, r, q, v0, kappa, theta, sigma, rho, t, dt, num_paths,
+             seed, scheme):
+
+    np.random.seed(seed)
+    num_steps = int(t / dt)
+    sPaths = np.zeros(shape=(num_paths, num_steps))
+
+    # The random numbers of each path are drawn in the order they are used
+    isQuadExp = scheme == FinHestonNumericalScheme.QUADEXP.value
+    z = np.zeros((max(num_steps - 1, 0), 2))
+    u = np.zeros(max(num_steps - 1, 0))
+
+    for iPath in range(0, num_paths):
+        for iStep in range(0, num_steps - 1):
+            z[iStep, 0] = np.random.normal(0.0, 1.0)
+            z[iStep, 1] = np.random.normal(0.0, 1.0)
+            if isQuadExp:
+                u[iStep] = np.random.uniform(0.0, 1.0)
+
+        _getPath(sPaths[iPath], s0, r, q, v0, kappa, theta, sigma, rho, dt,
+                 scheme, z, u)
+
     return sPaths
 
 ###############################################################################
+# Fourier-cosine (COS) pricing of Fang and Oosterlee (2008). The density of the
+# log of the terminal stock price over its forward is expanded in a cosine
+# series on a truncated range. The characteristic function is evaluated once
+# per expiry on the grid of series frequencies and the put coefficients on that
+# range are shared by every strike, so a whole strike by expiry grid is priced
+# with a few array operations.
+###############################################################################
+
+gCOSNumTerms = 512
+gCOSTruncation = 16.0
+
+###############################################################################
+
+
+def _hestonCharFn(u, tau, v0, kappa, theta, sigma, rho):
+    """ Characteristic function of log(S(tau)/F(tau)) under Heston in the
+    form of Albrecher et al. that avoids the branch cut of the complex log.
+    The inputs broadcast so u can be a grid of frequencies per expiry. """
+
+    V = sigma * sigma
+    iu = 1j * u
+    beta = kappa - rho * sigma * iu
+    d = np.sqrt(beta * beta + V * (iu + u * u))
+    g = (beta - d) / (beta + d)
+    Q = np.exp(-d * tau)
+    C = kappa * theta / V * ((beta - d) * tau -
+                             2.0 * np.log((1.0 - g * Q) / (1.0 - g)))
+    D = (beta - d) / V * (1.0 - Q) / (1.0 - g * Q)
+    return np.exp(C + D * v0)
+
+###############################################################################
+
+
+def _hestonLogCharFnGradient(u, tau, v0, kappa, theta, sigma, rho):
+    """ Derivatives of the log of _hestonCharFn with respect to v0, kappa,
+    theta, sigma and rho stacked along a new first axis. They are found by
+    differentiating each step of the characteristic function in turn. """
+
+    V = sigma * sigma
+    iu = 1j * u
+    w = iu + u * u
+    beta = kappa - rho * sigma * iu
+    d = np.sqrt(beta * beta + V * w)
+    g = (beta - d) / (beta + d)
+    Q = np.exp(-d * tau)
+    oneMinusGQ = 1.0 - g * Q
+    E = (beta - d) * tau - 2.0 * np.log(oneMinusGQ / (1.0 - g))
+    D = (beta - d) / V * (1.0 - Q) / oneMinusGQ
+    P0 = kappa * theta / V
+
+    zero = np.zeros_like(beta)
+    one = np.ones_like(beta)
+
+    # derivatives of beta, sigma^2 and the C prefactor for each parameter
+    dBetas = [zero, one, zero, -rho * iu + zero, -sigma * iu + zero]
+    dVs = [0.0, 0.0, 0.0, 2.0 * sigma, 0.0]
+    dP0s = [0.0, theta / V, kappa / V, -2.0 * kappa * theta / (V * sigma),
+            0.0]
+
+    grads = []
+
+    for p in range(0, 5):
+        dBeta = dBetas[p]
+        dV = dVs[p]
+        dd = (2.0 * beta * dBeta + dV * w) / (2.0 * d)
+        dg = 2.0 * (d * dBeta - beta * dd) / (beta + d)**2
+        dQ = -tau * Q * dd
+        dL = -(dg * Q + g * dQ) / oneMinusGQ + dg / (1.0 - g)
+        dE = (dBeta - dd) * tau - 2.0 * dL
+        dC = dP0s[p] * E + P0 * dE
+        da1 = (dBeta - dd) / V - (beta - d) * dV / (V * V)
+        da2 = (-dQ * oneMinusGQ + (1.0 - Q) * (dg * Q + g * dQ)) \
+            / (oneMinusGQ * oneMinusGQ)
+        dD = da1 * (1.0 - Q) / oneMinusGQ + (beta - d) / V * da2
+        grads.append(dC + dD * v0)
+
+    # v0 only enters through the D v0 term
+    grads[0] = D
+
+    return np.array(grads)
+
+###############################################################################
+
+
+def _hestonCumulants(tau, v0, kappa, theta, sigma, rho):
+    """ First two cumulants of log(S(tau)/F(tau)) under Heston which set
+    the truncation range of the COS expansion. They are the derivatives of
+    the log of the characteristic function at zero found by central
+    differences, which avoids the cancellation in the closed form. """
+
+    h = 1e-4
+    logPhiUp = np.log(_hestonCharFn(h, tau, v0, kappa, theta, sigma, rho))
+    logPhiDn = np.log(_hestonCharFn(-h, tau, v0, kappa, theta, sigma, rho))
+
+    c1 = np.imag(logPhiUp - logPhiDn) / (2.0 * h)
+    c2 = -np.real(logPhiUp + logPhiDn) / (h * h)
+    return c1, np.abs(c2)
+
+###############################################################################
+
+
+def _cosPutCoefficients(a, b, numTerms):
+    """ Cosine series coefficients of the put payoff (1 - exp(y))^+ on the
+    range [a, b] of the log of the stock price over the strike. The arrays a
+    and b hold one range per expiry and strike. """
+
+    d = np.minimum(b, 0.0)[:, :, None]
+    a = a[:, :, None]
+    b = b[:, :, None]
+
+    k = np.arange(numTerms)[None, None, :]
+    w = k * np.pi / (b - a)
+    cosWd = np.cos(w * (d - a))
+    sinWd = np.sin(w * (d - a))
+
+    # chi is the integral of exp(y) cos(w(y - a)) over [a, d]
+    chi = ((cosWd + w * sinWd) * np.exp(d) - np.exp(a)) / (1.0 + w * w)
+
+    # psi is the integral of cos(w(y - a)) over [a, d]
+    wSafe = np.where(k == 0, 1.0, w)
+    psi = np.where(k == 0, d - a, sinWd / wSafe)
+
+    # a strike with the whole range above it has a zero put payoff
+    coeffs = 2.0 / (b - a) * (psi - chi)
+    return np.where(d > a, coeffs, 0.0)
+
+###############################################################################
+
+
+def _hestonCOSPrices(stock_price, interestRates, dividendYields, taus,
+                     strikes, v0, kappa, theta, sigma, rho, isCall,
+                     numTerms, truncation, withGradient=False):
+    """ Heston prices of European options with expiry times taus and a
+    matrix of strikes with one row per expiry. The interest rates and the
+    dividend yields have one entry per expiry. If withGradient is True the
+    derivatives of the prices with respect to v0, kappa, theta, sigma and rho
+    are also returned stacked along a new first axis. These hold the series
+    range fixed which is consistent to the accuracy of the prices. """
+
+    F = stock_price * np.exp((interestRates - dividendYields) * taus)
+    x = np.log(F[:, None] / strikes)
+
+    (c1, c2) = _hestonCumulants(taus, v0, kappa, theta, sigma, rho)
+    width = truncation * np.sqrt(c2)
+
+    # Every strike of an expiry has a range of the same width centred on its
+    # mean so the characteristic function is shared by all of its strikes
+    a = x + (c1 - width)[:, None]
+    b = x + (c1 + width)[:, None]
+
+    k = np.arange(numTerms)
+    u = k[None, :] * np.pi / (2.0 * width)[:, None]
+
+    phi = _hestonCharFn(u, taus[:, None], v0, kappa, theta, sigma, rho)
+    phi = phi * np.exp(1j * u * (width - c1)[:, None])
+    phi[:, 0] *= 0.5
+
+    coeffs = _cosPutCoefficients(a, b, numTerms)
+    series = np.sum(np.real(phi)[:, None, :] * coeffs, axis=2)
+
+    df = np.exp(-interestRates * taus)[:, None]
+    prices = strikes * df * series
+
+    if isCall:
+        dq = np.exp(-dividendYields * taus)[:, None]
+        prices = prices + stock_price * dq - strikes * df
+
+    if withGradient is False:
+        return prices
+
+    # The put call parity terms do not depend on the model parameters
+    dLogPhi = _hestonLogCharFnGradient(u, taus[:, None], v0, kappa, theta,
+                                       sigma, rho)
+    dPhi = np.real(phi[None, :, :] * dLogPhi)
+    dSeries = np.einsum('pen,ekn->pek', dPhi, coeffs)
+    grads = (strikes * df)[None, :, :] * dSeries
+
+    return prices, grads
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _hestonChunk(params, num_paths):
+    """ Sum and sum of squares of the European option payoffs of one chunk
+    of Heston paths. """
+
+    s0 = params[0]
+    r = params[1]
+    q = params[2]
+    v0 = params[3]
+    kappa = params[4]
+    theta = params[5]
+    sigma = params[6]
+    rho = params[7]
+    t = params[8]
+    dt = params[9]
+    K = params[10]
+    optionType = int(params[11])
+    scheme = int(params[12])
+
+    num_steps = int(t / dt)
+    sPath = np.zeros(num_steps)
+    u = np.zeros(max(num_steps - 1, 0))
+
+    total = 0.0
+    totalSq = 0.0
+
+    for iPath in range(0, num_paths):
+        z = np.random.standard_normal((max(num_steps - 1, 0), 2))
+        if scheme == FinHestonNumericalScheme.QUADEXP.value:
+            u = np.random.random(max(num_steps - 1, 0))
+
+        _getPath(sPath, s0, r, q, v0, kappa, theta, sigma, rho, dt, scheme,
+                 z, u)
+
+        if optionType == FinOptionTypes.EUROPEAN_CALL.value:
+            payoff = max(sPath[-1] - K, 0.0)
+        else:
+            payoff = max(K - sPath[-1], 0.0)
+        total += payoff
+        totalSq += payoff * payoff
+
+    return (total, totalSq)
+
+###############################################################################
 
 
 class FinModelHeston():
@@ -172,7 +421,12 @@ class FinModelHeston():
                  num_paths,
                  num_steps_per_year,
                  seed,
-                 scheme=FinHestonNumericalScheme.EULERLOG):
+                 scheme=FinHestonNumericalScheme.EULERLOG,
+                 engine=None):
+        """ Monte-Carlo value of a European option. If a
+        FinMonteCarloEngine is passed then the paths are simulated in
+        independent chunks on all cores with a result that does not depend on
+        the number of threads. """
 
         tau = (option._expiry_date - valuation_date) / gDaysInYear
 
@@ -180,6 +434,21 @@ class FinModelHeston():
         dt = 1.0 / num_steps_per_year
         schemeValue = float(scheme.value)
 
+        if engine is not None:
+
+            if option._optionType != FinOptionTypes.EUROPEAN_CALL and \
+               option._optionType != FinOptionTypes.EUROPEAN_PUT:
+                raise FinError("Unknown option type.")
+
+            params = np.array([stock_price, interestRate, dividendYield,
+                               self._v0, self._kappa, self._theta,
+                               self._sigma, self._rho, tau, dt, K,
+                               option._optionType.value, schemeValue])
+
+            (payoff, _) = engine.run(_hestonChunk, params, num_paths, seed)
+            v = payoff * exp(-interestRate * tau)
+            return v
+
         sPaths = getPaths(stock_price,
                           interestRate,
                           dividendYield,
@@ -390,4 +659,80 @@ class FinModelHeston():
         v = S0 * exp(-q * tau) * FF(1) - K * exp(-r * tau) * FF(0)
         return(v)
 
+###############################################################################
+
+    def value_COS(self,
+                  valuation_date,
+                  option,
+                  stock_price,
+                  interestRate,
+                  dividendYield,
+                  numTerms=gCOSNumTerms):
+        """ Value a European call or put using the Fourier-cosine expansion
+        of Fang and Oosterlee. This is much faster than the quadrature based
+        methods and prices puts and calls. """
+
+        tau = (option._expiry_date - valuation_date) / gDaysInYear
+
+        v = self.valueGrid_COS(stock_price, interestRate, dividendYield,
+                               [tau], [option._strikePrice],
+                               option._optionType, numTerms)
+        return v[0, 0]
+
+###############################################################################
+
+    def valueGrid_COS(self,
+                      stock_price,
+                      interestRate,
+                      dividendYield,
+                      expiryTimes,
+                      strikes,
+                      optionType=FinOptionTypes.EUROPEAN_CALL,
+                      numTerms=gCOSNumTerms,
+                      truncation=gCOSTruncation):
+        """ Value a grid of European options with the Fourier-cosine method
+        and return a matrix with one row per expiry time and one column per
+        strike. The strikes can be a vector shared by all expiries or a matrix
+        with one row per expiry. The interest rate and dividend yield can be
+        numbers or vectors with one value per expiry. The characteristic
+        function is evaluated once per expiry on numTerms frequencies. The
+        series covers truncation standard deviations either side of the mean
+        log price. Parameters far from the Feller condition have heavy left
+        tails and need a wider range and more terms. """
+
+        taus = np.atleast_1d(np.asarray(expiryTimes, dtype=np.float64))
+        numExpiries = len(taus)
+
+        if np.any(taus <= 0.0):
+            raise FinError("Expiry times must be positive.")
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+
+        if strikes.ndim == 1:
+            strikes = np.tile(strikes, (numExpiries, 1))
+
+        if strikes.ndim != 2 or strikes.shape[0] != numExpiries:
+            raise FinError("Need a strike vector or one row per expiry.")
+
+        if np.any(strikes <= 0.0):
+            raise FinError("Strikes must be positive.")
+
+        r = np.broadcast_to(np.asarray(interestRate, dtype=np.float64),
+                            (numExpiries,))
+        q = np.broadcast_to(np.asarray(dividendYield, dtype=np.float64),
+                            (numExpiries,))
+
+        if optionType == FinOptionTypes.EUROPEAN_CALL:
+            isCall = True
+        elif optionType == FinOptionTypes.EUROPEAN_PUT:
+            isCall = False
+        else:
+            raise FinError("Unknown option type.")
+
+        v = _hestonCOSPrices(stock_price, r, q, taus, strikes,
+                             self._v0, self._kappa, self._theta,
+                             self._sigma, self._rho, isCall, numTerms,
+                             truncation)
+        return v
+
 ###############################################################################
@@ -0,0 +1,268 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from ..utils.FinError import FinError
+from ..utils.global_types import FinOptionTypes
+from ..utils.helpers import labelToString
+from .black_scholes_analytic import bsValue, bsVega, bsImpliedVolatility
+from .heston import FinModelHeston, _hestonCOSPrices
+from .heston import gCOSNumTerms, gCOSTruncation
+
+###############################################################################
+# The parameters are fitted by a bounded Levenberg-Marquardt style least
+# squares solver. The residuals are the differences between the model and
+# market prices divided by the market vega so that they are close to implied
+# volatility errors. The Jacobian of the residuals comes from the analytic
+# derivatives of the COS prices with respect to the parameters.
+###############################################################################
+
+# Order of the parameters is v0, kappa, theta, sigma, rho
+gHestonLowerBounds = np.array([1e-4, 1e-3, 1e-4, 1e-3, -0.999])
+gHestonUpperBounds = np.array([2.0, 20.0, 2.0, 5.0, 0.999])
+
+###############################################################################
+
+
+class FinHestonCalibrator():
+    """ Fits the parameters of the Heston model to a grid of European option
+    prices with one row per expiry time. The fit is a least squares fit of
+    the vega weighted price errors using analytic gradients of the Fourier-
+    cosine prices. A calibration can be warm started from the parameters of a
+    previous fit, such as the one of the previous day. """
+
+    def __init__(self,
+                 stock_price: float,
+                 expiryTimes: (list, np.ndarray),
+                 strikes: (list, np.ndarray),
+                 marketPrices: (list, np.ndarray),
+                 interestRates: (float, list, np.ndarray),
+                 dividendYields: (float, list, np.ndarray),
+                 optionType: FinOptionTypes = FinOptionTypes.EUROPEAN_CALL):
+        """ Create the calibrator from the market prices of the options. The
+        strikes can be a vector shared by all expiries or a matrix with one
+        row per expiry. The rates can be numbers or vectors with one value
+        per expiry. """
+
+        taus = np.atleast_1d(np.asarray(expiryTimes, dtype=np.float64))
+        numExpiries = len(taus)
+
+        if np.any(taus <= 0.0):
+            raise FinError("Expiry times must be positive.")
+
+        strikes = np.asarray(strikes, dtype=np.float64)
+
+        if strikes.ndim == 1:
+            strikes = np.tile(strikes, (numExpiries, 1))
+
+        marketPrices = np.asarray(marketPrices, dtype=np.float64)
+
+        if strikes.ndim != 2 or strikes.shape[0] != numExpiries:
+            raise FinError("Need a strike vector or one row per expiry.")
+
+        if marketPrices.shape != strikes.shape:
+            raise FinError("Need one market price per expiry and strike.")
+
+        if optionType != FinOptionTypes.EUROPEAN_CALL and \
+           optionType != FinOptionTypes.EUROPEAN_PUT:
+            raise FinError("Unknown option type.")
+
+        self._stock_price = stock_price
+        self._taus = taus
+        self._strikes = strikes
+        self._marketPrices = marketPrices
+        self._optionType = optionType
+
+        self._r = np.array(np.broadcast_to(
+            np.asarray(interestRates, dtype=np.float64), (numExpiries,)))
+        self._q = np.array(np.broadcast_to(
+            np.asarray(dividendYields, dtype=np.float64), (numExpiries,)))
+
+        self._marketVols = self._impliedVols(marketPrices)
+
+        # Vega floors stop deep out of the money options dominating the fit
+        t = np.repeat(taus[:, None], strikes.shape[1], axis=1)
+        vegas = bsVega(stock_price, t, strikes, self._r[:, None],
+                       self._q[:, None], self._marketVols,
+                       optionType.value)
+        self._weights = 1.0 / np.maximum(vegas, 1e-4 * stock_price)
+
+        self._model = None
+        self._result = None
+        self._sliceVolErrors = None
+
+###############################################################################
+
+    @classmethod
+    def fromEquityVolSurface(cls, volSurface):
+        """ Create the calibrator from the market volatility grid of a
+        FinEquityVolSurface using its expiry times, rates and strikes. """
+
+        taus = np.array(volSurface._texp)
+        strikes = np.array(volSurface._strikes, dtype=np.float64)
+        vols = np.array(volSurface._volatilityGrid, dtype=np.float64)
+        r = np.array(volSurface._r)
+        q = np.array(volSurface._q)
+        s = volSurface._stock_price
+
+        t = np.repeat(taus[:, None], len(strikes), axis=1)
+        k = np.tile(strikes, (len(taus), 1))
+
+        prices = bsValue(s, t, k, r[:, None], q[:, None], vols,
+                         FinOptionTypes.EUROPEAN_CALL.value)
+
+        return cls(s, taus, strikes, prices, r, q,
+                   FinOptionTypes.EUROPEAN_CALL)
+
+###############################################################################
+
+    def _impliedVols(self, prices):
+        """ Black-Scholes implied volatilities of a grid of prices. """
+
+        vols = np.zeros(prices.shape)
+
+        for i in range(0, len(self._taus)):
+            for j in range(0, prices.shape[1]):
+                vols[i, j] = bsImpliedVolatility(self._stock_price,
+                                                 self._taus[i],
+                                                 self._strikes[i, j],
+                                                 self._r[i], self._q[i],
+                                                 prices[i, j],
+                                                 self._optionType.value)
+        return vols
+
+###############################################################################
+
+    def _modelPrices(self, x, withGradient=False):
+        """ COS prices of the market options for the parameter vector x. """
+
+        isCall = self._optionType == FinOptionTypes.EUROPEAN_CALL
+
+        return _hestonCOSPrices(self._stock_price, self._r, self._q,
+                                self._taus, self._strikes,
+                                x[0], x[1], x[2], x[3], x[4], isCall,
+                                gCOSNumTerms, gCOSTruncation, withGradient)
+
+###############################################################################
+
+    def _residuals(self, x):
+        prices = self._modelPrices(x)
+        return ((prices - self._marketPrices) * self._weights).ravel()
+
+###############################################################################
+
+    def _jacobian(self, x):
+        (_, grads) = self._modelPrices(x, True)
+        grads = grads * self._weights[None, :, :]
+        return grads.reshape(5, -1).T
+
+###############################################################################
+
+    def _initialParameters(self):
+        """ A starting point from the at the money variance of the first and
+        last expiry with typical values for the other parameters. """
+
+        atm = np.argmin(np.abs(np.log(self._strikes / self._stock_price)),
+                        axis=1)
+        vols = self._marketVols[np.arange(len(self._taus)), atm]
+        return np.array([vols[0]**2, 2.0, vols[-1]**2, 0.5, -0.5])
+
+###############################################################################
+
+    def calibrate(self,
+                  initialModel: FinModelHeston = None,
+                  maxIterations: int = 100,
+                  tolerance: float = 1e-10):
+        """ Fit the Heston parameters and return the fitted FinModelHeston.
+        The fit starts from initialModel if it is given, from the last fit of
+        this calibrator if there is one and from a guess based on the at the
+        money volatilities otherwise. """
+
+        if initialModel is not None:
+            x0 = np.array([initialModel._v0, initialModel._kappa,
+                           initialModel._theta, initialModel._sigma,
+                           initialModel._rho])
+        elif self._model is not None:
+            x0 = np.array([self._model._v0, self._model._kappa,
+                           self._model._theta, self._model._sigma,
+                           self._model._rho])
+        else:
+            x0 = self._initialParameters()
+
+        x0 = np.clip(x0, gHestonLowerBounds, gHestonUpperBounds)
+
+        result = least_squares(self._residuals, x0, jac=self._jacobian,
+                               bounds=(gHestonLowerBounds, gHestonUpperBounds),
+                               method='trf', x_scale='jac',
+                               ftol=tolerance, xtol=tolerance,
+                               gtol=tolerance, max_nfev=maxIterations)
+
+        self._result = result
+        self._model = FinModelHeston(*result.x)
+
+        # Vega weighted errors are close to implied volatility errors
+        errors = result.fun.reshape(self._strikes.shape)
+        self._sliceVolErrors = np.sqrt(np.mean(errors**2, axis=1))
+
+        return self._model
+
+###############################################################################
+
+    def checkCalibration(self, verbose: bool = True):
+        """ Return the root mean square implied volatility error of each
+        expiry slice of the last fit and optionally print a report of the fit
+        to every option. """
+
+        if self._model is None:
+            raise FinError("Need to calibrate before checking calibration.")
+
+        prices = self._modelPrices(np.array([self._model._v0,
+                                             self._model._kappa,
+                                             self._model._theta,
+                                             self._model._sigma,
+                                             self._model._rho]))
+
+        if verbose:
+            print("==========================================================")
+            print("HESTON PARAMETERS:", self._result.x)
+            print("NUM FUNCTION EVALUATIONS:", self._result.nfev)
+            print("==========================================================")
+            for i in range(0, len(self._taus)):
+                print("EXPIRY: %9.5f RMS VOL ERROR: %9.5f%%" %
+                      (self._taus[i], self._sliceVolErrors[i] * 100.0))
+                for j in range(0, self._strikes.shape[1]):
+                    print("%12.3f %12.6f %12.6f %9.5f" %
+                          (self._strikes[i, j], self._marketPrices[i, j],
+                           prices[i, j], self._marketVols[i, j] * 100.0))
+            print("==========================================================")
+
+        return self._sliceVolErrors
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("STOCK PRICE", self._stock_price)
+        s += labelToString("NUM EXPIRIES", len(self._taus))
+        s += labelToString("NUM STRIKES", self._strikes.shape[1])
+        s += labelToString("OPTION TYPE", self._optionType)
+
+        if self._model is not None:
+            s += labelToString("V0", self._model._v0)
+            s += labelToString("KAPPA", self._model._kappa)
+            s += labelToString("THETA", self._model._theta)
+            s += labelToString("SIGMA", self._model._sigma)
+            s += labelToString("RHO", self._model._rho)
+            s += labelToString("MAX SLICE VOL ERROR",
+                               np.max(self._sliceVolErrors), "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -0,0 +1,325 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, float64, int64
+
+from ..utils.FinError import FinError
+from ..utils.helpers import labelToString
+from .FinModel import FinModel
+
+###############################################################################
+# Dupire local volatility built from an implied volatility surface. The local
+# volatility is stored on a uniform mesh of times t and log-moneyness values
+# y = log(K/F(t)) where F(t) is the forward. In terms of the total implied
+# variance w(y, t) = sigma_imp^2 t the Dupire formula is
+#
+#   sigma_loc^2 = (dw/dt) / g
+#   g = (1 - y w'/(2w))^2 - (w'^2/4)(1/w + 1/4) + w''/2
+#
+# where ' is a derivative with respect to y (Gatheral, The Volatility Surface,
+# chapter 1). A surface with calendar arbitrage has dw/dt < 0 somewhere and
+# one with butterfly arbitrage has g < 0. The total variance is made
+# non-decreasing in time at each y, and g is floored, so that the grid holds a
+# real and bounded local volatility everywhere.
+#
+# As the log-moneyness is measured from the forward, log(S/F(t)) has a drift
+# of -sigma_loc^2/2 with no dependence on rates and the paths are simulated in
+# that coordinate. The mesh is uniform, so a lookup finds its cell by division
+# with no search.
+###############################################################################
+
+gLocalVolMinDenominator = 1e-4
+
+###############################################################################
+
+
+@njit(float64(float64, float64, float64, float64, float64[:, :], float64,
+              float64), cache=True, fastmath=True)
+def _bilinearLookup(t0, dt, y0, dy, grid, t, y):
+    """ Bilinear interpolation on a uniform mesh of times t0 + i dt and
+    log-moneyness y0 + j dy. It is flat beyond the edges of the mesh. """
+
+    numTimes, numLogStrikes = grid.shape
+
+    u = (t - t0) / dt
+    u = min(max(u, 0.0), numTimes - 1.0)
+    i = min(int(u), numTimes - 2)
+    u = u - i
+
+    v = (y - y0) / dy
+    v = min(max(v, 0.0), numLogStrikes - 1.0)
+    j = min(int(v), numLogStrikes - 2)
+    v = v - j
+
+    return (1.0 - u) * ((1.0 - v) * grid[i, j] + v * grid[i, j + 1]) + \
+        u * ((1.0 - v) * grid[i + 1, j] + v * grid[i + 1, j + 1])
+
+###############################################################################
+
+
+@njit(float64[:](float64, float64, float64, float64, float64[:, :],
+                 float64[:], float64[:]), cache=True, fastmath=True)
+def _bilinearLookupVect(t0, dt, y0, dy, grid, times, logMoneyness):
+    """ Bilinear lookup of the grid at many points. """
+
+    n = len(times)
+    vols = np.empty(n)
+    for k in range(0, n):
+        vols[k] = _bilinearLookup(t0, dt, y0, dy, grid, times[k],
+                                  logMoneyness[k])
+    return vols
+
+###############################################################################
+
+
+@njit(float64[:, :](int64, int64, float64, float64[:], float64, float64,
+                    float64, float64, float64[:, :], int64),
+      cache=True, fastmath=True)
+def getLocalVolPaths(num_paths,
+                     numTimeSteps,
+                     t,
+                     fwds,
+                     t0,
+                     dt,
+                     y0,
+                     dy,
+                     localVols,
+                     seed):
+    """ Simulate the underlying under local volatility. The fwds are the
+    forwards at the numTimeSteps + 1 equally spaced times from 0 to t and the
+    local volatility grid is described by its first time t0 and spacing dt
+    and its first log-moneyness y0 and spacing dy. At each time step the grid
+    row for that time is interpolated once and then shared by all paths. The
+    paths are antithetic so 2 x num_paths paths are returned. """
+
+    np.random.seed(seed)
+
+    numLogStrikes = localVols.shape[1]
+    h = t / numTimeSteps
+    sqrt_h = np.sqrt(h)
+
+    Sall = np.empty((2 * num_paths, numTimeSteps + 1))
+    y = np.zeros(2 * num_paths)
+    row = np.empty(numLogStrikes)
+
+    Sall[:, 0] = fwds[0]
+
+    for it in range(1, numTimeSteps + 1):
+
+        # Cache the grid row at the start of this step
+        u = ((it - 1) * h - t0) / dt
+        u = min(max(u, 0.0), localVols.shape[0] - 1.0)
+        i = min(int(u), localVols.shape[0] - 2)
+        u = u - i
+        for j in range(0, numLogStrikes):
+            row[j] = (1.0 - u) * localVols[i, j] + u * localVols[i + 1, j]
+
+        g1D = np.random.standard_normal(num_paths)
+
+        for ip in range(0, 2 * num_paths):
+
+            if ip < num_paths:
+                z = g1D[ip]
+            else:
+                z = -g1D[ip - num_paths]
+
+            v = (y[ip] - y0) / dy
+            v = min(max(v, 0.0), numLogStrikes - 1.0)
+            j = min(int(v), numLogStrikes - 2)
+            v = v - j
+            vol = (1.0 - v) * row[j] + v * row[j + 1]
+
+            y[ip] += -0.5 * vol * vol * h + vol * sqrt_h * z
+            Sall[ip, it] = fwds[it] * np.exp(y[ip])
+
+    return Sall
+
+###############################################################################
+
+
+class FinModelLocalVolatility(FinModel):
+    """ Dupire local volatility model built from a calibrated
+    FinEquityVolSurface or FinFXVolSurfacePlus. The local volatility is
+    computed once on a uniform mesh of times and log-moneyness and is then
+    read by bilinear interpolation, so the smile functions are not called
+    when paths are simulated. """
+
+    def __init__(self,
+                 volSurface,
+                 maxTime=None,
+                 numTimes: int = 100,
+                 numLogStrikes: int = 201,
+                 numStdDevs: float = 4.0,
+                 minVol: float = 0.01,
+                 maxVol: float = 5.0):
+        """ Create the local volatility grid from the volatility surface. The
+        mesh has numTimes + 1 times from zero to maxTime, which defaults to
+        the last expiry of the surface, and numLogStrikes log-moneyness values
+        spanning numStdDevs ATM standard deviations at maxTime either side of
+        the forward. Local volatilities are bounded by minVol and maxVol. """
+
+        if hasattr(volSurface, "_stock_price"):
+            spot = volSurface._stock_price
+            discount_curve = volSurface._discount_curve
+            dividendCurve = volSurface._dividendCurve
+        elif hasattr(volSurface, "_spotFXRate"):
+            spot = volSurface._spotFXRate
+            discount_curve = volSurface._domDiscountCurve
+            dividendCurve = volSurface._forDiscountCurve
+        else:
+            raise FinError("Volatility surface must be a FinEquityVolSurface"
+                           " or a FinFXVolSurfacePlus.")
+
+        if maxTime is None:
+            maxTime = volSurface._texp[-1]
+
+        if maxTime <= 0.0:
+            raise FinError("Maximum time must be positive.")
+
+        if numTimes < 2 or numLogStrikes < 3:
+            raise FinError("Local volatility grid is too small.")
+
+        if minVol <= 0.0 or maxVol <= minVol:
+            raise FinError("Local volatility bounds are not valid.")
+
+        self._volSurface = volSurface
+        self._spot = spot
+        self._discount_curve = discount_curve
+        self._dividendCurve = dividendCurve
+        self._maxTime = maxTime
+        self._minVol = minVol
+        self._maxVol = maxVol
+
+        self._buildGrid(numTimes, numLogStrikes, numStdDevs)
+
+###############################################################################
+
+    def _forwards(self, times):
+        """ The forward of the underlying at each of the times. """
+
+        times = np.asarray(times, dtype=float)
+        disDF = np.asarray(self._discount_curve._df(times), dtype=float)
+        divDF = np.asarray(self._dividendCurve._df(times), dtype=float)
+        return self._spot * divDF / disDF
+
+###############################################################################
+
+    def _buildGrid(self, numTimes, numLogStrikes, numStdDevs):
+        """ Compute the total implied variance on the mesh and apply the
+        Dupire formula with finite difference derivatives. """
+
+        T = self._maxTime
+        dt = T / numTimes
+
+        fwdT = self._forwards(np.array([T]))[0]
+        atmVol = self._volSurface.volatilityFromStrikeTimeVect(fwdT, T)
+        yMax = numStdDevs * atmVol * np.sqrt(T)
+        dy = 2.0 * yMax / (numLogStrikes - 1)
+
+        # The first row is at t = dt and is copied to t = 0 below
+        times = dt * np.arange(1, numTimes + 1)
+        logMoneyness = -yMax + dy * np.arange(0, numLogStrikes)
+
+        fwds = self._forwards(times)
+        strikes = fwds[:, None] * np.exp(logMoneyness[None, :])
+        vols = self._volSurface.volatilityFromStrikeTimeVect(strikes,
+                                                             times[:, None])
+        w = vols * vols * times[:, None]
+
+        if np.any(np.isnan(w)):
+            raise FinError("Volatility surface is not defined on all of the"
+                           " grid. Try a smaller numStdDevs.")
+
+        # No calendar arbitrage means total variance does not fall with time
+        w = np.maximum.accumulate(w, axis=0)
+
+        dwdt = np.gradient(w, dt, axis=0)
+        dwdy = np.gradient(w, dy, axis=1)
+        d2wdy2 = np.gradient(dwdy, dy, axis=1)
+
+        y = logMoneyness[None, :]
+        g = (1.0 - y * dwdy / (2.0 * w))**2 \
+            - 0.25 * dwdy**2 * (1.0 / w + 0.25) + 0.5 * d2wdy2
+        g = np.maximum(g, gLocalVolMinDenominator)
+
+        localVar = np.clip(dwdt / g, self._minVol**2, self._maxVol**2)
+
+        self._localVols = np.empty((numTimes + 1, numLogStrikes))
+        self._localVols[1:, :] = np.sqrt(localVar)
+        self._localVols[0, :] = self._localVols[1, :]
+
+        self._t0 = 0.0
+        self._dt = dt
+        self._y0 = -yMax
+        self._dy = dy
+        self._times = np.concatenate((np.zeros(1), times))
+        self._logMoneyness = logMoneyness
+
+###############################################################################
+
+    def localVolatility(self, times, stock_prices):
+        """ Return the local volatility at times in years from the valuation
+        date and underlying prices. The arguments are broadcast against each
+        other and the result has their broadcast shape. """
+
+        (times, stock_prices) = np.broadcast_arrays(
+            np.asarray(times, dtype=float),
+            np.asarray(stock_prices, dtype=float))
+
+        if np.any(stock_prices <= 0.0):
+            raise FinError("Stock prices must be positive.")
+
+        shape = times.shape
+        times = times.ravel().copy()
+        logMoneyness = np.log(stock_prices.ravel() / self._forwards(times))
+
+        vols = _bilinearLookupVect(self._t0, self._dt, self._y0, self._dy,
+                                   self._localVols, times, logMoneyness)
+
+        return vols.reshape(shape)
+
+###############################################################################
+
+    def getPaths(self,
+                 num_paths: int,
+                 numTimeSteps: int,
+                 t: float,
+                 seed: int = 4242):
+        """ Simulate 2 x num_paths antithetic paths of the underlying with
+        numTimeSteps equal steps to time t. Returns an array of shape
+        (2 x num_paths, numTimeSteps + 1) whose first column is the spot. """
+
+        if t <= 0.0:
+            raise FinError("Time must be positive.")
+
+        if numTimeSteps < 1 or num_paths < 1:
+            raise FinError("Number of paths and time steps must be positive.")
+
+        times = np.linspace(0.0, t, numTimeSteps + 1)
+        fwds = self._forwards(times)
+        fwds[0] = self._spot
+
+        return getLocalVolPaths(num_paths, numTimeSteps, t, fwds, self._t0,
+                                self._dt, self._y0, self._dy, self._localVols,
+                                seed)
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("SPOT", self._spot)
+        s += labelToString("MAX TIME", self._maxTime)
+        s += labelToString("NUM TIMES", len(self._times))
+        s += labelToString("NUM LOG STRIKES", len(self._logMoneyness))
+        s += labelToString("MIN VOL", self._minVol)
+        s += labelToString("MAX VOL", self._maxVol, "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
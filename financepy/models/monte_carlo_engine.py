@@ -0,0 +1,154 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange, config
+from numba import get_num_threads, set_num_threads
+
+from ..utils.FinError import FinError
+from ..utils.helpers import labelToString
+
+###############################################################################
+# The paths of a simulation are split into chunks of a fixed size. Each chunk
+# seeds the numba random number generator with its own seed spawned from a
+# SeedSequence of the user seed so the streams of the chunks are independent.
+# Numba keeps a separate generator state for each thread and a chunk runs on
+# one thread from start to end. The chunks are valued on all cores and the
+# chunk results are added up in chunk order so the answer does not depend on
+# the number of threads or the order in which the chunks were run.
+###############################################################################
+
+gMonteCarloChunkSize = 4096
+
+###############################################################################
+
+
+def getChunkSeeds(seed, numChunks):
+    """ Return an array of numChunks seeds, one for each chunk of paths. Each
+    is the first word of the state of a child of the SeedSequence of the user
+    seed so the seeds of different chunks and user seeds are unrelated. """
+
+    children = np.random.SeedSequence(seed).spawn(numChunks)
+    seeds = np.zeros(numChunks, dtype=np.int64)
+    for i in range(0, numChunks):
+        seeds[i] = children[i].generate_state(1)[0]
+    return seeds
+
+###############################################################################
+
+
+@njit(cache=True)
+def getNumChunks(num_paths, chunkSize):
+    """ Number of chunks needed to hold num_paths paths. """
+    return (num_paths + chunkSize - 1) // chunkSize
+
+###############################################################################
+
+
+@njit(parallel=True)
+def runChunks(chunkKernel, params, num_paths, chunkSize, seeds):
+    """ Value num_paths paths in chunks of chunkSize paths on all cores. The
+    chunkKernel is a jitted function called as chunkKernel(params, numPaths)
+    after the random number generator has been seeded with the chunk seed.
+    It draws its random numbers with np.random and returns the sum and the
+    sum of squares of its path values. The function returns the mean path
+    value and its standard error. """
+
+    numChunks = getNumChunks(num_paths, chunkSize)
+    sums = np.zeros(numChunks)
+    sumSqs = np.zeros(numChunks)
+
+    for iChunk in prange(0, numChunks):
+        numChunkPaths = min(chunkSize, num_paths - iChunk * chunkSize)
+        np.random.seed(seeds[iChunk])
+        (sums[iChunk], sumSqs[iChunk]) = chunkKernel(params, numChunkPaths)
+
+    # The reduction is done in chunk order so it is the same on any machine
+    total = 0.0
+    totalSq = 0.0
+    for iChunk in range(0, numChunks):
+        total += sums[iChunk]
+        totalSq += sumSqs[iChunk]
+
+    mean = total / num_paths
+    var = max(totalSq / num_paths - mean * mean, 0.0)
+    stdError = np.sqrt(var / num_paths)
+    return (mean, stdError)
+
+###############################################################################
+
+
+class FinMonteCarloEngine():
+    """ Runs Monte-Carlo kernels on independent chunks of paths in parallel.
+    Each chunk uses its own random number stream so the result only
+    depends on the seed, the number of paths and the chunk size and is
+    bit-identical whatever the number of threads used. """
+
+    def __init__(self,
+                 chunkSize: int = gMonteCarloChunkSize,
+                 numThreads: int = None):
+        """ Create the engine with the number of paths per chunk and the
+        number of threads. If the number of threads is None then numba's
+        default of one thread per core is used. """
+
+        if chunkSize < 1:
+            raise FinError("Chunk size must be a positive integer.")
+
+        if numThreads is not None and numThreads < 1:
+            raise FinError("Number of threads must be a positive integer.")
+
+        self._chunkSize = chunkSize
+        self._numThreads = numThreads
+
+###############################################################################
+
+    def run(self,
+            chunkKernel,
+            params: np.ndarray,
+            num_paths: int,
+            seed: int):
+        """ Value num_paths paths with the jitted chunkKernel and return the
+        mean path value and its standard error. """
+
+        if num_paths < 1:
+            raise FinError("Number of paths must be a positive integer.")
+
+        params = np.asarray(params, dtype=np.float64)
+
+        numChunks = getNumChunks(num_paths, self._chunkSize)
+        seeds = getChunkSeeds(seed, numChunks)
+
+        if self._numThreads is None:
+            return runChunks(chunkKernel, params, num_paths,
+                             self._chunkSize, seeds)
+
+        if self._numThreads > config.NUMBA_NUM_THREADS:
+            raise FinError("Number of threads cannot exceed " +
+                           str(config.NUMBA_NUM_THREADS))
+
+        oldNumThreads = get_num_threads()
+        set_num_threads(self._numThreads)
+
+        try:
+            result = runChunks(chunkKernel, params, num_paths,
+                               self._chunkSize, seeds)
+        finally:
+            set_num_threads(oldNumThreads)
+
+        return result
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("CHUNK SIZE", self._chunkSize)
+        s += labelToString("NUM THREADS", self._numThreads, "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
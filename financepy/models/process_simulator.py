@@ -11,6 +11,7 @@ import numpy as np
 from ..utils.FinError import FinError
 from ..utils.math import norminvcdf
 from ..utils.helpers import labelToString
+from .random_draw_cache import getCachedGaussians, getNormals
 
 ###############################################################################
 
@@ -26,6 +27,34 @@ class FinProcessTypes(Enum):
 ###############################################################################
 
 
+class FinPathAccumulatorTypes(Enum):
+    TERMINAL = 1
+    MINIMUM = 2
+    MAXIMUM = 3
+    SUM = 4
+
+###############################################################################
+
+
+def _accumulatorCodes(accumulators, chunkSize):
+    """ Check the list of FinPathAccumulatorTypes and the chunk size of a
+    path statistics simulation and return the accumulator codes. """
+
+    if len(accumulators) == 0:
+        raise FinError("Need at least one path accumulator.")
+
+    for accumulator in accumulators:
+        if isinstance(accumulator, FinPathAccumulatorTypes) is False:
+            raise FinError("Accumulators must be FinPathAccumulatorTypes")
+
+    if chunkSize < 1:
+        raise FinError("Chunk size must be a positive integer.")
+
+    return np.array([a.value for a in accumulators], dtype=np.int64)
+
+###############################################################################
+
+
 class FinProcessSimulator():
 
     def __init__(self):
@@ -38,12 +67,23 @@ class FinProcessSimulator():
             modelParams,
             numAnnSteps,
             num_paths,
-            seed):
+            seed,
+            randomCache=None):
+        """ Simulate paths of the process. If a FinRandomDrawCache is given
+        the normals for the seed are taken from it. This is only supported
+        for the GBM process. """
+
+        if randomCache is not None and processType != FinProcessTypes.GBM:
+            raise FinError("Random draw cache only supported for GBM.")
 
         if processType == FinProcessTypes.GBM:
             (stock_price, drift, volatility, scheme) = modelParams
-            paths = getGBMPaths(num_paths, numAnnSteps, t, drift,
-                                stock_price, volatility, scheme.value, seed)
+            numTimeSteps = int(t / (1.0 / numAnnSteps) + 0.50)
+            normals = getCachedGaussians(randomCache, seed, num_paths,
+                                         numTimeSteps, 1)
+            paths = _getGBMPaths(num_paths, numAnnSteps, t, drift,
+                                 stock_price, volatility, scheme.value, seed,
+                                 normals)
             return paths
 
         elif processType == FinProcessTypes.HESTON:
@@ -85,6 +125,69 @@ class FinProcessSimulator():
         else:
             raise FinError("Unknown process" + str(processType))
 
+###############################################################################
+
+    def getPathStatistics(
+            self,
+            processType,
+            t,
+            modelParams,
+            numAnnSteps,
+            num_paths,
+            seed,
+            accumulators,
+            chunkSize=10000,
+            randomCache=None):
+        """ Simulate the process without storing the paths and return a
+        matrix with one row per path and one column per accumulator in the
+        list of FinPathAccumulatorTypes. The paths are stepped in place so the
+        memory used grows with the number of paths and not with the number of
+        time steps. The random numbers are drawn in chunks of chunkSize paths
+        in the same order as getProcess so the statistics are those of the
+        paths that getProcess returns for the same seed. The Heston, Vasicek
+        and CIR processes are simulated a path at a time and so hold at most
+        chunkSize paths. If a FinRandomDrawCache is given the normals are
+        taken from it. This is only supported for the GBM process. """
+
+        accumulatorCodes = _accumulatorCodes(accumulators, chunkSize)
+
+        if randomCache is not None and processType != FinProcessTypes.GBM:
+            raise FinError("Random draw cache only supported for GBM.")
+
+        dt = 1.0 / numAnnSteps
+
+        if processType == FinProcessTypes.GBM:
+            (stock_price, drift, volatility, scheme) = modelParams
+            numTimeSteps = int(t / dt + 0.50)
+            normals = getCachedGaussians(randomCache, seed, num_paths,
+                                         numTimeSteps, 1)
+            stats = _getGBMPathStatistics(num_paths, numTimeSteps, dt, drift,
+                                          stock_price, volatility,
+                                          scheme.value, accumulatorCodes,
+                                          chunkSize, seed, normals)
+            return stats
+
+        elif processType == FinProcessTypes.HESTON:
+            (stock_price, drift, v0, kappa, theta, sigma, rho,
+             scheme) = modelParams
+            params = np.array([drift, stock_price, v0, kappa, theta, sigma,
+                               rho])
+
+        elif processType == FinProcessTypes.VASICEK or \
+                processType == FinProcessTypes.CIR:
+            (r0, kappa, theta, sigma, scheme) = modelParams
+            params = np.array([r0, kappa, theta, sigma])
+
+        else:
+            raise FinError("Path statistics not implemented for process " +
+                           str(processType))
+
+        num_steps = int(t / dt)
+        stats = _getPathStatistics(processType.value, num_paths, num_steps,
+                                   dt, params, scheme.value, accumulatorCodes,
+                                   chunkSize, seed)
+        return stats
+
 ###############################################################################
 
 
@@ -96,25 +199,22 @@ class FinHestonNumericalScheme(Enum):
 ###############################################################################
 
 
-@njit(float64[:, :](int64, int64, float64, float64, float64, float64, float64,
-                    float64, float64, float64, int64, int64),
-      cache=True, fastmath=True)
-def getHestonPaths(num_paths,
-                   numAnnSteps,
-                   t,
-                   drift,
-                   s0,
-                   v0,
-                   kappa,
-                   theta,
-                   sigma,
-                   rho,
-                   scheme,
-                   seed):
+@njit(cache=True, fastmath=True)
+def _getHestonPaths(num_paths,
+                    num_steps,
+                    dt,
+                    drift,
+                    s0,
+                    v0,
+                    kappa,
+                    theta,
+                    sigma,
+                    rho,
+                    scheme):
+    """ Simulate Heston stock price paths with the random numbers that follow
+    in the generator. The generator is not seeded so the paths of a large
+    simulation can be generated a chunk of paths at a time. """
 
-    np.random.seed(seed)
-    dt = 1.0 / numAnnSteps
-    num_steps = int(t / dt)
     sPaths = np.empty(shape=(num_paths, num_steps + 1))
     sPaths[:, 0] = s0
     sdt = sqrt(dt)
@@ -216,15 +316,42 @@ def getHestonPaths(num_paths,
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64, float64, float64,
+                    float64, float64, float64, int64, int64),
+      cache=True, fastmath=True)
+def getHestonPaths(num_paths,
+                   numAnnSteps,
+                   t,
+                   drift,
+                   s0,
+                   v0,
+                   kappa,
+                   theta,
+                   sigma,
+                   rho,
+                   scheme,
+                   seed):
+
+    np.random.seed(seed)
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+    return _getHestonPaths(num_paths, num_steps, dt, drift, s0, v0, kappa,
+                           theta, sigma, rho, scheme)
+
+###############################################################################
+
+
 class FinGBMNumericalScheme(Enum):
     NORMAL = 1
     ANTITHETIC = 2
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, int64, int64), cache=True, fastmath=True)
-def getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed):
+@njit(cache=True, fastmath=True)
+def _getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme,
+                 seed, normals):
+    """ Simulate the GBM paths of getGBMPaths using a cached block of normals
+    or new normals from the seed if the block is empty. """
 
     np.random.seed(seed)
     dt = 1.0 / numAnnSteps
@@ -232,12 +359,15 @@ def getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed)
     vsqrt_dt = sigma * sqrt(dt)
     m = exp((mu - sigma * sigma / 2.0) * dt)
 
+    if len(normals) > 0 and len(normals) != numTimeSteps * num_paths:
+        raise FinError("Cached normals do not match the simulation size.")
+
     if scheme == FinGBMNumericalScheme.NORMAL.value:
 
         Sall = np.empty((num_paths, numTimeSteps + 1))
         Sall[:, 0] = stock_price
         for it in range(1, numTimeSteps + 1):
-            g1D = np.random.standard_normal((num_paths))
+            g1D = getNormals(normals, (it - 1) * num_paths, num_paths)
             for ip in range(0, num_paths):
                 w = np.exp(g1D[ip] * vsqrt_dt)
                 Sall[ip, it] = Sall[ip, it - 1] * m * w
@@ -247,7 +377,7 @@ def getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed)
         Sall = np.empty((2 * num_paths, numTimeSteps + 1))
         Sall[:, 0] = stock_price
         for it in range(1, numTimeSteps + 1):
-            g1D = np.random.standard_normal((num_paths))
+            g1D = getNormals(normals, (it - 1) * num_paths, num_paths)
             for ip in range(0, num_paths):
                 w = np.exp(g1D[ip] * vsqrt_dt)
                 Sall[ip, it] = Sall[ip, it - 1] * m * w
@@ -266,27 +396,120 @@ def getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed)
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, int64, int64), cache=True, fastmath=True)
+def getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma, scheme, seed):
+
+    return _getGBMPaths(num_paths, numAnnSteps, t, mu, stock_price, sigma,
+                        scheme, seed, np.empty(0))
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _updateAccumulators(stats, ip, s, accumulators):
+    """ Fold the latest value of path ip into its row of statistics. """
+
+    for k in range(0, len(accumulators)):
+        code = accumulators[k]
+        if code == FinPathAccumulatorTypes.TERMINAL.value:
+            stats[ip, k] = s
+        elif code == FinPathAccumulatorTypes.MINIMUM.value:
+            stats[ip, k] = min(stats[ip, k], s)
+        elif code == FinPathAccumulatorTypes.MAXIMUM.value:
+            stats[ip, k] = max(stats[ip, k], s)
+        else:
+            stats[ip, k] += s
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _getGBMPathStatistics(num_paths, numTimeSteps, dt, mu, stock_price, sigma,
+                          scheme, accumulators, chunkSize, seed, normals):
+    """ Simulate GBM paths in place and return the running statistics of
+    each path. The running minimum and maximum include the initial value and
+    the running sum adds the values at the numTimeSteps dates after it. The
+    normals of each time step are drawn in chunks so that the random stream is
+    the same as in getGBMPaths. If the block of cached normals is not empty
+    the normals are read from it in the same order. """
+
+    np.random.seed(seed)
+    vsqrt_dt = sigma * sqrt(dt)
+    m = exp((mu - sigma * sigma / 2.0) * dt)
+
+    if scheme == FinGBMNumericalScheme.NORMAL.value:
+        numOutputPaths = num_paths
+    elif scheme == FinGBMNumericalScheme.ANTITHETIC.value:
+        numOutputPaths = 2 * num_paths
+    else:
+        raise FinError("Unknown FinGBMNumericalScheme")
+
+    numAccumulators = len(accumulators)
+    s = np.empty(numOutputPaths)
+    s[:] = stock_price
+
+    stats = np.empty((numOutputPaths, numAccumulators))
+    for k in range(0, numAccumulators):
+        if accumulators[k] == FinPathAccumulatorTypes.SUM.value:
+            stats[:, k] = 0.0
+        else:
+            stats[:, k] = stock_price
+
+    for it in range(1, numTimeSteps + 1):
+        for start in range(0, num_paths, chunkSize):
+            end = min(start + chunkSize, num_paths)
+            g1D = getNormals(normals, (it - 1) * num_paths + start,
+                             end - start)
+            for ip in range(start, end):
+                w = np.exp(g1D[ip - start] * vsqrt_dt)
+                s[ip] = s[ip] * m * w
+                _updateAccumulators(stats, ip, s[ip], accumulators)
+
+                if numOutputPaths > num_paths:
+                    ia = ip + num_paths
+                    s[ia] = s[ia] * m / w
+                    _updateAccumulators(stats, ia, s[ia], accumulators)
+
+    return stats
+
+###############################################################################
+
+
+@njit(float64[:, :](int64, int64, float64, float64, float64, float64, int64,
+                    int64[:], int64, int64), cache=True, fastmath=True)
+def getGBMPathStatistics(num_paths, numTimeSteps, dt, mu, stock_price, sigma,
+                         scheme, accumulators, chunkSize, seed):
+    """ Simulate GBM paths in place and return the running statistics of
+    each path. The running minimum and maximum include the initial value and
+    the running sum adds the values at the numTimeSteps dates after it. """
+
+    return _getGBMPathStatistics(num_paths, numTimeSteps, dt, mu, stock_price,
+                                 sigma, scheme, accumulators, chunkSize, seed,
+                                 np.empty(0))
+
+###############################################################################
+
+
 class FinVasicekNumericalScheme(Enum):
     NORMAL = 1
     ANTITHETIC = 2
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, float64, int64, int64), cache=True, fastmath=True)
-def getVasicekPaths(num_paths,
-                    numAnnSteps,
-                    t,
-                    r0,
-                    kappa,
-                    theta,
-                    sigma,
-                    scheme,
-                    seed):
+@njit(cache=True, fastmath=True)
+def _getVasicekPaths(num_paths,
+                     num_steps,
+                     dt,
+                     r0,
+                     kappa,
+                     theta,
+                     sigma,
+                     scheme):
+    """ Simulate Vasicek short rate paths with the random numbers that follow
+    in the generator. The generator is not seeded so the paths of a large
+    simulation can be generated a chunk of paths at a time. """
 
-    np.random.seed(seed)
-    dt = 1.0 / numAnnSteps
-    num_steps = int(t / dt)
     sigmasqrt_dt = sigma * sqrt(dt)
 
     if scheme == FinVasicekNumericalScheme.NORMAL.value:
@@ -312,11 +535,35 @@ def getVasicekPaths(num_paths,
                     z[iStep - 1] * sigmasqrt_dt
                 rate_path[iPath, iStep] = r1
                 rate_path[iPath + num_paths, iStep] = r2
+    else:
+        raise FinError("Unknown FinVasicekNumericalScheme")
+
     return rate_path
 
 ###############################################################################
 
 
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, float64, int64, int64), cache=True, fastmath=True)
+def getVasicekPaths(num_paths,
+                    numAnnSteps,
+                    t,
+                    r0,
+                    kappa,
+                    theta,
+                    sigma,
+                    scheme,
+                    seed):
+
+    np.random.seed(seed)
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+    return _getVasicekPaths(num_paths, num_steps, dt, r0, kappa, theta, sigma,
+                            scheme)
+
+###############################################################################
+
+
 class FinCIRNumericalScheme(Enum):
     EULER = 1
     LOGNORMAL = 2
@@ -326,21 +573,19 @@ class FinCIRNumericalScheme(Enum):
 
 ###############################################################################
 
-@njit(float64[:, :](int64, int64, float64, float64, float64,
-                    float64, float64, int64, int64), cache=True, fastmath=True)
-def getCIRPaths(num_paths,
-                numAnnSteps,
-                t,
-                r0,
-                kappa,
-                theta,
-                sigma,
-                scheme,
-                seed):
+@njit(cache=True, fastmath=True)
+def _getCIRPaths(num_paths,
+                 num_steps,
+                 dt,
+                 r0,
+                 kappa,
+                 theta,
+                 sigma,
+                 scheme):
+    """ Simulate CIR short rate paths with the random numbers that follow in
+    the generator. The generator is not seeded so the paths of a large
+    simulation can be generated a chunk of paths at a time. """
 
-    np.random.seed(seed)
-    dt = 1.0 / numAnnSteps
-    num_steps = int(t / dt)
     rate_path = np.empty(shape=(num_paths, num_steps + 1))
     rate_path[:, 0] = r0
 
@@ -397,6 +642,100 @@ def getCIRPaths(num_paths,
                          beta * sqrtrplus) * c * dt
                 rate_path[iPath, iStep] = r
 
+    else:
+        raise FinError("Unknown FinCIRNumericalScheme")
+
     return rate_path
 
 ###############################################################################
+
+
+@njit(float64[:, :](int64, int64, float64, float64, float64,
+                    float64, float64, int64, int64), cache=True, fastmath=True)
+def getCIRPaths(num_paths,
+                numAnnSteps,
+                t,
+                r0,
+                kappa,
+                theta,
+                sigma,
+                scheme,
+                seed):
+
+    np.random.seed(seed)
+    dt = 1.0 / numAnnSteps
+    num_steps = int(t / dt)
+    return _getCIRPaths(num_paths, num_steps, dt, r0, kappa, theta, sigma,
+                        scheme)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _foldPathStatistics(stats, rows, paths, accumulators):
+    """ Fold each simulated path into the row of statistics given by rows.
+    The running minimum and maximum include the initial value and the
+    running sum adds the values at the dates after it. """
+
+    numSteps = paths.shape[1] - 1
+
+    for i in range(0, paths.shape[0]):
+        ip = rows[i]
+
+        for k in range(0, len(accumulators)):
+            if accumulators[k] == FinPathAccumulatorTypes.SUM.value:
+                stats[ip, k] = 0.0
+            else:
+                stats[ip, k] = paths[i, 0]
+
+        for it in range(1, numSteps + 1):
+            _updateAccumulators(stats, ip, paths[i, it], accumulators)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _getPathStatistics(processType, num_paths, num_steps, dt, params, scheme,
+                       accumulators, chunkSize, seed):
+    """ Simulate the Heston, Vasicek or CIR process in chunks of chunkSize
+    paths and return the running statistics of each path. The generator is
+    seeded once so the paths are the same as those of getProcess. """
+
+    np.random.seed(seed)
+
+    numOutputPaths = num_paths
+    if processType == FinProcessTypes.VASICEK.value and \
+            scheme == FinVasicekNumericalScheme.ANTITHETIC.value:
+        numOutputPaths = 2 * num_paths
+
+    stats = np.empty((numOutputPaths, len(accumulators)))
+
+    for start in range(0, num_paths, chunkSize):
+
+        n = min(chunkSize, num_paths - start)
+
+        if processType == FinProcessTypes.HESTON.value:
+            paths = _getHestonPaths(n, num_steps, dt, params[0], params[1],
+                                    params[2], params[3], params[4],
+                                    params[5], params[6], scheme)
+        elif processType == FinProcessTypes.VASICEK.value:
+            paths = _getVasicekPaths(n, num_steps, dt, params[0], params[1],
+                                     params[2], params[3], scheme)
+        elif processType == FinProcessTypes.CIR.value:
+            paths = _getCIRPaths(n, num_steps, dt, params[0], params[1],
+                                 params[2], params[3], scheme)
+        else:
+            raise FinError("Path statistics not implemented for process.")
+
+        # Antithetic paths follow the first num_paths rows of the output
+        rows = np.empty(paths.shape[0], dtype=np.int64)
+        for i in range(0, n):
+            rows[i] = start + i
+        for i in range(n, paths.shape[0]):
+            rows[i] = num_paths + start + i - n
+
+        _foldPathStatistics(stats, rows, paths, accumulators)
+
+    return stats
+
+###############################################################################
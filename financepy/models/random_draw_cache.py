@@ -0,0 +1,154 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import OrderedDict
+
+import numpy as np
+from numba import njit
+
+from ..utils.FinError import FinError
+from ..utils.helpers import labelToString
+
+###############################################################################
+# Bump and revalue risk calls the same Monte-Carlo pricer many times with the
+# same seed. Each call reseeds the generator and draws all of its normals
+# again. The cache below keeps the blocks of normals that have been drawn so
+# that the bumped revaluations reuse them. A block holds the normals that the
+# generator returns after it is seeded, in the order that they are returned.
+# Each path generator reads a block in the same order as it would draw the
+# normals itself, so a value found with a cache uses the same normals as one
+# found with the seed alone and they agree to rounding error.
+###############################################################################
+
+gRandomDrawCacheBytes = 2**28
+
+###############################################################################
+
+
+class FinRandomDrawCache():
+    """ Least recently used store of blocks of Gaussian random numbers. A
+    block is found from the seed, the number of paths, the number of time
+    steps and the number of dimensions (such as assets) per time step. The
+    total size of the stored blocks is capped at maxBytes. The blocks are
+    shared by every pricer that uses the cache and so are stored read only. """
+
+    def __init__(self,
+                 maxBytes: int = gRandomDrawCacheBytes):
+        """ Create an empty cache holding at most maxBytes bytes of normals.
+        The default is 256MB. """
+
+        if maxBytes < 1:
+            raise FinError("Cache size must be a positive integer.")
+
+        self._maxBytes = maxBytes
+        self._draws = OrderedDict()
+        self._numBytes = 0
+        self._numHits = 0
+        self._numMisses = 0
+
+###############################################################################
+
+    def drawKey(self, seed, num_paths, numSteps, numDims):
+        """ The key of the block of normals for a seed and a simulation
+        size. """
+
+        return (int(seed), int(num_paths), int(numSteps), int(numDims))
+
+###############################################################################
+
+    def getGaussians(self,
+                     seed: int,
+                     num_paths: int,
+                     numSteps: int,
+                     numDims: int):
+        """ Return a flat array of num_paths x numSteps x numDims normals drawn
+        after seeding the generator with seed. They are drawn and stored if
+        they are not in the cache. A block that is larger than the cache is
+        returned but not stored. """
+
+        if num_paths < 1 or numSteps < 1 or numDims < 1:
+            raise FinError("Block sizes must be positive integers.")
+
+        key = self.drawKey(seed, num_paths, numSteps, numDims)
+        draws = self._draws.get(key)
+
+        if draws is not None:
+            self._numHits += 1
+            self._draws.move_to_end(key)
+            return draws
+
+        self._numMisses += 1
+        np.random.seed(seed)
+        draws = np.random.standard_normal(num_paths * numSteps * numDims)
+
+        if draws.nbytes > self._maxBytes:
+            return draws
+
+        # The block is shared by all later users so it is made read only
+        draws.flags.writeable = False
+        self._draws[key] = draws
+        self._numBytes += draws.nbytes
+
+        while self._numBytes > self._maxBytes:
+            (_, oldDraws) = self._draws.popitem(last=False)
+            self._numBytes -= oldDraws.nbytes
+
+        return draws
+
+###############################################################################
+
+    def clear(self):
+        """ Remove all of the stored blocks. """
+
+        self._draws.clear()
+        self._numBytes = 0
+        self._numHits = 0
+        self._numMisses = 0
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("MAX BYTES", self._maxBytes)
+        s += labelToString("NUM BYTES", self._numBytes)
+        s += labelToString("NUM BLOCKS", len(self._draws))
+        s += labelToString("NUM HITS", self._numHits)
+        s += labelToString("NUM MISSES", self._numMisses, "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
+
+
+def getCachedGaussians(randomCache, seed, num_paths, numSteps, numDims):
+    """ The block of normals from the cache or an empty array if there is no
+    cache. The path generators draw their own normals when given an empty
+    array. """
+
+    if randomCache is None:
+        return np.empty(0)
+
+    if isinstance(randomCache, FinRandomDrawCache) is False:
+        raise FinError("Random cache must be a FinRandomDrawCache.")
+
+    return randomCache.getGaussians(seed, num_paths, numSteps, numDims)
+
+###############################################################################
+
+
+@njit(cache=True)
+def getNormals(normals, start, n):
+    """ The n normals from position start of a cached block or n new normals
+    from the generator if the block is empty. """
+
+    if len(normals) == 0:
+        return np.random.standard_normal(n)
+
+    return normals[start:start + n]
+
+###############################################################################
@@ -11,6 +11,8 @@ from ..market.discount.interpolator import FinInterpTypes, _uinterpolate
 from ..utils.helpers import labelToString
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .rates_tree_cache import valueCallablePuttableBonds
+from .rates_tree_cache import valueBermudanSwaptions
 
 interp = FinInterpTypes.FLAT_FWD_RATES.value
 
@@ -95,24 +97,13 @@ def searchRoot(x0, m, Q, rt, dfEnd, dt, sigma):
 
 
 @njit(fastmath=True, cache=True)
-def bermudanSwaption_Tree_Fast(texp, tmat,
-                               strikePrice, face_amount,
-                               coupon_times, coupon_flows,
-                               exerciseTypeInt,
-                               _dfTimes, _df_values,
-                               _treeTimes,
-                               _Q, _rt, _dt):
-    """ Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to non-analytical bond
-    price we need to extend tree out to bond maturity and take into account
-    cash flows through time. """
+def _mapBermudanSwaption(texp, tmat, strikePrice, face_amount,
+                         coupon_times, coupon_flows, _dt, _treeTimes,
+                         _dfTimes, _df_values, numTimeSteps):
+    """ Map the fixed leg flows, the floating leg value and the accrued
+    interest of a swaption onto the tree time steps. Returns these with the
+    expiry and maturity steps. """
 
-    pu = 0.50
-    pd = 0.50
-
-    ###########################################################################
-
-    numTimeSteps, numNodes = _Q.shape
     expiryStep = int(texp/_dt + 0.50)
     maturityStep = int(tmat/_dt + 0.50)
 
@@ -166,6 +157,38 @@ def bermudanSwaption_Tree_Fast(texp, tmat,
 
     #######################################################################
 
+    return fixed_legFlows, floatLegValues, accrued, expiryStep, maturityStep
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Tree_Fast(texp, tmat,
+                               strikePrice, face_amount,
+                               coupon_times, coupon_flows,
+                               exerciseTypeInt,
+                               _dfTimes, _df_values,
+                               _treeTimes,
+                               _Q, _rt, _dt):
+    """ Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to non-analytical bond
+    price we need to extend tree out to bond maturity and take into account
+    cash flows through time. """
+
+    pu = 0.50
+    pd = 0.50
+
+    ###########################################################################
+
+    numTimeSteps, numNodes = _Q.shape
+
+    (fixed_legFlows, floatLegValues, accrued, expiryStep, maturityStep) = \
+        _mapBermudanSwaption(texp, tmat, strikePrice, face_amount,
+                             coupon_times, coupon_flows, _dt, _treeTimes,
+                             _dfTimes, _df_values, numTimeSteps)
+
+    #######################################################################
+
     # The value of the swap at each time and node. Principal is exchanged.
     fixed_legValues = np.zeros(shape=(numTimeSteps, numNodes))
     # The value of the option to enter into a payer swap
@@ -425,22 +448,14 @@ def americanBondOption_Tree_Fast(texp, tmat,
 
 
 @njit(fastmath=True, cache=True)
-def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
-                                   call_times, call_prices,
-                                   put_times, put_prices, face_amount,
-                                   _sigma, _a, _Q,  # IS SIGMA USED ?
-                                   _pu, _pm, _pd, _rt, _dt, _treeTimes,
-                                   _dfTimes, _df_values):
-    """ Value a bond with embedded put and call options that can be exercised
-    at any time over the specified list of put and call dates.
-    Due to non-analytical bond price we need to extend tree out to bond
-    maturity and take into account cash flows through time. """
+def _mapCallablePuttableBond(coupon_times, coupon_flows,
+                             call_times, call_prices,
+                             put_times, put_prices, face_amount,
+                             _dt, _treeTimes, _dfTimes, _df_values,
+                             numTimeSteps):
+    """ Map the coupons, the accrued interest and the call and put prices of
+    a bond onto the tree time steps. Returns these with the maturity step. """
 
-    pu = 0.50
-    pd = 0.50
-
-    #######################################################################
-    numTimeSteps, numNodes = _Q.shape
     dt = _dt
     tmat = coupon_times[-1]
     maturityStep = int(tmat/dt + 0.50)
@@ -505,6 +520,36 @@ def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
         n = int(put_time/dt + 0.50)
         treePutValue[n] = put_prices[i]
 
+    return treeFlows, accrued, treeCallValue, treePutValue, maturityStep
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
+                                   call_times, call_prices,
+                                   put_times, put_prices, face_amount,
+                                   _sigma, _Q, _rt, _dt, _treeTimes,
+                                   _dfTimes, _df_values):
+    """ Value a bond with embedded put and call options that can be exercised
+    at any time over the specified list of put and call dates.
+    Due to non-analytical bond price we need to extend tree out to bond
+    maturity and take into account cash flows through time. """
+
+    pu = 0.50
+    pd = 0.50
+
+    #######################################################################
+    numTimeSteps, numNodes = _Q.shape
+    dt = _dt
+
+    (treeFlows, accrued, treeCallValue, treePutValue, maturityStep) = \
+        _mapCallablePuttableBond(coupon_times, coupon_flows,
+                                 call_times, call_prices,
+                                 put_times, put_prices, face_amount,
+                                 _dt, _treeTimes, _dfTimes, _df_values,
+                                 numTimeSteps)
+
     ###########################################################################
     # Value the bond by backward induction starting at bond maturity
     ###########################################################################
@@ -645,10 +690,12 @@ class FinModelRatesBDT():
 
     def __init__(self, 
                  sigma: float, 
-                 numTimeSteps:int=100):
+                 numTimeSteps:int=100,
+                 treeCache=None):
         """ Constructs the Black-Derman-Toy rate model in the case when the
         volatility is assumed to be constant. The short rate process simplifies
-        and is given by d(log(r)) = theta(t) * dt + sigma * dW. Althopugh """
+        and is given by d(log(r)) = theta(t) * dt + sigma * dW. Models that
+        share a FinRatesTreeCache reuse each other's trees. """
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
@@ -659,6 +706,7 @@ class FinModelRatesBDT():
             raise FinError("Drift fitting requires at least 3 time steps.")
 
         self._numTimeSteps = numTimeSteps
+        self._treeCache = treeCache
 
         self._Q = None
         self._rt = None
@@ -679,6 +727,16 @@ class FinModelRatesBDT():
 
         interp = FinInterpTypes.FLAT_FWD_RATES.value
 
+        self._dfTimes = dfTimes
+        self._dfs = df_values
+
+        if self._treeCache is not None:
+            key = self._treeCache.treeKey(self, treeMat, dfTimes, df_values)
+            tree = self._treeCache.getTree(key)
+            if tree is not None:
+                (self._treeTimes, self._Q, self._rt, self._dt) = tree
+                return
+
         treeMaturity = treeMat * (self._numTimeSteps+1)/self._numTimeSteps
         treeTimes = np.linspace(0.0, treeMaturity, self._numTimeSteps + 2)
         self._treeTimes = treeTimes
@@ -690,13 +748,14 @@ class FinModelRatesBDT():
             t = treeTimes[i]
             dfTree[i] = _uinterpolate(t, dfTimes, df_values, interp)
 
-        self._dfTimes = dfTimes
-        self._dfs = df_values
-
         self._Q, self._rt, self._dt \
             = buildTreeFast(self._sigma,
                             treeTimes, self._numTimeSteps, dfTree)
 
+        if self._treeCache is not None:
+            self._treeCache.addTree(key, (self._treeTimes, self._Q, self._rt,
+                                          self._dt))
+
         return
 
 ###############################################################################
@@ -773,6 +832,9 @@ class FinModelRatesBDT():
         Due to non-analytical bond price we need to extend tree out to bond
         maturity and take into account cash flows through time. """
 
+        coupon_times = np.array(coupon_times)
+        coupon_flows = np.array(coupon_flows)
+
         call_times = np.array(call_times)
         put_times = np.array(put_times)
 
@@ -791,6 +853,61 @@ class FinModelRatesBDT():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def callablePuttableBonds_Tree(self,
+                                   coupon_times, coupon_flows,
+                                   call_times, call_prices,
+                                   put_times, put_prices,
+                                   face_amounts):
+        """ Value many bonds with embedded calls and puts on the current tree
+        with a single backward induction. Each argument is a list with one
+        schedule or face amount per bond and the tree must extend out to the
+        longest bond maturity. Returns arrays of the bond values with and
+        without the options. """
+
+        numTimeSteps, _ = self._Q.shape
+
+        # The binomial rollback has fixed probabilities so none are passed
+        noProbs = np.zeros(0)
+
+        withOption, pure = \
+            valueCallablePuttableBonds(_mapCallablePuttableBond,
+                                       coupon_times, coupon_flows,
+                                       call_times, call_prices,
+                                       put_times, put_prices, face_amounts,
+                                       self._treeTimes, self._dfTimes,
+                                       self._dfs, numTimeSteps,
+                                       noProbs, noProbs, noProbs,
+                                       self._rt, self._dt, 0, True)
+
+        return {'bondwithoption': withOption, 'bondpure': pure}
+
+###############################################################################
+
+    def bermudanSwaptions(self, texps, strikes, face_amounts,
+                          coupon_times, coupon_flows, exerciseTypes):
+        """ Value many swaptions on the current tree with a single backward
+        induction. Each argument is a list with one entry per swaption and the
+        tree must extend out to the longest swap maturity. Returns arrays of
+        the payer and receiver values. """
+
+        exerciseTypeInts = [optionExerciseTypesToInt(exerciseType)
+                            for exerciseType in exerciseTypes]
+
+        numTimeSteps, _ = self._Q.shape
+        noProbs = np.zeros(0)
+
+        payValues, recValues = \
+            valueBermudanSwaptions(_mapBermudanSwaption, texps, strikes,
+                                   face_amounts, coupon_times, coupon_flows,
+                                   exerciseTypeInts, self._treeTimes,
+                                   self._dfTimes, self._dfs, numTimeSteps,
+                                   noProbs, noProbs, noProbs,
+                                   self._rt, self._dt, 0, True)
+
+        return {'pay': payValues, 'rec': recValues}
+
 ###############################################################################
 
     def __repr__(self):
@@ -13,6 +13,8 @@ from ..market.discount.interpolator import FinInterpTypes, _uinterpolate
 from ..utils.helpers import labelToString
 from ..utils.global_types import FinExerciseTypes
 from ..utils.global_vars import gSmall
+from .rates_tree_cache import valueCallablePuttableBonds
+from .rates_tree_cache import valueBermudanSwaptions
 
 interp = FinInterpTypes.FLAT_FWD_RATES.value
 
@@ -413,18 +415,13 @@ def americanBondOption_Tree_Fast(texp,
 
 
 @njit(fastmath=True, cache=True)
-def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, face_amount,
-                               coupon_times, coupon_flows,
-                               exerciseTypeInt,
-                               _dfTimes, _df_values,
-                               _treeTimes, _Q, _pu, _pm, _pd, _rt, _dt, _a):
-    """ Option to enter into a swap that can be exercised on coupon payment
-    dates after the start of the exercise period. Due to multiple exercise
-    times we need to extend tree out to bond maturity and take into account
-    cash flows through time. """
+def _mapBermudanSwaption(texp, tmat, strikePrice, face_amount,
+                         coupon_times, coupon_flows, _dt, _treeTimes,
+                         _dfTimes, _df_values, numTimeSteps):
+    """ Map the fixed leg flows, the floating leg value and the accrued
+    interest of a swaption onto the tree time steps. Returns these with the
+    expiry and maturity steps. """
 
-    numTimeSteps, numNodes = _Q.shape
-    jmax = ceil(0.1835/(_a * _dt))
     expiryStep = int(texp/_dt + 0.50)
     maturityStep = int(tmat/_dt + 0.50)
 
@@ -479,6 +476,32 @@ def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, face_amount,
 
     ###########################################################################
 
+    return fixed_legFlows, floatLegValues, accrued, expiryStep, maturityStep
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, face_amount,
+                               coupon_times, coupon_flows,
+                               exerciseTypeInt,
+                               _dfTimes, _df_values,
+                               _treeTimes, _Q, _pu, _pm, _pd, _rt, _dt, _a):
+    """ Option to enter into a swap that can be exercised on coupon payment
+    dates after the start of the exercise period. Due to multiple exercise
+    times we need to extend tree out to bond maturity and take into account
+    cash flows through time. """
+
+    numTimeSteps, numNodes = _Q.shape
+    jmax = ceil(0.1835/(_a * _dt))
+
+    (fixed_legFlows, floatLegValues, accrued, expiryStep, maturityStep) = \
+        _mapBermudanSwaption(texp, tmat, strikePrice, face_amount,
+                             coupon_times, coupon_flows, _dt, _treeTimes,
+                             _dfTimes, _df_values, numTimeSteps)
+
+    ###########################################################################
+
     # The value of the swap at each time and node. Principal is exchanged.
     fixed_legValues = np.zeros(shape=(numTimeSteps, numNodes))
     # The value of the option to enter into a payer swap
@@ -602,28 +625,15 @@ def bermudanSwaption_Tree_Fast(texp, tmat, strikePrice, face_amount,
 
 
 @njit(fastmath=True, cache=True)
-def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
-                                   call_times, call_prices,
-                                   put_times, put_prices, face,
-                                   _sigma, _a, _Q,  # IS SIGMA USED ?
-                                   _pu, _pm, _pd, _rt, _dt, _treeTimes,
-                                   _dfTimes, _df_values):
-    """ Value an option on a bond with coupons that can have European or
-    American exercise. Some minor issues to do with handling coupons on
-    the option expiry date need to be solved. """
-
-#    print("Coupon Times:", coupon_times)
-#    print("Coupon Flows:", coupon_flows)
-
-#    print("DF Times:", _dfTimes)
-#    print("DF Values:", _df_values)
-
-    if np.any(coupon_times < 0.0):
-        raise FinError("No coupon times can be before the value date.")
+def _mapCallablePuttableBond(coupon_times, coupon_flows,
+                             call_times, call_prices,
+                             put_times, put_prices, face,
+                             _dt, _treeTimes, _dfTimes, _df_values,
+                             numTimeSteps):
+    """ Map the coupons, the accrued interest and the call and put prices of
+    a bond onto the tree time steps. Returns these with the maturity step. """
 
-    numTimeSteps, numNodes = _Q.shape
     dt = _dt
-    jmax = ceil(0.1835/(_a * dt))
     tmat = coupon_times[-1]
     maturityStep = int(tmat/dt + 0.50)
 
@@ -688,6 +698,42 @@ def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
         n = int(round(put_time/dt, 0))
         treePutValue[n] = put_prices[i]
 
+    return treeFlows, accrued, treeCallValue, treePutValue, maturityStep
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callablePuttableBond_Tree_Fast(coupon_times, coupon_flows,
+                                   call_times, call_prices,
+                                   put_times, put_prices, face,
+                                   _sigma, _a, _Q,  # IS SIGMA USED ?
+                                   _pu, _pm, _pd, _rt, _dt, _treeTimes,
+                                   _dfTimes, _df_values):
+    """ Value an option on a bond with coupons that can have European or
+    American exercise. Some minor issues to do with handling coupons on
+    the option expiry date need to be solved. """
+
+#    print("Coupon Times:", coupon_times)
+#    print("Coupon Flows:", coupon_flows)
+
+#    print("DF Times:", _dfTimes)
+#    print("DF Values:", _df_values)
+
+    if np.any(coupon_times < 0.0):
+        raise FinError("No coupon times can be before the value date.")
+
+    numTimeSteps, numNodes = _Q.shape
+    dt = _dt
+    jmax = ceil(0.1835/(_a * dt))
+
+    (treeFlows, accrued, treeCallValue, treePutValue, maturityStep) = \
+        _mapCallablePuttableBond(coupon_times, coupon_flows,
+                                 call_times, call_prices,
+                                 put_times, put_prices, face,
+                                 _dt, _treeTimes, _dfTimes, _df_values,
+                                 numTimeSteps)
+
     ###########################################################################
     # Value the bond by backward induction starting at bond maturity
     ###########################################################################
@@ -846,12 +892,14 @@ class FinModelRatesHW():
                  sigma,
                  a,
                  numTimeSteps=100,
-                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE):
+                 europeanCalcType=FinHWEuropeanCalcType.EXPIRY_TREE,
+                 treeCache=None):
         """ Constructs the Hull-White rate model. The speed of mean reversion
         a and volatility are passed in. The short rate process is given by
         dr = (theta(t) - ar) * dt  + sigma * dW. The model will switch to use
         Jamshidian's approach where possible unless the useJamshidian flag is
-        set to false in which case it uses the trinomial Tree. """
+        set to false in which case it uses the trinomial Tree. Models that
+        share a FinRatesTreeCache reuse each other's trees. """
 
         if sigma < 0.0:
             raise FinError("Negative volatility not allowed.")
@@ -863,6 +911,7 @@ class FinModelRatesHW():
         self._a = a
         self._numTimeSteps = numTimeSteps
         self._europeanCalcType = europeanCalcType
+        self._treeCache = treeCache
 
         self._Q = None
         self._r = None
@@ -1236,6 +1285,62 @@ class FinModelRatesHW():
         return {'bondwithoption': v['bondwithoption'],
                 'bondpure': v['bondpure']}
 
+###############################################################################
+
+    def callablePuttableBonds_Tree(self,
+                                   coupon_times,
+                                   coupon_flows,
+                                   call_times,
+                                   call_prices,
+                                   put_times,
+                                   put_prices,
+                                   face_amounts):
+        """ Value many bonds with embedded calls and puts on the current tree
+        with a single backward induction. Each argument is a list with one
+        schedule or face amount per bond and the tree must extend out to the
+        longest bond maturity. Returns arrays of the bond values with and
+        without the options. """
+
+        numTimeSteps, _ = self._Q.shape
+        jmax = ceil(0.1835/(self._a * self._dt))
+
+        withOption, pure = \
+            valueCallablePuttableBonds(_mapCallablePuttableBond,
+                                       coupon_times, coupon_flows,
+                                       call_times, call_prices,
+                                       put_times, put_prices, face_amounts,
+                                       self._treeTimes, self._dfTimes,
+                                       self._dfs, numTimeSteps,
+                                       self._pu, self._pm, self._pd,
+                                       self._rt, self._dt, jmax, False)
+
+        return {'bondwithoption': withOption, 'bondpure': pure}
+
+###############################################################################
+
+    def bermudanSwaptions(self, texps, strikes, faces,
+                          coupon_times, coupon_flows, exerciseTypes):
+        """ Value many swaptions on the current tree with a single backward
+        induction. Each argument is a list with one entry per swaption and the
+        tree must extend out to the longest swap maturity. Returns arrays of
+        the payer and receiver values. """
+
+        exerciseTypeInts = [optionExerciseTypesToInt(exerciseType)
+                            for exerciseType in exerciseTypes]
+
+        numTimeSteps, _ = self._Q.shape
+        jmax = ceil(0.1835/(self._a * self._dt))
+
+        payValues, recValues = \
+            valueBermudanSwaptions(_mapBermudanSwaption, texps, strikes,
+                                   faces, coupon_times, coupon_flows,
+                                   exerciseTypeInts, self._treeTimes,
+                                   self._dfTimes, self._dfs, numTimeSteps,
+                                   self._pu, self._pm, self._pd,
+                                   self._rt, self._dt, jmax, False)
+
+        return {'pay': payValues, 'rec': recValues}
+
 ###############################################################################
 
     def df_Tree(self, tmat):
@@ -1271,6 +1376,17 @@ class FinModelRatesHW():
         if isinstance(df_values, np.ndarray) is False:
             raise FinError("DF VALUES must be a numpy vector")
 
+        self._dfTimes = dfTimes
+        self._dfs = df_values
+
+        if self._treeCache is not None:
+            key = self._treeCache.treeKey(self, treeMat, dfTimes, df_values)
+            tree = self._treeCache.getTree(key)
+            if tree is not None:
+                (self._treeTimes, self._Q, self._pu, self._pm, self._pd,
+                 self._rt, self._dt) = tree
+                return
+
         # I wish to add on an additional time to the tree so that the second
         # last time corresponds to a maturity treeMat. For this reason I scale
         # up the maturity date of the tree as follows
@@ -1287,13 +1403,15 @@ class FinModelRatesHW():
             t = treeTimes[i]
             dfTree[i] = _uinterpolate(t, dfTimes, df_values, interp)
 
-        self._dfTimes = dfTimes
-        self._dfs = df_values
-
         self._Q, self._pu, self._pm, self._pd, self._rt, self._dt \
             = buildTree_Fast(self._a, self._sigma,
                              treeTimes, self._numTimeSteps, dfTree)
 
+        if self._treeCache is not None:
+            self._treeCache.addTree(key, (self._treeTimes, self._Q, self._pu,
+                                          self._pm, self._pd, self._rt,
+                                          self._dt))
+
         return
 
 ###############################################################################
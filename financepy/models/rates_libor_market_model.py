@@ -9,6 +9,9 @@ from ..utils.FinError import FinError
 from ..utils.math import N
 from ..utils.math import norminvcdf
 from ..models.sobol import getUniformSobol
+from ..models.sobol import _directionNumbers, _sobolIntegers
+from ..models.sobol import gMaxSobolDimension
+from ..models.monte_carlo_engine import FinMonteCarloEngine
 
 # TO DO: SHIFTED LOGNORMAL
 # TO DO: TERMINAL MEASURE
@@ -612,6 +615,371 @@ def LMMSimulateFwdsMF(numForwards, numFactors, num_paths, numeraireIndex, fwd0,
 ###############################################################################
 
 
+###############################################################################
+# The functions below simulate the forward curve only as far as a horizon time
+# index and store only the curve at a list of observation time indices and
+# the spot Ibor rate fwd[t, t] at each time up to the horizon. Paths are
+# evolved one antithetic pair at a time so the working memory does not depend
+# on the number of paths and the random numbers are drawn in the same order as
+# the full simulations above. Sobol points are generated in chunks of paths.
+###############################################################################
+
+gLMMSobolChunkSize = 4096
+
+###############################################################################
+
+
+def _checkObservationIndices(obsIndices, numTimes):
+    """ Check the observation time indices and return them as a sorted array
+    together with the horizon which is the last of them. """
+
+    obsIndices = np.array(obsIndices, dtype=np.int64).ravel()
+
+    if len(obsIndices) == 0:
+        raise FinError("Need at least one observation time index.")
+
+    if np.any(np.diff(obsIndices) <= 0):
+        raise FinError("Observation time indices must be increasing.")
+
+    if obsIndices[0] < 0 or obsIndices[-1] >= numTimes:
+        raise FinError("Observation time indices must be between 0 and " +
+                       str(numTimes - 1))
+
+    return obsIndices, obsIndices[-1]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _LMMStoreSlices(iPath, iTime, fwd, obsIndices, fwdSlices, spotFwds):
+    """ Save the spot Ibor and the curve if this is an observation time. """
+
+    spotFwds[iPath, iTime] = fwd[iTime]
+
+    for iObs in range(0, len(obsIndices)):
+        if obsIndices[iObs] == iTime:
+            for iFwd in range(0, len(fwd)):
+                fwdSlices[iPath, iObs, iFwd] = fwd[iFwd]
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _LMMEvolvePathMF(iPath, fwd0, lambdas, taus, g, obsIndices, horizon,
+                     fwdSlices, spotFwds):
+    """ Evolve one path of the multi-factor spot measure LMM to the horizon
+    using the Gaussians g[j, q] for time step j and factor q. The update of
+    each forward is the same predictor corrector as LMMSimulateFwdsMF but the
+    predictor drift is a running sum over the forwards. """
+
+    numForwards = len(fwd0)
+    numFactors = len(lambdas)
+
+    fwd = fwd0.copy()
+    sumA = np.zeros(numFactors)
+
+    _LMMStoreSlices(iPath, 0, fwd, obsIndices, fwdSlices, spotFwds)
+
+    for j in range(0, horizon):  # TIME LOOP
+        dtj = taus[j]
+        sqrt_dtj = np.sqrt(dtj)
+
+        for q in range(0, numFactors):
+            sumA[q] = 0.0
+
+        # The drift of forward k only depends on the forwards up to k so the
+        # forwards can be updated in place in increasing order of k
+        for k in range(j, numForwards):  # FORWARDS LOOP
+
+            fk = fwd[k]
+            tk = taus[k]
+
+            itoTerm = 0.0
+            randomTerm = 0.0
+            muA = 0.0
+            for q in range(0, numFactors):
+                zkj = lambdas[q, k-j]
+                if k > j:
+                    sumA[q] += zkj * fk * tk / (1.0 + fk * tk)
+                itoTerm += zkj * zkj
+                randomTerm += zkj * g[j, q]
+                muA += zkj * sumA[q]
+            randomTerm *= sqrt_dtj
+
+            # predictor corrector
+            x = np.exp(muA * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fB = fk * x
+
+            # The corrector uses the predicted value of forward k throughout
+            muB = 0.0
+            for i in range(j+1, k+1):
+                ti = taus[i]
+                zz = 0.0
+                for q in range(0, numFactors):
+                    zz += lambdas[q, i-j] * lambdas[q, k-j]
+                muB += fB * ti * zz / (1.0 + fB * ti)
+
+            muC = 0.5 * (muA + muB)
+
+            x = np.exp(muC * dtj - 0.5 * itoTerm * dtj + randomTerm)
+            fwd[k] = fk * x
+
+        # Forwards that have fixed keep their fixing
+        _LMMStoreSlices(iPath, j+1, fwd, obsIndices, fwdSlices, spotFwds)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _LMMSimulateSlicesMF(fwd0, lambdas, taus, useSobol, seed, obsIndices,
+                         horizon, chunkSize, fwdSlices, spotFwds):
+    """ Fill the slice arrays with antithetic pairs of multi-factor paths. """
+
+    numForwards = len(fwd0)
+    numFactors = len(lambdas)
+    num_paths = len(fwdSlices)
+    halfNumPaths = num_paths // 2
+
+    np.random.seed(seed)
+
+    g = np.zeros((numForwards, numFactors))
+
+    if useSobol == 1:
+        numDimensions = max(horizon * numFactors, 1)
+        directions = _directionNumbers(numDimensions)
+        shifts = np.zeros(numDimensions, dtype=np.int64)
+
+    for chunkStart in range(0, halfNumPaths, chunkSize):
+
+        numChunkPaths = min(chunkSize, halfNumPaths - chunkStart)
+
+        if useSobol == 1:
+            rands = _sobolIntegers(directions, shifts, chunkStart,
+                                   numChunkPaths)
+
+        for iChunkPath in range(0, numChunkPaths):
+
+            iPath = chunkStart + iChunkPath
+
+            # Draws beyond the horizon keep the stream of the full simulation
+            if useSobol == 1:
+                for j in range(0, horizon):
+                    for q in range(0, numFactors):
+                        u = rands[iChunkPath, j*numFactors + q]
+                        g[j, q] = norminvcdf(u)
+            else:
+                for j in range(0, numForwards):
+                    for q in range(0, numFactors):
+                        g[j, q] = np.random.normal()
+
+            _LMMEvolvePathMF(iPath, fwd0, lambdas, taus, g, obsIndices,
+                             horizon, fwdSlices, spotFwds)
+
+            # ANTITHETICS
+            _LMMEvolvePathMF(iPath + halfNumPaths, fwd0, lambdas, taus, -g,
+                             obsIndices, horizon, fwdSlices, spotFwds)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _LMMSimulateSlicesNF(fwd0, zetas, correl, taus, seed, obsIndices,
+                         horizon, fwdSlices, spotFwds):
+    """ Fill the slice arrays with antithetic pairs of full N-factor paths
+    using the same predictor corrector as LMMSimulateFwdsNF. """
+
+    numForwards = len(fwd0)
+    num_paths = len(fwdSlices)
+    halfNumPaths = num_paths // 2
+
+    np.random.seed(seed)
+
+    # The factors of the correlation of the live forwards at each time step
+    factors = np.zeros((horizon + 1, numForwards, numForwards))
+    for j in range(1, horizon + 1):
+        chol = np.linalg.cholesky(np.ascontiguousarray(correl[j:, j:]))
+        factors[j, :numForwards-j, :numForwards-j] = chol
+
+    gMatrix = np.zeros((numForwards, numForwards))
+    fwd = np.zeros(numForwards)
+    fwdNext = np.zeros(numForwards)
+    fwdB = np.zeros(numForwards)
+
+    for iHalfPath in range(0, halfNumPaths):
+
+        for j in range(1, numForwards):
+            for k in range(0, numForwards-j):
+                gMatrix[j, k] = np.random.normal()
+
+        for sign in (1.0, -1.0):
+
+            iPath = iHalfPath
+            if sign < 0.0:
+                iPath = iHalfPath + halfNumPaths
+
+            for iFwd in range(0, numForwards):
+                fwd[iFwd] = fwd0[iFwd]
+                fwdNext[iFwd] = fwd0[iFwd]
+
+            _LMMStoreSlices(iPath, 0, fwd, obsIndices, fwdSlices, spotFwds)
+
+            for j in range(1, horizon + 1):  # TIME LOOP
+
+                dt = taus[j]
+                sqrt_dt = np.sqrt(dt)
+
+                for i in range(j, numForwards):  # FORWARDS LOOP
+
+                    zi = zetas[i]
+
+                    muA = 0.0
+                    for k in range(j, i+1):
+                        rho = correl[k, i]
+                        fk = fwd[k]
+                        zk = zetas[k]
+                        tk = taus[k]
+                        muA += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+                    w = 0.0
+                    for k in range(0, numForwards-j):
+                        w = w + factors[j, i-j, k] * sign * gMatrix[j, k]
+
+                    fwdB[i] = fwd[i] \
+                        * np.exp(muA * dt - 0.5 * (zi**2) * dt
+                                 + zi * w * sqrt_dt)
+
+                    muB = 0.0
+                    for k in range(j, i+1):
+                        rho = correl[k, i]
+                        fk = fwdB[k]
+                        zk = zetas[k]
+                        tk = taus[k]
+                        muB += zi * fk * tk * zk * rho / (1.0 + fk * tk)
+
+                    muAvg = 0.5*(muA + muB)
+                    x = np.exp(muAvg * dt - 0.5 * (zi**2) * dt
+                               + zi * w * sqrt_dt)
+                    fwdNext[i] = fwd[i] * x
+
+                # Forwards that have fixed keep their fixing
+                for iFwd in range(0, numForwards):
+                    fwd[iFwd] = fwdNext[iFwd]
+
+                _LMMStoreSlices(iPath, j, fwd, obsIndices, fwdSlices,
+                                spotFwds)
+
+###############################################################################
+
+
+def _LMMSliceArrays(num_paths, numObs, numForwards, horizon, useFloat32):
+    """ Allocate the arrays for the observed curves and the spot Ibors. """
+
+    dtype = np.float32 if useFloat32 else np.float64
+
+    # Even number of paths for antithetics
+    num_paths = 2 * int(num_paths/2)
+
+    fwdSlices = np.zeros((num_paths, numObs, numForwards), dtype=dtype)
+    spotFwds = np.zeros((num_paths, horizon + 1), dtype=dtype)
+    return fwdSlices, spotFwds
+
+###############################################################################
+
+
+def LMMSimulateFwdSlices1F(numForwards, num_paths, numeraireIndex, fwd0,
+                           gammas, taus, useSobol, seed, obsIndices,
+                           useFloat32=False, chunkSize=gLMMSobolChunkSize):
+    """ One factor simulation of the forward Ibors in the spot measure that
+    stops at the last of the observation time indices. It returns a 3D array
+    of the forward curves by path, observation and forward point and a 2D
+    array of the spot Ibor fwd[t, t] by path and time up to the horizon. The
+    curves agree with those of LMMSimulateFwds1F at the same times. Storage
+    can be in single precision to halve the memory and Sobol points are
+    generated chunkSize paths at a time. """
+
+    if len(gammas) != numForwards:
+        raise FinError("Gamma vector does not have right number of forwards")
+
+    lambdas = np.array(gammas, dtype=np.float64).reshape(1, numForwards)
+
+    return LMMSimulateFwdSlicesMF(numForwards, 1, num_paths, numeraireIndex,
+                                  fwd0, lambdas, taus, useSobol, seed,
+                                  obsIndices, useFloat32, chunkSize)
+
+###############################################################################
+
+
+def LMMSimulateFwdSlicesMF(numForwards, numFactors, num_paths, numeraireIndex,
+                           fwd0, lambdas, taus, useSobol, seed, obsIndices,
+                           useFloat32=False, chunkSize=gLMMSobolChunkSize):
+    """ Multi-factor simulation of the forward Ibors in the spot measure that
+    stops at the last of the observation time indices. It returns the curves
+    at the observation times by path and the spot Ibor by path and time up to
+    the horizon. The curves agree with those of LMMSimulateFwdsMF at the same
+    times. """
+
+    lambdas = np.array(lambdas, dtype=np.float64)
+
+    if len(lambdas) != numFactors:
+        raise FinError("Lambda does not have the right number of factors")
+
+    if len(lambdas[0]) != numForwards:
+        raise FinError("Lambda does not have the right number of forwards")
+
+    if len(fwd0) != numForwards or len(taus) != numForwards:
+        raise FinError("Need fwd0 and taus for each forward.")
+
+    if useSobol != 0 and useSobol != 1:
+        raise FinError("Use Sobol must be 0 or 1.")
+
+    if chunkSize < 1:
+        raise FinError("Chunk size must be a positive integer.")
+
+    obsIndices, horizon = _checkObservationIndices(obsIndices, numForwards)
+
+    if useSobol == 1 and horizon * numFactors >= gMaxSobolDimension:
+        raise FinError("Too many Sobol dimensions for this horizon.")
+
+    fwdSlices, spotFwds = _LMMSliceArrays(num_paths, len(obsIndices),
+                                          numForwards, horizon, useFloat32)
+
+    _LMMSimulateSlicesMF(np.array(fwd0, dtype=np.float64), lambdas,
+                         np.array(taus, dtype=np.float64), int(useSobol),
+                         seed, obsIndices, horizon, chunkSize,
+                         fwdSlices, spotFwds)
+
+    return fwdSlices, spotFwds
+
+###############################################################################
+
+
+def LMMSimulateFwdSlicesNF(numForwards, num_paths, fwd0, zetas, correl, taus,
+                           seed, obsIndices, useFloat32=False):
+    """ Full N-factor simulation of the forward Ibors in the spot measure that
+    stops at the last of the observation time indices. It returns the curves
+    at the observation times by path and the spot Ibor by path and time up to
+    the horizon. The curves agree with those of LMMSimulateFwdsNF at the same
+    times. """
+
+    if len(fwd0) != numForwards or len(taus) != numForwards:
+        raise FinError("Need fwd0 and taus for each forward.")
+
+    obsIndices, horizon = _checkObservationIndices(obsIndices, numForwards)
+
+    fwdSlices, spotFwds = _LMMSliceArrays(num_paths, len(obsIndices),
+                                          numForwards, horizon, useFloat32)
+
+    _LMMSimulateSlicesNF(np.array(fwd0, dtype=np.float64),
+                         np.array(zetas, dtype=np.float64),
+                         np.array(correl, dtype=np.float64),
+                         np.array(taus, dtype=np.float64),
+                         seed, obsIndices, horizon, fwdSlices, spotFwds)
+
+    return fwdSlices, spotFwds
+
+###############################################################################
+
+
 @njit(float64[:](int64, int64, float64, float64[:], float64[:, :, :],
                  float64[:], int64),
       cache=True, fastmath=True, parallel=useParallel)
@@ -802,6 +1170,163 @@ def LMMSwaptionPricer(strike, a, b, num_paths, fwd0, fwds, taus, isPayer):
 ###############################################################################
 
 
+@njit(cache=True, fastmath=True)
+def _LMMSwaptionPayoff(strike, a, b, fwdCurve, spotFwds, taus, isPayer):
+    """ Payoff of a European swaption with expiry time index a and swap end
+    index b on one path divided by the spot measure numeraire. The path is
+    given by its forward curve at the expiry and its spot Ibors. """
+
+    numeraire = 1.0
+    for k in range(0, a):
+        numeraire *= (1.0 + taus[k] * spotFwds[k])
+
+    pv01 = 0.0
+    df = 1.0
+
+    # Value the swap as if we were at time a with forward curve known
+    for k in range(a, b):
+        f = fwdCurve[k]
+        tau = taus[k]
+        df = df / (1.0 + tau * f)
+        pv01 = pv01 + tau * df
+
+    fwdSwapRate = (1.0 - df) / pv01
+
+    if isPayer == 1:
+        payRecSwaption = max(fwdSwapRate - strike, 0.0) * pv01
+    elif isPayer == 0:
+        payRecSwaption = max(strike - fwdSwapRate, 0.0) * pv01
+    else:
+        raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+
+    return payRecSwaption / (abs(numeraire) + 1e-10)
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def LMMSwaptionPricerSlice(strike, a, b, num_paths, fwdSlice, spotFwds, taus,
+                           isPayer):
+    """ Price a European swaption from the forward curve at its expiry time
+    index a, as stored by the LMMSimulateFwdSlices functions, and from the
+    spot Ibors up to the expiry which give the spot measure numeraire. """
+
+    maxPaths = len(fwdSlice)
+
+    if a >= len(spotFwds[0]):
+        raise FinError("Spot Ibors are not simulated to the expiry.")
+
+    if a >= b:
+        raise FinError("Swap maturity is before expiry date")
+
+    if b > len(fwdSlice[0]):
+        raise FinError("Swap maturity is beyond the last forward.")
+
+    if num_paths > maxPaths:
+        raise FinError("NumPaths > MaxPaths")
+
+    sumPayRecSwaption = 0.0
+
+    for iPath in range(0, num_paths):
+        sumPayRecSwaption += _LMMSwaptionPayoff(strike, a, b,
+                                                fwdSlice[iPath],
+                                                spotFwds[iPath], taus,
+                                                isPayer)
+
+    payRecPrice = sumPayRecSwaption / num_paths
+    return payRecPrice
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _LMMSwaptionChunk(params, num_paths):
+    """ Sum and sum of squares of the antithetic pair swaption payoffs of one
+    chunk of multi-factor LMM paths. The params are packed by
+    LMMSwaptionPricerMC. """
+
+    numForwards = int(params[0])
+    numFactors = int(params[1])
+    a = int(params[2])
+    b = int(params[3])
+    strike = params[4]
+    isPayer = int(params[5])
+
+    fwd0 = params[6:6 + numForwards]
+    taus = params[6 + numForwards:6 + 2 * numForwards]
+    lambdas = params[6 + 2 * numForwards:].reshape((numFactors, numForwards))
+
+    # Each pair of paths only needs to be evolved to the expiry
+    obsIndices = np.array([a], dtype=np.int64)
+    fwdSlices = np.zeros((2, 1, numForwards))
+    spotFwds = np.zeros((2, a + 1))
+    g = np.zeros((numForwards, numFactors))
+
+    total = 0.0
+    totalSq = 0.0
+
+    for iPath in range(0, num_paths):
+
+        g[:a, :] = np.random.standard_normal((a, numFactors))
+
+        _LMMEvolvePathMF(0, fwd0, lambdas, taus, g, obsIndices, a,
+                         fwdSlices, spotFwds)
+
+        # ANTITHETICS
+        _LMMEvolvePathMF(1, fwd0, lambdas, taus, -g, obsIndices, a,
+                         fwdSlices, spotFwds)
+
+        payoff = 0.5 * (_LMMSwaptionPayoff(strike, a, b, fwdSlices[0, 0],
+                                           spotFwds[0], taus, isPayer) +
+                        _LMMSwaptionPayoff(strike, a, b, fwdSlices[1, 0],
+                                           spotFwds[1], taus, isPayer))
+        total += payoff
+        totalSq += payoff * payoff
+
+    return (total, totalSq)
+
+###############################################################################
+
+
+def LMMSwaptionPricerMC(strike, a, b, num_paths, fwd0, lambdas, taus,
+                        isPayer, seed, engine=None):
+    """ Price a European swaption with expiry time index a and swap end index
+    b by simulating num_paths antithetic pairs of multi-factor LMM paths in
+    the spot measure up to the expiry. The paths are valued in chunks on all
+    cores by a FinMonteCarloEngine, each chunk with its own random number
+    stream, so the price does not depend on the number of threads. A one
+    factor model has a single row of lambdas. Returns the price and its
+    standard error. """
+
+    lambdas = np.atleast_2d(np.array(lambdas, dtype=np.float64))
+    numFactors, numForwards = lambdas.shape
+
+    if len(fwd0) != numForwards or len(taus) != numForwards:
+        raise FinError("Need fwd0 and taus for each forward.")
+
+    if a < 0:
+        raise FinError("Swaption expiry index cannot be negative.")
+
+    if a >= b:
+        raise FinError("Swap maturity is before expiry date")
+
+    if b > numForwards:
+        raise FinError("Swap maturity is beyond the last forward.")
+
+    if isPayer != 0 and isPayer != 1:
+        raise FinError("Unknown payRecSwaption value - must be 0 or 1")
+
+    if engine is None:
+        engine = FinMonteCarloEngine()
+
+    params = np.concatenate(([numForwards, numFactors, a, b, strike,
+                              isPayer], fwd0, taus, lambdas.ravel()))
+
+    return engine.run(_LMMSwaptionChunk, params, num_paths, seed)
+
+###############################################################################
+
+
 @njit(float64[:](float64, int64, int64, float64[:], float64[:, :, :],
                  float64[:]), cache=True, fastmath=True, parallel=useParallel)
 def LMMRatchetCapletPricer(spread, numPeriods, num_paths, fwd0, fwds, taus):
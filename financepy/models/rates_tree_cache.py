@@ -0,0 +1,442 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+from collections import OrderedDict
+
+import numpy as np
+from numba import njit
+
+from ..utils.FinError import FinError
+from ..utils.global_vars import gSmall
+from ..utils.helpers import labelToString
+
+###############################################################################
+# Building a short rate tree means fitting the drift at every time step to the
+# discount curve which costs far more than rolling back a single trade. The
+# cache below keeps the trees built for each set of model parameters, tree
+# horizon and curve so that trades which share a tree do not rebuild it. The
+# batched kernels roll back many trades on the same tree at once with a value
+# array that has one row per tree node and one column per trade.
+###############################################################################
+
+gTreeCacheSize = 32
+
+###############################################################################
+
+
+class FinRatesTreeCache():
+    """ Least recently used store of calibrated Hull-White, Black-Karasinski
+    and Black-Derman-Toy trees. A tree is found from the model type, the mean
+    reversion, the volatility, the number of time steps, the tree horizon and
+    the discount factors of the curve. Models that are given a cache look up
+    their tree in it before building one. """
+
+    def __init__(self,
+                 maxSize: int = gTreeCacheSize):
+        """ Create an empty cache that holds at most maxSize trees. """
+
+        if maxSize < 1:
+            raise FinError("Cache size must be a positive integer.")
+
+        self._maxSize = maxSize
+        self._trees = OrderedDict()
+        self._numHits = 0
+        self._numMisses = 0
+
+###############################################################################
+
+    def treeKey(self, model, treeMat, dfTimes, df_values):
+        """ The key of the tree of a model built out to treeMat on the curve
+        with discount factors df_values at times dfTimes. The curve enters
+        through its values so a curve that is changed in place is a miss. """
+
+        a = getattr(model, "_a", 0.0)
+
+        return (type(model).__name__, a, model._sigma, model._numTimeSteps,
+                treeMat, np.asarray(dfTimes, dtype=np.float64).tobytes(),
+                np.asarray(df_values, dtype=np.float64).tobytes())
+
+###############################################################################
+
+    def getTree(self, key):
+        """ Return the stored tree for the key or None if it is not stored. """
+
+        tree = self._trees.get(key)
+
+        if tree is None:
+            self._numMisses += 1
+        else:
+            self._numHits += 1
+            self._trees.move_to_end(key)
+
+        return tree
+
+###############################################################################
+
+    def addTree(self, key, tree):
+        """ Store a tree and drop the least recently used tree if the cache is
+        full. """
+
+        self._trees[key] = tree
+        self._trees.move_to_end(key)
+
+        while len(self._trees) > self._maxSize:
+            self._trees.popitem(last=False)
+
+###############################################################################
+
+    def clear(self):
+        """ Remove all of the stored trees. """
+
+        self._trees.clear()
+        self._numHits = 0
+        self._numMisses = 0
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("MAX SIZE", self._maxSize)
+        s += labelToString("NUM TREES", len(self._trees))
+        s += labelToString("NUM HITS", self._numHits)
+        s += labelToString("NUM MISSES", self._numMisses, "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _nodeRange(m, jmax, isBinomial):
+    """ First and last plus one node index of the live nodes at step m. The
+    binomial tree is packed into the lower diagonal of a square matrix. """
+
+    if isBinomial:
+        return 0, m + 1
+
+    nm = min(m, jmax)
+    return jmax - nm, jmax + nm + 1
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _rollback(nextValues, values, m, _pu, _pm, _pd, _rt, _dt, jmax,
+              isBinomial):
+    """ Set the values of all of the trades at the nodes of step m to the
+    discounted expectation of their values at step m+1. The arrays have one
+    row per node and one column per trade. """
+
+    numTrades = values.shape[1]
+
+    if isBinomial:
+
+        for k in range(0, m+1):
+            df = np.exp(-_rt[m, k] * _dt)
+            for iTrade in range(0, numTrades):
+                vu = nextValues[k+1, iTrade]
+                vd = nextValues[k, iTrade]
+                values[k, iTrade] = (0.50*vu + 0.50*vd) * df
+
+        return
+
+    nm = min(m, jmax)
+
+    for k in range(-nm, nm+1):
+        kN = k + jmax
+        df = np.exp(-_rt[m, kN] * _dt)
+        pu = _pu[kN]
+        pm = _pm[kN]
+        pd = _pd[kN]
+
+        if k == jmax:
+            iu, im, id = kN, kN-1, kN-2
+        elif k == -jmax:
+            iu, im, id = kN+2, kN+1, kN
+        else:
+            iu, im, id = kN+1, kN, kN-1
+
+        for iTrade in range(0, numTrades):
+            vu = nextValues[iu, iTrade]
+            vm = nextValues[im, iTrade]
+            vd = nextValues[id, iTrade]
+            values[kN, iTrade] = (pu*vu + pm*vm + pd*vd) * df
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def callablePuttableBonds_Tree_Fast(treeFlows, accrued,
+                                    treeCallValues, treePutValues,
+                                    maturitySteps, faces,
+                                    _pu, _pm, _pd, _rt, _dt, jmax,
+                                    isBinomial):
+    """ Value many bonds with embedded calls and puts with one backward
+    induction over the tree. Row i of the flow, accrued, call and put arrays
+    holds the amounts of bond i mapped onto the tree time steps. Each bond is
+    priced exactly as by the single bond tree valuation. The values with and
+    without the options are returned. """
+
+    numTrades = len(maturitySteps)
+    numNodes = _rt.shape[1]
+
+    bondValues = np.zeros((numNodes, numTrades))
+    nextBondValues = np.zeros((numNodes, numTrades))
+    callPutBondValues = np.zeros((numNodes, numTrades))
+    nextCallPutBondValues = np.zeros((numNodes, numTrades))
+
+    lastStep = np.max(maturitySteps)
+
+    for m in range(lastStep, -1, -1):
+
+        if m < lastStep:
+            _rollback(nextBondValues, bondValues, m,
+                      _pu, _pm, _pd, _rt, _dt, jmax, isBinomial)
+            _rollback(nextCallPutBondValues, callPutBondValues, m,
+                      _pu, _pm, _pd, _rt, _dt, jmax, isBinomial)
+
+        (kStart, kEnd) = _nodeRange(m, jmax, isBinomial)
+
+        for iTrade in range(0, numTrades):
+
+            maturityStep = maturitySteps[iTrade]
+
+            if m > maturityStep:
+                continue
+
+            face = faces[iTrade]
+            vcall = treeCallValues[iTrade, m]
+            vput = treePutValues[iTrade, m]
+            accd = accrued[iTrade, m]
+
+            for kN in range(kStart, kEnd):
+
+                if m == maturityStep:
+                    vhold = (1.0 + treeFlows[iTrade, m]) * face
+                    bondValues[kN, iTrade] = vhold
+                else:
+                    flow = treeFlows[iTrade, m] * face
+                    bondValues[kN, iTrade] += flow
+                    # Need to make add on coupons paid if we hold
+                    vhold = callPutBondValues[kN, iTrade] + flow
+
+                value = min(max(vhold - accd, vput), vcall) + accd
+                callPutBondValues[kN, iTrade] = value
+
+        (bondValues, nextBondValues) = (nextBondValues, bondValues)
+        (callPutBondValues, nextCallPutBondValues) = \
+            (nextCallPutBondValues, callPutBondValues)
+
+    root = 0 if isBinomial else jmax
+    return nextCallPutBondValues[root].copy(), nextBondValues[root].copy()
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def bermudanSwaptions_Tree_Fast(fixedLegFlows, floatLegValues, accrued,
+                                expirySteps, maturitySteps, exerciseTypes,
+                                faces, _pu, _pm, _pd, _rt, _dt, jmax,
+                                isBinomial):
+    """ Value many payer and receiver swaptions with European or Bermudan
+    exercise with one backward induction over the tree. Row i of the fixed
+    leg flow, floating leg value and accrued arrays holds the amounts of
+    swaption i mapped onto the tree time steps. The swap fixed leg is valued
+    as a bond and exercise compares its clean value with the floating leg.
+    The payer and receiver values are returned. """
+
+    numTrades = len(maturitySteps)
+    numNodes = _rt.shape[1]
+
+    fixedLegValues = np.zeros((numNodes, numTrades))
+    nextFixedLegValues = np.zeros((numNodes, numTrades))
+    payValues = np.zeros((numNodes, numTrades))
+    nextPayValues = np.zeros((numNodes, numTrades))
+    recValues = np.zeros((numNodes, numTrades))
+    nextRecValues = np.zeros((numNodes, numTrades))
+
+    lastStep = np.max(maturitySteps)
+
+    for m in range(lastStep, -1, -1):
+
+        if m < lastStep:
+            _rollback(nextFixedLegValues, fixedLegValues, m,
+                      _pu, _pm, _pd, _rt, _dt, jmax, isBinomial)
+            _rollback(nextPayValues, payValues, m,
+                      _pu, _pm, _pd, _rt, _dt, jmax, isBinomial)
+            _rollback(nextRecValues, recValues, m,
+                      _pu, _pm, _pd, _rt, _dt, jmax, isBinomial)
+
+        (kStart, kEnd) = _nodeRange(m, jmax, isBinomial)
+
+        for iTrade in range(0, numTrades):
+
+            maturityStep = maturitySteps[iTrade]
+            expiryStep = expirySteps[iTrade]
+            exerciseType = exerciseTypes[iTrade]
+            face = faces[iTrade]
+
+            if m > maturityStep:
+                continue
+
+            if m == maturityStep:
+                flow = 1.0 + fixedLegFlows[iTrade, m]
+                for kN in range(kStart, kEnd):
+                    fixedLegValues[kN, iTrade] = flow * face
+                    payValues[kN, iTrade] = 0.0
+                    recValues[kN, iTrade] = 0.0
+                continue
+
+            flow = fixedLegFlows[iTrade, m] * face
+            floatLegValue = floatLegValues[iTrade, m]
+
+            exercise = False
+            if m == expiryStep:
+                exercise = True
+            elif exerciseType == 2 and flow > gSmall and m > expiryStep:
+                exercise = True
+            elif exerciseType == 3 and m > expiryStep:
+                raise FinError("American optionality not tested.")
+
+            for kN in range(kStart, kEnd):
+
+                fixedLegValues[kN, iTrade] += flow
+
+                if exercise:
+                    # The floating value is clean and so must be the fixed
+                    fixedLegValue = fixedLegValues[kN, iTrade] \
+                        - accrued[iTrade, m]
+                    payExercise = max(floatLegValue - fixedLegValue, 0.0)
+                    recExercise = max(fixedLegValue - floatLegValue, 0.0)
+                    payValues[kN, iTrade] = max(payExercise,
+                                                payValues[kN, iTrade])
+                    recValues[kN, iTrade] = max(recExercise,
+                                                recValues[kN, iTrade])
+
+        (fixedLegValues, nextFixedLegValues) = \
+            (nextFixedLegValues, fixedLegValues)
+        (payValues, nextPayValues) = (nextPayValues, payValues)
+        (recValues, nextRecValues) = (nextRecValues, recValues)
+
+    root = 0 if isBinomial else jmax
+    return nextPayValues[root].copy(), nextRecValues[root].copy()
+
+###############################################################################
+
+
+def valueCallablePuttableBonds(mapBondFn, couponTimes, couponFlows,
+                               callTimes, callPrices, putTimes, putPrices,
+                               faceAmounts, treeTimes, dfTimes, df_values,
+                               numTimeSteps, _pu, _pm, _pd, _rt, _dt, jmax,
+                               isBinomial):
+    """ Map each bond onto the tree with the model's own mapping function and
+    roll them all back together. Each of the schedule arguments is a list
+    with one entry per bond. """
+
+    numTrades = len(couponTimes)
+
+    if numTrades == 0:
+        raise FinError("Need at least one bond.")
+
+    for schedule in [couponFlows, callTimes, callPrices, putTimes,
+                     putPrices, faceAmounts]:
+        if len(schedule) != numTrades:
+            raise FinError("Need one schedule per bond.")
+
+    treeFlows = np.zeros((numTrades, numTimeSteps))
+    accrued = np.zeros((numTrades, numTimeSteps))
+    treeCallValues = np.zeros((numTrades, numTimeSteps))
+    treePutValues = np.zeros((numTrades, numTimeSteps))
+    maturitySteps = np.zeros(numTrades, dtype=np.int64)
+    faces = np.array(faceAmounts, dtype=np.float64)
+
+    lastTime = treeTimes[-2] + gSmall
+
+    for i in range(0, numTrades):
+
+        cpnTimes = np.array(couponTimes[i], dtype=np.float64)
+
+        if cpnTimes[-1] > lastTime:
+            raise FinError("Bond matures after the tree horizon.")
+
+        (treeFlows[i], accrued[i], treeCallValues[i], treePutValues[i],
+         maturitySteps[i]) = \
+            mapBondFn(cpnTimes,
+                      np.array(couponFlows[i], dtype=np.float64),
+                      np.array(callTimes[i], dtype=np.float64),
+                      np.array(callPrices[i], dtype=np.float64),
+                      np.array(putTimes[i], dtype=np.float64),
+                      np.array(putPrices[i], dtype=np.float64),
+                      faces[i], _dt, treeTimes, dfTimes, df_values,
+                      numTimeSteps)
+
+    return callablePuttableBonds_Tree_Fast(treeFlows, accrued,
+                                           treeCallValues, treePutValues,
+                                           maturitySteps, faces,
+                                           _pu, _pm, _pd, _rt, _dt, jmax,
+                                           isBinomial)
+
+###############################################################################
+
+
+def valueBermudanSwaptions(mapSwaptionFn, expiryTimes, strikePrices,
+                           faceAmounts, couponTimes, couponFlows,
+                           exerciseTypes, treeTimes, dfTimes, df_values,
+                           numTimeSteps, _pu, _pm, _pd, _rt, _dt, jmax,
+                           isBinomial):
+    """ Map each swaption onto the tree with the model's own mapping function
+    and roll them all back together. The exercise types are integers. """
+
+    numTrades = len(expiryTimes)
+
+    if numTrades == 0:
+        raise FinError("Need at least one swaption.")
+
+    for schedule in [strikePrices, faceAmounts, couponTimes, couponFlows,
+                     exerciseTypes]:
+        if len(schedule) != numTrades:
+            raise FinError("Need one schedule per swaption.")
+
+    fixedLegFlows = np.zeros((numTrades, numTimeSteps))
+    floatLegValues = np.zeros((numTrades, numTimeSteps))
+    accrued = np.zeros((numTrades, numTimeSteps))
+    expirySteps = np.zeros(numTrades, dtype=np.int64)
+    maturitySteps = np.zeros(numTrades, dtype=np.int64)
+    faces = np.array(faceAmounts, dtype=np.float64)
+
+    lastTime = treeTimes[-2] + gSmall
+
+    for i in range(0, numTrades):
+
+        cpnTimes = np.array(couponTimes[i], dtype=np.float64)
+        texp = expiryTimes[i]
+        tmat = cpnTimes[-1]
+
+        if texp > tmat:
+            raise FinError("Option expiry after bond matures.")
+
+        if texp < 0.0:
+            raise FinError("Option expiry time negative.")
+
+        if tmat > lastTime:
+            raise FinError("Swap matures after the tree horizon.")
+
+        (fixedLegFlows[i], floatLegValues[i], accrued[i], expirySteps[i],
+         maturitySteps[i]) = \
+            mapSwaptionFn(texp, tmat, strikePrices[i], faces[i], cpnTimes,
+                          np.array(couponFlows[i], dtype=np.float64),
+                          _dt, treeTimes, dfTimes, df_values, numTimeSteps)
+
+    return bermudanSwaptions_Tree_Fast(fixedLegFlows, floatLegValues,
+                                       accrued, expirySteps, maturitySteps,
+                                       np.array(exerciseTypes,
+                                                dtype=np.int64),
+                                       faces, _pu, _pm, _pd, _rt, _dt, jmax,
+                                       isBinomial)
+
+###############################################################################
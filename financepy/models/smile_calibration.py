@@ -0,0 +1,474 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from numba import njit, prange
+
+from ..utils.FinError import FinError
+from .volatility_fns import FinVolFunctionTypes
+from .volatility_fns import volFunctionClark
+from .volatility_fns import volFunctionBloomberg
+from .volatility_fns import volFunctionSVI
+from .volatility_fns import volFunctionSSVI
+from .sabr import volFunctionSABR
+from .sabr import volFunctionSABR_BETA_ONE
+from .sabr import volFunctionSABR_BETA_HALF
+
+###############################################################################
+# Least-squares calibration of parametric smiles to a grid of strikes and
+# volatilities, one smile per expiry slice. Each slice is fitted with the
+# Levenberg-Marquardt method, which needs the derivatives of the smile vol
+# with respect to its parameters. These are analytic for SVI and for the
+# Hagan SABR expansion with free or fixed (0.5) beta. The other smiles use
+# central differences. The slices are independent so they are fitted in
+# parallel and can each be started from the parameters of an earlier fit.
+###############################################################################
+
+gSmileCalibrationMaxIter = 100
+
+###############################################################################
+
+
+@njit(cache=True, fastmath=True)
+def _smileVol(volTypeValue, params, f, k, t):
+    """ Return the smile volatility at strike k. This dispatches in the same
+    way as the volFunction of the volatility surfaces. """
+
+    if volTypeValue == FinVolFunctionTypes.CLARK.value:
+        return volFunctionClark(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_ONE.value:
+        return volFunctionSABR_BETA_ONE(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_HALF.value:
+        return volFunctionSABR_BETA_HALF(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.BBG.value:
+        return volFunctionBloomberg(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.SABR.value:
+        return volFunctionSABR(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.CLARK5.value:
+        return volFunctionClark(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.SVI.value:
+        return volFunctionSVI(params, f, k, t)
+    elif volTypeValue == FinVolFunctionTypes.SSVI.value:
+        return volFunctionSSVI(params, f, k, t)
+    else:
+        raise FinError("Unknown Model Type")
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def _sabrVolGrad(alpha, beta, rho, nu, f, k, t, grad):
+    """ Return the Hagan SABR volatility as computed by volFunctionSABR and
+    write its derivatives with respect to alpha, beta, rho and nu into grad.
+    Each intermediate of volFunctionSABR is differentiated in turn, once for
+    each parameter, using scalar seeds for the parameter derivatives. """
+
+    alphaSeed = 1.0
+
+    if alpha < 1e-10:
+        alpha = 1e-10
+        alphaSeed = 0.0
+
+    if k <= 0:
+        raise FinError("Strike must be positive")
+
+    if f <= 0:
+        raise FinError("Forward must be positive")
+
+    logfk = np.log(f / k)
+    logf_k = np.log(f * k)
+
+    b = 1.0 - beta
+    fkb = (f*k)**b
+    sqf = fkb**0.5
+    A = b**2 * alpha**2 / (24.0 * fkb)
+    num = 0.25 * rho * beta * nu * alpha
+    B = num / sqf
+    C = (2.0 - 3.0*rho**2) * nu**2 / 24.0
+    V = B**2 * logfk**2 / 24.0
+    W = B**4 * logfk**4 / 1920.0
+    G = 1.0 + (A + B + C) * t
+    H = sqf * (1.0 + V + W)
+    z = nu * sqf * logfk / alpha
+
+    useZ = abs(z) > 1e-07
+
+    if useZ:
+        R = np.sqrt(1.0 - 2.0*rho*z + z**2)
+        x = np.log((R + z - rho) / (1.0 - rho))
+        vol = alpha * z * G / (H * x)
+    else:
+        vol = alpha * G / H
+
+    for i in range(0, 4):
+
+        dalpha = 0.0
+        dbeta = 0.0
+        drho = 0.0
+        dnu = 0.0
+
+        if i == 0:
+            dalpha = alphaSeed
+        elif i == 1:
+            dbeta = 1.0
+        elif i == 2:
+            drho = 1.0
+        else:
+            dnu = 1.0
+
+        db = -dbeta
+        dfkb = fkb * logf_k * db
+        dsqf = 0.5 * dfkb / sqf
+
+        dA = (2.0 * b * db * alpha**2 + 2.0 * b**2 * alpha * dalpha) / \
+            (24.0 * fkb) - A * dfkb / fkb
+
+        dnum = 0.25 * (drho * beta * nu * alpha + rho * dbeta * nu * alpha +
+                       rho * beta * dnu * alpha + rho * beta * nu * dalpha)
+        dB = dnum / sqf - B * dsqf / sqf
+
+        dC = (-6.0 * rho * drho * nu**2 +
+              (2.0 - 3.0*rho**2) * 2.0 * nu * dnu) / 24.0
+
+        dV = 2.0 * B * dB * logfk**2 / 24.0
+        dW = 4.0 * B**3 * dB * logfk**4 / 1920.0
+
+        dG = (dA + dB + dC) * t
+        dH = dsqf * (1.0 + V + W) + sqf * (dV + dW)
+
+        if useZ:
+            dz = logfk * (dnu * sqf * alpha + nu * dsqf * alpha -
+                          nu * sqf * dalpha) / alpha**2
+            dR = (-drho * z - rho * dz + z * dz) / R
+            dx = (dR + dz - drho) / (R + z - rho) + drho / (1.0 - rho)
+            grad[i] = vol * (dalpha / alpha + dz / z + dG / G - dH / H -
+                             dx / x)
+        else:
+            grad[i] = vol * (dalpha / alpha + dG / G - dH / H)
+
+    return vol
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def volFunctionAndGrad(volTypeValue, params, f, k, t, grad):
+    """ Return the smile volatility at strike k and write its derivatives
+    with respect to the smile parameters into grad. """
+
+    if volTypeValue == FinVolFunctionTypes.SVI.value:
+
+        a = params[0]
+        b = params[1]
+        rho = params[2]
+        m = params[3]
+        sigma = params[4]
+
+        xm = np.log(f/k) - m
+        s = np.sqrt(xm * xm + sigma * sigma)
+        vart = a + b * (rho * xm + s)
+        vol = np.sqrt(vart/t)
+
+        # The derivatives of the total variance are divided by 2 vol t
+        scale = 0.5 / (vol * t)
+        grad[0] = scale
+        grad[1] = scale * (rho * xm + s)
+        grad[2] = scale * b * xm
+        grad[3] = -scale * b * (rho + xm / s)
+        grad[4] = scale * b * sigma / s
+        return vol
+
+    elif volTypeValue == FinVolFunctionTypes.SABR.value:
+
+        return _sabrVolGrad(params[0], params[1], params[2], params[3],
+                            f, k, t, grad)
+
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_HALF.value:
+
+        g = np.empty(4)
+        vol = _sabrVolGrad(params[0], 0.50, params[1], params[2], f, k, t, g)
+        grad[0] = g[0]
+        grad[1] = g[2]
+        grad[2] = g[3]
+        return vol
+
+    vol = _smileVol(volTypeValue, params, f, k, t)
+    bumped = params.copy()
+
+    for i in range(0, len(params)):
+        h = 1e-6 * (1.0 + abs(params[i]))
+        bumped[i] = params[i] + h
+        volUp = _smileVol(volTypeValue, bumped, f, k, t)
+        bumped[i] = params[i] - h
+        volDn = _smileVol(volTypeValue, bumped, f, k, t)
+        bumped[i] = params[i]
+        grad[i] = (volUp - volDn) / (2.0 * h)
+
+    return vol
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def smileInitialGuess(volTypeValue, numParameters, f, t, atmVol):
+    """ Return starting parameters for a smile that is flat at the ATM
+    volatility, or close to it, for slices with no earlier fit. """
+
+    params = np.zeros(numParameters)
+
+    if volTypeValue == FinVolFunctionTypes.CLARK.value or \
+       volTypeValue == FinVolFunctionTypes.CLARK5.value:
+        params[0] = np.log(atmVol)
+    elif volTypeValue == FinVolFunctionTypes.BBG.value:
+        params[numParameters - 1] = atmVol
+    elif volTypeValue == FinVolFunctionTypes.SABR.value:
+        params[0] = atmVol * np.sqrt(f)
+        params[1] = 0.50
+        params[3] = 0.50
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_HALF.value:
+        params[0] = atmVol * np.sqrt(f)
+        params[2] = 0.50
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_ONE.value:
+        params[0] = atmVol
+        params[2] = 0.50
+    elif volTypeValue == FinVolFunctionTypes.SVI.value:
+        params[1] = 0.50 * atmVol * np.sqrt(t)
+        params[4] = 0.20
+        params[0] = atmVol * atmVol * t - params[1] * params[4]
+    elif volTypeValue == FinVolFunctionTypes.SSVI.value:
+        params[0] = 0.50
+        params[1] = atmVol
+    else:
+        raise FinError("Unknown Model Type")
+
+    return params
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def smileInitialGuesses(volTypeValue, numParameters, texp, fwds, strikes,
+                        vols):
+    """ Return a row of starting parameters for each expiry slice using the
+    market vol at the strike closest to the forward as the ATM vol. """
+
+    numSlices = len(texp)
+    xinits = np.zeros((numSlices, numParameters))
+
+    for i in range(0, numSlices):
+        j = np.argmin(np.abs(strikes[i] - fwds[i]))
+        xinits[i, :] = smileInitialGuess(volTypeValue, numParameters,
+                                         fwds[i], texp[i], vols[i, j])
+
+    return xinits
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def _inSmileDomain(volTypeValue, params):
+    """ Return True if the smile is defined for these parameters. The solver
+    does not step outside this region as the smile functions raise an error
+    there. """
+
+    if volTypeValue == FinVolFunctionTypes.SABR.value:
+        return abs(params[2]) < 1.0
+    elif volTypeValue == FinVolFunctionTypes.SABR_BETA_HALF.value or \
+            volTypeValue == FinVolFunctionTypes.SABR_BETA_ONE.value:
+        return abs(params[1]) < 1.0
+    elif volTypeValue == FinVolFunctionTypes.SSVI.value:
+        return params[0] > 0.0 and params[1] > 0.0 and abs(params[2]) < 1.0
+    elif volTypeValue == FinVolFunctionTypes.BBG.value:
+        numParams = len(params)
+        atmVol = 0.0
+        for i in range(0, numParams):
+            atmVol += params[i] * (0.50 ** (numParams - i - 1))
+        return atmVol > 0.0
+
+    return True
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def _smileCost(volTypeValue, params, f, t, strikes, vols):
+    """ Sum of the squared differences between the smile and market vols. """
+
+    tot = 0.0
+    for i in range(0, len(strikes)):
+        diff = _smileVol(volTypeValue, params, f, strikes[i], t) - vols[i]
+        tot += diff * diff
+    return tot
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def _dampedStep(jtj, jtr, lam):
+    """ Return the Levenberg-Marquardt step for the normal equations jtj and
+    gradient jtr with the diagonal scaled by the damping lam. """
+
+    lhs = jtj.copy()
+    for j in range(0, len(jtr)):
+        lhs[j, j] += lam * jtj[j, j] + 1e-14
+
+    return np.linalg.solve(lhs, -jtr)
+
+###############################################################################
+
+
+@njit(cache=True, error_model="numpy")
+def fitSmileLM(volTypeValue, params, f, t, strikes, vols, tol, maxIter):
+    """ Fit the smile parameters of one expiry slice to the market vols at
+    the strikes by Levenberg-Marquardt starting from params. The damping is
+    raised when a step fails to reduce the cost or leaves the region where
+    the smile is defined, and is lowered when it succeeds. """
+
+    numStrikes = len(strikes)
+    numParams = len(params)
+
+    params = params.copy()
+    jac = np.zeros((numStrikes, numParams))
+    res = np.zeros(numStrikes)
+    grad = np.zeros(numParams)
+
+    lam = 1e-3
+    cost = _smileCost(volTypeValue, params, f, t, strikes, vols)
+
+    if not np.isfinite(cost):
+        raise FinError("Smile is not defined at the initial parameters.")
+
+    for _ in range(0, maxIter):
+
+        for i in range(0, numStrikes):
+            vol = volFunctionAndGrad(volTypeValue, params, f, strikes[i], t,
+                                     grad)
+            res[i] = vol - vols[i]
+            jac[i, :] = grad
+
+        jtj = jac.T @ jac
+        jtr = jac.T @ res
+
+        improved = False
+
+        while lam < 1e10:
+
+            trial = params + _dampedStep(jtj, jtr, lam)
+
+            if _inSmileDomain(volTypeValue, trial):
+                trialCost = _smileCost(volTypeValue, trial, f, t, strikes,
+                                       vols)
+                if np.isfinite(trialCost) and trialCost < cost:
+                    improved = True
+                    break
+
+            lam *= 4.0
+
+        if not improved:
+            break
+
+        params = trial
+        lam = max(lam / 4.0, 1e-12)
+        change = cost - trialCost
+        cost = trialCost
+
+        if change < tol * (cost + tol):
+            break
+
+    return params
+
+###############################################################################
+# Unable to cache this function as it takes the residual function as an
+# argument, in the same way as nelder_mead.
+###############################################################################
+
+
+@njit(error_model="numpy")
+def fitResidualsLM(residualFn, volTypeValue, params, args, tol, maxIter):
+    """ Fit the smile parameters by Levenberg-Marquardt to the residual
+    vector returned by residualFn(params, *args), starting from params. This
+    is for fits to quotes other than vols at fixed strikes, so the Jacobian
+    is taken by central differences of the residuals. The damping is adjusted
+    as in fitSmileLM. """
+
+    numParams = len(params)
+
+    params = params.copy()
+    bumped = params.copy()
+
+    lam = 1e-3
+    res = residualFn(params, *args)
+    cost = np.sum(res * res)
+
+    if not np.isfinite(cost):
+        raise FinError("Smile is not defined at the initial parameters.")
+
+    jac = np.zeros((len(res), numParams))
+
+    for _ in range(0, maxIter):
+
+        for j in range(0, numParams):
+            h = 1e-6 * (1.0 + abs(params[j]))
+            bumped[j] = params[j] + h
+            resUp = residualFn(bumped, *args)
+            bumped[j] = params[j] - h
+            resDn = residualFn(bumped, *args)
+            bumped[j] = params[j]
+            jac[:, j] = (resUp - resDn) / (2.0 * h)
+
+        jtj = jac.T @ jac
+        jtr = jac.T @ res
+
+        improved = False
+
+        while lam < 1e10:
+
+            trial = params + _dampedStep(jtj, jtr, lam)
+
+            if _inSmileDomain(volTypeValue, trial):
+                trialRes = residualFn(trial, *args)
+                trialCost = np.sum(trialRes * trialRes)
+                if np.isfinite(trialCost) and trialCost < cost:
+                    improved = True
+                    break
+
+            lam *= 4.0
+
+        if not improved:
+            break
+
+        params = trial
+        bumped[:] = trial
+        res = trialRes
+        lam = max(lam / 4.0, 1e-12)
+        change = cost - trialCost
+        cost = trialCost
+
+        if change < tol * (cost + tol):
+            break
+
+    return params
+
+###############################################################################
+
+
+@njit(cache=True, parallel=True, error_model="numpy")
+def calibrateSmilesLM(volTypeValue, texp, fwds, strikes, vols, xinits, tol,
+                      maxIter):
+    """ Fit a smile to each expiry slice. Row i of the strikes and vols holds
+    the market data for expiry time texp[i] and forward fwds[i], and row i of
+    xinits holds its starting parameters. The slices are fitted in parallel.
+    Returns the fitted parameters, one row per slice. """
+
+    numSlices = len(texp)
+    parameters = np.zeros(xinits.shape)
+
+    for i in prange(0, numSlices):
+        parameters[i, :] = fitSmileLM(volTypeValue, xinits[i], fwds[i],
+                                      texp[i], strikes[i], vols[i], tol,
+                                      maxIter)
+
+    return parameters
+
+###############################################################################
@@ -31,10 +31,15 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import os
+from enum import Enum
+
 import numpy as np
 from numba import njit
+from scipy.special import ndtri
 
 from financepy.utils.math import norminvcdf
+from financepy.utils.FinError import FinError
+from financepy.utils.helpers import labelToString
 
 ###############################################################################
 # This code loads sobol coefficients from binary numpy file and allocates
@@ -141,3 +146,341 @@ def getUniformSobol(num_points, dimension):
     return points
 
 ###############################################################################
+
+# The Sobol generator object below builds the direction numbers of each
+# dimension once, to the full 32 bits, and then produces points from any
+# index using the Gray code. Its unscrambled points are the same as those
+# returned by getUniformSobol.
+###############################################################################
+
+gSobolBits = 32
+gSobolScale = 2.0**gSobolBits
+gMaxSobolDimension = len(sArr) + 1
+
+###############################################################################
+
+
+class FinSobolScrambleTypes(Enum):
+    NONE = 1
+    DIGITAL_SHIFT = 2
+    LINEAR_MATRIX = 3
+
+###############################################################################
+
+
+@njit(cache=True)
+def _directionNumbers(dimension):
+    """ Direction numbers of the first dimension Sobol coordinates scaled by
+    2**32. Row j holds v[1] to v[32] of dimension j. """
+
+    directions = np.zeros((dimension, gSobolBits), dtype=np.int64)
+
+    for i in range(1, gSobolBits + 1):
+        directions[0, i - 1] = 1 << (gSobolBits - i)
+
+    for j in range(1, dimension):
+        s = sArr[j - 1]
+        a = aArr[j - 1]
+        m = m_i[j - 1]
+
+        v = np.zeros(gSobolBits + 1, dtype=np.int64)
+
+        for i in range(1, s + 1):
+            v[i] = m[i - 1] << (gSobolBits - i)
+
+        for i in range(s + 1, gSobolBits + 1):
+            v[i] = v[i - s] ^ (v[i - s] >> s)
+            for k in range(1, s):
+                v[i] = v[i] ^ (((a >> (s - 1 - k)) & 1) * v[i - k])
+
+        for i in range(1, gSobolBits + 1):
+            directions[j, i - 1] = v[i]
+
+    return directions
+
+###############################################################################
+
+
+@njit(cache=True)
+def _sobolIntegers(directions, shifts, startIndex, num_points):
+    """ Sobol points startIndex + 1 to startIndex + num_points scaled by 2**32
+    and XORed with the digital shift of each dimension. The first point is
+    found from the Gray code of its index and the others by the Gray code
+    recursion that flips one direction number per point. """
+
+    dimension = directions.shape[0]
+    points = np.empty((num_points, dimension))
+
+    x = np.zeros(dimension, dtype=np.int64)
+    gray = startIndex ^ (startIndex >> 1)
+
+    bit = 0
+    while gray > 0:
+        if gray & 1:
+            for j in range(0, dimension):
+                x[j] ^= directions[j, bit]
+        gray >>= 1
+        bit += 1
+
+    for i in range(0, num_points):
+        index = startIndex + i
+
+        # the position of the lowest zero bit of index picks the direction
+        c = 0
+        while index & 1:
+            index >>= 1
+            c += 1
+
+        for j in range(0, dimension):
+            x[j] ^= directions[j, c]
+            points[i, j] = (x[j] ^ shifts[j]) / gSobolScale
+
+    return points
+
+###############################################################################
+
+
+@njit(cache=True)
+def _scrambleDirections(directions, scrambleMatrices):
+    """ Multiply the binary digits of each direction number by a random lower
+    triangular matrix with a unit diagonal. Row r of the matrix of a dimension
+    is stored as a 32 bit mask and gives the r-th most significant digit of
+    the scrambled number as the parity of the masked input digits. """
+
+    (dimension, numBits) = directions.shape
+    scrambled = np.zeros((dimension, numBits), dtype=np.int64)
+
+    for j in range(0, dimension):
+        for k in range(0, numBits):
+            v = directions[j, k]
+            y = 0
+            for r in range(0, gSobolBits):
+                masked = scrambleMatrices[j, r] & v
+                parity = 0
+                while masked:
+                    parity ^= 1
+                    masked &= masked - 1
+                y |= parity << (gSobolBits - 1 - r)
+            scrambled[j, k] = y
+
+    return scrambled
+
+###############################################################################
+
+
+class FinSobolGenerator():
+    """ Sobol quasi-random sequence generator that keeps its own position in
+    the sequence. It supports skipping ahead so that chunks of points can be
+    generated independently and scrambling by a random digital shift or by a
+    random linear matrix scramble with a digital shift. The linear matrix
+    scramble is Matousek's affine version of Owen scrambling. Points of a
+    scrambled sequence keep their low discrepancy and different seeds give
+    independent randomised sequences from which an error can be estimated. """
+
+    def __init__(self,
+                 dimension: int,
+                 scrambleType: FinSobolScrambleTypes = FinSobolScrambleTypes.NONE,
+                 seed: int = 0):
+        """ Create a generator of points of a given dimension. The seed is
+        only used to draw the scrambling of the sequence. """
+
+        if dimension < 1 or dimension > gMaxSobolDimension:
+            raise FinError("Sobol dimension must be between 1 and " +
+                           str(gMaxSobolDimension))
+
+        self._dimension = dimension
+        self._scrambleType = scrambleType
+        self._seed = seed
+        self._index = 0
+
+        directions = _directionNumbers(dimension)
+        shifts = np.zeros(dimension, dtype=np.int64)
+
+        # A local random state leaves the global numpy stream untouched
+        rng = np.random.RandomState(seed)
+
+        if scrambleType == FinSobolScrambleTypes.NONE:
+            pass
+        elif scrambleType == FinSobolScrambleTypes.DIGITAL_SHIFT:
+            shifts = rng.randint(0, 2**gSobolBits, dimension, dtype=np.int64)
+        elif scrambleType == FinSobolScrambleTypes.LINEAR_MATRIX:
+            matrices = rng.randint(0, 2**gSobolBits,
+                                   (dimension, gSobolBits), dtype=np.int64)
+            for r in range(0, gSobolBits):
+                # keep the digits above the diagonal and set the diagonal
+                diagonal = 1 << (gSobolBits - 1 - r)
+                upper = (2**gSobolBits - 1) ^ (2 * diagonal - 1)
+                matrices[:, r] = (matrices[:, r] & upper) | diagonal
+            directions = _scrambleDirections(directions, matrices)
+            shifts = rng.randint(0, 2**gSobolBits, dimension, dtype=np.int64)
+        else:
+            raise FinError("Unknown FinSobolScrambleTypes")
+
+        self._directions = directions
+        self._shifts = shifts
+
+###############################################################################
+
+    def skipTo(self,
+               index: int):
+        """ Move to a position in the sequence so that the next point
+        returned is point number index + 1. This lets several generators
+        with the same scrambling produce disjoint chunks of the sequence. """
+
+        if index < 0:
+            raise FinError("Sobol index must be non-negative.")
+
+        self._index = index
+
+###############################################################################
+
+    def getUniforms(self,
+                    num_points: int):
+        """ Return the next num_points points as a 2D array with one row per
+        point and one column per dimension of values in [0, 1). """
+
+        points = _sobolIntegers(self._directions, self._shifts,
+                                self._index, num_points)
+
+        self._index += num_points
+        return points
+
+###############################################################################
+
+    def getGaussians(self,
+                     num_points: int):
+        """ Return the next num_points points mapped to independent standard
+        normals with a vectorised inverse normal distribution function. """
+
+        points = self.getUniforms(num_points)
+
+        # A shifted point can land on zero so it is moved to the cell centre
+        points = np.maximum(points, 0.5 / gSobolScale)
+        return ndtri(points)
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("DIMENSION", self._dimension)
+        s += labelToString("SCRAMBLE TYPE", self._scrambleType)
+        s += labelToString("SEED", self._seed)
+        s += labelToString("INDEX", self._index, "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
+
+
+class FinBrownianBridge():
+    """ Builds Brownian motion paths on a grid of times from independent
+    normals in Brownian bridge order. The first normal sets the value at the
+    last time, the second the value at the middle time and so on. Used with a
+    Sobol sequence this gives the best distributed coordinates to the values
+    that explain most of the variance of the paths. """
+
+    def __init__(self,
+                 times: (list, np.ndarray)):
+        """ Create the bridge for an increasing grid of positive times. The
+        Brownian motion is zero at time zero. """
+
+        times = np.array(times, dtype=np.float64)
+        n = len(times)
+
+        if n == 0:
+            raise FinError("Brownian bridge needs at least one time.")
+
+        if times[0] <= 0.0 or np.any(np.diff(times) <= 0.0):
+            raise FinError("Times must be positive and increasing.")
+
+        self._times = times
+        self._numSteps = n
+
+        self._bridgeIndex = np.zeros(n, dtype=np.int64)
+        self._leftIndex = np.zeros(n, dtype=np.int64)
+        self._rightIndex = np.zeros(n, dtype=np.int64)
+        self._leftWeight = np.zeros(n)
+        self._rightWeight = np.zeros(n)
+        self._stdDev = np.zeros(n)
+
+        used = np.zeros(n, dtype=bool)
+        used[n - 1] = True
+        self._bridgeIndex[0] = n - 1
+        self._stdDev[0] = np.sqrt(times[n - 1])
+
+        j = 0
+        for i in range(1, n):
+
+            # find the next gap between points that are already set
+            while used[j]:
+                j += 1
+            k = j
+            while not used[k]:
+                k += 1
+
+            l = j + ((k - 1 - j) >> 1)
+            used[l] = True
+
+            self._bridgeIndex[i] = l
+            self._leftIndex[i] = j
+            self._rightIndex[i] = k
+
+            tl = times[l]
+            tk = times[k]
+            tj = times[j - 1] if j > 0 else 0.0
+
+            self._leftWeight[i] = (tk - tl) / (tk - tj)
+            self._rightWeight[i] = (tl - tj) / (tk - tj)
+            self._stdDev[i] = np.sqrt((tl - tj) * (tk - tl) / (tk - tj))
+
+            j = k + 1
+            if j >= n:
+                j = 0
+
+###############################################################################
+
+    def buildPaths(self,
+                   gaussians: np.ndarray):
+        """ Map a 2D array of independent normals with one row per path and
+        one column per time to the values of the Brownian motion at each time
+        of the grid. Column 0 of the normals drives the final value. """
+
+        gaussians = np.asarray(gaussians, dtype=np.float64)
+
+        if gaussians.ndim != 2 or gaussians.shape[1] != self._numSteps:
+            raise FinError("Need a 2D array with one column per time.")
+
+        paths = np.zeros(gaussians.shape)
+        paths[:, -1] = self._stdDev[0] * gaussians[:, 0]
+
+        for i in range(1, self._numSteps):
+            j = self._leftIndex[i]
+            k = self._rightIndex[i]
+            l = self._bridgeIndex[i]
+
+            paths[:, l] = self._rightWeight[i] * paths[:, k] + \
+                self._stdDev[i] * gaussians[:, i]
+
+            if j > 0:
+                paths[:, l] += self._leftWeight[i] * paths[:, j - 1]
+
+        return paths
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM STEPS", self._numSteps)
+        s += labelToString("FINAL TIME", self._times[-1], "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
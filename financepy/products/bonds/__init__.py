@@ -3,6 +3,7 @@ from .annuity import *
 from .zero_curve import *
 from .convertible import *
 from .bond_embedded_option import *
+from .bond_embedded_option_portfolio import *
 from .floating_rate_note import *
 from .bond_future import *
 from .bond_market import *
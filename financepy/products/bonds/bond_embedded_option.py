@@ -123,13 +123,10 @@ class BondEmbeddedOption(object):
 
 ###############################################################################
 
-    def value(self,
-              settlement_date: Date,
-              discount_curve: DiscountCurve,
-              model):
-        """ Value the bond that settles on the specified date that can have
-        both embedded call and put options. This is done using the specified
-        model and a discount curve. """
+    def _treeSchedule(self,
+                      settlement_date: Date):
+        """ Return the times of the coupons, calls and puts after settlement
+        with their amounts and the time to bond maturity. """
 
         # Generate bond coupon flow schedule
         cpn = self._bond._coupon/self._bond._frequency
@@ -165,6 +162,23 @@ class BondEmbeddedOption(object):
 
         maturity_date = self._bond._maturity_date
         tmat = (maturity_date - settlement_date) / gDaysInYear
+
+        return (cpnTimes, cpnAmounts, call_times, call_prices, put_times,
+                put_prices, tmat)
+
+###############################################################################
+
+    def value(self,
+              settlement_date: Date,
+              discount_curve: DiscountCurve,
+              model):
+        """ Value the bond that settles on the specified date that can have
+        both embedded call and put options. This is done using the specified
+        model and a discount curve. """
+
+        (cpnTimes, cpnAmounts, call_times, call_prices, put_times,
+         put_prices, tmat) = self._treeSchedule(settlement_date)
+
         dfTimes = discount_curve._times
         df_values = discount_curve._dfs
 
@@ -0,0 +1,108 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...models.rates_hull_white_tree import FinModelRatesHW
+from ...models.rates_bk_tree import FinModelRatesBK
+from ...models.rates_bdt_tree import FinModelRatesBDT
+from ...utils.FinError import FinError
+from ...utils.date import Date
+from ...utils.helpers import labelToString, check_argument_types
+from ...market.discount.curve import DiscountCurve
+
+from .bond_embedded_option import BondEmbeddedOption
+
+###############################################################################
+
+
+class BondEmbeddedOptionPortfolio(object):
+    """ A book of bonds with embedded calls and puts that are valued together
+    on one short rate tree. The tree is built once out to the longest bond
+    maturity and all of the bonds are rolled back on it in a single backward
+    induction. As each bond is not valued on a tree that ends at its own
+    maturity, the values differ from those of BondEmbeddedOption by the
+    discretisation error of the tree. """
+
+    def __init__(self,
+                 bonds: list):
+        """ Create the portfolio from a list of BondEmbeddedOption objects. """
+
+        check_argument_types(self.__init__, locals())
+
+        if len(bonds) == 0:
+            raise FinError("Portfolio must contain at least one bond.")
+
+        for bond in bonds:
+            if isinstance(bond, BondEmbeddedOption) is False:
+                raise FinError("Portfolio can only contain "
+                               "BondEmbeddedOptions.")
+
+        self._bonds = bonds
+        self._numTrades = len(bonds)
+
+###############################################################################
+
+    def value(self,
+              settlement_date: Date,
+              discount_curve: DiscountCurve,
+              model):
+        """ Value all of the bonds that settle on the specified date with the
+        Hull-White, Black-Karasinski or Black-Derman-Toy model. As for a
+        single bond the values are the average of those on trees with
+        numTimeSteps and numTimeSteps+1 steps. Returns arrays of the bond
+        values with and without the embedded options. """
+
+        if not isinstance(model, (FinModelRatesHW, FinModelRatesBK,
+                                  FinModelRatesBDT)):
+            raise FinError("Unknown model type")
+
+        schedules = [bond._treeSchedule(settlement_date)
+                     for bond in self._bonds]
+
+        (cpnTimes, cpnAmounts, call_times, call_prices, put_times,
+         put_prices, tmats) = [list(x) for x in zip(*schedules)]
+
+        faces = [bond._bond._face_amount for bond in self._bonds]
+
+        tmat = max(tmats)
+        dfTimes = discount_curve._times
+        df_values = discount_curve._dfs
+
+        model.buildTree(tmat, dfTimes, df_values)
+        v1 = model.callablePuttableBonds_Tree(cpnTimes, cpnAmounts,
+                                              call_times, call_prices,
+                                              put_times, put_prices,
+                                              faces)
+        model._numTimeSteps += 1
+        model.buildTree(tmat, dfTimes, df_values)
+        v2 = model.callablePuttableBonds_Tree(cpnTimes, cpnAmounts,
+                                              call_times, call_prices,
+                                              put_times, put_prices,
+                                              faces)
+        model._numTimeSteps -= 1
+
+        v_bondwithoption = (v1['bondwithoption'] + v2['bondwithoption'])/2
+        v_bondpure = (v1['bondpure'] + v2['bondpure'])/2
+
+        return {'bondwithoption': v_bondwithoption, 'bondpure': v_bondpure}
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM BONDS", self._numTrades)
+        s += labelToString("LAST MATURITY DATE",
+                           max([bond._maturity_date for bond in self._bonds]))
+        s += labelToString("TOTAL FACE AMOUNT",
+                           np.sum([bond._face_amount for bond in self._bonds]),
+                           "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
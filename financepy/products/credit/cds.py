@@ -179,6 +179,197 @@ def _protectionLegPV_NUMBA(teff,
     return prot_pv
 
 
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _flatFwdNodeWeights(t, times, values):
+    """ Return the value at time t interpolated flat in forward rates as done
+    by _uinterpolate together with the indices of the two grid points that it
+    depends on and its derivatives with respect to them. """
+
+    y = _uinterpolate(t, times, values, FinInterpTypes.FLAT_FWD_RATES.value)
+
+    if t == times[0]:
+        return y, 0, 0, 1.0, 0.0
+
+    num_points = len(times)
+    i = np.searchsorted(times, t)
+
+    if i < num_points:
+        a = i - 1
+        b = i
+    else:
+        a = num_points - 2
+        b = num_points - 1
+
+    dt = times[b] - times[a]
+    wa = (times[b] - t) / dt
+    wb = (t - times[a]) / dt
+    return y, a, b, y * wa / values[a], y * wb / values[b]
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _riskyPV01Grad_NUMBA(teff,
+                         accrual_factorPCDToNow,
+                         paymentTimes,
+                         year_fracs,
+                         npIborTimes,
+                         npIborValues,
+                         npSurvTimes,
+                         npSurvValues):
+    """ Derivatives of the full risky PV01 computed by _riskyPV01_NUMBA with
+    respect to the survival probabilities and the Ibor discount factors on
+    their grids. The clean risky PV01 has the same derivatives. """
+
+    dq = np.zeros(len(npSurvValues))
+    dz = np.zeros(len(npIborValues))
+
+    tncd = paymentTimes[1]
+
+    (qeff, ae, be, gae, gbe) = _flatFwdNodeWeights(teff, npSurvTimes,
+                                                   npSurvValues)
+    (q1, a1, b1, ga1, gb1) = _flatFwdNodeWeights(tncd, npSurvTimes,
+                                                 npSurvValues)
+    (z1, c1, d1, gc1, gd1) = _flatFwdNodeWeights(tncd, npIborTimes,
+                                                 npIborValues)
+
+    # The first coupon and the accrued paid on default before it
+    acc = accrual_factorPCDToNow + 0.5 * (year_fracs[1] -
+                                          accrual_factorPCDToNow)
+    dVdqeff = z1 * acc
+    dVdq1 = z1 * year_fracs[1] - z1 * acc
+    dVdz1 = q1 * year_fracs[1] + (qeff - q1) * acc
+
+    dq[ae] += dVdqeff * gae
+    dq[be] += dVdqeff * gbe
+
+    for it in range(2, len(paymentTimes)):
+
+        t2 = paymentTimes[it]
+
+        (q2, a2, b2, ga2, gb2) = _flatFwdNodeWeights(t2, npSurvTimes,
+                                                     npSurvValues)
+        (z2, c2, d2, gc2, gd2) = _flatFwdNodeWeights(t2, npIborTimes,
+                                                     npIborValues)
+
+        tau = year_fracs[it]
+
+        dVdq2 = z2 * tau
+        dVdz2 = q2 * tau
+
+        if useFlatHazardRateIntegral:
+            h12 = -log(q2 / q1) / tau
+            r12 = -log(z2 / z1) / tau
+            alpha = h12 + r12
+            e = exp(-alpha * tau)
+            expTerm = 1.0 - e - alpha * tau * e
+            den = abs(alpha * alpha + 1e-20)
+            g = q1 * z1 * h12 * expTerm / den
+            dgda = q1 * z1 * h12 * (alpha * tau * tau * e / den
+                                    - expTerm * 2.0 * alpha / (den * den))
+            dgdh = q1 * z1 * expTerm / den + dgda
+            dVdq1 += g / q1 + dgdh / (q1 * tau)
+            dVdq2 += -dgdh / (q2 * tau)
+            dVdz1 += g / z1 + dgda / (z1 * tau)
+            dVdz2 += -dgda / (z2 * tau)
+        else:
+            dVdq1 += 0.50 * z2 * tau
+            dVdq2 += -0.50 * z2 * tau
+            dVdz2 += 0.50 * (q1 - q2) * tau
+
+        dq[a2] += dVdq2 * ga2
+        dq[b2] += dVdq2 * gb2
+        dz[c2] += dVdz2 * gc2
+        dz[d2] += dVdz2 * gd2
+
+        # The next period starts where this one ended
+        dq[a1] += dVdq1 * ga1
+        dq[b1] += dVdq1 * gb1
+        (q1, a1, b1, ga1, gb1) = (q2, a2, b2, ga2, gb2)
+        dVdq1 = 0.0
+
+    dq[a1] += dVdq1 * ga1
+    dq[b1] += dVdq1 * gb1
+    dz[c1] += dVdz1 * gc1
+    dz[d1] += dVdz1 * gd1
+
+    return dq, dz
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _protectionLegGrad_NUMBA(teff,
+                             tmat,
+                             npIborTimes,
+                             npIborValues,
+                             npSurvTimes,
+                             npSurvValues,
+                             contract_recovery_rate,
+                             num_steps_per_year):
+    """ Derivatives of the protection leg PV computed by
+    _protectionLegPV_NUMBA with respect to the survival probabilities and the
+    Ibor discount factors on their grids. """
+
+    dq = np.zeros(len(npSurvValues))
+    dz = np.zeros(len(npIborValues))
+
+    dt = (tmat - teff) / num_steps_per_year
+    t = teff
+    (z1, c1, d1, gc1, gd1) = _flatFwdNodeWeights(t, npIborTimes,
+                                                 npIborValues)
+    (q1, a1, b1, ga1, gb1) = _flatFwdNodeWeights(t, npSurvTimes,
+                                                 npSurvValues)
+
+    small = 1e-8
+
+    for _ in range(0, num_steps_per_year):
+
+        t = t + dt
+        (z2, c2, d2, gc2, gd2) = _flatFwdNodeWeights(t, npIborTimes,
+                                                     npIborValues)
+        (q2, a2, b2, ga2, gb2) = _flatFwdNodeWeights(t, npSurvTimes,
+                                                     npSurvValues)
+
+        if useFlatHazardRateIntegral is True:
+            h12 = -log(q2 / q1) / dt
+            r12 = -log(z2 / z1) / dt
+            expTerm = exp(-(r12 + h12) * dt)
+            den = abs(h12 + r12) + small
+            dprot_pv = h12 * (1.0 - expTerm) * q1 * z1 / den
+            sign = 1.0 if h12 + r12 >= 0.0 else -1.0
+            dpdr = h12 * dt * expTerm * q1 * z1 / den - dprot_pv * sign / den
+            dpdh = (1.0 - expTerm) * q1 * z1 / den + dpdr
+            dVdq1 = dprot_pv / q1 + dpdh / (q1 * dt)
+            dVdq2 = -dpdh / (q2 * dt)
+            dVdz1 = dprot_pv / z1 + dpdr / (z1 * dt)
+            dVdz2 = -dpdr / (z2 * dt)
+        else:
+            dVdq1 = 0.5 * (z1 + z2)
+            dVdq2 = -0.5 * (z1 + z2)
+            dVdz1 = 0.5 * (q1 - q2)
+            dVdz2 = 0.5 * (q1 - q2)
+
+        dq[a1] += dVdq1 * ga1
+        dq[b1] += dVdq1 * gb1
+        dq[a2] += dVdq2 * ga2
+        dq[b2] += dVdq2 * gb2
+        dz[c1] += dVdz1 * gc1
+        dz[d1] += dVdz1 * gd1
+        dz[c2] += dVdz2 * gc2
+        dz[d2] += dVdz2 * gd2
+
+        (q1, a1, b1, ga1, gb1) = (q2, a2, b2, ga2, gb2)
+        (z1, c1, d1, gc1, gd1) = (z2, c2, d2, gc2, gd2)
+
+    dq *= (1.0 - contract_recovery_rate)
+    dz *= (1.0 - contract_recovery_rate)
+    return dq, dz
+
+
 ###############################################################################
 ###############################################################################
 ###############################################################################
@@ -450,6 +641,125 @@ class FinCDS(object):
 
     ###############################################################################
 
+    def _gridDerivatives(self,
+                         valuation_date: Date,
+                         issuer_curve,
+                         contract_recovery_rate=standard_recovery_rate,
+                         pv01_method=0,
+                         prot_method=0,
+                         num_steps_per_year=25):
+        """ Derivatives of the full value of the CDS with respect to the
+        survival probabilities of the issuer curve and the discount factors of
+        its Ibor curve at their grid points after time zero. They are found
+        analytically from the pricing functions so the curves are not bumped.
+        The clean value has the same derivatives. Only the market standard
+        risky PV01 and protection leg methods (method 0) are supported. """
+
+        if pv01_method != 0 or prot_method != 0:
+            raise FinError("Analytic CDS sensitivities only support " +
+                           "pv01_method and prot_method equal to 0")
+
+        (teff, accrual_factorPCDToNow, paymentTimes) = \
+            self._premiumTimes(valuation_date)
+
+        tmat = (self._maturity_date - valuation_date) / gDaysInYear
+
+        libor_curve = issuer_curve._libor_curve
+        iborTimes = np.asarray(libor_curve._times, dtype=float)
+        iborValues = np.asarray(libor_curve._dfs, dtype=float)
+        survTimes = np.asarray(issuer_curve._times, dtype=float)
+        survValues = np.asarray(issuer_curve._values, dtype=float)
+
+        (dq01, dz01) = _riskyPV01Grad_NUMBA(teff,
+                                            accrual_factorPCDToNow,
+                                            paymentTimes,
+                                            np.array(self._accrual_factors),
+                                            iborTimes,
+                                            iborValues,
+                                            survTimes,
+                                            survValues)
+
+        (dqProt, dzProt) = _protectionLegGrad_NUMBA(teff,
+                                                    tmat,
+                                                    iborTimes,
+                                                    iborValues,
+                                                    survTimes,
+                                                    survValues,
+                                                    contract_recovery_rate,
+                                                    num_steps_per_year)
+
+        if self._long_protection:
+            longProt = +1
+        else:
+            longProt = -1
+
+        scale = longProt * self._notional
+        dvdq = scale * (dqProt - self._running_coupon * dq01)
+        dvdz = scale * (dzProt - self._running_coupon * dz01)
+
+        # The curves are anchored at one at time zero
+        dvdq[0] = 0.0
+        dvdz[0] = 0.0
+
+        return dvdq, dvdz
+
+    ###############################################################################
+
+    def bucketedCreditDV01(self,
+                           valuation_date,
+                           issuer_curve,
+                           contract_recovery_rate=standard_recovery_rate,
+                           pv01_method=0,
+                           prot_method=0,
+                           num_steps_per_year=25):
+        """ Calculation of the change in the value of the CDS contract for a
+        one basis point change in each of the CDS spreads used to build the
+        issuer curve. This uses the curve Jacobian rather than rebuilding a
+        bumped copy of the curve for each spread. Only pv01_method and
+        prot_method equal to 0 are supported. """
+
+        (dvdq, _) = self._gridDerivatives(valuation_date,
+                                          issuer_curve,
+                                          contract_recovery_rate,
+                                          pv01_method,
+                                          prot_method,
+                                          num_steps_per_year)
+
+        bump = 0.0001  # 1 basis point
+        return dvdq @ issuer_curve.curveJacobian() * bump
+
+    ###############################################################################
+
+    def bucketedInterestDV01(self,
+                             valuation_date: Date,
+                             issuer_curve,
+                             contract_recovery_rate=standard_recovery_rate,
+                             pv01_method: int = 0,
+                             prot_method: int = 0,
+                             num_steps_per_year: int = 25):
+        """ Calculation of the change in the value of the CDS contract for a
+        one basis point change in each of the market quotes used to build the
+        Ibor curve. The issuer curve is implied again from its CDS spreads
+        as in interestDV01 but this is done with the Jacobians of the two
+        curves and not by rebuilding them. Only pv01_method and prot_method
+        equal to 0 are supported. """
+
+        libor_curve = issuer_curve._libor_curve
+
+        (dvdq, dvdl) = self._gridDerivatives(valuation_date,
+                                             issuer_curve,
+                                             contract_recovery_rate,
+                                             pv01_method,
+                                             prot_method,
+                                             num_steps_per_year)
+
+        dvdl += dvdq @ issuer_curve.interestJacobian()
+
+        bump = 0.0001  # 1 basis point
+        return dvdl @ libor_curve.curveJacobian() * bump
+
+    ###############################################################################
+
     def cashSettlementAmount(self,
                              valuation_date,
                              settlement_date,
@@ -650,14 +960,10 @@ class FinCDS(object):
 
     ###############################################################################
 
-    def riskyPV01(self,
-                  valuation_date,
-                  issuer_curve,
-                  pv01_method=0):
-        """ The riskyPV01 is the present value of a risky one dollar paid on
-        the premium leg of a CDS contract. """
-
-        libor_curve = issuer_curve._libor_curve
+    def _premiumTimes(self, valuation_date):
+        """ Return the effective time, the part of the coupon accrued from the
+        previous coupon date to the step-in date and the payment times of the
+        premium leg. """
 
         paymentTimes = []
         for it in range(0, len(self._adjusted_dates)):
@@ -671,13 +977,29 @@ class FinCDS(object):
         dayCount = DayCount(self._day_count_type)
 
         accrual_factorPCDToNow = dayCount.year_frac(pcd, eff)[0]
+        teff = (eff - valuation_date) / gDaysInYear
+
+        return teff, accrual_factorPCDToNow, np.array(paymentTimes)
+
+    ###############################################################################
+
+    def riskyPV01(self,
+                  valuation_date,
+                  issuer_curve,
+                  pv01_method=0):
+        """ The riskyPV01 is the present value of a risky one dollar paid on
+        the premium leg of a CDS contract. """
+
+        libor_curve = issuer_curve._libor_curve
+
+        (teff, accrual_factorPCDToNow, paymentTimes) = \
+            self._premiumTimes(valuation_date)
 
         year_fracs = self._accrual_factors
-        teff = (eff - valuation_date) / gDaysInYear
 
         valueRPV01 = _riskyPV01_NUMBA(teff,
                                       accrual_factorPCDToNow,
-                                      np.array(paymentTimes),
+                                      paymentTimes,
                                       np.array(year_fracs),
                                       libor_curve._times,
                                       libor_curve._dfs,
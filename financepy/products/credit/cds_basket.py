@@ -6,6 +6,7 @@
 # all default baskets at the same time.
 
 import numpy as np
+from numba import njit, float64, int64
 
 from ...utils.FinError import FinError
 
@@ -17,7 +18,8 @@ from ...utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
 from ...products.credit.cds import FinCDS
 
 from ...models.credit_gaussian_copula_onefactor import homogeneousBasketLossDbn
-from ...models.credit_gaussian_copula import default_timesGC
+from ...models.credit_gaussian_copula import default_timesGC_Chunks
+from ...models.credit_gaussian_copula import gDefaultTimesChunkSize
 from ...models.credit_student_t_copula import FinModelStudentTCopula
 
 from ...products.credit.cds_curve import FinCDSCurve
@@ -31,7 +33,41 @@ from ...utils.date import Date
 from ...utils.helpers import labelToString
 
 ###############################################################################
-# TODO: Convert functions to use NUMBA!!
+
+
+@njit((float64[:, :], int64), cache=True)
+def _nthDefaultTimes(default_times, nToDefault):
+    """ Find the time of the nth default in each trial and the index of the
+    credit that defaults at that time. The matrix of default times by credit
+    and trial is read one credit at a time and the n earliest times of each
+    trial are kept in order, so no trial has to be sorted. """
+
+    num_credits, num_trials = default_times.shape
+
+    earliest = np.full((num_trials, nToDefault), np.inf)
+
+    for iCredit in range(0, num_credits):
+        for iTrial in range(0, num_trials):
+            tau = default_times[iCredit, iTrial]
+            if tau < earliest[iTrial, nToDefault - 1]:
+                j = nToDefault - 1
+                while j > 0 and earliest[iTrial, j - 1] > tau:
+                    earliest[iTrial, j] = earliest[iTrial, j - 1]
+                    j -= 1
+                earliest[iTrial, j] = tau
+
+    nthTimes = earliest[:, nToDefault - 1].copy()
+
+    # The credit is the first one whose default time is the nth time
+    nthCredits = np.full(num_trials, -1, dtype=np.int64)
+    for iCredit in range(0, num_credits):
+        for iTrial in range(0, num_trials):
+            if nthCredits[iTrial] < 0 and \
+                    default_times[iCredit, iTrial] == nthTimes[iTrial]:
+                nthCredits[iTrial] = iCredit
+
+    return nthTimes, nthCredits
+
 ###############################################################################
 
 
@@ -77,17 +113,11 @@ class FinCDSBasket(object):
 
 ###############################################################################
 
-    def valueLegs_MC(self,
+    def _legSchedule(self,
                      valuation_date,
-                     nToDefault,
-                     default_times,
-                     issuer_curves,
                      libor_curve):
-        """ Value the legs of the default basket using Monte Carlo. The default
-        times are an input so this valuation is not model dependent. """
-
-        num_credits = default_times.shape[0]
-        num_trials = default_times.shape[1]
+        """ The risky PV01 to each payment date, the average accrual factor
+        and the time to maturity that the Monte-Carlo leg values need. """
 
         adjusted_dates = self._cds_contract._adjusted_dates
         num_flows = len(adjusted_dates)
@@ -109,50 +139,101 @@ class FinCDSBasket(object):
 
         tmat = (self._maturity_date - valuation_date) / gDaysInYear
 
-        rpv01 = 0.0
-        prot = 0.0
+        return rpv01ToTimes, averageAccrualFactor, tmat
 
-        assetTau = np.zeros(num_credits)
+###############################################################################
 
-        for iTrial in range(0, num_trials):
-            for iCredit in range(0, num_credits):
-                assetTau[iCredit] = default_times[iCredit, iTrial]
+    def _legSums_MC(self,
+                    nToDefault,
+                    default_times,
+                    issuer_curves,
+                    libor_curve,
+                    schedule):
+        """ Sum the risky PV01 and protection leg values over the trials in
+        a matrix of default times by credit and trial. """
+
+        (rpv01ToTimes, averageAccrualFactor, tmat) = schedule
 
-            # ORDER THE DEFAULT TIMES
-            assetTau.sort()
+        (nthTimes, nthCredits) = _nthDefaultTimes(
+            np.ascontiguousarray(default_times, dtype=np.float64),
+            nToDefault)
 
-            # GET THE Nth DEFAULT TIME
-            minTau = assetTau[nToDefault - 1]
+        isDefault = nthTimes < tmat
+        tau = nthTimes[isDefault]
+
+        numPaymentsIndex = (tau / averageAccrualFactor).astype(np.int64)
+        rpv01 = np.sum(rpv01ToTimes[numPaymentsIndex])
+        rpv01 += np.sum(tau - numPaymentsIndex * averageAccrualFactor)
+
+        numSurvive = len(nthTimes) - len(tau)
+        rpv01 += numSurvive * rpv01ToTimes[int(tmat / averageAccrualFactor)]
+
+        prot = 0.0
+        if len(tau) > 0:
+            recovery_rates = np.array([c._recovery_rate
+                                       for c in issuer_curves])
+            lgd = 1.0 - recovery_rates[nthCredits[isDefault]]
+            prot = np.sum(lgd * libor_curve._df(tau))
 
-            if minTau < tmat:
-                numPaymentsIndex = int(minTau / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                rpv01Trial += (minTau - numPaymentsIndex *
-                               averageAccrualFactor)
+        return (rpv01, prot)
 
-                # DETERMINE IDENTITY OF N-TO-DEFAULT CREDIT IF BASKET NOT HOMO
-                assetIndex = 0
-                for iCredit in range(0, num_credits):
-                    if minTau == default_times[iCredit, iTrial]:
-                        assetIndex = iCredit
-                        break
+###############################################################################
 
-                protTrial = (1.0 - issuer_curves[assetIndex]._recovery_rate)
-                protTrial *= libor_curve._df(minTau)
+    def valueLegs_MC(self,
+                     valuation_date,
+                     nToDefault,
+                     default_times,
+                     issuer_curves,
+                     libor_curve):
+        """ Value the legs of the default basket using Monte Carlo. The default
+        times are an input so this valuation is not model dependent. """
 
-            else:
+        num_trials = default_times.shape[1]
 
-                numPaymentsIndex = int(tmat / averageAccrualFactor)
-                rpv01Trial = rpv01ToTimes[numPaymentsIndex]
-                protTrial = 0.0
+        schedule = self._legSchedule(valuation_date, libor_curve)
 
-            rpv01 += rpv01Trial
-            prot += protTrial
+        rpv01, prot = self._legSums_MC(nToDefault, default_times,
+                                       issuer_curves, libor_curve, schedule)
 
         rpv01 = rpv01 / num_trials
         prot = prot / num_trials
         return (rpv01, prot)
 
+###############################################################################
+
+    def _valueChunks_MC(self,
+                        valuation_date,
+                        nToDefault,
+                        chunks,
+                        issuer_curves,
+                        libor_curve):
+        """ Value the legs of the default basket from an iterator over chunks
+        of default times so only one chunk is held in memory at a time. """
+
+        schedule = self._legSchedule(valuation_date, libor_curve)
+
+        rpv01 = 0.0
+        prot_pv = 0.0
+        num_trials = 0
+
+        for default_times in chunks:
+            (r, p) = self._legSums_MC(nToDefault, default_times,
+                                      issuer_curves, libor_curve, schedule)
+            rpv01 += r
+            prot_pv += p
+            num_trials += default_times.shape[1]
+
+        rpv01 = rpv01 / num_trials
+        prot_pv = prot_pv / num_trials
+
+        spd = prot_pv / rpv01
+        value = self._notional * (prot_pv - self._running_coupon * rpv01)
+
+        if not self._long_protection:
+            value = value * -1.0
+
+        return (value, rpv01, spd)
+
 ###############################################################################
 
     def valueGaussian_MC(self,
@@ -162,33 +243,29 @@ class FinCDSBasket(object):
                          correlationMatrix,
                          libor_curve,
                          num_trials,
-                         seed):
+                         seed,
+                         chunkSize=gDefaultTimesChunkSize):
         """ Value the default basket using a Gaussian copula model. This
-        depends on the issuer discount and correlation matrix. """
+        depends on the issuer discount and correlation matrix. The trials are
+        simulated in chunks of chunkSize so memory does not grow with the
+        number of trials. """
 
         num_credits = len(issuer_curves)
 
         if nToDefault > num_credits or nToDefault < 1:
             raise FinError("nToDefault must be 1 to num_credits")
 
-        default_times = default_timesGC(issuer_curves,
-                                      correlationMatrix,
-                                      num_trials,
-                                      seed)
-
-        rpv01, prot_pv = self.valueLegs_MC(valuation_date,
-                                          nToDefault,
-                                          default_times,
-                                          issuer_curves,
-                                          libor_curve)
-
-        spd = prot_pv / rpv01
-        value = self._notional * (prot_pv - self._running_coupon * rpv01)
+        chunks = default_timesGC_Chunks(issuer_curves,
+                                        correlationMatrix,
+                                        num_trials,
+                                        seed,
+                                        chunkSize)
 
-        if not self._long_protection:
-            value = value * -1.0
-
-        return (value, rpv01, spd)
+        return self._valueChunks_MC(valuation_date,
+                                    nToDefault,
+                                    chunks,
+                                    issuer_curves,
+                                    libor_curve)
 
 ###############################################################################
 
@@ -200,8 +277,11 @@ class FinCDSBasket(object):
                          degreesOfFreedom,
                          libor_curve,
                          num_trials,
-                         seed):
-        """ Value the default basket using the Student-T copula. """
+                         seed,
+                         chunkSize=gDefaultTimesChunkSize):
+        """ Value the default basket using the Student-T copula. The trials
+        are simulated in chunks of chunkSize so memory does not grow with the
+        number of trials. """
 
         num_credits = len(issuer_curves)
 
@@ -210,25 +290,18 @@ class FinCDSBasket(object):
 
         model = FinModelStudentTCopula()
 
-        default_times = model.default_times(issuer_curves,
-                                          correlationMatrix,
-                                          degreesOfFreedom,
-                                          num_trials,
-                                          seed)
-
-        rpv01, prot_pv = self.valueLegs_MC(valuation_date,
-                                          nToDefault,
-                                          default_times,
-                                          issuer_curves,
-                                          libor_curve)
-
-        spd = prot_pv / rpv01
-        value = self._notional * (prot_pv - self._running_coupon * rpv01)
-
-        if not self._long_protection:
-            value = value * -1.0
-
-        return (value, rpv01, spd)
+        chunks = model.default_timesChunks(issuer_curves,
+                                           correlationMatrix,
+                                           degreesOfFreedom,
+                                           num_trials,
+                                           seed,
+                                           chunkSize)
+
+        return self._valueChunks_MC(valuation_date,
+                                    nToDefault,
+                                    chunks,
+                                    issuer_curves,
+                                    libor_curve)
 
 ###############################################################################
 
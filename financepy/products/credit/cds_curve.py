@@ -6,6 +6,7 @@ import numpy as np
 import scipy.optimize as optimize
 
 from ...utils.date import Date
+from ...utils.date_vector import DateVector
 from ...utils.FinError import FinError
 from ...utils.global_vars import gDaysInYear
 from ...market.discount.interpolator import _uinterpolate, FinInterpTypes
@@ -66,6 +67,8 @@ class FinCDSCurve():
 
         self._times = []
         self._values = []
+        self._valueDerivatives = None
+        self._jacobian = None
 
         if len(self._cds_contracts) > 0:
             self._buildCurve()
@@ -96,7 +99,7 @@ class FinCDSCurve():
         """ Extract the survival probability to date dt. This function
         supports vectorisation. """
 
-        if isinstance(dt, Date):
+        if isinstance(dt, (Date, DateVector)):
             t = (dt - self._valuation_date) / gDaysInYear
         elif isinstance(dt, list):
             t = np.array(dt)
@@ -130,7 +133,7 @@ class FinCDSCurve():
         """ Extract the discount factor from the underlying Ibor curve. This
         function supports vectorisation. """
 
-        if isinstance(dt, Date):
+        if isinstance(dt, (Date, DateVector)):
             t = (dt - self._valuation_date) / gDaysInYear
         elif isinstance(dt, list):
             t = np.array(dt)
@@ -146,6 +149,8 @@ class FinCDSCurve():
 
         self._validate(self._cds_contracts)
         numTimes = len(self._cds_contracts)
+        self._valueDerivatives = None
+        self._jacobian = None
 
         # we size the vectors to include time zero
         self._times = np.array([0.0])
@@ -165,6 +170,83 @@ class FinCDSCurve():
             optimize.newton(f, x0=q, fprime=None, args=argtuple,
                             tol=1e-7, maxiter=50, fprime2=None)
 
+###############################################################################
+
+    def _contractGridDerivatives(self):
+        """ Derivatives of the value per unit notional of each CDS contract
+        with respect to the survival probabilities on the grid and to the
+        grid discount factors of the Ibor curve. There is one row for each
+        contract. They are computed analytically from each contract at the
+        bootstrap solution. """
+
+        dvdq = []
+        dvdz = []
+
+        for cds in self._cds_contracts:
+            (dq, dz) = cds._gridDerivatives(self._valuation_date, self)
+            dvdq.append(dq / cds._notional)
+            dvdz.append(dz / cds._notional)
+
+        return np.array(dvdq), np.array(dvdz)
+
+###############################################################################
+
+    def _survivalDerivatives(self):
+        """ Derivatives of the contract values with respect to the survival
+        probabilities on the grid after time zero. Each contract was solved
+        with the grid up to its maturity so only these points are kept and
+        the matrix is lower triangular. """
+
+        if self._valueDerivatives is not None:
+            return self._valueDerivatives
+
+        (dvdq, _) = self._contractGridDerivatives()
+
+        self._valueDerivatives = np.tril(dvdq[:, 1:])
+        return self._valueDerivatives
+
+###############################################################################
+
+    def curveJacobian(self):
+        """ Return the matrix of derivatives of the grid survival probabilities
+        with respect to the running coupons of the CDS contracts used to build
+        the curve. It is found once at the bootstrap solution using the implicit
+        function theorem so no rebuilding of the curve is needed. The first row
+        is for time zero and is zero. The result is cached until the curve is
+        next built. """
+
+        if self._jacobian is not None:
+            return self._jacobian
+
+        couponDerivatives = []
+        for cds in self._cds_contracts:
+            longProt = 1.0 if cds._long_protection else -1.0
+            rpv01 = cds.riskyPV01(self._valuation_date, self)['clean_rpv01']
+            couponDerivatives.append(-longProt * rpv01)
+
+        numContracts = len(self._cds_contracts)
+        self._jacobian = np.zeros((numContracts + 1, numContracts))
+        self._jacobian[1:] = -np.linalg.solve(self._survivalDerivatives(),
+                                              np.diag(couponDerivatives))
+        return self._jacobian
+
+###############################################################################
+
+    def interestJacobian(self):
+        """ Return the matrix of derivatives of the grid survival probabilities
+        with respect to the grid discount factors of the Ibor curve. This is
+        how the survival curve moves when the Ibor curve moves with the CDS
+        coupons held fixed. It uses the implicit function theorem so the curve
+        is not rebuilt. """
+
+        (_, derivatives) = self._contractGridDerivatives()
+
+        numContracts = len(self._cds_contracts)
+        jacobian = np.zeros((numContracts + 1, derivatives.shape[1]))
+        jacobian[1:] = -np.linalg.solve(self._survivalDerivatives(),
+                                        derivatives)
+        return jacobian
+
 ###############################################################################
 
     def fwd(self, dt):
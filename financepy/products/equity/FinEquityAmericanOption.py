@@ -14,10 +14,10 @@ from ...market.discount.curve import DiscountCurve
 from ...products.equity.FinEquityOption import FinEquityOption
 
 from ...models.FinModel import FinModel
+from ...models.black_scholes_pde import bsPDEValue
 
 ###############################################################################
 # TODO: Implement some analytical approximations
-# TODO: Tree with discrete dividends
 # TODO: Other dynamics such as SABR
 ###############################################################################
 
@@ -90,6 +90,76 @@ class FinEquityAmericanOption(FinEquityOption):
         else:
             return v[0]
 
+###############################################################################
+
+    def valuePDE(self,
+                 valuation_date: Date,
+                 stock_price: (np.ndarray, float),
+                 discount_curve: DiscountCurve,
+                 dividendCurve: DiscountCurve,
+                 model: FinModel,
+                 dividendDates: list = None,
+                 dividendAmounts: list = None,
+                 numTimeSteps: int = 200,
+                 numSpaceSteps: int = 200):
+        """ Value the option under the Black-Scholes model by solving the PDE
+        on a finite difference grid. Early exercise is handled exactly at each
+        time step. Cash dividends of dividendAmounts paid on dividendDates
+        make the stock price jump down and are in addition to the continuous
+        yield in the dividendCurve. The stock_price may be an array. Returns a
+        dictionary of the value, delta, gamma and theta. """
+
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+
+        if texp <= 0.0:
+            raise FinError("Time to expiry must be positive.")
+
+        if isinstance(model, FinModel) is False:
+            raise FinError("Model is not inherited off type FinModel.")
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        k = self._strikePrice
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL or \
+                self._optionType == FinOptionTypes.AMERICAN_CALL:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        def payoff(s):
+            return np.maximum(phi * (s - k), 0.0)
+
+        if self._optionType == FinOptionTypes.AMERICAN_CALL or \
+                self._optionType == FinOptionTypes.AMERICAN_PUT:
+            exercise = payoff
+        else:
+            exercise = None
+
+        dividendTimes = None
+        if dividendDates is not None:
+
+            if dividendAmounts is None or \
+                    len(dividendAmounts) != len(dividendDates):
+                raise FinError("Each dividend date needs an amount.")
+
+            dividendTimes = [(dt - valuation_date) / gDaysInYear
+                             for dt in dividendDates]
+
+        results = bsPDEValue(stock_price, texp, r, q, model._volatility,
+                             payoff, exercise, dividendTimes=dividendTimes,
+                             dividendAmounts=dividendAmounts, points=[k],
+                             numTimeSteps=numTimeSteps,
+                             numSpaceSteps=numSpaceSteps)
+
+        for key in results:
+            results[key] = results[key] * self._numOptions
+            if results[key].ndim == 0:
+                results[key] = float(results[key])
+
+        return results
+
 ###############################################################################
 
     def __repr__(self):
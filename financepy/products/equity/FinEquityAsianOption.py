@@ -7,7 +7,6 @@ import numpy as np
 from numba import njit
 
 # TODO: Add perturbatory risk using the analytical methods !!
-# TODO: Add Sobol to Monte Carlo
 
 from ...utils.math import covar
 from ...utils.global_vars import gDaysInYear
@@ -17,6 +16,10 @@ from ...utils.global_types import FinOptionTypes
 from ...utils.helpers import check_argument_types, labelToString
 from ...utils.date import Date
 from ...market.discount.curve import DiscountCurve
+from ...models.sobol import FinSobolGenerator, FinSobolScrambleTypes
+from ...models.sobol import FinBrownianBridge
+from ...models.black_scholes_mc_greeks import _asianGreeksNUMBA
+from ...models.random_draw_cache import getCachedGaussians, getNormals
 
 from ...utils.math import N
 
@@ -240,7 +243,7 @@ def _valueMC_fast_NUMBA(t0: float,
 @njit(cache=True, fastmath=True)
 def _valueMC_fast_CV_NUMBA(t0, t, tau, K, n, optionType, stock_price,
                            interestRate, dividendYield, volatility, num_paths,
-                           seed, accruedAverage, v_g_exact):
+                           seed, accruedAverage, v_g_exact, normals):
 
     np.random.seed(seed)
     mu = interestRate - dividendYield
@@ -265,7 +268,7 @@ def _valueMC_fast_CV_NUMBA(t0, t, tau, K, n, optionType, stock_price,
         n = int(n * t / tau + 0.5) + 1
 
     # evolve stock price to start of averaging period
-    g = np.random.normal(0.0, 1.0, size=(num_paths))
+    g = getNormals(normals, 0, num_paths)
 
     s_1 = np.empty(num_paths)
     s_2 = np.empty(num_paths)
@@ -281,9 +284,9 @@ def _valueMC_fast_CV_NUMBA(t0, t, tau, K, n, optionType, stock_price,
     ln_s_1_geometric = np.zeros(num_paths)
     ln_s_2_geometric = np.zeros(num_paths)
 
-    for _ in range(0, n):
+    for obs in range(0, n):
 
-        g = np.random.normal(0.0, 1.0, size=(num_paths))
+        g = getNormals(normals, (obs + 1) * num_paths, num_paths)
         for ip in range(0, num_paths):
             s_1[ip] = s_1[ip] * np.exp((mu - v2 / 2.0) *
                                        dt + g[ip] * np.sqrt(dt) * volatility)
@@ -727,10 +730,13 @@ class FinEquityAsianOption():
                 model,
                 num_paths: int,
                 seed: int,
-                accruedAverage: float):
+                accruedAverage: float,
+                randomCache=None):
         """ Monte Carlo valuation of the Asian Average option using a control
         variate method that improves accuracy and reduces the variance of the
-        price. This uses Numpy and Numba. This is the standard MC pricer. """
+        price. This uses Numpy and Numba. This is the standard MC pricer. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         # the years to the start of the averaging period
         t0 = (self._startAveragingDate - valuation_date) / gDaysInYear
@@ -753,6 +759,15 @@ class FinEquityAsianOption():
                                          model,
                                          accruedAverage)
 
+        # The kernel rescales the number of observations in the averaging
+        # period and draws one block of normals for each and one for t0
+        numObs = n
+        if t0 < 0.0:
+            numObs = int(n * texp / tau + 0.5) + 1
+
+        normals = getCachedGaussians(randomCache, seed, num_paths,
+                                     numObs + 1, 1)
+
         v = _valueMC_fast_CV_NUMBA(t0,
                                    texp,
                                    tau,
@@ -766,8 +781,138 @@ class FinEquityAsianOption():
                                    num_paths,
                                    seed,
                                    accruedAverage,
-                                   v_g_exact)
+                                   v_g_exact,
+                                   normals)
+
+        return v
+
+###############################################################################
+
+    def valueMCGreeks(self,
+                      valuation_date: Date,
+                      stock_price: float,
+                      discount_curve: DiscountCurve,
+                      dividendCurve: DiscountCurve,
+                      model,
+                      num_paths: int,
+                      seed: int,
+                      accruedAverage: float):
+        """ Monte Carlo value of the Asian Average option together with its
+        delta, gamma, vega and rho from the same antithetic paths. The delta,
+        vega and rho are pathwise derivatives of the average and the gamma is
+        a pathwise-likelihood ratio estimate so there is no bump and revalue.
+        Returns a dictionary of the value and the Greeks. """
+
+        if valuation_date > self._expiry_date:
+            raise FinError("Value date after option expiry date.")
+
+        if valuation_date > self._startAveragingDate and accruedAverage is None:
+            raise FinError(errorStr)
+
+        if accruedAverage is None:
+            accruedAverage = 0.0
+
+        # the years to the start of the averaging period
+        t0 = (self._startAveragingDate - valuation_date) / gDaysInYear
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+        tau = (self._expiry_date - self._startAveragingDate) / gDaysInYear
+
+        K = self._strikePrice
+        n = self._numObservations
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        volatility = model._volatility
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL:
+            phi = 1.0
+        elif self._optionType == FinOptionTypes.EUROPEAN_PUT:
+            phi = -1.0
+        else:
+            raise FinError("Unknown option type " + str(self._optionType))
+
+        (v, delta, gamma, vega, rho) = \
+            _asianGreeksNUMBA(t0, texp, tau, K, n, phi, stock_price, r, q,
+                              volatility, num_paths, seed,
+                              float(accruedAverage))
+
+        return {'value': v, 'delta': delta, 'gamma': gamma, 'vega': vega,
+                'rho': rho}
+
+###############################################################################
+
+    def valueQMC(self,
+                 valuation_date: Date,
+                 stock_price: float,
+                 discount_curve: DiscountCurve,
+                 dividendCurve: DiscountCurve,
+                 model,
+                 num_paths: int,
+                 seed: int,
+                 accruedAverage: float,
+                 scrambleType=FinSobolScrambleTypes.LINEAR_MATRIX):
+        """ Quasi Monte Carlo valuation of the Asian Average option. The
+        paths are built from a scrambled Sobol sequence using a Brownian
+        bridge so that the first Sobol coordinates drive the final and mid
+        averaging dates. The seed sets the scrambling of the sequence. """
+
+        if valuation_date > self._expiry_date:
+            raise FinError("Value date after option expiry date.")
+
+        t0 = (self._startAveragingDate - valuation_date) / gDaysInYear
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+        tau = (self._expiry_date - self._startAveragingDate) / gDaysInYear
+
+        K = self._strikePrice
+        n = self._numObservations
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        volatility = model._volatility
+
+        multiplier = 1.0
+
+        if t0 < 0.0:  # we are in the averaging period
+
+            if accruedAverage is None:
+                raise FinError(errorStr)
+
+            # the strike and notional are adjusted as in the MC pricers
+            K = (K * tau + accruedAverage * t0) / texp
+            multiplier = texp / tau
+            t0 = 0.0
+            n = int(n * texp / tau + 0.5) + 1
+
+        dt = (texp - t0) / n
+        obsTimes = t0 + dt * np.arange(1, n + 1)
+
+        if t0 > 0.0:
+            times = np.concatenate(([t0], obsTimes))
+        else:
+            times = obsTimes
+
+        generator = FinSobolGenerator(len(times), scrambleType, seed)
+        bridge = FinBrownianBridge(times)
+
+        w = bridge.buildPaths(generator.getGaussians(num_paths))
+        w = w[:, len(times) - n:]
+
+        mu = r - q
+        s = stock_price * np.exp((mu - volatility**2 / 2.0) * obsTimes +
+                                 volatility * w)
+
+        sArithmetic = np.mean(s, axis=1)
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL:
+            payoff = np.maximum(sArithmetic - K, 0.0)
+        elif self._optionType == FinOptionTypes.EUROPEAN_PUT:
+            payoff = np.maximum(K - sArithmetic, 0.0)
+        else:
+            raise FinError("Unknown option type.")
 
+        v = multiplier * np.mean(payoff) * np.exp(-r * texp)
         return v
 
 ###############################################################################
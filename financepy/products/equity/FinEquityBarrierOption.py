@@ -9,8 +9,14 @@ from ...utils.FinError import FinError
 from ...utils.global_vars import gDaysInYear
 from ...products.equity.FinEquityOption import FinEquityOption
 from ...models.process_simulator import FinProcessSimulator
+from ...models.process_simulator import FinProcessTypes
+from ...models.process_simulator import FinPathAccumulatorTypes
+from ...models.black_scholes_mc_greeks import _barrierGreeksNUMBA
+from ...models.black_scholes_analytic import bsValue
+from ...models.black_scholes_pde import bsPDEValue
 from ...market.discount.curve import DiscountCurve
 from ...utils.helpers import labelToString, check_argument_types
+from ...utils.global_types import FinOptionTypes
 from ...utils.date import Date
 
 
@@ -288,12 +294,15 @@ class FinEquityBarrierOption(FinEquityOption):
                 modelParams,
                 numAnnObs: int = 252,
                 num_paths: int = 10000,
-                seed: int = 4242):
+                seed: int = 4242,
+                randomCache=None):
         """ A Monte-Carlo based valuation of the barrier option which simulates
         the evolution of the stock price of at a specified number of annual
         observation times until expiry to examine if the barrier has been
         crossed and the corresponding value of the final payoff, if any. It
-        assumes a GBM model for the stock price. """
+        assumes a GBM model for the stock price. If a FinRandomDrawCache is
+        given then the normals for the seed are taken from it so that bumped
+        revaluations reuse them. """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
         numTimeSteps = int(texp * numAnnObs)
@@ -337,7 +346,8 @@ class FinEquityBarrierOption(FinEquityOption):
 
         if simplePut or simpleCall:
             Sall = process.getProcess(
-                processType, texp, modelParams, 1, num_paths, seed)
+                processType, texp, modelParams, 1, num_paths, seed,
+                randomCache)
 
         if simpleCall:
             c = (np.maximum(Sall[:, -1] - K, 0.0)).mean()
@@ -349,54 +359,72 @@ class FinEquityBarrierOption(FinEquityOption):
             p = p * np.exp(-r * texp)
             return p
 
-        # Get full set of paths
-        Sall = process.getProcess(processType, texp, modelParams, numTimeSteps,
-                                  num_paths, seed)
+        downBarrier = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                     FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                     FinEquityBarrierTypes.DOWN_AND_IN_PUT,
+                                     FinEquityBarrierTypes.DOWN_AND_OUT_PUT)
 
-        (num_paths, numTimeSteps) = Sall.shape
+        if processType == FinProcessTypes.GBM:
 
-        if optionType == FinEquityBarrierTypes.DOWN_AND_IN_CALL or \
-           optionType == FinEquityBarrierTypes.DOWN_AND_OUT_CALL or \
-           optionType == FinEquityBarrierTypes.DOWN_AND_IN_PUT or \
-           optionType == FinEquityBarrierTypes.DOWN_AND_OUT_PUT:
+            # Stream the paths keeping only their extreme and terminal values
+            if downBarrier:
+                extremeType = FinPathAccumulatorTypes.MINIMUM
+            else:
+                extremeType = FinPathAccumulatorTypes.MAXIMUM
+
+            stats = process.getPathStatistics(processType, texp, modelParams,
+                                              numTimeSteps, num_paths, seed,
+                                              [FinPathAccumulatorTypes.TERMINAL,
+                                               extremeType],
+                                              randomCache=randomCache)
 
-            barrierCrossedFromAbove = [False] * num_paths
+            STerminal = stats[:, 0]
+            SExtreme = stats[:, 1]
 
-            for p in range(0, num_paths):
-                barrierCrossedFromAbove[p] = np.any(Sall[p] <= B)
+        else:
 
-        if optionType == FinEquityBarrierTypes.UP_AND_IN_CALL or \
-           optionType == FinEquityBarrierTypes.UP_AND_OUT_CALL or \
-           optionType == FinEquityBarrierTypes.UP_AND_IN_PUT or \
-           optionType == FinEquityBarrierTypes.UP_AND_OUT_PUT:
+            # Get full set of paths
+            Sall = process.getProcess(processType, texp, modelParams,
+                                      numTimeSteps, num_paths, seed,
+                                      randomCache)
 
-            barrierCrossedFromBelow = [False] * num_paths
-            for p in range(0, num_paths):
-                barrierCrossedFromBelow[p] = np.any(Sall[p] >= B)
+            STerminal = Sall[:, -1]
+
+            if downBarrier:
+                SExtreme = np.min(Sall, axis=1)
+            else:
+                SExtreme = np.max(Sall, axis=1)
+
+        num_paths = len(STerminal)
+
+        if downBarrier:
+            barrierCrossedFromAbove = SExtreme <= B
+        else:
+            barrierCrossedFromBelow = SExtreme >= B
 
         payoff = np.zeros(num_paths)
         ones = np.ones(num_paths)
 
         if optionType == FinEquityBarrierTypes.DOWN_AND_OUT_CALL:
-            payoff = np.maximum(Sall[:, -1] - K, 0.0) * \
+            payoff = np.maximum(STerminal - K, 0.0) * \
                 (ones - barrierCrossedFromAbove)
         elif optionType == FinEquityBarrierTypes.DOWN_AND_IN_CALL:
-            payoff = np.maximum(Sall[:, -1] - K, 0.0) * barrierCrossedFromAbove
+            payoff = np.maximum(STerminal - K, 0.0) * barrierCrossedFromAbove
         elif optionType == FinEquityBarrierTypes.UP_AND_IN_CALL:
-            payoff = np.maximum(Sall[:, -1] - K, 0.0) * barrierCrossedFromBelow
+            payoff = np.maximum(STerminal - K, 0.0) * barrierCrossedFromBelow
         elif optionType == FinEquityBarrierTypes.UP_AND_OUT_CALL:
-            payoff = np.maximum(Sall[:, -1] - K, 0.0) * \
+            payoff = np.maximum(STerminal - K, 0.0) * \
                 (ones - barrierCrossedFromBelow)
         elif optionType == FinEquityBarrierTypes.UP_AND_IN_PUT:
-            payoff = np.maximum(K - Sall[:, -1], 0.0) * barrierCrossedFromBelow
+            payoff = np.maximum(K - STerminal, 0.0) * barrierCrossedFromBelow
         elif optionType == FinEquityBarrierTypes.UP_AND_OUT_PUT:
-            payoff = np.maximum(K - Sall[:, -1], 0.0) * \
+            payoff = np.maximum(K - STerminal, 0.0) * \
                 (ones - barrierCrossedFromBelow)
         elif optionType == FinEquityBarrierTypes.DOWN_AND_OUT_PUT:
-            payoff = np.maximum(K - Sall[:, -1], 0.0) * \
+            payoff = np.maximum(K - STerminal, 0.0) * \
                 (ones - barrierCrossedFromAbove)
         elif optionType == FinEquityBarrierTypes.DOWN_AND_IN_PUT:
-            payoff = np.maximum(K - Sall[:, -1], 0.0) * barrierCrossedFromAbove
+            payoff = np.maximum(K - STerminal, 0.0) * barrierCrossedFromAbove
         else:
             raise FinError("Unknown barrier option type." +
                            str(self._optionType))
@@ -405,6 +433,192 @@ class FinEquityBarrierOption(FinEquityOption):
 
         return v * self._notional
 
+###############################################################################
+
+    def valueMCGreeks(self,
+                      valuation_date: Date,
+                      stock_price: float,
+                      discount_curve: DiscountCurve,
+                      dividendCurve: DiscountCurve,
+                      model,
+                      numAnnObs: int = 252,
+                      num_paths: int = 10000,
+                      seed: int = 4242):
+        """ Monte-Carlo value of the barrier option under the Black-Scholes
+        model together with its delta, vega and rho from the same simulation.
+        The barrier makes the payoff jump so the Greeks are likelihood ratio
+        estimates. The delta weight depends on the first observation interval
+        only and the gamma weight would vary with its square, so the gamma is
+        not returned. Returns a dictionary of the value and Greeks. """
+
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+        numTimeSteps = max(int(texp * numAnnObs), 1)
+        K = self._strikePrice
+        B = self._barrierLevel
+        optionType = self._optionType
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        volatility = model._volatility
+
+        isDown = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_IN_PUT,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_PUT)
+
+        isKnockIn = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                   FinEquityBarrierTypes.UP_AND_IN_CALL,
+                                   FinEquityBarrierTypes.DOWN_AND_IN_PUT,
+                                   FinEquityBarrierTypes.UP_AND_IN_PUT)
+
+        isCall = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinEquityBarrierTypes.UP_AND_IN_CALL,
+                                FinEquityBarrierTypes.UP_AND_OUT_CALL)
+
+        if isDown:
+            isCrossed = stock_price <= B
+        else:
+            isCrossed = stock_price >= B
+
+        if isCrossed and not isKnockIn:
+            return {'value': 0.0, 'delta': 0.0, 'vega': 0.0, 'rho': 0.0}
+
+        if isCall:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        (v, delta, vega, rho) = \
+            _barrierGreeksNUMBA(isDown, isKnockIn, isCrossed, phi, K, B, texp,
+                                numTimeSteps, stock_price, r, q, volatility,
+                                num_paths, seed)
+
+        n = self._notional
+        return {'value': v * n, 'delta': delta * n, 'vega': vega * n,
+                'rho': rho * n}
+
+###############################################################################
+
+    def valuePDE(self,
+                 valuation_date: Date,
+                 stock_price: (float, np.ndarray),
+                 discount_curve: DiscountCurve,
+                 dividendCurve: DiscountCurve,
+                 model,
+                 numTimeSteps: int = 200,
+                 numSpaceSteps: int = 200):
+        """ Value the barrier option under the Black-Scholes model by solving
+        the PDE on a finite difference grid whose edge is the barrier. As in
+        the analytical value the barrier is monitored continuously but is
+        shifted by the Broadie, Glasserman and Kou correction for the number
+        of observations per year. At the barrier a knock-in option becomes a
+        vanilla option and so its value there is the Black-Scholes price. The
+        stock_price may be an array. Returns a dictionary of the value,
+        delta, gamma and theta. """
+
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+
+        if texp <= 0.0:
+            raise FinError("Option expires before value date.")
+
+        K = self._strikePrice
+        H = self._barrierLevel
+        optionType = self._optionType
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        volatility = model._volatility
+
+        isDown = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_IN_PUT,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_PUT)
+
+        isKnockIn = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                   FinEquityBarrierTypes.UP_AND_IN_CALL,
+                                   FinEquityBarrierTypes.DOWN_AND_IN_PUT,
+                                   FinEquityBarrierTypes.UP_AND_IN_PUT)
+
+        isCall = optionType in (FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                                FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinEquityBarrierTypes.UP_AND_IN_CALL,
+                                FinEquityBarrierTypes.UP_AND_OUT_CALL)
+
+        if isCall:
+            phi = 1.0
+            optionTypeValue = FinOptionTypes.EUROPEAN_CALL.value
+        else:
+            phi = -1.0
+            optionTypeValue = FinOptionTypes.EUROPEAN_PUT.value
+
+        numObservations = 1 + texp * self._numObservationsPerYear
+        t = texp / numObservations
+
+        if isDown:
+            hAdj = H * np.exp(-0.5826 * volatility * np.sqrt(t))
+        else:
+            hAdj = H * np.exp(0.5826 * volatility * np.sqrt(t))
+
+        def payoff(s):
+            return np.maximum(phi * (s - K), 0.0)
+
+        def barrierValue(tau):
+            return bsValue(hAdj, tau, K, r, q, volatility, optionTypeValue)
+
+        s0 = np.asarray(stock_price, dtype=float)
+
+        if isDown:
+            isCrossed = s0 <= H
+        else:
+            isCrossed = s0 >= H
+
+        results = {'value': np.zeros(s0.shape), 'delta': np.zeros(s0.shape),
+                   'gamma': np.zeros(s0.shape), 'theta': np.zeros(s0.shape)}
+
+        # A knocked out option is worthless and a knocked in one is vanilla
+        if isKnockIn and np.any(isCrossed):
+            res = bsPDEValue(s0[isCrossed], texp, r, q, volatility, payoff,
+                             points=[K], numTimeSteps=numTimeSteps,
+                             numSpaceSteps=numSpaceSteps)
+            for key in results:
+                results[key][isCrossed] = res[key]
+
+        if np.any(~isCrossed):
+
+            # A knock-in option pays nothing unless the barrier is hit
+            if isKnockIn:
+                terminal = np.zeros_like
+                rebate = barrierValue
+            else:
+                terminal = payoff
+                rebate = 0.0
+
+            if isDown:
+                res = bsPDEValue(s0[~isCrossed], texp, r, q, volatility,
+                                 terminal, lowerBarrier=hAdj,
+                                 lowerValue=rebate, points=[K, hAdj],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+            else:
+                res = bsPDEValue(s0[~isCrossed], texp, r, q, volatility,
+                                 terminal, upperBarrier=hAdj,
+                                 upperValue=rebate, points=[K, hAdj],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+
+            for key in results:
+                results[key][~isCrossed] = res[key]
+
+        for key in results:
+            results[key] = results[key] * self._notional
+            if results[key].ndim == 0:
+                results[key] = float(results[key])
+
+        return results
+
 ###############################################################################
 
     def __repr__(self):
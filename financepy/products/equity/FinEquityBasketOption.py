@@ -11,6 +11,8 @@ import numpy as np
 
 from ...utils.global_vars import gDaysInYear
 from ...models.gbm_process_simulator import FinGBMProcess
+from ...models.black_scholes_mc_greeks import _terminalGreeksNUMBA
+from ...models.black_scholes_mc_greeks import gMCGreeksBasket
 
 from ...utils.FinError import FinError
 from ...utils.global_types import FinOptionTypes
@@ -189,12 +191,14 @@ class FinEquityBasketOption():
                 volatilities: np.ndarray,
                 corrMatrix: np.ndarray,
                 num_paths:int = 10000,
-                seed:int = 4242):
+                seed:int = 4242,
+                randomCache=None):
         """ Valuation of the EquityBasketOption using a Monte-Carlo simulation
         of stock prices assuming a GBM distribution. Cholesky decomposition is
         used to handle a full rank correlation structure between the individual
         assets. The num_paths and seed are pre-set to default values but can be
-        overwritten. """
+        overwritten. If a FinRandomDrawCache is given then the normals for the
+        seed are taken from it so that bumped revaluations reuse them. """
 
         check_argument_types(getattr(self, _funcName(), None), locals())
 
@@ -235,7 +239,8 @@ class FinEquityBasketOption():
                                     stock_prices,
                                     volatilities,
                                     corrMatrix,
-                                    seed)
+                                    seed,
+                                    randomCache)
 
         if self._optionType == FinOptionTypes.EUROPEAN_CALL:
             payoff = np.maximum(np.mean(Sall, axis=1) - k, 0.0)
@@ -248,6 +253,62 @@ class FinEquityBasketOption():
         v = payoff * np.exp(-r * texp)
         return v
 
+###############################################################################
+
+    def valueMCGreeks(self,
+                      valuation_date: Date,
+                      stock_prices: np.ndarray,
+                      discount_curve: DiscountCurve,
+                      dividendCurves: (list),
+                      volatilities: np.ndarray,
+                      corrMatrix: np.ndarray,
+                      num_paths: int = 10000,
+                      seed: int = 4242):
+        """ Monte-Carlo value of the EquityBasketOption together with its
+        Greeks from the same simulation. The deltas and vegas are pathwise
+        derivatives and the gammas are pathwise-likelihood ratio estimates so
+        there is no bump and revalue. Returns a dictionary with the value, the
+        arrays of delta, gamma and vega to each asset, and the rho. """
+
+        check_argument_types(getattr(self, _funcName(), None), locals())
+
+        if valuation_date > self._expiry_date:
+            raise FinError("Value date after expiry date.")
+
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+
+        dividend_yields = []
+        for curve in dividendCurves:
+            dq = curve.df(self._expiry_date)
+            q = -np.log(dq) / texp
+            dividend_yields.append(q)
+
+        self._validate(stock_prices,
+                       dividend_yields,
+                       volatilities,
+                       corrMatrix)
+
+        df = discount_curve.df(self._expiry_date)
+        r = -np.log(df)/texp
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL:
+            phi = 1.0
+        elif self._optionType == FinOptionTypes.EUROPEAN_PUT:
+            phi = -1.0
+        else:
+            raise FinError("Unknown option type.")
+
+        (v, delta, gamma, vega, rho) = \
+            _terminalGreeksNUMBA(gMCGreeksBasket, phi, self._strikePrice, 1,
+                                 texp, r, np.array(dividend_yields),
+                                 np.array(stock_prices, dtype=np.float64),
+                                 np.array(volatilities, dtype=np.float64),
+                                 np.array(corrMatrix, dtype=np.float64),
+                                 num_paths, seed)
+
+        return {'value': v, 'delta': delta, 'gamma': gamma, 'vega': vega,
+                'rho': rho}
+
 ###############################################################################
 
     def __repr__(self):
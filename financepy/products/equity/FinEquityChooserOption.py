@@ -17,6 +17,7 @@ from ...market.discount.curve_flat import DiscountCurve
 from ...utils.helpers import labelToString, check_argument_types
 from ...utils.date import Date
 from ...models.black_scholes import bsValue
+from ...models.random_draw_cache import getCachedGaussians
 
 from scipy.stats import norm
 N = norm.cdf
@@ -169,8 +170,11 @@ class FinEquityChooserOption(FinEquityOption):
                 dividendCurve: DiscountCurve,
                 model,
                 num_paths: int = 10000,
-                seed: int = 4242):
-        """ Value the complex chooser option Monte Carlo. """
+                seed: int = 4242,
+                randomCache=None):
+        """ Value the complex chooser option Monte Carlo. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         dft = discount_curve.df(self._chooseDate)
         dftc = discount_curve.df(self._callExpiryDate)
@@ -203,7 +207,11 @@ class FinEquityChooserOption(FinEquityOption):
         sqrt_dt = np.sqrt(t)
 
         # Use Antithetic variables
-        g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        if randomCache is None:
+            g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        else:
+            g = getCachedGaussians(randomCache, seed, num_paths, 1, 1)
+            g = g.reshape((1, num_paths))
         s = stock_price * np.exp((rt - q - v*v / 2.0) * t)
         m = np.exp(g * sqrt_dt * v)
 
@@ -16,6 +16,8 @@ from ...utils.date import Date
 from ...market.discount.curve import DiscountCurve
 
 from ...utils.math import NVect
+from ...models.black_scholes_mc_greeks import _digitalGreeksNUMBA
+from ...models.random_draw_cache import getCachedGaussians
 
 
 ###############################################################################
@@ -119,10 +121,13 @@ class FinEquityDigitalOption(FinEquityOption):
                 dividendCurve: DiscountCurve,
                 model,
                 num_paths: int = 10000,
-                seed: int = 4242):
+                seed: int = 4242,
+                randomCache=None):
         """ Digital Option valuation using the Black-Scholes model and Monte
         Carlo simulation. Product assumes a barrier only at expiry. Monte Carlo
-        handles both a cash-or-nothing and an asset-or-nothing option."""
+        handles both a cash-or-nothing and an asset-or-nothing option. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         np.random.seed(seed)
         t = (self._expiry_date - valuation_date) / gDaysInYear
@@ -137,7 +142,11 @@ class FinEquityDigitalOption(FinEquityOption):
         sqrt_dt = np.sqrt(t)
 
         # Use Antithetic variables
-        g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        if randomCache is None:
+            g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        else:
+            g = getCachedGaussians(randomCache, seed, num_paths, 1, 1)
+            g = g.reshape((1, num_paths))
         s = stock_price * np.exp((r - q - volatility * volatility / 2.0) * t)
         m = np.exp(g * sqrt_dt * volatility)
 
@@ -163,6 +172,51 @@ class FinEquityDigitalOption(FinEquityOption):
         v = payoff * df / 2.0
         return v
 
+###############################################################################
+
+    def valueMCGreeks(self,
+                      valuation_date: Date,
+                      stock_price: float,
+                      discount_curve: DiscountCurve,
+                      dividendCurve: DiscountCurve,
+                      model,
+                      num_paths: int = 10000,
+                      seed: int = 4242):
+        """ Monte Carlo value of the digital option together with its delta,
+        gamma, vega and rho from the same antithetic paths. As the payoff
+        jumps at the barrier the Greeks are likelihood ratio estimates which
+        weight each payoff by the derivative of the log-density of the
+        terminal stock price. Returns a dictionary of the value and Greeks. """
+
+        t = (self._expiry_date - valuation_date) / gDaysInYear
+        df = discount_curve.df(self._expiry_date)
+        r = -np.log(df)/t
+
+        dq = dividendCurve.df(self._expiry_date)
+        q = -np.log(dq)/t
+
+        volatility = model._volatility
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL:
+            phi = 1.0
+        else:
+            phi = -1.0
+
+        if self._underlyingType == FinDigitalOptionTypes.CASH_OR_NOTHING:
+            isAssetOrNothing = False
+        elif self._underlyingType == FinDigitalOptionTypes.ASSET_OR_NOTHING:
+            isAssetOrNothing = True
+        else:
+            raise FinError("Unknown underlying type.")
+
+        (v, delta, gamma, vega, rho) = \
+            _digitalGreeksNUMBA(isAssetOrNothing, phi, self._barrierPrice, t,
+                                stock_price, r, q, volatility, num_paths,
+                                seed)
+
+        return {'value': v, 'delta': delta, 'gamma': gamma, 'vega': vega,
+                'rho': rho}
+
 ###############################################################################
 
     def __repr__(self):
@@ -11,6 +11,7 @@ from ...utils.FinError import FinError
 from ...utils.date import Date
 
 from ...models.gbm_process_simulator import FinGBMProcess
+from ...models.process_simulator import FinPathAccumulatorTypes
 from ...products.equity.FinEquityOption import FinEquityOption
 from ...utils.helpers import labelToString, check_argument_types
 from ...market.discount.curve import DiscountCurve
@@ -182,9 +183,12 @@ class FinEquityFixedLookbackOption(FinEquityOption):
                 stockMinMax: float,
                 num_paths: int = 10000,
                 num_steps_per_year: int = 252,
-                seed: int = 4242):
+                seed: int = 4242,
+                randomCache=None):
         """ Monte Carlo valuation of a fixed strike lookback option using a
-        Black-Scholes model that assumes the stock follows a GBM process. """
+        Black-Scholes model that assumes the stock follows a GBM process. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -213,20 +217,29 @@ class FinEquityFixedLookbackOption(FinEquityOption):
                     "Smin must be less than or equal to the stock price.")
 
         model = FinGBMProcess()
-        Sall = model.getPaths(num_paths, numTimeSteps, t, mu, stock_price,
-                              volatility, seed)
+
+        # Only the running extreme of each path is kept
+        if optionType == FinOptionTypes.EUROPEAN_CALL:
+            extremeType = FinPathAccumulatorTypes.MAXIMUM
+        else:
+            extremeType = FinPathAccumulatorTypes.MINIMUM
+
+        stats = model.getPathStatistics(num_paths, numTimeSteps, t, mu,
+                                        stock_price, volatility, seed,
+                                        [extremeType],
+                                        randomCache=randomCache)
 
         # Due to antithetics we have doubled the number of paths
         num_paths = 2 * num_paths
         payoff = np.zeros(num_paths)
 
         if optionType == FinOptionTypes.EUROPEAN_CALL:
-            SMax = np.max(Sall, axis=1)
+            SMax = stats[:, 0]
             smaxs = np.ones(num_paths) * smax
             payoff = np.maximum(SMax - k, 0.0)
             payoff = np.maximum(payoff, smaxs - k)
         elif optionType == FinOptionTypes.EUROPEAN_PUT:
-            SMin = np.min(Sall, axis=1)
+            SMin = stats[:, 0]
             smins = np.ones(num_paths) * smin
             payoff = np.maximum(k - SMin, 0.0)
             payoff = np.maximum(payoff, k - smins)
@@ -11,6 +11,7 @@ from ...utils.FinError import FinError
 from ...utils.date import Date
 
 from ...models.gbm_process_simulator import FinGBMProcess
+from ...models.process_simulator import FinPathAccumulatorTypes
 from ...products.equity.FinEquityOption import FinEquityOption
 from ...utils.helpers import labelToString, check_argument_types
 from ...market.discount.curve import DiscountCurve
@@ -147,9 +148,12 @@ class FinEquityFloatLookbackOption(FinEquityOption):
                 stockMinMax: float,
                 num_paths: int = 10000,
                 num_steps_per_year: int = 252,
-                seed: int = 4242):
+                seed: int = 4242,
+                randomCache=None):
         """ Monte Carlo valuation of a floating strike lookback option using a
-        Black-Scholes model that assumes the stock follows a GBM process. """
+        Black-Scholes model that assumes the stock follows a GBM process. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
         numTimeSteps = int(t * num_steps_per_year)
@@ -175,21 +179,30 @@ class FinEquityFloatLookbackOption(FinEquityOption):
                     "Smax must be greater than or equal to the stock price.")
 
         model = FinGBMProcess()
-        Sall = model.getPaths(num_paths, numTimeSteps, t, mu, stock_price,
-                              volatility, seed)
+
+        # Only the running extreme and terminal value of each path are kept
+        if optionType == FinOptionTypes.EUROPEAN_CALL:
+            extremeType = FinPathAccumulatorTypes.MINIMUM
+        else:
+            extremeType = FinPathAccumulatorTypes.MAXIMUM
+
+        stats = model.getPathStatistics(num_paths, numTimeSteps, t, mu,
+                                        stock_price, volatility, seed,
+                                        [FinPathAccumulatorTypes.TERMINAL,
+                                         extremeType],
+                                        randomCache=randomCache)
 
         # Due to antithetics we have doubled the number of paths
         num_paths = 2 * num_paths
         payoff = np.zeros(num_paths)
+        STerminal = stats[:, 0]
 
         if optionType == FinOptionTypes.EUROPEAN_CALL:
-            SMin = np.min(Sall, axis=1)
-            SMin = np.minimum(SMin, smin)
-            payoff = np.maximum(Sall[:, -1] - SMin, 0.0)
+            SMin = np.minimum(stats[:, 1], smin)
+            payoff = np.maximum(STerminal - SMin, 0.0)
         elif optionType == FinOptionTypes.EUROPEAN_PUT:
-            SMax = np.max(Sall, axis=1)
-            SMax = np.maximum(SMax, smax)
-            payoff = np.maximum(SMax - Sall[:, -1], 0.0)
+            SMax = np.maximum(stats[:, 1], smax)
+            payoff = np.maximum(SMax - STerminal, 0.0)
         else:
             raise FinError("Unknown lookback option type:" + str(optionType))
 
@@ -13,7 +13,8 @@ from ...products.equity.FinEquityOption import FinEquityOption
 from ...utils.helpers import labelToString, check_argument_types
 from ...utils.date import Date
 from ...market.discount.curve import DiscountCurve
-from ...models.gbm_process_simulator import getPaths
+from ...models.gbm_process_simulator import FinGBMProcess
+from ...models.black_scholes_pde import bsPDEValue
 
 from numba import njit
 
@@ -403,11 +404,14 @@ class FinEquityOneTouchOption(FinEquityOption):
                 model,
                 num_paths: int = 10000,
                 num_steps_per_year: int = 252,
-                seed: int = 4242):
+                seed: int = 4242,
+                randomCache=None):
         """ Touch Option valuation using the Black-Scholes model and Monte
         Carlo simulation. Accuracy is not great when compared to the analytical
         result as we only observe the barrier a finite number of times. The
-        convergence is slow. """
+        convergence is slow. If a FinRandomDrawCache is given then the normals
+        for the seed are taken from it so that bumped revaluations reuse
+        them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -424,7 +428,8 @@ class FinEquityOneTouchOption(FinEquityOption):
         s0 = stock_price
         mu = r - q
 
-        s = getPaths(num_paths, numTimeSteps, t, mu, s0, v, seed)
+        s = FinGBMProcess().getPaths(num_paths, numTimeSteps, t, mu, s0, v,
+                                     seed, randomCache)
 
         H = self._barrierPrice
         X = self._paymentSize
@@ -551,6 +556,112 @@ class FinEquityOneTouchOption(FinEquityOption):
 
         return v
 
+###############################################################################
+
+    def valuePDE(self,
+                 valuation_date: Date,
+                 stock_price: (float, np.ndarray),
+                 discount_curve: DiscountCurve,
+                 dividendCurve: DiscountCurve,
+                 model,
+                 numTimeSteps: int = 200,
+                 numSpaceSteps: int = 200):
+        """ Touch Option valuation using the Black-Scholes model by solving
+        the PDE on a finite difference grid whose edge is the barrier. The
+        barrier is continuous as in the analytical value. The value at the
+        barrier is the payment if it is hit, discounted from expiry if that
+        is when it is paid. The stock_price may be an array. Returns a
+        dictionary of the value, delta, gamma and theta. """
+
+        if valuation_date > self._expiry_date:
+            raise FinError("Value date after expiry date.")
+
+        t = (self._expiry_date - valuation_date) / gDaysInYear
+        t = max(t, 1e-6)
+
+        s0 = np.asarray(stock_price, dtype=float)
+        H = self._barrierPrice
+        X = self._paymentSize
+        optionType = self._optionType
+
+        r = discount_curve.ccRate(self._expiry_date)
+        q = dividendCurve.ccRate(self._expiry_date)
+
+        v = model._volatility
+
+        isDown = optionType in (
+            FinTouchOptionPayoffTypes.DOWN_AND_IN_CASH_AT_HIT,
+            FinTouchOptionPayoffTypes.DOWN_AND_IN_CASH_AT_EXPIRY,
+            FinTouchOptionPayoffTypes.DOWN_AND_OUT_CASH_OR_NOTHING,
+            FinTouchOptionPayoffTypes.DOWN_AND_IN_ASSET_AT_HIT,
+            FinTouchOptionPayoffTypes.DOWN_AND_IN_ASSET_AT_EXPIRY,
+            FinTouchOptionPayoffTypes.DOWN_AND_OUT_ASSET_OR_NOTHING)
+
+        if isDown and np.any(s0 <= H):
+            raise FinError("Stock price is currently below barrier.")
+
+        if not isDown and np.any(s0 >= H):
+            raise FinError("Stock price is currently above barrier.")
+
+        def noPayoff(s):
+            return np.zeros(len(s))
+
+        # Value at the barrier and payoff at expiry if it is not hit
+        if optionType in (FinTouchOptionPayoffTypes.DOWN_AND_IN_CASH_AT_HIT,
+                          FinTouchOptionPayoffTypes.UP_AND_IN_CASH_AT_HIT):
+            def rebate(tau):
+                return X * np.ones(len(tau))
+            payoff = noPayoff
+        elif optionType in (
+                FinTouchOptionPayoffTypes.DOWN_AND_IN_CASH_AT_EXPIRY,
+                FinTouchOptionPayoffTypes.UP_AND_IN_CASH_AT_EXPIRY):
+            def rebate(tau):
+                return X * np.exp(-r * tau)
+            payoff = noPayoff
+        elif optionType in (
+                FinTouchOptionPayoffTypes.DOWN_AND_IN_ASSET_AT_HIT,
+                FinTouchOptionPayoffTypes.UP_AND_IN_ASSET_AT_HIT):
+            def rebate(tau):
+                return H * np.ones(len(tau))
+            payoff = noPayoff
+        elif optionType in (
+                FinTouchOptionPayoffTypes.DOWN_AND_IN_ASSET_AT_EXPIRY,
+                FinTouchOptionPayoffTypes.UP_AND_IN_ASSET_AT_EXPIRY):
+            def rebate(tau):
+                return H * np.exp(-q * tau)
+            payoff = noPayoff
+        elif optionType in (
+                FinTouchOptionPayoffTypes.DOWN_AND_OUT_CASH_OR_NOTHING,
+                FinTouchOptionPayoffTypes.UP_AND_OUT_CASH_OR_NOTHING):
+            rebate = 0.0
+            def payoff(s):
+                return X * np.ones(len(s))
+        elif optionType in (
+                FinTouchOptionPayoffTypes.DOWN_AND_OUT_ASSET_OR_NOTHING,
+                FinTouchOptionPayoffTypes.UP_AND_OUT_ASSET_OR_NOTHING):
+            rebate = 0.0
+            def payoff(s):
+                return s
+        else:
+            raise FinError("Unknown option type.")
+
+        if isDown:
+            results = bsPDEValue(s0, t, r, q, v, payoff, lowerBarrier=H,
+                                 lowerValue=rebate, points=[H],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+        else:
+            results = bsPDEValue(s0, t, r, q, v, payoff, upperBarrier=H,
+                                 upperValue=rebate, points=[H],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+
+        for key in results:
+            if results[key].ndim == 0:
+                results[key] = float(results[key])
+
+        return results
+
 ###############################################################################
 
     def __repr__(self):
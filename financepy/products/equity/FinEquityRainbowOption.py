@@ -11,6 +11,8 @@ from ...utils.math import N, M
 from ...utils.global_vars import gDaysInYear
 from ...utils.FinError import FinError
 from ...models.gbm_process_simulator import FinGBMProcess
+from ...models.black_scholes_mc_greeks import _terminalGreeksNUMBA
+from ...models.black_scholes_mc_greeks import gMCGreeksNthAsset
 from ...products.equity.FinEquityOption import FinEquityOption
 from ...market.discount.curve import DiscountCurve
 from ...utils.helpers import labelToString, check_argument_types
@@ -74,7 +76,8 @@ def valueMCFast(t,
                 payoffType,
                 payoffParams,
                 num_paths=10000,
-                seed=4242):
+                seed=4242,
+                randomCache=None):
 
     np.random.seed(seed)
 
@@ -95,7 +98,8 @@ def valueMCFast(t,
 
     numTimeSteps = 2
     Sall = model.getPathsAssets(numAssets, num_paths, numTimeSteps,
-                                t, mus, stock_prices, volatilities, betas, seed)
+                                t, mus, stock_prices, volatilities, betas, seed,
+                                randomCache)
 
     payoff = payoffValue(Sall, payoffType.value, payoffParams)
     payoff = np.mean(payoff)
@@ -276,7 +280,11 @@ class FinEquityRainbowOption(FinEquityOption):
                 volatilities,
                 corrMatrix,
                 num_paths=10000,
-                seed=4242):
+                seed=4242,
+                randomCache=None):
+        """ Monte-Carlo valuation of the rainbow option assuming the assets
+        follow correlated GBM processes. If a FinRandomDrawCache is given then the normals for the
+        seed are taken from it so that bumped revaluations reuse them. """
 
         self._validate(stock_prices,
                        dividendCurves,
@@ -298,10 +306,77 @@ class FinEquityRainbowOption(FinEquityOption):
                         self._payoffType,
                         self._payoffParams,
                         num_paths,
-                        seed)
+                        seed,
+                        randomCache)
 
         return v
 
+###############################################################################
+
+    def valueMCGreeks(self,
+                      valuation_date,
+                      stock_prices,
+                      discount_curve,
+                      dividendCurves,
+                      volatilities,
+                      corrMatrix,
+                      num_paths=10000,
+                      seed=4242):
+        """ Monte-Carlo value of the rainbow option together with its Greeks
+        from the same simulation. The deltas and vegas are pathwise
+        derivatives and the gammas are pathwise-likelihood ratio estimates so
+        there is no bump and revalue. Returns a dictionary with the value, the
+        arrays of delta, gamma and vega to each asset, and the rho. """
+
+        self._validate(stock_prices,
+                       dividendCurves,
+                       volatilities,
+                       corrMatrix)
+
+        if valuation_date > self._expiry_date:
+            raise FinError("Value date after expiry date.")
+
+        t = (self._expiry_date - valuation_date) / gDaysInYear
+
+        df = discount_curve._df(t)
+        r = -log(df)/t
+
+        qs = []
+        for curve in dividendCurves:
+            dq = curve._df(t)
+            q = -np.log(dq)/t
+            qs.append(q)
+
+        # Each payoff is a call or put on the nth largest asset price
+        payoffType = self._payoffType
+        k = self._payoffParams[-1]
+
+        if payoffType == FinEquityRainbowOptionTypes.CALL_ON_MAXIMUM:
+            (phi, nth) = (1.0, 1)
+        elif payoffType == FinEquityRainbowOptionTypes.PUT_ON_MAXIMUM:
+            (phi, nth) = (-1.0, 1)
+        elif payoffType == FinEquityRainbowOptionTypes.CALL_ON_MINIMUM:
+            (phi, nth) = (1.0, self._numAssets)
+        elif payoffType == FinEquityRainbowOptionTypes.PUT_ON_MINIMUM:
+            (phi, nth) = (-1.0, self._numAssets)
+        elif payoffType == FinEquityRainbowOptionTypes.CALL_ON_NTH:
+            (phi, nth) = (1.0, int(self._payoffParams[0]))
+        elif payoffType == FinEquityRainbowOptionTypes.PUT_ON_NTH:
+            (phi, nth) = (-1.0, int(self._payoffParams[0]))
+        else:
+            raise FinError("Unknown payoff type")
+
+        (v, delta, gamma, vega, rho) = \
+            _terminalGreeksNUMBA(gMCGreeksNthAsset, phi, k, nth, t, r,
+                                 np.array(qs),
+                                 np.array(stock_prices, dtype=np.float64),
+                                 np.array(volatilities, dtype=np.float64),
+                                 np.array(corrMatrix, dtype=np.float64),
+                                 num_paths, seed)
+
+        return {'value': v, 'delta': delta, 'gamma': gamma, 'vega': vega,
+                'rho': rho}
+
 ###############################################################################
 
     def __repr__(self):
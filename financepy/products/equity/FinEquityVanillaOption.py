@@ -25,6 +25,7 @@ from ...models.black_scholes_analytic import bsGamma
 from ...models.black_scholes_analytic import bsRho
 from ...models.black_scholes_analytic import bsTheta
 from ...models.black_scholes_analytic import bsImpliedVolatility
+from ...models.black_scholes_analytic import bsImpliedVolatilityVect
 from ...models.black_scholes_analytic import bsIntrinsic
 
 
@@ -396,7 +397,9 @@ class FinEquityVanillaOption():
                           dividendCurve: DiscountCurve,
                           price):
         """ Calculate the Black-Scholes implied volatility of a European 
-        vanilla option. """
+        vanilla option. If the stock price or the option price is a vector
+        then a vector of volatilities is returned with NaN for any prices that
+        do not have an implied volatility. """
 
         texp = (self._expiry_date - valuation_date) / gDaysInYear
 
@@ -413,6 +416,12 @@ class FinEquityVanillaOption():
         k = self._strikePrice
         s0 = stock_price
 
+        if np.ndim(s0) > 0 or np.ndim(price) > 0:
+            return bsImpliedVolatilityVect(np.asarray(s0, dtype=np.float64),
+                                           texp, k, r, q,
+                                           np.asarray(price, dtype=np.float64),
+                                           self._optionType.value)
+
         sigma = bsImpliedVolatility(s0, texp, k, r, q, price, 
                                     self._optionType.value)
         
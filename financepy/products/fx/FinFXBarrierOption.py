@@ -12,7 +12,10 @@ from ...utils.math import N
 from ...utils.global_vars import gDaysInYear
 from ...products.fx.FinFXOption import FinFXOption
 from ...models.process_simulator import FinProcessSimulator
+from ...models.black_scholes_analytic import bsValue
+from ...models.black_scholes_pde import bsPDEValue
 from ...utils.helpers import labelToString, check_argument_types
+from ...utils.global_types import FinOptionTypes
 from ...utils.date import Date
 
 ###############################################################################
@@ -233,6 +236,125 @@ class FinFXBarrierOption(FinFXOption):
 
 ###############################################################################
 
+    def valuePDE(self,
+                 valuation_date,
+                 spotFXRate: (float, np.ndarray),
+                 domDiscountCurve,
+                 forDiscountCurve,
+                 model,
+                 numTimeSteps: int = 200,
+                 numSpaceSteps: int = 200):
+        """ Value the FX barrier option under the Black-Scholes model by solving
+        the PDE on a finite difference grid whose edge is the barrier. As in
+        the analytical value the barrier is monitored continuously but is
+        shifted by the Broadie, Glasserman and Kou correction for the number
+        of observations per year. At the barrier a knock-in option becomes a
+        vanilla option and so its value there is the Black-Scholes price. The
+        spotFXRate may be an array. Returns a dictionary of the value,
+        delta, gamma and theta. """
+
+        texp = (self._expiry_date - valuation_date) / gDaysInYear
+
+        if texp <= 0.0:
+            raise FinError("Option expires before value date.")
+
+        K = self._strikeFXRate
+        H = self._barrierLevel
+        optionType = self._optionType
+
+        r = -np.log(domDiscountCurve._df(texp)) / texp
+        q = -np.log(forDiscountCurve._df(texp)) / texp
+
+        volatility = model._volatility
+
+        isDown = optionType in (FinFXBarrierTypes.DOWN_AND_IN_CALL,
+                                FinFXBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinFXBarrierTypes.DOWN_AND_IN_PUT,
+                                FinFXBarrierTypes.DOWN_AND_OUT_PUT)
+
+        isKnockIn = optionType in (FinFXBarrierTypes.DOWN_AND_IN_CALL,
+                                   FinFXBarrierTypes.UP_AND_IN_CALL,
+                                   FinFXBarrierTypes.DOWN_AND_IN_PUT,
+                                   FinFXBarrierTypes.UP_AND_IN_PUT)
+
+        isCall = optionType in (FinFXBarrierTypes.DOWN_AND_IN_CALL,
+                                FinFXBarrierTypes.DOWN_AND_OUT_CALL,
+                                FinFXBarrierTypes.UP_AND_IN_CALL,
+                                FinFXBarrierTypes.UP_AND_OUT_CALL)
+
+        if isCall:
+            phi = 1.0
+            optionTypeValue = FinOptionTypes.EUROPEAN_CALL.value
+        else:
+            phi = -1.0
+            optionTypeValue = FinOptionTypes.EUROPEAN_PUT.value
+
+        numObservations = texp * self._numObservationsPerYear
+        t = texp / numObservations
+
+        if isDown:
+            hAdj = H * np.exp(-0.5826 * volatility * np.sqrt(t))
+        else:
+            hAdj = H * np.exp(0.5826 * volatility * np.sqrt(t))
+
+        def payoff(s):
+            return np.maximum(phi * (s - K), 0.0)
+
+        def barrierValue(tau):
+            return bsValue(hAdj, tau, K, r, q, volatility, optionTypeValue)
+
+        s0 = np.asarray(spotFXRate, dtype=float)
+
+        if isDown:
+            isCrossed = s0 <= H
+        else:
+            isCrossed = s0 >= H
+
+        results = {'value': np.zeros(s0.shape), 'delta': np.zeros(s0.shape),
+                   'gamma': np.zeros(s0.shape), 'theta': np.zeros(s0.shape)}
+
+        # A knocked out option is worthless and a knocked in one is vanilla
+        if isKnockIn and np.any(isCrossed):
+            res = bsPDEValue(s0[isCrossed], texp, r, q, volatility, payoff,
+                             points=[K], numTimeSteps=numTimeSteps,
+                             numSpaceSteps=numSpaceSteps)
+            for key in results:
+                results[key][isCrossed] = res[key]
+
+        if np.any(~isCrossed):
+
+            # A knock-in option pays nothing unless the barrier is hit
+            if isKnockIn:
+                terminal = np.zeros_like
+                rebate = barrierValue
+            else:
+                terminal = payoff
+                rebate = 0.0
+
+            if isDown:
+                res = bsPDEValue(s0[~isCrossed], texp, r, q, volatility,
+                                 terminal, lowerBarrier=hAdj,
+                                 lowerValue=rebate, points=[K, hAdj],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+            else:
+                res = bsPDEValue(s0[~isCrossed], texp, r, q, volatility,
+                                 terminal, upperBarrier=hAdj,
+                                 upperValue=rebate, points=[K, hAdj],
+                                 numTimeSteps=numTimeSteps,
+                                 numSpaceSteps=numSpaceSteps)
+
+            for key in results:
+                results[key][~isCrossed] = res[key]
+
+        for key in results:
+            if results[key].ndim == 0:
+                results[key] = float(results[key])
+
+        return results
+
+##########################################################################
+
     def valueMC(self,
                 valuation_date,
                 spotFXRate,
@@ -241,8 +363,11 @@ class FinFXBarrierOption(FinFXOption):
                 modelParams,
                 numAnnSteps=552,
                 num_paths=5000,
-                seed=4242):
-        """ Value the FX Barrier Option using Monte Carlo. """
+                seed=4242,
+                randomCache=None):
+        """ Value the FX Barrier Option using Monte Carlo. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
         numTimeSteps = int(t * numAnnSteps)
@@ -282,7 +407,7 @@ class FinFXBarrierOption(FinFXOption):
 
         if simplePut or simpleCall:
             Sall = process.getProcess(
-                processType, t, modelParams, 1, num_paths, seed)
+                processType, t, modelParams, 1, num_paths, seed, randomCache)
 
         if simpleCall:
             sT = Sall[:, -1]
@@ -302,7 +427,8 @@ class FinFXBarrierOption(FinFXOption):
                                   modelParams,
                                   numTimeSteps,
                                   num_paths,
-                                  seed)
+                                  seed,
+                                  randomCache)
 
         (num_paths, numTimeSteps) = Sall.shape
 
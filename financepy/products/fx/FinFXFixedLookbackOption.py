@@ -172,8 +172,11 @@ class FinFXFixedLookbackOption():
                 spotFXRateMinMax: float,
                 num_paths:int = 10000,
                 num_steps_per_year: int =252,
-                seed: int =4242):
-        """ Value FX Fixed Lookback option using Monte Carlo. """
+                seed: int =4242,
+                randomCache=None):
+        """ Value FX Fixed Lookback option using Monte Carlo. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
         S0 = spotFXRate
@@ -213,7 +216,8 @@ class FinFXFixedLookbackOption():
             mu,
             S0,
             volatility,
-            seed)
+            seed,
+            randomCache)
 
         # Due to antithetics we have doubled the number of paths
         num_paths = 2 * num_paths
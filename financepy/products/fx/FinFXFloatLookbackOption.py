@@ -140,7 +140,11 @@ class FinFXFloatLookbackOption(FinFXOption):
             stockMinMax,
             num_paths=10000,
             num_steps_per_year=252,
-            seed=4242):
+            seed=4242,
+            randomCache=None):
+        """ Value FX Float Lookback option using Monte Carlo. If a
+        FinRandomDrawCache is given then the normals for the seed are taken
+        from it so that bumped revaluations reuse them. """
 
         t = (self._expiry_date - valuation_date) / gDaysInYear
         df = domesticCurve._df(t)
@@ -175,7 +179,8 @@ class FinFXFloatLookbackOption(FinFXOption):
             mu,
             stock_price,
             volatility,
-            seed)
+            seed,
+            randomCache)
 
         # Due to antithetics we have doubled the number of paths
         num_paths = 2 * num_paths
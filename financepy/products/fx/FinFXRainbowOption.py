@@ -74,7 +74,8 @@ def valueMCFast(t,
                 payoffType,
                 payoffParams,
                 num_paths=10000,
-                seed=4242):
+                seed=4242,
+                randomCache=None):
 
     np.random.seed(seed)
     df = discount_curve._df(t)
@@ -85,7 +86,8 @@ def valueMCFast(t,
 
     numTimeSteps = 2
     Sall = model.getPathsAssets(numAssets, num_paths, numTimeSteps,
-                                t, mus, stock_prices, volatilities, betas, seed)
+                                t, mus, stock_prices, volatilities, betas, seed,
+                                randomCache)
 
     payoff = payoffValue(Sall, payoffType.value, payoffParams)
     payoff = np.mean(payoff)
@@ -257,7 +259,12 @@ class FinRainbowOption(FinEquityOption):
                 volatilities,
                 betas,
                 num_paths=10000,
-                seed=4242):
+                seed=4242,
+                randomCache=None):
+        """ Monte-Carlo valuation of the rainbow option assuming the assets
+        follow correlated GBM processes. If a FinRandomDrawCache is given then
+        the normals for the seed are taken from it so that bumped revaluations
+        reuse them. """
 
         self.validate(stock_prices,
                       dividend_yields,
@@ -279,7 +286,8 @@ class FinRainbowOption(FinEquityOption):
                         self._payoffType,
                         self._payoffParams,
                         num_paths,
-                        seed)
+                        seed,
+                        randomCache)
 
         return v
 
@@ -21,7 +21,9 @@ from ...models.sabr import volFunctionSABR
 from ...models.sabr import FinModelSABR
 from ...models.black_scholes import FinModelBlackScholes
 
-from ...models.black_scholes_analytic import bsValue, bsDelta
+from ...models.black_scholes_analytic import bsValue, bsDelta, bsVega
+from ...models.black_scholes_analytic import bsImpliedVolatilityVect
+from ...models.random_draw_cache import getCachedGaussians
 
 from ...utils.helpers import check_argument_types, labelToString
 
@@ -661,8 +663,51 @@ class FinFXVanillaOption():
                           dividendCurve,
                           price):
         """ This function determines the implied volatility of an FX option
-        given a price and the other option details. It uses a one-dimensional
-        Newton root search algorith to determine the implied volatility. """
+        given a price in domestic pips and the other option details. European
+        options use the vectorised Black-Scholes solver so the spot FX rate or
+        the price can be a vector. These return NaN for any prices that do not
+        have an implied volatility. American options use a one-dimensional
+        Newton root search on the tree value. """
+
+        if self._optionType == FinOptionTypes.EUROPEAN_CALL or \
+                self._optionType == FinOptionTypes.EUROPEAN_PUT:
+
+            # The times and rates are those used by the value function
+            if type(valuation_date) == Date:
+                spotDate = valuation_date.addWeekDays(self._spotDays)
+                tdel = (self._deliveryDate - spotDate) / gDaysInYear
+                texp = (self._expiry_date - valuation_date) / gDaysInYear
+            else:
+                tdel = valuation_date
+                texp = tdel
+
+            tdel = np.maximum(tdel, 1e-10)
+            rd = -np.log(discount_curve._df(tdel)) / tdel
+            rf = -np.log(dividendCurve._df(tdel)) / tdel
+
+            s0 = np.asarray(stock_price, dtype=np.float64)
+            k = self._strikeFXRate
+            price = np.asarray(price, dtype=np.float64)
+            optionTypeValue = self._optionType.value
+
+            sigma = bsImpliedVolatilityVect(s0, texp, k, rd, rf, price,
+                                            optionTypeValue)
+
+            # The value function uses the fast approximate normal CDF so a
+            # few Newton steps make the volatility reprice the option exactly
+            for _ in range(0, 3):
+                live = np.isfinite(sigma) & (sigma > 0.0)
+                v = np.where(live, sigma, 1.0)
+                vega = bsVega(s0, texp, k, rd, rf, v, optionTypeValue)
+                diff = bsValue(s0, texp, k, rd, rf, v, optionTypeValue)
+                live = live & (vega > gSmall)
+                step = (diff - price) / np.where(live, vega, 1.0)
+                sigma = np.where(live, sigma - step, sigma)
+
+            if np.ndim(sigma) == 0:
+                return float(sigma)
+
+            return sigma
 
         argtuple = (self, valuation_date, stock_price,
                     discount_curve, dividendCurve, price)
@@ -680,12 +725,15 @@ class FinFXVanillaOption():
                 forDiscountCurve,
                 model,
                 num_paths=10000,
-                seed=4242):
+                seed=4242,
+                randomCache=None):
         """ Calculate the value of an FX Option using Monte Carlo methods.
         This function can be used to validate the risk measures calculated
         above or used as the starting code for a model exotic FX product that
         cannot be priced analytically. This function uses Numpy vectorisation
-        for speed of execution."""
+        for speed of execution. If a FinRandomDrawCache is given then the
+        normals for the seed are taken from it so that bumped revaluations
+        reuse them. """
 
         if isinstance(model, FinModelBlackScholes):
             volatility = model._volatility
@@ -707,7 +755,11 @@ class FinFXVanillaOption():
         sqrt_dt = np.sqrt(t)
 
         # Use Antithetic variables
-        g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        if randomCache is None:
+            g = np.random.normal(0.0, 1.0, size=(1, num_paths))
+        else:
+            g = getCachedGaussians(randomCache, seed, num_paths, 1, 1)
+            g = g.reshape((1, num_paths))
         s = spotFXRate * np.exp((mu - v2 / 2.0) * t)
         m = np.exp(g * sqrt_dt * volatility)
         s_1 = s * m
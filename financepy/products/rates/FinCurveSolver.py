@@ -0,0 +1,463 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from ...utils.FinError import FinError
+from ...utils.date_vector import DateVector
+from ...utils.day_count import DayCount
+from ...utils.helpers import labelToString
+from ...utils.global_vars import gDaysInYear
+from ...utils.global_types import FinSwapTypes
+from ...market.discount.interpolator import _interpolateSensitivities
+from ...market.discount.interpolator import FinInterpTypes, FinInterpolator
+
+# These interpolation schemes only depend on the neighbouring grid points so
+# the curve can be bootstrapped one instrument at a time
+gLocalInterpTypes = (FinInterpTypes.FLAT_FWD_RATES,
+                     FinInterpTypes.LINEAR_ZERO_RATES,
+                     FinInterpTypes.LINEAR_FWD_RATES)
+
+###############################################################################
+# The curve instruments are written per unit notional in the general form
+#
+#   c + sum a D(t) + sum w D(s) D(p) / D(e)
+#
+# where D is the discount function of the curve being built. The constant c
+# and the weights w hold any discounting done on a separate discount curve.
+# When there is no payment time p in the ratio we set p = 0 as D(0) = 1. The
+# terms are returned as (c, flowTimes, flowAmounts, startTimes, endTimes,
+# payTimes, weights).
+###############################################################################
+
+
+def _yearTimes(dates, valuation_date):
+    """ Curve times of a list of dates using the convention of the curves. """
+    return (DateVector(dates) - valuation_date) / gDaysInYear
+
+###############################################################################
+
+
+def _depositTerms(depo, valuation_date):
+    """ A deposit reprices if D(start) - (1 + acc * r) D(end) is zero. """
+
+    tset = (depo._start_date - valuation_date) / gDaysInYear
+    tmat = (depo._maturity_date - valuation_date) / gDaysInYear
+
+    flowTimes = np.array([tset, tmat])
+    flowAmounts = np.array([1.0, -1.0 / depo._maturityDf()])
+    noFixings = np.zeros(0)
+
+    return (0.0, flowTimes, flowAmounts,
+            noFixings, noFixings, noFixings, noFixings)
+
+###############################################################################
+
+
+def _fraTerms(fra, valuation_date, discount_curve=None):
+    """ A FRA per unit notional is worth (D(s) / D(e) - 1 - acc * K) P(e)
+    where P is the discount curve. On a single curve this is just the pair of
+    flows D(s) - (1 + acc * K) D(e). """
+
+    dc = DayCount(fra._day_count_type)
+    acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+    tset = (fra._start_date - valuation_date) / gDaysInYear
+    tmat = (fra._maturity_date - valuation_date) / gDaysInYear
+    noFixings = np.zeros(0)
+
+    if discount_curve is None:
+        flowTimes = np.array([tset, tmat])
+        flowAmounts = np.array([1.0, -(1.0 + acc_factor * fra._fraRate)])
+        return (0.0, flowTimes, flowAmounts,
+                noFixings, noFixings, noFixings, noFixings)
+
+    dfPay = discount_curve.df(fra._maturity_date) / \
+        discount_curve.df(valuation_date)
+
+    constant = -(1.0 + acc_factor * fra._fraRate) * dfPay
+
+    return (constant, noFixings, noFixings,
+            np.array([tset]), np.array([tmat]), np.zeros(1),
+            np.array([dfPay]))
+
+###############################################################################
+
+
+def _swapTerms(swap, valuation_date, discount_curve=None):
+    """ Precompute the payment times, accrual factors and amounts of both
+    legs of a swap per unit notional. Each Ibor fixing is paid as
+    (D(start) / D(end) - 1 + spread * alpha) P(pay) so it splits into a fixed
+    flow and a ratio of discount factors. If there is no separate discount
+    curve then P = D and the fixed flows are flows on the curve being built,
+    otherwise they are discounted now and only the ratio depends on D. """
+
+    fixed_leg = swap._fixed_leg
+    fixedSign = -1.0 if fixed_leg._leg_type == FinSwapTypes.PAY else 1.0
+    notional = fixed_leg._notional
+
+    fixedDates = DateVector(fixed_leg._payment_dates)
+    fixedTimes = (fixedDates - valuation_date) / gDaysInYear
+    fixedAmounts = fixedSign * np.array(fixed_leg._payments) / notional
+    fixedAmounts[-1] += fixedSign * fixed_leg._principal
+    fixedLive = fixedTimes > 0.0
+
+    floatLeg = swap._floatLeg
+    floatSign = -1.0 if floatLeg._leg_type == FinSwapTypes.PAY else 1.0
+    weight = floatSign * floatLeg._notional / notional
+
+    payDates = DateVector(floatLeg._payment_dates)
+    payTimes = (payDates - valuation_date) / gDaysInYear
+    startTimes = _yearTimes(floatLeg._startAccruedDates, valuation_date)
+    endTimes = _yearTimes(floatLeg._endAccruedDates, valuation_date)
+    alphas = np.array(floatLeg._year_fracs)
+    floatAmounts = weight * (floatLeg._spread * alphas - 1.0)
+    floatAmounts[-1] += weight * floatLeg._principal
+    live = payTimes > 0.0
+
+    if discount_curve is None:
+        flowTimes = np.concatenate((fixedTimes[fixedLive], payTimes[live]))
+        flowAmounts = np.concatenate((fixedAmounts[fixedLive],
+                                      floatAmounts[live]))
+        weights = np.full(np.count_nonzero(live), weight)
+        return (0.0, flowTimes, flowAmounts,
+                startTimes[live], endTimes[live], payTimes[live], weights)
+
+    dfValue = discount_curve.df(valuation_date)
+    fixedDfs = discount_curve.dfVector(fixedDates[fixedLive]) / dfValue
+    floatDfs = discount_curve.dfVector(payDates[live]) / dfValue
+
+    constant = np.sum(fixedAmounts[fixedLive] * fixedDfs) + \
+        np.sum(floatAmounts[live] * floatDfs)
+
+    noFlows = np.zeros(0)
+    return (constant, noFlows, noFlows,
+            startTimes[live], endTimes[live], np.zeros(len(floatDfs)),
+            weight * floatDfs)
+
+###############################################################################
+
+
+def _curveInstrumentTerms(curve, discount_curve=None):
+    """ Return the grid times of a curve built from its used deposits, FRAs
+    and swaps together with the terms of each of these instruments. There is
+    one grid point at the maturity of each instrument after time zero. """
+
+    valuation_date = curve._valuation_date
+    gridTimes = [0.0]
+    terms = []
+
+    for depo in curve._usedDeposits:
+        tmat = (depo._maturity_date - valuation_date) / gDaysInYear
+        gridTimes.append(tmat)
+        terms.append(_depositTerms(depo, valuation_date))
+
+    for fra in curve._usedFRAs:
+        tmat = (fra._maturity_date - valuation_date) / gDaysInYear
+        gridTimes.append(tmat)
+        terms.append(_fraTerms(fra, valuation_date, discount_curve))
+
+    for swap in curve._usedSwaps:
+        maturity_date = swap._fixed_leg._payment_dates[-1]
+        tmat = (maturity_date - valuation_date) / gDaysInYear
+        gridTimes.append(tmat)
+        terms.append(_swapTerms(swap, valuation_date, discount_curve))
+
+    return np.array(gridTimes), terms
+
+###############################################################################
+
+
+class CurveSolverReport():
+    """ Records how a global curve fit converged so that it can be inspected
+    after the curve has been built without anything being printed. """
+
+    def __init__(self,
+                 method: str,
+                 numIterations: int,
+                 numFunctionEvaluations: int,
+                 converged: bool,
+                 residuals: np.ndarray,
+                 costHistory: list):
+        """ Create the report from the final state of the solver. """
+
+        self._method = method
+        self._numIterations = numIterations
+        self._numFunctionEvaluations = numFunctionEvaluations
+        self._converged = converged
+        self._residuals = residuals
+        self._maxResidual = np.max(np.abs(residuals)) if len(residuals) else 0.0
+        self._costHistory = costHistory
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("METHOD", self._method)
+        s += labelToString("CONVERGED", self._converged)
+        s += labelToString("NUM ITERATIONS", self._numIterations)
+        s += labelToString("NUM FUNCTION EVALS", self._numFunctionEvaluations)
+        s += labelToString("MAX RESIDUAL", self._maxResidual)
+        s += labelToString("FINAL COST", self._costHistory[-1], "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        """ Simple print function for backward compatibility. """
+        print(self)
+
+###############################################################################
+
+
+class _CurveSystem():
+    """ The curve instruments stacked into one set of arrays so that all of
+    their values and their Jacobian with respect to the grid discount factors
+    come from a single call to the interpolator. Each instrument only touches
+    a few grid points so the maps from flows to instruments are sparse. """
+
+    def __init__(self, terms, interp_type):
+
+        numInstruments = len(terms)
+
+        constants = np.array([term[0] for term in terms])
+        flowIndex = np.concatenate([np.full(len(term[1]), i)
+                                    for i, term in enumerate(terms)])
+        ratioIndex = np.concatenate([np.full(len(term[3]), i)
+                                     for i, term in enumerate(terms)])
+
+        flowTimes = np.concatenate([term[1] for term in terms])
+        flowAmounts = np.concatenate([term[2] for term in terms])
+        startTimes = np.concatenate([term[3] for term in terms])
+        endTimes = np.concatenate([term[4] for term in terms])
+        payTimes = np.concatenate([term[5] for term in terms])
+        weights = np.concatenate([term[6] for term in terms])
+
+        allTimes = np.concatenate((flowTimes, startTimes, endTimes, payTimes))
+        self._times, inverse = np.unique(allTimes, return_inverse=True)
+
+        numFlows = len(flowTimes)
+        numRatios = len(startTimes)
+        self._flowPos = inverse[0:numFlows]
+        self._startPos = inverse[numFlows:numFlows + numRatios]
+        self._endPos = inverse[numFlows + numRatios:numFlows + 2 * numRatios]
+        self._payPos = inverse[numFlows + 2 * numRatios:]
+
+        shape = (numInstruments, numFlows)
+        self._flowMap = csr_matrix((flowAmounts,
+                                    (flowIndex, np.arange(numFlows))),
+                                   shape=shape)
+
+        shape = (numInstruments, numRatios)
+        self._ratioMap = csr_matrix((weights,
+                                     (ratioIndex, np.arange(numRatios))),
+                                    shape=shape)
+
+        self._constants = constants
+        self._interp_type = interp_type
+
+###############################################################################
+
+    def evaluate(self, gridTimes, gridDfs):
+        """ Return the instrument values and their derivatives with respect
+        to all of the grid discount factors. """
+
+        df, dfSens = _interpolateSensitivities(self._times, gridTimes,
+                                               gridDfs, self._interp_type)
+
+        values = self._constants + self._flowMap @ df[self._flowPos]
+        jacobian = self._flowMap @ dfSens[self._flowPos]
+
+        if self._ratioMap.shape[1] > 0:
+            dfS = df[self._startPos]
+            dfE = df[self._endPos]
+            dfP = df[self._payPos]
+            u = dfS * dfP / dfE
+            du = dfSens[self._startPos] / dfS[:, None] + \
+                dfSens[self._payPos] / dfP[:, None] - \
+                dfSens[self._endPos] / dfE[:, None]
+            values = values + self._ratioMap @ u
+            jacobian = jacobian + self._ratioMap @ (u[:, None] * du)
+
+        return values, jacobian
+
+###############################################################################
+
+
+def _solveCurveGlobal(curve, gridTimes, terms, tol, maxIterations=50):
+    """ Solve for all of the grid discount factors of the curve at the same
+    time so that every instrument reprices. The first grid point is at time
+    zero and has a discount factor of 1. Gauss-Newton steps are taken on the
+    square system and if a step fails to reduce the sum of squared values we
+    switch to Levenberg-Marquardt damping which is relaxed again as the fit
+    improves. The curve is left fitted to the solution and the convergence
+    report is returned. """
+
+    system = _CurveSystem(terms, curve._interp_type)
+
+    gridDfs = np.ones(len(gridTimes))
+    values, jacobian = system.evaluate(gridTimes, gridDfs)
+    cost = 0.5 * np.dot(values, values)
+    costHistory = [cost]
+
+    method = "GAUSS_NEWTON"
+    numEvaluations = 1
+    damping = 0.0
+    iteration = 0
+    converged = bool(np.max(np.abs(values)) < tol)
+
+    while converged is False and iteration < maxIterations:
+
+        iteration += 1
+        J = jacobian[:, 1:]
+        accepted = False
+
+        while accepted is False:
+
+            if damping == 0.0:
+                step = np.linalg.lstsq(J, -values, rcond=None)[0]
+            else:
+                scale = np.sqrt(damping) * np.linalg.norm(J, axis=0)
+                A = np.vstack((J, np.diag(scale)))
+                b = np.concatenate((-values, np.zeros(len(scale))))
+                step = np.linalg.lstsq(A, b, rcond=None)[0]
+
+            newDfs = gridDfs.copy()
+            newDfs[1:] += step
+
+            if np.all(newDfs[1:] > 0.0):
+                newValues, newJacobian = system.evaluate(gridTimes, newDfs)
+                numEvaluations += 1
+                newCost = 0.5 * np.dot(newValues, newValues)
+
+                if newCost < cost:
+                    accepted = True
+                    gridDfs = newDfs
+                    values = newValues
+                    jacobian = newJacobian
+                    cost = newCost
+                    costHistory.append(cost)
+                    damping = damping / 10.0 if damping > 1e-8 else 0.0
+                    break
+
+            if damping > 1e10:
+                break
+
+            method = "LEVENBERG_MARQUARDT"
+            damping = max(10.0 * damping, 1e-4)
+
+        if accepted is False:
+            break
+
+        converged = bool(np.max(np.abs(values)) < tol)
+
+    curve._times = gridTimes
+    curve._dfs = gridDfs
+    curve._interpolator.fit(curve._times, curve._dfs)
+
+    return CurveSolverReport(method, iteration, numEvaluations,
+                             converged, values, costHistory)
+
+###############################################################################
+
+
+def _buildCurveUsingGlobalSolver(curve, tol, discount_curve=None):
+    """ Construct a deposit, FRA and swap curve by solving for all of its grid
+    discount factors at once with Gauss-Newton steps that fall back to
+    Levenberg-Marquardt. This is needed for the spline schemes as moving one
+    grid point changes the whole curve. If a discount curve is given then it
+    discounts the instrument flows. The convergence details are kept in the
+    solver report of the curve. """
+
+    curve._interpolator = FinInterpolator(curve._interp_type)
+    gridTimes, terms = _curveInstrumentTerms(curve, discount_curve)
+    curve._solverReport = _solveCurveGlobal(curve, gridTimes, terms, tol)
+
+    if curve._solverReport._converged is False:
+        raise FinError("Global curve solver failed to converge.")
+
+    if curve._checkRefit is True:
+        curve._checkRefits(1e-10, tol, 1e-5)
+
+###############################################################################
+
+
+def _quoteDerivatives(curve, discount_curve=None):
+    """ Return the derivative of the value per unit notional of each of the
+    instruments of the curve with respect to its own market quote. An
+    instrument does not depend on the quotes of the other instruments. """
+
+    valuation_date = curve._valuation_date
+    derivatives = []
+
+    for depo in curve._usedDeposits:
+        dc = DayCount(depo._day_count_type)
+        acc_factor = dc.year_frac(depo._start_date, depo._maturity_date)[0]
+        derivatives.append(-acc_factor * curve.df(depo._maturity_date))
+
+    payCurve = curve if discount_curve is None else discount_curve
+    dfValue = payCurve.df(valuation_date)
+
+    for fra in curve._usedFRAs:
+        dc = DayCount(fra._day_count_type)
+        acc_factor = dc.year_frac(fra._start_date, fra._maturity_date)[0]
+        dfPay = payCurve.df(fra._maturity_date) / dfValue
+        derivatives.append(-acc_factor * dfPay)
+
+    for swap in curve._usedSwaps:
+        fixed_leg = swap._fixed_leg
+        fixedSign = -1.0 if fixed_leg._leg_type == FinSwapTypes.PAY else 1.0
+        fixedDates = DateVector(fixed_leg._payment_dates)
+        live = fixedDates > valuation_date
+        dfPay = payCurve.dfVector(fixedDates[live]) / dfValue
+        yearFracs = np.array(fixed_leg._year_fracs)[live]
+        derivatives.append(fixedSign * np.sum(yearFracs * dfPay))
+
+    return np.array(derivatives)
+
+###############################################################################
+
+
+def _curveQuoteJacobian(curve, discount_curve=None):
+    """ Return the derivatives of the grid discount factors of a curve with
+    respect to the market quotes of its deposits, FRAs and swaps. At the
+    solution every instrument has a zero value so by the implicit function
+    theorem the Jacobian is -inv(dV/dDfs) dV/dQuotes. This needs only the
+    Jacobian of the fitted curve and one linear solve. The first grid point is
+    fixed at time zero and so has a zero row. """
+
+    gridTimes, terms = _curveInstrumentTerms(curve, discount_curve)
+
+    if len(gridTimes) != len(curve._times) or \
+            np.any(np.abs(gridTimes - curve._times) > 1e-12):
+        raise FinError("Curve grid does not match the instrument maturities.")
+
+    system = _CurveSystem(terms, curve._interp_type)
+    _, jacobian = system.evaluate(curve._times, curve._dfs)
+    quoteDerivatives = _quoteDerivatives(curve, discount_curve)
+
+    dfJacobian = np.zeros((len(curve._times), len(quoteDerivatives)))
+    dfJacobian[1:] = -np.linalg.solve(jacobian[:, 1:],
+                                      np.diag(quoteDerivatives))
+    return dfJacobian
+
+###############################################################################
+
+
+def _swapBucketedPV01(swap, valuation_date, curve, bump=0.0001):
+    """ Change in the value of a swap that is discounted and projected on one
+    curve for a bump in each of the market quotes that built the curve. This
+    needs one valuation and a multiplication by the curve Jacobian. """
+
+    if valuation_date != curve._valuation_date:
+        raise FinError("Bucketed PV01 is computed on the curve valuation date")
+
+    terms = _swapTerms(swap, valuation_date)
+    system = _CurveSystem([terms], curve._interp_type)
+    _, jacobian = system.evaluate(curve._times, curve._dfs)
+
+    dValue = jacobian[0] @ curve.curveJacobian()
+    return dValue * swap._fixed_leg._notional * bump
+
+###############################################################################
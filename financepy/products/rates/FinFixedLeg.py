@@ -2,20 +2,63 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.FinError import FinError
 from ...utils.date import Date
+from ...utils.date_vector import DateVector
 from ...utils.math import ONE_MILLION
-from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
-from ...utils.schedule import Schedule
+from ...utils.schedule import cachedAccrualTable
 from ...utils.helpers import labelToString, check_argument_types
 from ...utils.global_types import FinSwapTypes
 from ...market.discount.curve import DiscountCurve
 
 ##########################################################################
 
+
+def _curveDiscountFactors(curve, excelDates):
+    """ Return the discount factors at an array of whole day excel dates.
+    Curves that are not a DiscountCurve may not have the dfVector fast path
+    and so are given a list of Dates. """
+
+    if hasattr(curve, "dfVector"):
+        return curve.dfVector(excelDates)
+
+    if len(excelDates) == 0:
+        return np.zeros(0)
+
+    dates = DateVector(excelDates).toDates()
+    return np.atleast_1d(np.asarray(curve.df(dates), dtype=np.float64))
+
+##########################################################################
+
+
+def _batchDiscountFactors(curve, valuation_date, excelDates):
+    """ Return the discount factor at the valuation date and the discount
+    factors at an array of whole day excel dates. When the valuation date is
+    a whole day they are all found in a single call to the curve. """
+
+    valueDate = valuation_date._excelDate
+
+    if valueDate == int(valueDate):
+        dates = np.concatenate((np.array([valueDate], dtype=np.int64),
+                                excelDates))
+        dfs = _curveDiscountFactors(curve, dates)
+        return dfs[0], dfs[1:]
+
+    dfValue = curve.df(valuation_date)
+
+    if len(excelDates) == 0:
+        return dfValue, np.zeros(0)
+
+    return dfValue, _curveDiscountFactors(curve, excelDates)
+
+##########################################################################
+
 class FinFixedLeg(object):
     """ Class for managing the fixed leg of a swap. A fixed leg is a leg with
     a sequence of flows calculated according to an ISDA schedule and with a 
@@ -74,6 +117,9 @@ class FinFixedLeg(object):
         self._year_fracs = []
         self._accrued_days = []
         self._rates = []
+        self._paymentDfs = []
+        self._paymentPVs = []
+        self._lastValuation = None
 
         self.generatePayments()
 
@@ -87,105 +133,104 @@ class FinFixedLeg(object):
         # Nothing is paid on the swap effective date and so the first payment
         # date is the first actual payment date
 
-        schedule = Schedule(self._effective_date,
-                            self._termination_date,
-                            self._freq_type,
-                            self._calendar_type,
-                            self._bus_day_adjust_type,
-                            self._date_gen_rule_type)
-
-        scheduleDates = schedule._adjusted_dates
-
-        if len(scheduleDates) < 2:
-            raise FinError("Schedule has none or only one date")
+        # The accrual table is shared by all legs with the same terms and
+        # holds the dates as DateVectors and the year fractions as arrays
+        table = cachedAccrualTable(self._effective_date,
+                                   self._termination_date,
+                                   self._freq_type,
+                                   self._calendar_type,
+                                   self._bus_day_adjust_type,
+                                   self._date_gen_rule_type,
+                                   self._day_count_type,
+                                   self._payment_lag)
 
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._year_fracs = []
-        self._accrued_days = []
-        self._rates = []
+        self._startAccruedDates = list(table._startAccruedDates)
+        self._endAccruedDates = list(table._endAccruedDates)
+        self._payment_dates = list(table._payment_dates)
+        self._year_fracs = list(table._year_fracs)
+        self._accrued_days = list(table._accrued_days)
 
-        prevDt = scheduleDates[0] 
-        
-        day_counter = DayCount(self._day_count_type)
-        calendar = Calendar(self._calendar_type)
+        self._startAccruedDateVector = table._startAccruedDateVector
+        self._endAccruedDateVector = table._endAccruedDateVector
+        self._paymentDateVector = table._paymentDateVector
+        self._yearFracArray = table._yearFracArray
 
-        for nextDt in scheduleDates[1:]:
+        self._rates = [self._coupon] * len(table)
 
-            self._startAccruedDates.append(prevDt)
-            self._endAccruedDates.append(nextDt)
+        self._payments = [year_frac * self._notional * self._coupon
+                          for year_frac in self._year_fracs]
 
-            if self._payment_lag == 0:
-                payment_date = nextDt
-            else:
-                payment_date = calendar.addBusinessDays(nextDt,
-                                                       self._payment_lag)
-
-            self._payment_dates.append(payment_date)
-
-            (year_frac, num, den) = day_counter.year_frac(prevDt,
-                                                       nextDt)
-
-            self._rates.append(self._coupon)
-
-            payment = year_frac * self._notional * self._coupon
-
-            self._payments.append(payment)
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
-
-            prevDt = nextDt
+        self._paymentArray = np.array(self._payments)
 
 ###############################################################################
 
     def value(self,
               valuation_date: Date,
               discount_curve: DiscountCurve):
+        """ Value the fixed leg as of the valuation date. The discount factors
+        for all of the future payment dates are found in one call to the
+        curve and the flows are valued using Numpy. Only the curve and the
+        date are kept and printValuation values the flows from them. """
+
+        (live, liveDfs) = self._liveDiscountFactors(valuation_date,
+                                                    discount_curve)
 
+        legPV = float(np.sum(self._paymentArray[live] * liveDfs))
+
+        if live[-1]:
+            legPV += self._principal * liveDfs[-1] * self._notional
+
+        self._lastValuation = (valuation_date, discount_curve)
         self._paymentDfs = []
         self._paymentPVs = []
-        self._cumulativePVs = []
-                
-        notional = self._notional
-        dfValue = discount_curve.df(valuation_date)
-        legPV = 0.0
-        numPayments = len(self._payment_dates)
-
-        dfPmnt = 0.0
-
-        for iPmnt in range(0, numPayments):
- 
-            pmntDate = self._payment_dates[iPmnt]
-            pmntAmount= self._payments[iPmnt]
-
-            if pmntDate > valuation_date:
-
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
-                
-                self._paymentDfs.append(dfPmnt)            
-                self._paymentPVs.append(pmntAmount*dfPmnt)
-                self._cumulativePVs.append(legPV)
-
-            else:
-
-                self._paymentDfs.append(0.0)            
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(0.0)
-
-        if pmntDate > valuation_date:
-            paymentPV = self._principal * dfPmnt * notional
-            self._paymentPVs[-1] += paymentPV
-            legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
 
         if self._leg_type == FinSwapTypes.PAY:
             legPV = legPV * (-1.0)
 
         return legPV
 
+###############################################################################
+
+    def _liveDiscountFactors(self,
+                             valuation_date: Date,
+                             discount_curve: DiscountCurve):
+        """ Return a mask of the payments after the valuation date and their
+        discount factors to the valuation date. """
+
+        paymentDates = self._paymentDateVector._excelDate
+        live = paymentDates > valuation_date._excelDate
+
+        dfValue, dfs = _batchDiscountFactors(discount_curve,
+                                             valuation_date,
+                                             paymentDates[live])
+
+        return live, dfs / dfValue
+
+###############################################################################
+
+    def _valueFlows(self):
+        """ Fill the payment discount factors and present values of the last
+        valuation for printValuation. Payments on or before the valuation
+        date have zero discount factor and present value. """
+
+        if self._lastValuation is None:
+            return
+
+        (valuation_date, discount_curve) = self._lastValuation
+        (live, liveDfs) = self._liveDiscountFactors(valuation_date,
+                                                    discount_curve)
+
+        paymentDfs = np.zeros(len(self._payment_dates))
+        paymentDfs[live] = liveDfs
+        paymentPVs = self._paymentArray * paymentDfs
+
+        if live[-1]:
+            paymentPVs[-1] += self._principal * paymentDfs[-1] * \
+                self._notional
+
+        self._paymentDfs = paymentDfs
+        self._paymentPVs = paymentPVs
+
 ##########################################################################
 
     def printPayments(self):
@@ -232,10 +277,14 @@ class FinFixedLeg(object):
         print("FREQUENCY:", str(self._freq_type))
         print("DAY COUNT:", str(self._day_count_type))
 
-        if len(self._payments) == 0:
+        self._valueFlows()
+
+        if len(self._paymentPVs) == 0:
             print("Payments not calculated.")
             return
 
+        cumulativePVs = np.cumsum(self._paymentPVs)
+
         header = "PAY_DATE     ACCR_START   ACCR_END     DAYS  YEARFRAC"
         header += "    RATE      PAYMENT       DF          PV        CUM PV"
         print(header)
@@ -253,7 +302,7 @@ class FinFixedLeg(object):
                    self._payments[iFlow], 
                    self._paymentDfs[iFlow],
                    self._paymentPVs[iFlow],
-                   self._cumulativePVs[iFlow]))
+                   cumulativePVs[iFlow]))
 
 ##########################################################################
 
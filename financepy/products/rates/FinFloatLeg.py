@@ -2,17 +2,21 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+
 from ...utils.FinError import FinError
 from ...utils.date import Date
 from ...utils.math import ONE_MILLION
-from ...utils.day_count import DayCount, DayCountTypes
+from ...utils.day_count import DayCountTypes
 from ...utils.frequency import FrequencyTypes
 from ...utils.calendar import CalendarTypes,  DateGenRuleTypes
 from ...utils.calendar import Calendar, BusDayAdjustTypes
-from ...utils.schedule import Schedule
+from ...utils.schedule import cachedAccrualTable
 from ...utils.helpers import labelToString, check_argument_types
 from ...utils.global_types import FinSwapTypes
 from ...market.discount.curve import DiscountCurve
+from .FinFixedLeg import _batchDiscountFactors
+from .FinFixedLeg import _curveDiscountFactors
 
 ##########################################################################
 
@@ -72,6 +76,10 @@ class FinFloatLeg(object):
         self._payments = []
         self._year_fracs = []
         self._accrued_days = []
+        self._rates = []
+        self._paymentDfs = []
+        self._paymentPVs = []
+        self._lastValuation = None
 
         self.generatePaymentDates()
 
@@ -81,48 +89,27 @@ class FinFloatLeg(object):
         """ Generate the floating leg payment dates and accrual factors. The
         coupons cannot be generated yet as we do not have the index curve. """
 
-        scheduleDates = Schedule(self._effective_date,
-                                 self._termination_date,
-                                 self._freq_type,
-                                 self._calendar_type,
-                                 self._bus_day_adjust_type,
-                                 self._date_gen_rule_type)._generate()
-
-        if len(scheduleDates) < 2:
-            raise FinError("Schedule has none or only one date")
-
-        self._startAccruedDates = []
-        self._endAccruedDates = []
-        self._payment_dates = []
-        self._year_fracs = []
-        self._accrued_days = []
-
-        prevDt = scheduleDates[0]
-
-        day_counter = DayCount(self._day_count_type)
-        calendar = Calendar(self._calendar_type)
-
-        # All of the lists end up with the same length
-        for nextDt in scheduleDates[1:]:
-
-            self._startAccruedDates.append(prevDt)
-            self._endAccruedDates.append(nextDt)
-
-            if self._payment_lag == 0:
-                payment_date = nextDt
-            else:
-                payment_date = calendar.addBusinessDays(nextDt,
-                                                       self._payment_lag)
-
-            self._payment_dates.append(payment_date)
-
-            (year_frac, num, _) = day_counter.year_frac(prevDt,
-                                                     nextDt)        
-            
-            self._year_fracs.append(year_frac)
-            self._accrued_days.append(num)
-
-            prevDt = nextDt
+        # The accrual table is shared by all legs with the same terms and
+        # holds the dates as DateVectors and the year fractions as arrays
+        table = cachedAccrualTable(self._effective_date,
+                                   self._termination_date,
+                                   self._freq_type,
+                                   self._calendar_type,
+                                   self._bus_day_adjust_type,
+                                   self._date_gen_rule_type,
+                                   self._day_count_type,
+                                   self._payment_lag)
+
+        self._startAccruedDates = list(table._startAccruedDates)
+        self._endAccruedDates = list(table._endAccruedDates)
+        self._payment_dates = list(table._payment_dates)
+        self._year_fracs = list(table._year_fracs)
+        self._accrued_days = list(table._accrued_days)
+
+        self._startAccruedDateVector = table._startAccruedDateVector
+        self._endAccruedDateVector = table._endAccruedDateVector
+        self._paymentDateVector = table._paymentDateVector
+        self._yearFracArray = table._yearFracArray
 
 ###############################################################################
 
@@ -134,7 +121,9 @@ class FinFloatLeg(object):
         """ Value the floating leg with payments from an index curve and
         discounting based on a supplied discount curve as of the valuation date
         supplied. For an existing swap, the user must enter the next fixing
-        coupon. """
+        coupon. The discount factors are found in a single call to each curve
+        and the flows are valued using Numpy. Only the curves, the date and
+        the fixing are kept and printValuation values the flows from them. """
 
         if discount_curve is None:
             raise FinError("Discount curve is None")
@@ -142,69 +131,119 @@ class FinFloatLeg(object):
         if index_curve is None:
             index_curve = discount_curve
 
+        (live, rates, payments, liveDfs) = \
+            self._liveFlows(valuation_date, discount_curve, index_curve,
+                            firstFixingRate)
+
+        legPV = float(np.sum(payments * liveDfs))
+
+        if live[-1]:
+            legPV += self._principal * liveDfs[-1] * self._notional
+
+        self._lastValuation = (valuation_date, discount_curve, index_curve,
+                               firstFixingRate)
         self._rates = []
-        self._payments = []        
+        self._payments = []
         self._paymentDfs = []
         self._paymentPVs = []
-        self._cumulativePVs = []
 
-        notional = self._notional
-        dfValue = discount_curve.df(valuation_date)
-        legPV = 0.0
-        numPayments = len(self._payment_dates)
-        firstPayment = False
+        if self._leg_type == FinSwapTypes.PAY:
+            legPV = legPV * (-1.0)
 
-        for iPmnt in range(0, numPayments):
+        return legPV
 
-            pmntDate = self._payment_dates[iPmnt]
-            
-            if pmntDate > valuation_date:
+###############################################################################
 
-                startAccruedDt = self._startAccruedDates[iPmnt]
-                endAccruedDt = self._endAccruedDates[iPmnt]
-                alpha = self._year_fracs[iPmnt]
+    def _liveFlows(self,
+                   valuation_date: Date,
+                   discount_curve: DiscountCurve,
+                   index_curve: DiscountCurve,
+                   firstFixingRate: float):
+        """ Return a mask of the payments after the valuation date and their
+        rates, payment amounts and discount factors to the valuation date. """
 
-                if firstPayment is False and firstFixingRate is not None:
+        paymentDates = self._paymentDateVector._excelDate
+        live = paymentDates > valuation_date._excelDate
+        numLive = int(np.sum(live))
 
-                    fwd_rate = firstFixingRate
-                    firstPayment = True
+        alphas = self._yearFracArray[live]
 
-                else:
-                    
-                    dfStart = index_curve.df(startAccruedDt)
-                    dfEnd = index_curve.df(endAccruedDt)
-                    fwd_rate = (dfStart / dfEnd - 1.0) / alpha
+        # The first live period uses the fixing if it has been supplied so
+        # the index curve is only needed for the periods that follow it
+        if firstFixingRate is not None and numLive > 0:
+            numFixed = 1
+        else:
+            numFixed = 0
+
+        numFwds = numLive - numFixed
+        startDates = self._startAccruedDateVector._excelDate[live][numFixed:]
+        endDates = self._endAccruedDateVector._excelDate[live][numFixed:]
+
+        # All of the curve lookups are done in one call per curve
+        if index_curve is discount_curve:
+            dates = np.concatenate((startDates, endDates, paymentDates[live]))
+            dfValue, dfs = _batchDiscountFactors(discount_curve,
+                                                 valuation_date,
+                                                 dates)
+            dfStart = dfs[:numFwds]
+            dfEnd = dfs[numFwds:2*numFwds]
+            dfPmnt = dfs[2*numFwds:]
+        else:
+            dfValue, dfPmnt = _batchDiscountFactors(discount_curve,
+                                                    valuation_date,
+                                                    paymentDates[live])
+            if numFwds > 0:
+                dates = np.concatenate((startDates, endDates))
+                dfs = _curveDiscountFactors(index_curve, dates)
+            else:
+                dfs = np.zeros(0)
 
-                pmntAmount = (fwd_rate + self._spread) * alpha * notional
+            dfStart = dfs[:numFwds]
+            dfEnd = dfs[numFwds:]
 
-                dfPmnt = discount_curve.df(pmntDate) / dfValue
-                pmntPV = pmntAmount * dfPmnt
-                legPV += pmntPV
+        fwdRates = np.empty(numLive)
+        fwdRates[numFixed:] = (dfStart / dfEnd - 1.0) / alphas[numFixed:]
 
-                self._rates.append(fwd_rate)
-                self._payments.append(pmntAmount)
-                self._paymentDfs.append(dfPmnt)
-                self._paymentPVs.append(pmntPV)
-                self._cumulativePVs.append(legPV)
+        if numFixed > 0:
+            fwdRates[0] = firstFixingRate
 
-            else:
+        payments = (fwdRates + self._spread) * alphas * self._notional
 
-                self._rates.append(0.0)
-                self._payments.append(0.0)
-                self._paymentDfs.append(0.0)
-                self._paymentPVs.append(0.0)
-                self._cumulativePVs.append(legPV)
+        return live, fwdRates, payments, dfPmnt / dfValue
 
-        if pmntDate > valuation_date:
-            paymentPV = self._principal * dfPmnt * notional
-            self._paymentPVs[-1] += paymentPV
-            legPV += paymentPV
-            self._cumulativePVs[-1] = legPV
+###############################################################################
 
-        if self._leg_type == FinSwapTypes.PAY:
-            legPV = legPV * (-1.0)
+    def _valueFlows(self):
+        """ Fill the rates, payments, discount factors and present values of
+        the last valuation for printValuation. Payments on or before the
+        valuation date have zero rate, payment and present value. """
 
-        return legPV
+        if self._lastValuation is None:
+            return
+
+        (live, liveRates, livePayments, liveDfs) = \
+            self._liveFlows(*self._lastValuation)
+
+        numPayments = len(self._payment_dates)
+
+        rates = np.zeros(numPayments)
+        rates[live] = liveRates
+
+        payments = np.zeros(numPayments)
+        payments[live] = livePayments
+
+        paymentDfs = np.zeros(numPayments)
+        paymentDfs[live] = liveDfs
+        paymentPVs = payments * paymentDfs
+
+        if live[-1]:
+            paymentPVs[-1] += self._principal * paymentDfs[-1] * \
+                self._notional
+
+        self._rates = rates
+        self._payments = payments
+        self._paymentDfs = paymentDfs
+        self._paymentPVs = paymentPVs
 
 ##########################################################################
 
@@ -249,10 +288,14 @@ class FinFloatLeg(object):
         print("FREQUENCY:", str(self._freq_type))
         print("DAY COUNT:", str(self._day_count_type))
 
+        self._valueFlows()
+
         if len(self._payments) == 0:
             print("Payments not calculated.")
             return
 
+        cumulativePVs = np.cumsum(self._paymentPVs)
+
         header = "PAY_DATE     ACCR_START   ACCR_END     DAYS  YEARFRAC"
         header += "    IBOR      PAYMENT       DF          PV        CUM PV"
         print(header)
@@ -270,7 +313,7 @@ class FinFloatLeg(object):
                    self._payments[iFlow], 
                    self._paymentDfs[iFlow],
                    self._paymentPVs[iFlow],
-                   self._cumulativePVs[iFlow]))
+                   cumulativePVs[iFlow]))
 
 ###############################################################################
 
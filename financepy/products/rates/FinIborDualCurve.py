@@ -16,6 +16,9 @@ from ...market.discount.curve import DiscountCurve
 from ...products.rates.FinIborDeposit import FinIborDeposit
 from ...products.rates.FinIborFRA import FinIborFRA
 from ...products.rates.IborSwap import FinIborSwap
+from ...products.rates.FinCurveSolver import gLocalInterpTypes
+from ...products.rates.FinCurveSolver import _buildCurveUsingGlobalSolver
+from ...products.rates.FinCurveSolver import _curveQuoteJacobian
 
 swaptol = 1e-10
 
@@ -96,14 +99,38 @@ class IborDualCurve(DiscountCurve):
         self._validateInputs(iborDeposits, iborFRAs, iborSwaps)
         self._interp_type = interp_type
         self._checkRefit = checkRefit
+        self._solverReport = None
         self._buildCurve()
 
 ###############################################################################
 
     def _buildCurve(self):
-        """ Build curve based on interpolation. """
+        """ Build curve based on interpolation. The local interpolation schemes
+        are bootstrapped one instrument at a time. Spline schemes are not local
+        and so these are fitted to all instruments at once. """
 
-        self._buildCurveUsing1DSolver()
+        self._jacobian = None
+
+        if self._interp_type in gLocalInterpTypes:
+            self._buildCurveUsing1DSolver()
+        else:
+            _buildCurveUsingGlobalSolver(self, swaptol,
+                                        self._discount_curve)
+
+###############################################################################
+
+    def curveJacobian(self):
+        """ Return the matrix of derivatives of the grid discount factors with
+        respect to the market quotes of the deposits, FRAs and swaps used to
+        build the curve, in that order. It is found once at the solution using
+        the implicit function theorem so no rebuilding of the curve is needed.
+        The discount curve is held fixed. The result is cached until the curve
+        is next built. """
+
+        if self._jacobian is None:
+            self._jacobian = _curveQuoteJacobian(self, self._discount_curve)
+
+        return self._jacobian
 
 ###############################################################################
 
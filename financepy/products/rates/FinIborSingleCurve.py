@@ -3,6 +3,7 @@
 ##############################################################################
 
 import numpy as np
+from numba import njit
 from scipy import optimize
 
 from scipy.interpolate import CubicSpline
@@ -16,10 +17,15 @@ from ...utils.helpers import labelToString
 from ...utils.helpers import check_argument_types, _funcName
 from ...utils.global_vars import gDaysInYear
 from ...market.discount.interpolator import FinInterpTypes, FinInterpolator
+from ...market.discount.interpolator import _uinterpolateLastDf
 from ...market.discount.curve import DiscountCurve
 from ...products.rates.FinIborDeposit import FinIborDeposit
 from ...products.rates.FinIborFRA import FinIborFRA
 from ...products.rates.IborSwap import FinIborSwap
+from ...products.rates.FinCurveSolver import _fraTerms, _swapTerms
+from ...products.rates.FinCurveSolver import gLocalInterpTypes
+from ...products.rates.FinCurveSolver import _buildCurveUsingGlobalSolver
+from ...products.rates.FinCurveSolver import _curveQuoteJacobian
 
 swaptol = 1e-10
 
@@ -64,6 +70,73 @@ def _g(df, *args):
 ###############################################################################
 
 
+@njit(fastmath=True, cache=True)
+def _valueAndDerivative(times, dfs, method, tValue,
+                        flowTimes, flowAmounts,
+                        startTimes, endTimes, payTimes, weights):
+    """ Value per unit notional of an instrument written as a set of fixed
+    flows plus a set of Ibor fixings paid on a single curve, together with
+    its derivative with respect to the last discount factor on the grid. The
+    value is sum(a D(t)) + sum(w D(s) D(p) / D(e)) divided by D(tValue). """
+
+    v = 0.0
+    dv = 0.0
+
+    for j in range(0, len(flowTimes)):
+        df, ddf = _uinterpolateLastDf(flowTimes[j], times, dfs, method)
+        v += flowAmounts[j] * df
+        dv += flowAmounts[j] * ddf
+
+    for k in range(0, len(payTimes)):
+        dfS, ddfS = _uinterpolateLastDf(startTimes[k], times, dfs, method)
+        dfE, ddfE = _uinterpolateLastDf(endTimes[k], times, dfs, method)
+        dfP, ddfP = _uinterpolateLastDf(payTimes[k], times, dfs, method)
+        u = dfS * dfP / dfE
+        v += weights[k] * u
+        dv += weights[k] * (ddfS * dfP / dfE + dfS * ddfP / dfE
+                            - u * ddfE / dfE)
+
+    dfV, ddfV = _uinterpolateLastDf(tValue, times, dfs, method)
+    dv = (dv - v * ddfV / dfV) / dfV
+    v = v / dfV
+
+    return v, dv
+
+###############################################################################
+
+
+@njit(fastmath=True, cache=True)
+def _solveLastDf(times, dfs, method, tValue,
+                 flowTimes, flowAmounts,
+                 startTimes, endTimes, payTimes, weights,
+                 tol, maxIterations):
+    """ Newton search for the last discount factor on the grid that gives the
+    instrument a zero value. The derivative is analytical and the earlier grid
+    points are untouched. Returns the number of iterations or -1 if the search
+    did not converge. """
+
+    last = len(dfs) - 1
+
+    for iteration in range(0, maxIterations):
+
+        v, dv = _valueAndDerivative(times, dfs, method, tValue,
+                                    flowTimes, flowAmounts,
+                                    startTimes, endTimes, payTimes, weights)
+
+        if dv == 0.0:
+            return -1
+
+        step = v / dv
+        dfs[last] = dfs[last] - step
+
+        if abs(step) < tol:
+            return iteration + 1
+
+    return -1
+
+###############################################################################
+
+
 def _costFunction(dfs, *args):
     """ Root search objective function for swaps """
 
@@ -100,7 +173,6 @@ def _costFunction(dfs, *args):
 #        print("SWAP:", swap._maturity_date, v)
         cost += v*v
 
-    print("Cost:", cost)
     return cost
 
 ###############################################################################
@@ -167,14 +239,36 @@ class IborSingleCurve(DiscountCurve):
         self._interp_type = interp_type
         self._checkRefit = checkRefit        
         self._interpolator = None
+        self._solverReport = None
         self._buildCurve()
 
 ###############################################################################
 
     def _buildCurve(self):
-        """ Build curve based on interpolation. """
+        """ Build curve based on interpolation. The local interpolation schemes
+        are bootstrapped with analytical derivatives. Spline schemes are not
+        local and so these are fitted to all instruments at once. """
 
-        self._buildCurveUsing1DSolver()
+        self._jacobian = None
+
+        if self._interp_type in gLocalInterpTypes:
+            self._buildCurveUsingAnalyticBootstrap()
+        else:
+            _buildCurveUsingGlobalSolver(self, swaptol)
+
+###############################################################################
+
+    def curveJacobian(self):
+        """ Return the matrix of derivatives of the grid discount factors with
+        respect to the market quotes of the deposits, FRAs and swaps used to
+        build the curve, in that order. It is found once at the solution using
+        the implicit function theorem so no rebuilding of the curve is needed.
+        The result is cached until the curve is next built. """
+
+        if self._jacobian is None:
+            self._jacobian = _curveQuoteJacobian(self)
+
+        return self._jacobian
 
 ###############################################################################
 
@@ -417,6 +511,116 @@ class IborSingleCurve(DiscountCurve):
         if self._checkRefit is True:
             self._checkRefits(1e-10, swaptol, 1e-5)
 
+###############################################################################
+
+    def _fraFlows(self, fra):
+        """ Write a FRA per unit notional as the flows that are needed by the
+        analytic bootstrap. Its value is D(start) - (1 + acc * K) D(end). """
+
+        return _fraTerms(fra, self._valuation_date)[1:]
+
+###############################################################################
+
+    def _swapFlows(self, swap):
+        """ Precompute the payment times, accrual factors and amounts of both
+        legs of a swap per unit notional for the analytic bootstrap. Each Ibor
+        fixing is paid as (D(start) / D(end) - 1 + spread * alpha) D(pay) so
+        it splits into a fixed flow and a ratio of discount factors. """
+
+        return _swapTerms(swap, self._valuation_date)[1:]
+
+###############################################################################
+
+    def _solvePillar(self, flows, tol, maxIterations=50):
+        """ Solve for the last discount factor on the grid so that the
+        instrument described by the flows has a zero value. """
+
+        numIterations = _solveLastDf(self._times, self._dfs,
+                                     self._interp_type.value, 0.0,
+                                     *flows, tol, maxIterations)
+
+        if numIterations < 0:
+            raise FinError("Bootstrap failed to converge at time " +
+                           str(self._times[-1]))
+
+###############################################################################
+
+    def _buildCurveUsingAnalyticBootstrap(self):
+        """ Construct the discount curve using a bootstrap which refits the
+        instruments in the same order as _buildCurveUsing1DSolver. The grid
+        arrays are allocated once and the flows of each FRA and swap are
+        precomputed so that each Newton step only moves the last grid point
+        using an analytical derivative. Only valid for local interpolation
+        schemes. """
+
+        numPoints = 1 + len(self._usedDeposits) + len(self._usedFRAs) + \
+            len(self._usedSwaps)
+
+        self._interpolator = FinInterpolator(self._interp_type)
+        gridTimes = np.zeros(numPoints)
+        gridDfs = np.ones(numPoints)
+
+        # time zero is now.
+        tmat = 0.0
+        dfMat = 1.0
+        n = 1
+        self._times = gridTimes[0:n]
+        self._dfs = gridDfs[0:n]
+
+        for depo in self._usedDeposits:
+            dfSettle = self.df(depo._start_date)
+            dfMat = depo._maturityDf() * dfSettle
+            tmat = (depo._maturity_date - self._valuation_date) / gDaysInYear
+            gridTimes[n] = tmat
+            gridDfs[n] = dfMat
+            n += 1
+            self._times = gridTimes[0:n]
+            self._dfs = gridDfs[0:n]
+
+        oldtmat = tmat
+
+        for fra in self._usedFRAs:
+
+            tset = (fra._start_date - self._valuation_date) / gDaysInYear
+            tmat = (fra._maturity_date - self._valuation_date) / gDaysInYear
+
+            if tset < oldtmat and tmat > oldtmat:
+                dfMat = fra.maturityDf(self)
+                gridTimes[n] = tmat
+                gridDfs[n] = dfMat
+                n += 1
+                self._times = gridTimes[0:n]
+                self._dfs = gridDfs[0:n]
+            else:
+                gridTimes[n] = tmat
+                gridDfs[n] = dfMat
+                n += 1
+                self._times = gridTimes[0:n]
+                self._dfs = gridDfs[0:n]
+                self._solvePillar(self._fraFlows(fra), swaptol)
+                dfMat = gridDfs[n-1]
+
+        for swap in self._usedSwaps:
+            # I use the lastPaymentDate in case a date has been adjusted fwd
+            # over a holiday as the maturity date is usually not adjusted CHECK
+            maturity_date = swap._fixed_leg._payment_dates[-1]
+            tmat = (maturity_date - self._valuation_date) / gDaysInYear
+
+            gridTimes[n] = tmat
+            gridDfs[n] = dfMat
+            n += 1
+            self._times = gridTimes[0:n]
+            self._dfs = gridDfs[0:n]
+            self._solvePillar(self._swapFlows(swap), swaptol)
+            dfMat = gridDfs[n-1]
+
+        self._times = gridTimes
+        self._dfs = gridDfs
+        self._interpolator.fit(self._times, self._dfs)
+
+        if self._checkRefit is True:
+            self._checkRefits(1e-10, swaptol, 1e-5)
+
 ###############################################################################
 
     def _buildCurveUsingQuadraticMinimiser(self):
@@ -0,0 +1,271 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from ...utils.FinError import FinError
+from ...utils.date import Date
+from ...utils.global_vars import gSmall
+from ...utils.helpers import check_argument_types, labelToString
+from ...utils.global_types import FinSwapTypes
+from ...market.discount.curve import DiscountCurve
+
+from .IborSwap import FinIborSwap
+from .FinFixedLeg import _batchDiscountFactors
+from .FinFixedLeg import _curveDiscountFactors
+
+###############################################################################
+
+
+def _segmentSum(values, tradeIndex, numTrades):
+    """ Add up the values of the flows belonging to each trade. """
+    return np.bincount(tradeIndex, weights=values, minlength=numTrades)
+
+###############################################################################
+
+
+class FinIborSwapPortfolio(object):
+    """ A book of vanilla fixed versus Ibor swaps that are valued together.
+    The cash flows of all of the swaps are stored in columnar arrays with the
+    index of the trade that owns each flow. The whole book is valued with one
+    batched call to each curve for all of the discount factors and the flow
+    values are then summed by trade. """
+
+    def __init__(self,
+                 swaps: list):
+        """ Create the portfolio from a list of FinIborSwap objects. The cash
+        flow tables are built once from the legs of the swaps. """
+
+        check_argument_types(self.__init__, locals())
+
+        if len(swaps) == 0:
+            raise FinError("Portfolio must contain at least one swap.")
+
+        for swap in swaps:
+            if isinstance(swap, FinIborSwap) is False:
+                raise FinError("Portfolio can only contain FinIborSwaps.")
+
+        self._swaps = swaps
+        self._numTrades = len(swaps)
+
+        self._buildCashflowTables()
+
+###############################################################################
+
+    def _buildCashflowTables(self):
+        """ Concatenate the leg cash flows of all of the swaps into columnar
+        arrays. Fixed payments carry the sign of the leg. """
+
+        fixedLegs = [swap._fixed_leg for swap in self._swaps]
+        floatLegs = [swap._floatLeg for swap in self._swaps]
+
+        tradeIndex = np.arange(self._numTrades)
+
+        fixedSigns = np.array([-1.0 if leg._leg_type == FinSwapTypes.PAY
+                               else 1.0 for leg in fixedLegs])
+
+        numFixedFlows = [len(leg._payment_dates) for leg in fixedLegs]
+        self._fixedTradeIndex = np.repeat(tradeIndex, numFixedFlows)
+
+        self._fixedPaymentDates = np.concatenate(
+            [leg._paymentDateVector._excelDate for leg in fixedLegs])
+
+        self._fixedYearFracs = np.concatenate(
+            [leg._yearFracArray for leg in fixedLegs])
+
+        self._fixedPayments = np.concatenate(
+            [leg._paymentArray * sign
+             for leg, sign in zip(fixedLegs, fixedSigns)])
+
+        self._floatSigns = np.array([-1.0 if leg._leg_type == FinSwapTypes.PAY
+                                     else 1.0 for leg in floatLegs])
+
+        self._notionals = np.array([leg._notional for leg in fixedLegs])
+        self._spreads = np.array([leg._spread for leg in floatLegs])
+
+        numFloatFlows = [len(leg._payment_dates) for leg in floatLegs]
+        self._floatTradeIndex = np.repeat(tradeIndex, numFloatFlows)
+
+        self._floatStartDates = np.concatenate(
+            [leg._startAccruedDateVector._excelDate for leg in floatLegs])
+
+        self._floatEndDates = np.concatenate(
+            [leg._endAccruedDateVector._excelDate for leg in floatLegs])
+
+        self._floatPaymentDates = np.concatenate(
+            [leg._paymentDateVector._excelDate for leg in floatLegs])
+
+        self._floatYearFracs = np.concatenate(
+            [leg._yearFracArray for leg in floatLegs])
+
+        # The position of the first float flow of each trade in the table
+        self._floatFirstFlow = np.concatenate(([0],
+                                               np.cumsum(numFloatFlows)[:-1]))
+
+###############################################################################
+
+    def valuationArrays(self,
+                        valuation_date: Date,
+                        discount_curve: DiscountCurve,
+                        index_curve: DiscountCurve = None,
+                        firstFixingRates: np.ndarray = None):
+        """ Value all of the swaps in one pass and return arrays of their
+        values, their PV01s and their par swap rates. The PV01 is the value
+        of a one unit annuity on the fixed leg per unit of notional and the
+        par rate is the fixed coupon that makes the swap worth zero. The
+        optional firstFixingRates array holds the current fixing of each
+        swap, with NaN for swaps whose next fixing is projected. """
+
+        if discount_curve is None:
+            raise FinError("Discount curve is None")
+
+        if index_curve is None:
+            index_curve = discount_curve
+
+        numTrades = self._numTrades
+        valueDate = valuation_date._excelDate
+
+        fixedLive = self._fixedPaymentDates > valueDate
+        floatLive = self._floatPaymentDates > valueDate
+
+        # Find the first live float flow of each trade which may be fixed
+        prevLive = np.concatenate(([False], floatLive[:-1]))
+        prevLive[self._floatFirstFlow] = False
+        firstLive = floatLive & ~prevLive
+
+        if firstFixingRates is None:
+            floatFixed = np.zeros(len(floatLive), dtype=bool)
+        else:
+            firstFixingRates = np.asarray(firstFixingRates, dtype=np.float64)
+
+            if len(firstFixingRates) != numTrades:
+                raise FinError("Need one first fixing rate per swap.")
+
+            hasFixing = ~np.isnan(firstFixingRates)
+            floatFixed = firstLive & hasFixing[self._floatTradeIndex]
+
+        projected = floatLive & ~floatFixed
+
+        fixedDates = self._fixedPaymentDates[fixedLive]
+        startDates = self._floatStartDates[projected]
+        endDates = self._floatEndDates[projected]
+        floatPaymentDates = self._floatPaymentDates[floatLive]
+
+        numFixed = len(fixedDates)
+        numFwds = len(startDates)
+
+        # One interpolation call for the book when there is a single curve
+        if index_curve is discount_curve:
+            dates = np.concatenate((fixedDates, floatPaymentDates,
+                                    startDates, endDates))
+            dfValue, dfs = _batchDiscountFactors(discount_curve,
+                                                 valuation_date,
+                                                 dates)
+            numDiscounted = numFixed + len(floatPaymentDates)
+            discountDfs = dfs[:numDiscounted]
+            indexDfs = dfs[numDiscounted:]
+        else:
+            dates = np.concatenate((fixedDates, floatPaymentDates))
+            dfValue, discountDfs = _batchDiscountFactors(discount_curve,
+                                                         valuation_date,
+                                                         dates)
+            if numFwds > 0:
+                dates = np.concatenate((startDates, endDates))
+                indexDfs = _curveDiscountFactors(index_curve, dates)
+            else:
+                indexDfs = np.zeros(0)
+
+        fixedDfs = discountDfs[:numFixed] / dfValue
+        floatDfs = discountDfs[numFixed:] / dfValue
+
+        fixedTrades = self._fixedTradeIndex[fixedLive]
+
+        fixedPVs = _segmentSum(self._fixedPayments[fixedLive] * fixedDfs,
+                               fixedTrades, numTrades)
+
+        annuities = _segmentSum(self._fixedYearFracs[fixedLive] * fixedDfs,
+                                fixedTrades, numTrades)
+
+        # Forward rates for the projected flows and fixings for the others
+        rates = np.zeros(len(floatLive))
+        rates[projected] = (indexDfs[:numFwds] / indexDfs[numFwds:] - 1.0) \
+            / self._floatYearFracs[projected]
+
+        if firstFixingRates is not None:
+            rates[floatFixed] = \
+                firstFixingRates[self._floatTradeIndex[floatFixed]]
+
+        floatTrades = self._floatTradeIndex[floatLive]
+        alphas = self._floatYearFracs[floatLive]
+        spreads = self._spreads[floatTrades]
+
+        floatPVs = _segmentSum((rates[floatLive] + spreads) * alphas * floatDfs,
+                               floatTrades, numTrades)
+
+        floatPVs *= self._notionals
+
+        values = fixedPVs + self._floatSigns * floatPVs
+
+        parRates = np.zeros(numTrades)
+        hasAnnuity = np.abs(annuities) > gSmall
+        parRates[hasAnnuity] = floatPVs[hasAnnuity] / \
+            self._notionals[hasAnnuity] / annuities[hasAnnuity]
+
+        return values, annuities, parRates
+
+###############################################################################
+
+    def value(self,
+              valuation_date: Date,
+              discount_curve: DiscountCurve,
+              index_curve: DiscountCurve = None,
+              firstFixingRates: np.ndarray = None):
+        """ Return an array with the value of each swap in the portfolio. """
+
+        return self.valuationArrays(valuation_date,
+                                    discount_curve,
+                                    index_curve,
+                                    firstFixingRates)[0]
+
+###############################################################################
+
+    def pv01(self,
+             valuation_date: Date,
+             discount_curve: DiscountCurve):
+        """ Return an array with the value of a one unit annuity on the fixed
+        leg of each swap per unit of notional. """
+
+        return self.valuationArrays(valuation_date, discount_curve)[1]
+
+###############################################################################
+
+    def swap_rate(self,
+                  valuation_date: Date,
+                  discount_curve: DiscountCurve,
+                  index_curve: DiscountCurve = None,
+                  firstFixingRates: np.ndarray = None):
+        """ Return an array with the fixed coupon that makes each swap worth
+        zero given the floating leg projected on the index curve. """
+
+        return self.valuationArrays(valuation_date,
+                                    discount_curve,
+                                    index_curve,
+                                    firstFixingRates)[2]
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM SWAPS", self._numTrades)
+        s += labelToString("NUM FIXED FLOWS", len(self._fixedPaymentDates))
+        s += labelToString("NUM FLOAT FLOWS", len(self._floatPaymentDates))
+        s += labelToString("TOTAL NOTIONAL", np.sum(self._notionals), "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
@@ -17,6 +17,7 @@ from ...market.discount.curve import DiscountCurve
 
 from .FinFixedLeg import FinFixedLeg
 from .FinFloatLeg import FinFloatLeg
+from .FinCurveSolver import _swapBucketedPV01
 
 ###############################################################################
 
@@ -166,6 +167,17 @@ class FinOIS(object):
 
 ##########################################################################
 
+    def bucketedPV01(self, valuation_date, oisCurve):
+        """ Calculate the change in value of the swap for a one basis point
+        increase in each of the market quotes used to build the curve. The
+        swap is discounted and projected on this one curve and the risk is
+        found from one valuation and the curve Jacobian without rebuilding
+        the curve. """
+
+        return _swapBucketedPV01(self, valuation_date, oisCurve)
+
+###############################################################################
+
     def swap_rate(self, valuation_date, oisCurve):
         """ Calculate the fixed leg coupon that makes the swap worth zero.
         If the valuation date is before the swap payments start then this
@@ -18,6 +18,7 @@ from ...market.discount.curve import DiscountCurve
 
 from .FinFixedLeg import FinFixedLeg
 from .FinFloatLeg import FinFloatLeg
+from .FinCurveSolver import _swapBucketedPV01
 
 ##########################################################################
 
@@ -144,6 +145,17 @@ class FinIborSwap(object):
         pv01 = pv / self._fixed_leg._coupon / self._fixed_leg._notional
         return pv01
 
+###############################################################################
+
+    def bucketedPV01(self, valuation_date, discount_curve):
+        """ Calculate the change in value of the swap for a one basis point
+        increase in each of the market quotes used to build the curve. The
+        swap is discounted and projected on this one curve and the risk is
+        found from one valuation and the curve Jacobian without rebuilding
+        the curve. """
+
+        return _swapBucketedPV01(self, valuation_date, discount_curve)
+
 ###############################################################################
 
     def swap_rate(self,
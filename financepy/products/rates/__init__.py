@@ -11,5 +11,7 @@ from .FinOISCurve import *
 from .FinOIS import *
 from .FinIborSingleCurve import *
 from .FinIborDualCurve import *
+from .FinCurveSolver import *
 from .FinFixedLeg import *
 from .FinFloatLeg import *
+from .FinIborSwapPortfolio import *
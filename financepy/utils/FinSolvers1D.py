@@ -35,7 +35,9 @@ def _results(r):
 # IT NEEDS TO PASS IN ARGS AS A TUPLE AS ONE OF THE ARGS IS AN NDARRAY
 ###############################################################################
 
-@njit(fastmath=True, cache=True)
+# Not cached as a cached version that takes a jitted function as an argument
+# fails to type that function when it is reloaded from the cache
+@njit(fastmath=True)
 def newton_secant(func, x0, args=(), tol=1.48e-8, maxiter=50,
                   disp=True):
     """
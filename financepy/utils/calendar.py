@@ -4,12 +4,14 @@
 
 
 ###############################################################################
-# TODO: Do some timings and tidy up logic in adjustment function
+# TODO: Add a filter for calendars whose weekend is not SAT and SUN
 ###############################################################################
 
-import datetime
+import numpy as np
 from enum import Enum
+from . import date as _date
 from .date import Date
+from .date_vector import DateVector, _dateCounterArrays, _dateFromExcelDate
 from .FinError import FinError
 
 # from numba import njit, jit, int64, boolean
@@ -77,6 +79,196 @@ class DateGenRuleTypes(Enum):
     BACKWARD = 2
 
 ###############################################################################
+# Holiday rules are evaluated once per calendar type and year and stored in a
+# holiday bitmap and a business day bitmap which covers a contiguous range of
+# years. The cumulative count of business days then allows us to find the
+# next, previous or n-th business day with an array lookup. The cache is
+# shared by all Calendar objects of the same type.
+###############################################################################
+
+gBusinessDayIndexCache = {}
+
+###############################################################################
+
+
+class _BusinessDayIndex():
+    """ Lazily built bitmaps of holidays and business days for a calendar
+    type over a range of years, indexed by excel serial. The range of years is
+    extended as needed. """
+
+    def __init__(self,
+                 calendar):
+        """ Create the index using a Calendar object that is only used to
+        evaluate the holiday rules. """
+
+        self._calendar = calendar
+        self._yearBlocks = {}
+        self._startYear = None
+        self._endYear = None
+        self._startExcelDate = None
+        self._holidays = None
+        self._busDays = None
+        self._cumBusDays = None
+        self._busDayPositions = None
+
+    ###########################################################################
+
+    def _yearBlock(self,
+                   y: int):
+        """ Evaluate the holiday rules for every day of year y. Returns the
+        holiday and business day bitmaps for the year. These are cached. """
+
+        if y in self._yearBlocks:
+            return self._yearBlocks[y]
+
+        # The Date object extends the date counter list if it needs to
+        startExcelDate = int(Date(1, 1, y)._excelDate)
+        numDays = int(Date(1, 1, y + 1)._excelDate) - startExcelDate
+
+        holidays = np.zeros(numDays, dtype=np.bool_)
+        weekdays = (startExcelDate + 5 + np.arange(numDays)) % 7
+
+        idx = (y - _date.gStartYear) * 12 * 31
+        for m in range(1, 13):
+            for d in range(1, 32):
+                excelDate = _date.gDateCounterList[idx + (m - 1) * 31 + d - 1]
+                if excelDate < 0:
+                    continue
+                dayInYear = excelDate - startExcelDate + 1
+                weekday = weekdays[dayInYear - 1]
+                holidays[dayInYear - 1] = \
+                    self._calendar._holidayRule(y, m, d, dayInYear, weekday)
+
+        busDays = ~holidays & (weekdays < Date.SAT)
+        self._yearBlocks[y] = (holidays, busDays)
+        return self._yearBlocks[y]
+
+    ###########################################################################
+
+    def _extend(self,
+                startYear: int,
+                endYear: int):
+        """ Rebuild the bitmaps so that they cover years startYear to endYear
+        and any years already covered. """
+
+        if self._startYear is not None:
+            startYear = min(startYear, self._startYear)
+            endYear = max(endYear, self._endYear)
+
+        blocks = [self._yearBlock(y) for y in range(startYear, endYear + 1)]
+
+        self._holidays = np.concatenate([b[0] for b in blocks])
+        self._busDays = np.concatenate([b[1] for b in blocks])
+        self._cumBusDays = np.cumsum(self._busDays)
+        self._busDayPositions = np.flatnonzero(self._busDays)
+        self._startExcelDate = int(Date(1, 1, startYear)._excelDate)
+        self._startYear = startYear
+        self._endYear = endYear
+
+    ###########################################################################
+
+    def _offsets(self,
+                 excelDates: np.ndarray):
+        """ Return the positions of the serials in the bitmaps after making
+        sure that the bitmaps cover all of them. """
+
+        # Fast path for a single date that is already covered
+        if isinstance(excelDates, int) and self._startYear is not None:
+            i = excelDates - self._startExcelDate
+            if i >= 0 and i < len(self._busDays):
+                return i
+
+        excelDates = np.asarray(excelDates, dtype=np.int64)
+        firstDate = int(excelDates.min())
+        lastDate = int(excelDates.max())
+
+        if self._startYear is None:
+            _, inverse = _dateCounterArrays()
+            y0 = _date.gStartYear + int(inverse[firstDate]) // (12 * 31)
+            y1 = _date.gStartYear + int(inverse[lastDate]) // (12 * 31)
+            self._extend(y0, y1)
+
+        while firstDate < self._startExcelDate:
+            self._extend(self._startYear - 1, self._endYear)
+
+        while lastDate >= self._startExcelDate + len(self._busDays):
+            self._extend(self._startYear, self._endYear + 1)
+
+        return excelDates - self._startExcelDate
+
+    ###########################################################################
+
+    def isHoliday(self,
+                  excelDates: np.ndarray):
+        i = self._offsets(excelDates)
+        return self._holidays[i]
+
+    ###########################################################################
+
+    def isBusinessDay(self,
+                      excelDates: np.ndarray):
+        i = self._offsets(excelDates)
+        return self._busDays[i]
+
+    ###########################################################################
+
+    def following(self,
+                  excelDates: np.ndarray):
+        """ Serials of the first business day on or after each date. """
+
+        while True:
+            i = self._offsets(excelDates)
+            numBefore = self._cumBusDays[i] - self._busDays[i]
+            if numBefore.max() < len(self._busDayPositions):
+                break
+            self._extend(self._startYear, self._endYear + 1)
+
+        return self._busDayPositions[numBefore] + self._startExcelDate
+
+    ###########################################################################
+
+    def preceding(self,
+                  excelDates: np.ndarray):
+        """ Serials of the last business day on or before each date. """
+
+        while True:
+            i = self._offsets(excelDates)
+            numUpTo = self._cumBusDays[i]
+            if numUpTo.min() > 0:
+                break
+            self._extend(self._startYear - 1, self._endYear)
+
+        return self._busDayPositions[numUpTo - 1] + self._startExcelDate
+
+    ###########################################################################
+
+    def addBusinessDays(self,
+                        excelDates: np.ndarray,
+                        numDays: int):
+        """ Serials of the dates numDays business days after each date. """
+
+        if numDays == 0:
+            return np.asarray(excelDates, dtype=np.int64)
+
+        numYears = abs(numDays) // 240 + 1
+
+        while True:
+            i = self._offsets(excelDates)
+
+            if numDays > 0:
+                k = self._cumBusDays[i] + numDays - 1
+                if k.max() < len(self._busDayPositions):
+                    break
+                self._extend(self._startYear, self._endYear + numYears)
+            else:
+                k = self._cumBusDays[i] - self._busDays[i] + numDays
+                if k.min() >= 0:
+                    break
+                self._extend(self._startYear - numYears, self._endYear)
+
+        return self._busDayPositions[k] + self._startExcelDate
+
+###############################################################################
 
 
 class Calendar(object):
@@ -100,10 +292,12 @@ class Calendar(object):
     ###########################################################################
 
     def adjust(self,
-               dt: Date,
+               dt: (Date, DateVector),
                busDayConventionType: BusDayAdjustTypes):
         """ Adjust a payment date if it falls on a holiday according to the
-        specified business day convention. """
+        specified business day convention. The date can also be a DateVector
+        in which case all of the dates are adjusted at once and a DateVector
+        is returned. """
 
         if type(busDayConventionType) != BusDayAdjustTypes:
             raise FinError("Invalid type passed. Need FinBusDayConventionType")
@@ -111,141 +305,172 @@ class Calendar(object):
         if busDayConventionType == BusDayAdjustTypes.NONE:
             return dt
 
-        elif busDayConventionType == BusDayAdjustTypes.FOLLOWING:
-
-            # step forward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(1)
+        if isinstance(dt, DateVector):
+            return self._adjustVector(dt, busDayConventionType)
 
+        if self.isBusinessDay(dt) is True:
             return dt
 
-        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+        index = self._businessDayIndex()
+        excelDate = int(dt._excelDate)
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+        if busDayConventionType == BusDayAdjustTypes.FOLLOWING:
 
-            # step forward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(1)
+            # find the next business day
+            newExcelDate = index.following(excelDate)
 
-            # if the business day is in a different month look back
-            # for previous first business day one day at a time
-            # TODO: I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.isBusinessDay(dt) is False:
-                    dt = dt.addDays(-1)
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
 
-            return dt
+            # if the next business day is in a different month look back
+            # for the previous business day
+            newExcelDate = index.following(excelDate)
+            if _dateFromExcelDate(newExcelDate)._m != dt._m:
+                newExcelDate = index.preceding(excelDate)
 
         elif busDayConventionType == BusDayAdjustTypes.PRECEDING:
 
-            # if the business day is in the next month look back
-            # for previous first business day one day at a time
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(-1)
-
-            return dt
+            # find the previous business day
+            newExcelDate = index.preceding(excelDate)
 
         elif busDayConventionType == BusDayAdjustTypes.MODIFIED_PRECEDING:
 
-            d_start = dt._d
-            m_start = dt._m
-            y_start = dt._y
+            # if the previous business day is in a different month look
+            # forward for the next business day
+            newExcelDate = index.preceding(excelDate)
+            if _dateFromExcelDate(newExcelDate)._m != dt._m:
+                newExcelDate = index.following(excelDate)
 
-            # step backward until we find a business day
-            while self.isBusinessDay(dt) is False:
-                dt = dt.addDays(-1)
+        else:
 
-            # if the business day is in a different month look forward
-            # for previous first business day one day at a time
-            # I could speed this up by starting it at initial date
-            if dt._m != m_start:
-                dt = Date(d_start, m_start, y_start)
-                while self.isBusinessDay(dt) is False:
-                    dt = dt.addDays(+1)
+            raise FinError("Unknown adjustment convention" +
+                           str(busDayConventionType))
 
-            return dt
+        return _dateFromExcelDate(int(newExcelDate))
+
+###############################################################################
+
+    def _adjustVector(self,
+                      dts: DateVector,
+                      busDayConventionType: BusDayAdjustTypes):
+        """ Adjust all of the dates in a DateVector at once using the business
+        day index. """
+
+        index = self._businessDayIndex()
+        excelDates = dts._excelDate
+
+        if busDayConventionType == BusDayAdjustTypes.FOLLOWING:
+
+            newExcelDates = index.following(excelDates)
+
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_FOLLOWING:
+
+            newExcelDates = index.following(excelDates)
+            moved = DateVector(newExcelDates)._m != dts._m
+            newExcelDates = np.where(moved,
+                                     index.preceding(excelDates),
+                                     newExcelDates)
+
+        elif busDayConventionType == BusDayAdjustTypes.PRECEDING:
+
+            newExcelDates = index.preceding(excelDates)
+
+        elif busDayConventionType == BusDayAdjustTypes.MODIFIED_PRECEDING:
+
+            newExcelDates = index.preceding(excelDates)
+            moved = DateVector(newExcelDates)._m != dts._m
+            newExcelDates = np.where(moved,
+                                     index.following(excelDates),
+                                     newExcelDates)
 
         else:
 
             raise FinError("Unknown adjustment convention" +
                            str(busDayConventionType))
 
-        return dt
+        return DateVector(newExcelDates)
 
 ###############################################################################
 
     def addBusinessDays(self,
-                        start_date: Date,
+                        start_date: (Date, DateVector),
                         numDays: int):
         """ Returns a new date that is numDays business days after Date.
-        All holidays in the chosen calendar are assumed not business days. """
-
-        # TODO: REMOVE DATETIME DEPENDENCE HERE ???
+        All holidays in the chosen calendar are assumed not business days.
+        If a DateVector is passed in then a DateVector is returned. """
 
         if isinstance(numDays, int) is False:
             raise FinError("Num days must be an integer")
 
-        dt = datetime.date(start_date._y, start_date._m, start_date._d)
-        d = dt.day
-        m = dt.month
-        y = dt.year
-        newDt = Date(d, m, y)
-
-        s = +1
-        if numDays < 0:
-            numDays = -1 * numDays
-            s = -1
+        index = self._businessDayIndex()
 
-        while numDays > 0:
-            dt = dt + s * datetime.timedelta(days=1)
-            d = dt.day
-            m = dt.month
-            y = dt.year
-            newDt = Date(d, m, y)
+        if isinstance(start_date, DateVector):
+            return DateVector(index.addBusinessDays(start_date._excelDate,
+                                                    numDays))
 
-            if self.isBusinessDay(newDt) is True:
-                numDays -= 1
-
-        return newDt
+        excelDate = index.addBusinessDays(int(start_date._excelDate), numDays)
+        return _dateFromExcelDate(int(excelDate))
 
 ###############################################################################
 
     def isBusinessDay(self,
-                      dt: Date):
+                      dt: (Date, DateVector)):
         """ Determines if a date is a business day according to the specified
-        calendar. If it is it returns True, otherwise False. """
+        calendar. If it is it returns True, otherwise False. If a DateVector
+        is passed in then a boolean array is returned. """
 
         # For all calendars so far, SAT and SUN are not business days
         # If this ever changes I will need to add a filter here.
-        if dt.isWeekend():
-            return False
+        index = self._businessDayIndex()
 
-        if self.isHoliday(dt) is True:
-            return False
-        else:
-            return True
+        if isinstance(dt, DateVector):
+            return index.isBusinessDay(dt._excelDate)
+
+        return bool(index.isBusinessDay(int(dt._excelDate)))
 
 ###############################################################################
 
     def isHoliday(self,
-                  dt: Date):
+                  dt: (Date, DateVector)):
         """ Determines if a date is a Holiday according to the specified
         calendar. Weekends are not holidays unless the holiday falls on a 
-        weekend date. """
+        weekend date. If a DateVector is passed in then a boolean array is
+        returned. """
+
+        index = self._businessDayIndex()
+
+        if isinstance(dt, DateVector):
+            return index.isHoliday(dt._excelDate)
+
+        return bool(index.isHoliday(int(dt._excelDate)))
 
-        start_date = Date(1, 1, dt._y)
-        dayInYear = dt._excelDate - start_date._excelDate + 1
-        weekday = dt._weekday
+###############################################################################
+
+    def _businessDayIndex(self):
+        """ Return the holiday and business day index for this calendar type.
+        It is created on first use and shared between Calendar objects. """
+
+        if self._type not in gBusinessDayIndexCache:
+            gBusinessDayIndexCache[self._type] = \
+                _BusinessDayIndex(Calendar(self._type))
+
+        return gBusinessDayIndexCache[self._type]
+
+###############################################################################
 
-        self._y = dt._y
-        self._m = dt._m
-        self._d = dt._d
+    def _holidayRule(self,
+                     y: int,
+                     m: int,
+                     d: int,
+                     dayInYear: int,
+                     weekday: int):
+        """ Evaluates the holiday rules of the calendar for a single day. This
+        is only called when the business day index is built. """
+
+        self._y = y
+        self._m = m
+        self._d = d
         self._dayInYear = dayInYear
         self._weekday = weekday
-        self._dt = dt
 
         if self._type == CalendarTypes.NONE:
             return self.HOLIDAY_NONE()
@@ -286,7 +511,7 @@ class Calendar(object):
     def HOLIDAY_WEEKEND(self):
         """ Weekends by themselves are a holiday. """
 
-        if self._dt.isWeekend():
+        if self._weekday == Date.SAT or self._weekday == Date.SUN:
             return True
         else:
             return False
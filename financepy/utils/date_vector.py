@@ -0,0 +1,508 @@
+##############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+##############################################################################
+
+import numpy as np
+
+from . import date as _date
+from .date import Date, calculateList
+from .FinError import FinError
+
+###############################################################################
+# The Date class stores a single excel serial together with its day, month
+# and year. When we hold many thousands of dates (all of the cash flow dates
+# of a book of swaps for example) it is much cheaper to hold them as a single
+# integer array of excel serials and to do the date arithmetic in Numpy. The
+# serial to day, month and year mapping uses the same padded lookup table
+# gDateCounterList that is used by the Date class, via its dateIndex layout
+# of 12 months of 31 days per year.
+###############################################################################
+
+_monthDaysNotLeapYear = np.array(_date.monthDaysNotLeapYear, dtype=np.int32)
+_monthDaysLeapYear = np.array(_date.monthDaysLeapYear, dtype=np.int32)
+
+# Numpy copies of the date counter list and its inverse. These are rebuilt if
+# the Date class has resized the date counter list.
+_gDateCounterSource = None
+_gDateCounterArray = None
+_gIndexFromExcelDate = None
+
+###############################################################################
+
+
+def _dateCounterArrays():
+    """ Return a Numpy version of the padded date counter list that maps a
+    dateIndex to an excel serial and its inverse that maps an excel serial to
+    its dateIndex. Both are built once and cached. """
+
+    global _gDateCounterSource
+    global _gDateCounterArray
+    global _gIndexFromExcelDate
+
+    if _date.gDateCounterList is None:
+        calculateList()
+
+    if _gDateCounterSource is not _date.gDateCounterList:
+
+        counter = np.array(_date.gDateCounterList, dtype=np.int32)
+        validIndices = np.where(counter > 0)[0]
+
+        inverse = np.full(counter.max() + 1, -1, dtype=np.int32)
+        inverse[counter[validIndices]] = validIndices
+
+        _gDateCounterArray = counter
+        _gIndexFromExcelDate = inverse
+        _gDateCounterSource = _date.gDateCounterList
+
+    return _gDateCounterArray, _gIndexFromExcelDate
+
+###############################################################################
+
+
+def _isLeapYear(y: np.ndarray):
+    """ Vectorised test of whether each year in y is a leap year. """
+    return ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+
+###############################################################################
+
+
+def _daysInMonth(m: np.ndarray,
+                 y: np.ndarray):
+    """ Vectorised number of days in month m (1-12) of year y. """
+    return np.where(_isLeapYear(y),
+                    _monthDaysLeapYear[m - 1],
+                    _monthDaysNotLeapYear[m - 1])
+
+###############################################################################
+
+
+def _extendYearRange(startYear: int,
+                     endYear: int):
+    """ Resize the date counter list so that it covers the years startYear
+    to endYear in the same way as the Date class does when it is given a year
+    outside the current range. """
+
+    if startYear < 1900:
+        raise FinError("Year cannot be before 1900")
+
+    if _date.gDateCounterList is None:
+        calculateList()
+
+    if startYear < _date.gStartYear:
+        _date.gStartYear = int(startYear)
+        calculateList()
+
+    if endYear > _date.gEndYear:
+        _date.gEndYear = int(endYear)
+        calculateList()
+
+###############################################################################
+
+
+def _excelDatesFromDMY(d: np.ndarray,
+                       m: np.ndarray,
+                       y: np.ndarray):
+    """ Vectorised mapping of day, month and year arrays to excel serials
+    using the padded date counter list. """
+
+    if np.size(y) > 0:
+        _extendYearRange(np.min(y), np.max(y))
+
+    counter, _ = _dateCounterArrays()
+    idx = (y - _date.gStartYear) * 12 * 31 + (m - 1) * 31 + (d - 1)
+    excelDates = counter[idx]
+
+    if np.any(excelDates < 0):
+        raise FinError("DateVector: day not valid for month.")
+
+    return excelDates.astype(np.int32)
+
+###############################################################################
+
+
+def _dateFromExcelDate(excelDate: int):
+    """ Create a Date from an excel serial using the inverse lookup. """
+
+    _, inverse = _dateCounterArrays()
+    idx = int(inverse[excelDate])
+    y = _date.gStartYear + idx // (12 * 31)
+    m = 1 + (idx % (12 * 31)) // 31
+    d = 1 + idx % 31
+    return Date(d, m, y)
+
+###############################################################################
+
+
+def _parseTenor(tenor: str):
+    """ Split a tenor string such as 3M or 10Y into a period type which is
+    one of D, W, M or Y and a number of periods. """
+
+    if isinstance(tenor, str) is False:
+        raise FinError("Tenor must be a string e.g. '5Y'")
+
+    tenStr = tenor.upper()
+
+    if tenStr == "ON" or tenStr == "TN":
+        return "D", 1
+
+    periodType = tenStr[-1]
+
+    if periodType not in ("D", "W", "M", "Y"):
+        raise FinError("Unknown tenor type in " + tenor)
+
+    return periodType, int(tenStr[0:-1])
+
+###############################################################################
+
+
+class DateVector():
+    """ A compact vector of dates held as a Numpy int32 array of excel serial
+    numbers. It supports the same day, month and tenor arithmetic as the Date
+    class but acts on all of the dates at once and so avoids the creation of
+    one Python Date object per date. The serials are stored in the attribute
+    _excelDate so that comparisons and differences with Date objects work in
+    both directions and return Numpy arrays. """
+
+    def __init__(self,
+                 dates: (list, np.ndarray)):
+        """ Create a DateVector from a list of Date objects or from an array
+        of integer excel serial numbers. """
+
+        if isinstance(dates, DateVector):
+            excelDates = dates._excelDate.copy()
+        elif isinstance(dates, np.ndarray):
+            excelDates = dates
+        elif isinstance(dates, list):
+            if len(dates) > 0 and isinstance(dates[0], Date):
+                # Dates with a time of day have a fractional serial and fail
+                excelDates = [dt._excelDate for dt in dates]
+            else:
+                excelDates = dates
+        else:
+            raise FinError("DateVector needs a list of Dates or an array.")
+
+        excelDates = np.atleast_1d(np.asarray(excelDates))
+
+        if excelDates.ndim != 1:
+            raise FinError("DateVector must be one-dimensional.")
+
+        if excelDates.size > 0:
+            if np.any(excelDates != np.floor(excelDates)):
+                raise FinError("DateVector takes whole day excel serials.")
+
+        excelDates = excelDates.astype(np.int32)
+        self._checkRange(excelDates)
+
+        self._excelDate = excelDates
+        self._dmy = None
+
+    ###########################################################################
+
+    @classmethod
+    def fromDMY(cls,
+                d: np.ndarray,
+                m: np.ndarray,
+                y: np.ndarray):
+        """ Create a DateVector from arrays of day of month, month number and
+        four digit year. """
+
+        d = np.asarray(d, dtype=np.int32)
+        m = np.asarray(m, dtype=np.int32)
+        y = np.asarray(y, dtype=np.int32)
+
+        if np.any(m < 1) or np.any(m > 12):
+            raise FinError("DateVector: month must be 1-12")
+
+        if np.any(d < 1) or np.any(d > _daysInMonth(m, y)):
+            raise FinError("DateVector: day not valid for month.")
+
+        return cls(_excelDatesFromDMY(d, m, y))
+
+    ###########################################################################
+
+    @staticmethod
+    def _checkRange(excelDates: np.ndarray):
+        """ Check that all serials lie inside the date counter list. This is
+        resized if the dates fall outside it as for the Date class. """
+
+        if excelDates.size == 0:
+            return
+
+        if excelDates.min() < 1:
+            raise FinError("Year cannot be before 1900")
+
+        # A year has 365 or 366 days so these bound the years of the dates
+        _extendYearRange(1900 + int(excelDates.min()) // 366,
+                         1900 + int(excelDates.max()) // 365)
+
+        counter, inverse = _dateCounterArrays()
+
+        if excelDates.max() >= len(inverse) or \
+                np.any(inverse[excelDates] < 0):
+            raise FinError("DateVector: date outside range " +
+                           str(_date.gStartYear) + " to " +
+                           str(_date.gEndYear))
+
+    ###########################################################################
+
+    def _dayMonthYear(self):
+        """ Return the arrays of day of month, month and year of the dates.
+        These are calculated on first use and then cached. """
+
+        if self._dmy is None:
+            _, inverse = _dateCounterArrays()
+            idx = inverse[self._excelDate]
+            y = (_date.gStartYear + idx // (12 * 31)).astype(np.int32)
+            m = (1 + (idx % (12 * 31)) // 31).astype(np.int32)
+            d = (1 + idx % 31).astype(np.int32)
+            self._dmy = (d, m, y)
+
+        return self._dmy
+
+    ###########################################################################
+
+    @property
+    def _d(self):
+        return self._dayMonthYear()[0]
+
+    @property
+    def _m(self):
+        return self._dayMonthYear()[1]
+
+    @property
+    def _y(self):
+        return self._dayMonthYear()[2]
+
+    @property
+    def _weekday(self):
+        return (self._excelDate + 5) % 7
+
+    ###########################################################################
+
+    def excelDates(self):
+        """ Returns a copy of the array of excel serial numbers. """
+        return self._excelDate.copy()
+
+    ###########################################################################
+
+    def weekday(self):
+        """ Returns the weekday of each date with Monday = 0 and Sunday = 6
+        as in the Date class. """
+        return self._weekday
+
+    ###########################################################################
+
+    def isWeekend(self):
+        """ Returns a boolean array that is True if the date is a weekend. """
+        return self._weekday >= Date.SAT
+
+    ###########################################################################
+
+    def isEOM(self):
+        """ Returns a boolean array that is True if the date is a month end."""
+        d, m, y = self._dayMonthYear()
+        return d == _daysInMonth(m, y)
+
+    ###########################################################################
+
+    def EOM(self):
+        """ Returns a DateVector of the last date of the month of each date."""
+        d, m, y = self._dayMonthYear()
+        return DateVector(_excelDatesFromDMY(_daysInMonth(m, y), m, y))
+
+    ###########################################################################
+
+    def addDays(self,
+                numDays: (int, np.ndarray) = 1):
+        """ Returns a new DateVector with the dates numDays after the dates.
+        The number of days can be negative and can also be an array with one
+        entry per date. """
+
+        numDays = np.asarray(numDays)
+
+        if np.any(numDays != np.floor(numDays)):
+            raise FinError("Number of days must be an integer.")
+
+        return DateVector(self._excelDate + numDays.astype(np.int64))
+
+    ###########################################################################
+
+    def addWeekDays(self,
+                    numDays: int):
+        """ Returns a new DateVector with the dates numDays weekdays after the
+        dates. As with Date.addWeekDays only weekends are skipped. """
+
+        if isinstance(numDays, int) is False:
+            raise FinError("Num days must be an integer")
+
+        numWeeks = abs(numDays) // 5
+        remainingDays = abs(numDays) % 5
+        weekday = self._weekday
+
+        if numDays > 0:
+            extra = np.where(weekday + remainingDays > Date.FRI, 2, 0)
+            return self.addDays(numWeeks * 7 + remainingDays + extra)
+        else:
+            extra = np.where(weekday - remainingDays < Date.MON, 2, 0)
+            return self.addDays(-(numWeeks * 7 + remainingDays + extra))
+
+    ###########################################################################
+
+    def addMonths(self,
+                  numMonths: (int, np.ndarray)):
+        """ Returns a new DateVector with the dates numMonths months after the
+        dates. If the day does not exist in the new month it is moved back to
+        the month end, as in Date.addMonths. """
+
+        numMonths = np.asarray(numMonths)
+
+        if np.any(numMonths != np.floor(numMonths)):
+            raise FinError("Must only pass integers or float integers.")
+
+        d, m, y = self._dayMonthYear()
+
+        months = (m - 1) + numMonths.astype(np.int64)
+        newY = (y + months // 12).astype(np.int32)
+        newM = (1 + months % 12).astype(np.int32)
+        newD = np.minimum(d, _daysInMonth(newM, newY)).astype(np.int32)
+
+        return DateVector(_excelDatesFromDMY(newD, newM, newY))
+
+    ###########################################################################
+
+    def addYears(self,
+                 numYears: (int, np.ndarray)):
+        """ Returns a new DateVector with the dates numYears whole years after
+        the dates. """
+
+        return self.addMonths(np.asarray(numYears) * 12)
+
+    ###########################################################################
+
+    def addTenor(self,
+                 tenor: str):
+        """ Return the dates following these dates by a period given by the
+        tenor which is a string consisting of a number and a letter, the
+        letter being d, w, m , y for day, week, month or year. Months and
+        years are added one period at a time so that the result agrees with
+        Date.addTenor date by date. The dates are NOT holiday adjusted. """
+
+        periodType, numPeriods = _parseTenor(tenor)
+
+        if periodType == "D":
+            return self.addDays(numPeriods)
+        elif periodType == "W":
+            return self.addDays(7 * numPeriods)
+
+        step = 1
+        if periodType == "Y":
+            step = 12
+
+        newDates = DateVector(self._excelDate)
+        for _ in range(0, numPeriods):
+            newDates = newDates.addMonths(step)
+
+        return newDates
+
+    ###########################################################################
+
+    def toDates(self):
+        """ Return the dates as a list of Date objects. """
+        d, m, y = self._dayMonthYear()
+        return [Date(int(d[i]), int(m[i]), int(y[i])) for i in range(len(d))]
+
+    ###########################################################################
+
+    def __len__(self):
+        return len(self._excelDate)
+
+    ###########################################################################
+
+    def __getitem__(self, key):
+        """ An integer index returns a Date while a slice, mask or array of
+        indices returns a DateVector. """
+
+        if isinstance(key, (int, np.integer)):
+            d, m, y = self._dayMonthYear()
+            return Date(int(d[key]), int(m[key]), int(y[key]))
+
+        return DateVector(self._excelDate[key])
+
+    ###########################################################################
+
+    def __iter__(self):
+        for dt in self.toDates():
+            yield dt
+
+    ###########################################################################
+
+    @staticmethod
+    def _serials(other):
+        if isinstance(other, (Date, DateVector)):
+            return other._excelDate
+        else:
+            raise FinError("Can only compare a DateVector with dates.")
+
+    ###########################################################################
+
+    def __lt__(self, other):
+        return self._excelDate < self._serials(other)
+
+    ###########################################################################
+
+    def __gt__(self, other):
+        return self._excelDate > self._serials(other)
+
+    ###########################################################################
+
+    def __le__(self, other):
+        return self._excelDate <= self._serials(other)
+
+    ###########################################################################
+
+    def __ge__(self, other):
+        return self._excelDate >= self._serials(other)
+
+    ###########################################################################
+
+    def __eq__(self, other):
+        return self._excelDate == self._serials(other)
+
+    ###########################################################################
+
+    def __ne__(self, other):
+        return self._excelDate != self._serials(other)
+
+    ###########################################################################
+
+    def __sub__(self, other):
+        """ Number of days between these dates and a Date or DateVector. """
+        return self._excelDate - self._serials(other)
+
+    ###########################################################################
+
+    def __rsub__(self, other):
+        return self._serials(other) - self._excelDate
+
+    ###########################################################################
+
+    def __repr__(self):
+        """ Returns a string listing the dates. """
+
+        numDates = len(self)
+        if numDates > 10:
+            dates = self[0:5].toDates() + ["..."] + self[-5:].toDates()
+        else:
+            dates = self.toDates()
+
+        s = "DateVector(" + str(numDates) + "): "
+        s += ", ".join([str(dt) for dt in dates])
+        return s
+
+    ###########################################################################
+
+    def _print(self):
+        """ prints formatted string of the dates. """
+        print(self)
+
+###############################################################################
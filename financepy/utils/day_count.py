@@ -4,10 +4,12 @@
 
 from .date import Date, monthDaysLeapYear, monthDaysNotLeapYear, datediff
 from .date import isLeapYear
+from .date_vector import DateVector, _isLeapYear, _excelDatesFromDMY
 from .FinError import FinError
 from .frequency import FrequencyTypes, annual_frequency
 from .global_vars import gDaysInYear
 
+import numpy as np
 from enum import Enum
 
 # A useful source for these definitions can be found at
@@ -102,8 +104,17 @@ class DayCount(object):
         https://en.wikipedia.org/wiki/Day_count_convention
         and
         http://data.cbonds.info/files/cbondscalc/Calculator.pdf
+
+        If any of the dates is a DateVector then the year fractions are
+        calculated for all of the dates at once and the acc_factor and num
+        that are returned are Numpy arrays.
         """
 
+        if isinstance(dt1, DateVector) or isinstance(dt2, DateVector) or \
+           isinstance(dt3, DateVector):
+            return self._year_fracVector(dt1, dt2, dt3, freq_type,
+                                         isTerminationDate)
+
         d1 = dt1._d
         m1 = dt1._m
         y1 = dt1._y
@@ -285,6 +296,144 @@ class DayCount(object):
             raise FinError(str(self._type) +
                            " is not one of DayCountTypes")
 
+###############################################################################
+
+    def _year_fracVector(self,
+                         dt1: (Date, DateVector),
+                         dt2: (Date, DateVector),
+                         dt3: (Date, DateVector) = None,
+                         freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                         isTerminationDate: bool = False):
+        """ Vectorised version of year_frac in which any of the dates can be
+        a DateVector. The conventions are applied exactly as in year_frac but
+        using Numpy array operations. Returns the tuple (acc_factor, num, den)
+        in which acc_factor and num are arrays. """
+
+        d1 = np.asarray(dt1._d).astype(np.int64)
+        m1 = np.asarray(dt1._m).astype(np.int64)
+        y1 = np.asarray(dt1._y).astype(np.int64)
+
+        d2 = np.asarray(dt2._d).astype(np.int64)
+        m2 = np.asarray(dt2._m).astype(np.int64)
+        y2 = np.asarray(dt2._y).astype(np.int64)
+
+        days = np.asarray(dt2 - dt1)
+
+        if self._type == DayCountTypes.THIRTY_360_BOND:
+
+            d1 = np.where(d1 == 31, 30, d1)
+            d2 = np.where((d2 == 31) & (d1 == 30), 30, d2)
+            den = 360
+
+        elif self._type == DayCountTypes.THIRTY_E_360:
+
+            d1 = np.where(d1 == 31, 30, d1)
+            d2 = np.where(d2 == 31, 30, d2)
+            den = 360
+
+        elif self._type == DayCountTypes.THIRTY_E_360_ISDA:
+
+            lastDayOfFeb1 = (m1 == 2) & (d1 == np.where(_isLeapYear(y1), 29, 28))
+            lastDayOfFeb2 = (m2 == 2) & (d2 == np.where(_isLeapYear(y2), 29, 28))
+
+            d1 = np.where((d1 == 31) | lastDayOfFeb1, 30, d1)
+            d2 = np.where(d2 == 31, 30, d2)
+
+            if isTerminationDate is False:
+                d2 = np.where(lastDayOfFeb2, 30, d2)
+
+            den = 360
+
+        elif self._type == DayCountTypes.THIRTY_E_PLUS_360:
+
+            d1 = np.where(d1 == 31, 30, d1)
+            m2 = np.where(d2 == 31, m2 + 1, m2)
+            d2 = np.where(d2 == 31, 1, d2)
+            den = 360
+
+        elif self._type == DayCountTypes.ACT_ACT_ISDA:
+
+            denom1 = np.where(_isLeapYear(y1), 366, 365)
+            denom2 = np.where(_isLeapYear(y2), 366, 365)
+            ones = np.ones_like(y1)
+
+            daysYear1 = _excelDatesFromDMY(ones, ones, y1 + 1) - dt1._excelDate
+            daysYear2 = dt2._excelDate - _excelDatesFromDMY(ones, ones, y2)
+
+            sameYear = (y1 == y2)
+            num = np.where(sameYear, days, daysYear1 + daysYear2)
+            den = np.where(sameYear, denom1, denom1 + denom2)
+            acc_factor = np.where(sameYear,
+                                  days / denom1,
+                                  daysYear1 / denom1 + daysYear2 / denom2
+                                  + (y2 - y1 - 1.0))
+            return (acc_factor, num, den)
+
+        elif self._type == DayCountTypes.ACT_ACT_ICMA:
+
+            freq = annual_frequency(freq_type)
+
+            if dt3 is None or freq is None:
+                raise FinError("ACT_ACT_ICMA requires three dates and a freq")
+
+            num = days
+            den = freq * np.asarray(dt3 - dt1)
+            acc_factor = num / den
+            return (acc_factor, num, den)
+
+        elif self._type == DayCountTypes.ACT_365F:
+
+            return (days / 365, days, 365)
+
+        elif self._type == DayCountTypes.ACT_360:
+
+            return (days / 360, days, 360)
+
+        elif self._type == DayCountTypes.ACT_365L:
+
+            frequency = annual_frequency(freq_type)
+
+            if dt3 is None:
+                y3 = y2
+                t3 = None
+            else:
+                y3 = np.asarray(dt3._y).astype(np.int64)
+                t3 = dt3._excelDate
+
+            leap1 = _isLeapYear(y1)
+            leap3 = _isLeapYear(y3)
+
+            if frequency == 1:
+                if t3 is None:
+                    raise FinError("ACT_365L with annual frequency needs dt3")
+                twos = 2 * np.ones_like(y1)
+                feb29Year = np.where(leap1, y1, y3)
+                hasFeb29 = leap1 | leap3
+                feb29 = np.where(hasFeb29,
+                                 _excelDatesFromDMY(np.where(hasFeb29, 29, 28),
+                                                    twos,
+                                                    feb29Year),
+                                 1)
+                inRange = (feb29 > dt1._excelDate) & (feb29 <= t3)
+                den = np.where(hasFeb29 & inRange, 366, 365)
+            else:
+                den = np.where(leap3, 366, 365)
+
+            return (days / den, days, den)
+
+        elif self._type == DayCountTypes.SIMPLE:
+
+            return (days / gDaysInYear, days, gDaysInYear)
+
+        else:
+
+            raise FinError(str(self._type) +
+                           " is not one of DayCountTypes")
+
+        num = 360 * (y2 - y1) + 30 * (m2 - m1) + (d2 - d1)
+        acc_factor = num / den
+        return (acc_factor, num, den)
+
 ###############################################################################
 
     def __repr__(self):
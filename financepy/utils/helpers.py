@@ -7,6 +7,7 @@ import numpy as np
 from numba import njit, float64
 from typing import Union
 from .date import Date
+from .date_vector import DateVector
 from .global_vars import gDaysInYear, gSmall
 from .FinError import FinError
 from .day_count import DayCountTypes, DayCount
@@ -78,7 +79,8 @@ def timesFromDates(dt: Date,
     """ If a single date is passed in then return the year from valuation date
     but if a whole vector of dates is passed in then convert to a vector of
     times from the valuation date. The output is always a numpy vector of times
-    which has only one element if the input is only one date. """
+    which has only one element if the input is only one date. A DateVector
+    is converted to a vector of times in a single vectorised step. """
 
     if isinstance(valuation_date, Date) is False:
         raise FinError("Valuation date is not a Date")
@@ -110,6 +112,14 @@ def timesFromDates(dt: Date,
 
         return np.array(times)
 
+    elif isinstance(dt, DateVector):
+        if dcCounter is None:
+            times = (dt._excelDate - valuation_date._excelDate) / gDaysInYear
+        else:
+            times = dcCounter.year_frac(valuation_date, dt)[0]
+
+        return np.asarray(times, dtype=np.float64)
+
     elif isinstance(dt, np.ndarray):
         raise FinError("You passed an ndarray instead of dates.")
     else:
@@ -222,6 +232,12 @@ def input_time(dt: Date,
     elif isinstance(dt, Date):
         t = (dt - curve._valuation_date) / gDaysInYear
         return check(t)
+    elif isinstance(dt, DateVector):
+        t = (dt._excelDate - curve._valuation_date._excelDate) / gDaysInYear
+        if np.any(t < 0.0):
+            raise FinError("Date is before curve value date.")
+        t = np.maximum(small, t)
+        return t
     elif isinstance(dt, np.ndarray):
         t = dt
         if np.any(t) < 0:
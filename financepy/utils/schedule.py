@@ -2,11 +2,15 @@
 # Copyright (C) 2018, 2019, 2020 Dominic O'Kane
 ##############################################################################
 
+import numpy as np
+from collections import OrderedDict
 
 from .FinError import FinError
 from .date import Date
+from .date_vector import DateVector
 from .calendar import (Calendar, CalendarTypes)
 from .calendar import (BusDayAdjustTypes, DateGenRuleTypes)
+from .day_count import DayCount, DayCountTypes
 from .frequency import (annual_frequency, FrequencyTypes)
 from .helpers import labelToString
 from .helpers import check_argument_types
@@ -121,6 +125,14 @@ class Schedule(object):
 
         return self._adjusted_dates
 
+###############################################################################
+
+    def scheduleDateVector(self):
+        """ Returns the schedule of adjusted dates as a DateVector so that
+        they can be passed to vectorised day count and discounting code. """
+
+        return DateVector(self.scheduleDates())
+
 ###############################################################################
 
     def _generate(self):
@@ -266,3 +278,204 @@ class Schedule(object):
         print(self)
 
 ###############################################################################
+
+###############################################################################
+# Swap legs and curve instruments regenerate the same schedules many times -
+# a curve rebuild, a scenario run or a book of trades with standard terms all
+# ask for identical dates. Generated schedules and their accrual tables are
+# therefore kept in a least recently used cache keyed on the schedule terms.
+# Cached values are immutable (tuples and read-only arrays) so that they can
+# be shared safely between products.
+###############################################################################
+
+gScheduleCacheSize = 4096
+gScheduleCache = OrderedDict()
+
+###############################################################################
+
+
+def _scheduleCacheLookup(key, builder):
+    """ Return the cached value for the key. On a miss the value is created
+    by calling the builder function and the least recently used entry is
+    evicted if the cache is full. """
+
+    value = gScheduleCache.get(key)
+
+    if value is not None:
+        gScheduleCache.move_to_end(key)
+        return value
+
+    value = builder()
+    gScheduleCache[key] = value
+
+    while len(gScheduleCache) > gScheduleCacheSize:
+        gScheduleCache.popitem(last=False)
+
+    return value
+
+###############################################################################
+
+
+def clearScheduleCache():
+    """ Remove all of the cached schedules and accrual tables. """
+    gScheduleCache.clear()
+
+###############################################################################
+
+
+def cachedScheduleDates(effective_date: Date,
+                        termination_date: Date,
+                        freq_type: FrequencyTypes = FrequencyTypes.ANNUAL,
+                        calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                        bus_day_adjust_type: BusDayAdjustTypes = BusDayAdjustTypes.FOLLOWING,
+                        date_gen_rule_type: DateGenRuleTypes = DateGenRuleTypes.BACKWARD,
+                        adjustTerminationDate: bool = True,
+                        endOfMonthFlag: bool = False):
+    """ Return the adjusted dates of the Schedule with these terms as a tuple.
+    The schedule is only generated the first time that it is requested. """
+
+    key = ("DATES", effective_date._excelDate, termination_date._excelDate,
+           freq_type, calendar_type, bus_day_adjust_type, date_gen_rule_type,
+           bool(adjustTerminationDate), bool(endOfMonthFlag))
+
+    def build():
+        schedule = Schedule(effective_date,
+                            termination_date,
+                            freq_type,
+                            calendar_type,
+                            bus_day_adjust_type,
+                            date_gen_rule_type,
+                            adjustTerminationDate,
+                            endOfMonthFlag)
+
+        return tuple(schedule._adjusted_dates)
+
+    return _scheduleCacheLookup(key, build)
+
+###############################################################################
+
+
+class AccrualTable(object):
+    """ The accrual periods of a schedule for a given day count convention
+    and payment lag. The dates are held as tuples of Dates and as DateVectors
+    and the year fractions and accrued days as read-only Numpy arrays so that
+    they can be used directly in vectorised valuation code. Objects of this
+    class are shared through the schedule cache and must not be modified. """
+
+    def __init__(self,
+                 scheduleDates: (list, tuple),
+                 day_count_type: DayCountTypes,
+                 calendar_type: CalendarTypes = CalendarTypes.WEEKEND,
+                 payment_lag: int = 0):
+        """ Create the accrual table from a list of at least two schedule
+        dates. Payments are made payment_lag business days after the end of
+        each accrual period. """
+
+        if len(scheduleDates) < 2:
+            raise FinError("Schedule has none or only one date")
+
+        day_counter = DayCount(day_count_type)
+        calendar = Calendar(calendar_type)
+
+        startAccruedDates = []
+        endAccruedDates = []
+        payment_dates = []
+        year_fracs = []
+        accrued_days = []
+
+        prevDt = scheduleDates[0]
+
+        for nextDt in scheduleDates[1:]:
+
+            startAccruedDates.append(prevDt)
+            endAccruedDates.append(nextDt)
+
+            if payment_lag == 0:
+                payment_date = nextDt
+            else:
+                payment_date = calendar.addBusinessDays(nextDt, payment_lag)
+
+            payment_dates.append(payment_date)
+
+            (year_frac, num, _) = day_counter.year_frac(prevDt, nextDt)
+
+            year_fracs.append(year_frac)
+            accrued_days.append(num)
+
+            prevDt = nextDt
+
+        self._startAccruedDates = tuple(startAccruedDates)
+        self._endAccruedDates = tuple(endAccruedDates)
+        self._payment_dates = tuple(payment_dates)
+        self._year_fracs = tuple(year_fracs)
+        self._accrued_days = tuple(accrued_days)
+
+        self._startAccruedDateVector = DateVector(startAccruedDates)
+        self._endAccruedDateVector = DateVector(endAccruedDates)
+        self._paymentDateVector = DateVector(payment_dates)
+
+        for dateVector in (self._startAccruedDateVector,
+                           self._endAccruedDateVector,
+                           self._paymentDateVector):
+            dateVector._excelDate.setflags(write=False)
+
+        self._yearFracArray = np.array(year_fracs, dtype=np.float64)
+        self._yearFracArray.setflags(write=False)
+
+        self._accruedDaysArray = np.array(accrued_days, dtype=np.float64)
+        self._accruedDaysArray.setflags(write=False)
+
+###############################################################################
+
+    def __len__(self):
+        return len(self._payment_dates)
+
+###############################################################################
+
+    def __repr__(self):
+        s = labelToString("OBJECT TYPE", type(self).__name__)
+        s += labelToString("NUM PERIODS", len(self))
+        s += labelToString("FIRST ACCRUAL DATE", self._startAccruedDates[0])
+        s += labelToString("LAST PAYMENT DATE", self._payment_dates[-1], "")
+        return s
+
+###############################################################################
+
+    def _print(self):
+        print(self)
+
+###############################################################################
+
+
+def cachedAccrualTable(effective_date: Date,
+                       termination_date: Date,
+                       freq_type: FrequencyTypes,
+                       calendar_type: CalendarTypes,
+                       bus_day_adjust_type: BusDayAdjustTypes,
+                       date_gen_rule_type: DateGenRuleTypes,
+                       day_count_type: DayCountTypes,
+                       payment_lag: int = 0):
+    """ Return the AccrualTable of the schedule with these terms using the
+    given day count and payment lag. Tables are built once and then shared
+    by all of the swap legs with the same terms. """
+
+    key = ("ACCRUALS", effective_date._excelDate, termination_date._excelDate,
+           freq_type, calendar_type, bus_day_adjust_type, date_gen_rule_type,
+           day_count_type, payment_lag)
+
+    def build():
+        scheduleDates = cachedScheduleDates(effective_date,
+                                            termination_date,
+                                            freq_type,
+                                            calendar_type,
+                                            bus_day_adjust_type,
+                                            date_gen_rule_type)
+
+        return AccrualTable(scheduleDates,
+                            day_count_type,
+                            calendar_type,
+                            payment_lag)
+
+    return _scheduleCacheLookup(key, build)
+
+###############################################################################
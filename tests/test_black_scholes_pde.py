@@ -0,0 +1,175 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinOptionTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.models.black_scholes import FinModelBlackScholesTypes
+from financepy.models.black_scholes_analytic import bsValue, bsDelta, bsGamma
+from financepy.models.black_scholes_pde import bsPDEValue
+from financepy.models.equity_crr_tree import crrTreeValAvg
+from financepy.products.equity.FinEquityAmericanOption import \
+    FinEquityAmericanOption
+from financepy.products.equity.FinEquityBarrierOption import \
+    FinEquityBarrierOption, FinEquityBarrierTypes
+from financepy.products.equity.FinEquityOneTouchOption import \
+    FinEquityOneTouchOption, FinTouchOptionPayoffTypes
+from financepy.products.fx.FinFXBarrierOption import \
+    FinFXBarrierOption, FinFXBarrierTypes
+
+valuation_date = Date(1, 1, 2021)
+expiry_date = Date(1, 1, 2022)
+discount_curve = DiscountCurveFlat(valuation_date, 0.05)
+dividend_curve = DiscountCurveFlat(valuation_date, 0.02)
+model = FinModelBlackScholes(0.25)
+
+
+def test_vanilla_and_american():
+
+    s, k, t, r, q, v = 100.0, 105.0, 1.0, 0.05, 0.02, 0.25
+
+    for optionType, phi in [(FinOptionTypes.EUROPEAN_CALL, 1.0),
+                            (FinOptionTypes.EUROPEAN_PUT, -1.0)]:
+
+        res = bsPDEValue(s, t, r, q, v,
+                         lambda x: np.maximum(phi * (x - k), 0.0),
+                         points=[k])
+
+        ot = optionType.value
+        assert abs(res['value'] - bsValue(s, t, k, r, q, v, ot)) < 2e-3
+        assert abs(res['delta'] - bsDelta(s, t, k, r, q, v, ot)) < 1e-4
+        assert abs(res['gamma'] - bsGamma(s, t, k, r, q, v, ot)) < 1e-5
+
+    # The American put matches a tree with many more steps
+    tree = crrTreeValAvg(s, r, q, v, 2000, t,
+                         FinOptionTypes.AMERICAN_PUT.value, k)
+
+    res = bsPDEValue(s, t, r, q, v, lambda x: np.maximum(k - x, 0.0),
+                     lambda x: np.maximum(k - x, 0.0), points=[k])
+
+    assert abs(res['value'] - tree['value']) < 5e-3
+    assert abs(res['delta'] - tree['delta']) < 1e-3
+    assert abs(res['gamma'] - tree['gamma']) < 1e-4
+
+    option = FinEquityAmericanOption(expiry_date, k,
+                                     FinOptionTypes.AMERICAN_PUT)
+    pdeModel = FinModelBlackScholes(v, FinModelBlackScholesTypes.PDE, 200)
+    value = option.value(valuation_date, s, discount_curve, dividend_curve,
+                         pdeModel)
+    assert abs(value - tree['value']) < 5e-3
+
+
+def test_barrier_options():
+
+    for optionType in FinEquityBarrierTypes:
+
+        if optionType.name.startswith("DOWN"):
+            barrier = 90.0
+        else:
+            barrier = 115.0
+
+        for k in [95.0, 105.0, 120.0]:
+
+            option = FinEquityBarrierOption(expiry_date, k, optionType,
+                                            barrier, 252)
+
+            stock_prices = np.array([85.0, 100.0, 120.0])
+            res = option.valuePDE(valuation_date, stock_prices,
+                                  discount_curve, dividend_curve, model)
+
+            for i, s in enumerate(stock_prices):
+                v = option.value(valuation_date, s, discount_curve,
+                                 dividend_curve, model)
+                assert abs(res['value'][i] - v) < 2e-3
+
+    option = FinFXBarrierOption(expiry_date, 1.2, "EURUSD",
+                                FinFXBarrierTypes.DOWN_AND_OUT_CALL, 1.15,
+                                252, 1.0, "USD")
+
+    dom_curve = DiscountCurveFlat(valuation_date, 0.03)
+    for_curve = DiscountCurveFlat(valuation_date, 0.01)
+    fxModel = FinModelBlackScholes(0.12)
+
+    v = option.value(valuation_date, 1.21, dom_curve, for_curve, fxModel)
+    res = option.valuePDE(valuation_date, 1.21, dom_curve, for_curve,
+                          fxModel)
+    assert abs(res['value'] - v) < 1e-5
+
+
+def test_one_touch_options():
+
+    for optionType in FinTouchOptionPayoffTypes:
+
+        if optionType.name.startswith("DOWN"):
+            barrier = 90.0
+        else:
+            barrier = 115.0
+
+        option = FinEquityOneTouchOption(expiry_date, optionType, barrier)
+
+        v = option.value(valuation_date, 100.0, discount_curve,
+                         dividend_curve, model)
+        res = option.valuePDE(valuation_date, 100.0, discount_curve,
+                              dividend_curve, model)
+
+        assert abs(res['value'] / v - 1.0) < 1e-4
+
+    with pytest.raises(FinError):
+        option.valuePDE(valuation_date, 120.0, discount_curve,
+                        dividend_curve, model)
+
+
+def test_discrete_dividend():
+
+    dividend_date = Date(1, 7, 2021)
+    dividend = 5.0
+    zero_curve = DiscountCurveFlat(valuation_date, 0.0)
+
+    option = FinEquityAmericanOption(expiry_date, 100.0,
+                                     FinOptionTypes.EUROPEAN_CALL)
+
+    res = option.valuePDE(valuation_date, 100.0, discount_curve, zero_curve,
+                          model, [dividend_date], [dividend])
+
+    # Exact simulation of the stock with a drop on the dividend date
+    td = (dividend_date - valuation_date) / 365.0
+    t = (expiry_date - valuation_date) / 365.0
+    r = 0.05
+    v = 0.25
+
+    np.random.seed(42)
+    n = 200000
+    z1 = np.random.standard_normal(n)
+    z2 = np.random.standard_normal(n)
+    s = 100.0 * np.exp((r - 0.5 * v * v) * td + v * np.sqrt(td) * z1)
+    s = np.maximum(s - dividend, 0.0)
+    s = s * np.exp((r - 0.5 * v * v) * (t - td) + v * np.sqrt(t - td) * z2)
+    payoffs = np.exp(-r * t) * np.maximum(s - 100.0, 0.0)
+
+    se = np.std(payoffs) / np.sqrt(n)
+    assert abs(res['value'] - np.mean(payoffs)) < 3.0 * se
+
+    # A large dividend makes it worth exercising the call early
+    american = FinEquityAmericanOption(expiry_date, 100.0,
+                                       FinOptionTypes.AMERICAN_CALL)
+
+    euroValue = option.valuePDE(valuation_date, 100.0, discount_curve,
+                                zero_curve, model, [dividend_date],
+                                [20.0])['value']
+    amerValue = american.valuePDE(valuation_date, 100.0, discount_curve,
+                                  zero_curve, model, [dividend_date],
+                                  [20.0])['value']
+    assert amerValue > euroValue + 1.0
+
+    # Without dividends the American call is not exercised early
+    euroValue = option.valuePDE(valuation_date, 100.0, discount_curve,
+                                zero_curve, model)['value']
+    amerValue = american.valuePDE(valuation_date, 100.0, discount_curve,
+                                  zero_curve, model)['value']
+    assert abs(amerValue - euroValue) < 1e-10
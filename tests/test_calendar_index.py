@@ -0,0 +1,50 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+from financepy.utils.calendar import Calendar, CalendarTypes, BusDayAdjustTypes
+from financepy.utils.date import Date
+from financepy.utils.date_vector import DateVector
+
+calendar = Calendar(CalendarTypes.UNITED_KINGDOM)
+
+# Good Friday, Easter Monday and a Saturday in 2021 and then a business day
+dates = [Date(2, 4, 2021), Date(5, 4, 2021), Date(31, 7, 2021),
+         Date(30, 12, 2021)]
+
+
+def test_isBusinessDay():
+    assert [calendar.isBusinessDay(dt) for dt in dates] == \
+        [False, False, False, True]
+    assert list(calendar.isBusinessDay(DateVector(dates))) == \
+        [False, False, False, True]
+    assert calendar.isHoliday(Date(2, 4, 2021)) is True
+    assert calendar.isHoliday(Date(31, 7, 2021)) is False
+
+
+def test_adjust():
+    following = BusDayAdjustTypes.FOLLOWING
+    modFollowing = BusDayAdjustTypes.MODIFIED_FOLLOWING
+    assert calendar.adjust(Date(2, 4, 2021), following) == Date(6, 4, 2021)
+    assert calendar.adjust(Date(31, 7, 2021), following) == Date(2, 8, 2021)
+    assert calendar.adjust(Date(31, 7, 2021), modFollowing) == \
+        Date(30, 7, 2021)
+
+    for convention in BusDayAdjustTypes:
+        adjusted = calendar.adjust(DateVector(dates), convention)
+        assert adjusted.toDates() == \
+            [calendar.adjust(dt, convention) for dt in dates]
+
+
+def test_addBusinessDays():
+    # Crosses Christmas, Boxing Day and New Year holidays (all moved to MON)
+    assert calendar.addBusinessDays(Date(24, 12, 2021), 2) == Date(30, 12, 2021)
+    assert calendar.addBusinessDays(Date(30, 12, 2021), 1) == Date(31, 12, 2021)
+    assert calendar.addBusinessDays(Date(31, 12, 2021), 1) == Date(4, 1, 2022)
+    assert calendar.addBusinessDays(Date(4, 1, 2022), -2) == Date(30, 12, 2021)
+    assert calendar.addBusinessDays(Date(1, 1, 2021), 1000) == \
+        Date(16, 12, 2024)
+
+    shifted = calendar.addBusinessDays(DateVector(dates), -7)
+    assert shifted.toDates() == \
+        [calendar.addBusinessDays(dt, -7) for dt in dates]
@@ -0,0 +1,123 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from scipy.special import stdtr
+
+from financepy.utils.date import Date
+from financepy.utils.helpers import uniformToDefaultTime
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.products.credit.cds import FinCDS
+from financepy.products.credit.cds_curve import FinCDSCurve
+from financepy.products.credit.cds_basket import FinCDSBasket
+from financepy.products.credit.cds_basket import _nthDefaultTimes
+from financepy.models.credit_gaussian_copula import default_timesGC
+from financepy.models.credit_gaussian_copula import default_timesGC_Chunks
+from financepy.models.credit_gaussian_copula import survivalCurveSegments
+from financepy.models.credit_gaussian_copula import uniformsToDefaultTimes
+from financepy.models.credit_student_t_copula import FinModelStudentTCopula
+from financepy.models.credit_student_t_copula import studentTCDF
+
+valuation_date = Date(1, 1, 2021)
+libor_curve = DiscountCurveFlat(valuation_date, 0.02)
+num_credits = 6
+
+issuer_curves = []
+for i in range(0, num_credits):
+    cdsContracts = [FinCDS(valuation_date, valuation_date.addYears(y),
+                           0.005 + 0.002 * i + 0.001 * y) for y in [1, 3, 5]]
+    issuer_curves.append(FinCDSCurve(valuation_date, cdsContracts,
+                                     libor_curve, 0.4))
+
+correlationMatrix = 0.3 * np.ones((num_credits, num_credits)) \
+    + 0.7 * np.eye(num_credits)
+
+
+def test_uniforms_to_default_times():
+
+    (times, hazards, num_points) = survivalCurveSegments(issuer_curves)
+
+    np.random.seed(1234)
+    u = np.random.uniform(0.0, 1.0, size=(num_credits, 500))
+    u[0, :3] = [0.0, 1.0, 1e-12]
+    tau = uniformsToDefaultTimes(u, times, hazards, num_points)
+
+    for iCredit in range(0, num_credits):
+        c = issuer_curves[iCredit]
+        for iTrial in range(0, 500):
+            t = uniformToDefaultTime(u[iCredit, iTrial], c._times, c._values)
+            assert abs(tau[iCredit, iTrial] - t) < 1e-10
+
+
+def test_chunks_match_single_draw():
+
+    num_trials = 1000
+    tau = default_timesGC(issuer_curves, correlationMatrix, num_trials, 42)
+    assert tau.shape == (num_credits, 2 * num_trials)
+
+    chunks = list(default_timesGC_Chunks(issuer_curves, correlationMatrix,
+                                         num_trials, 42, 300))
+    assert [c.shape[1] for c in chunks] == [600, 600, 600, 200]
+
+    # A chunk size covering all trials gives the single draw exactly
+    chunks = list(default_timesGC_Chunks(issuer_curves, correlationMatrix,
+                                         num_trials, 42, num_trials))
+    assert len(chunks) == 1
+    assert np.all(chunks[0] == tau)
+
+    # The antithetic trials are the late defaults when the first are early
+    assert np.all((tau[:, :num_trials] < 1.0) <= (tau[:, num_trials:] > 1.0))
+
+
+def test_student_t():
+
+    x = np.linspace(-50.0, 50.0, 1001).reshape((7, 143))
+    for dof in [1, 2, 3, 4, 7, 10]:
+        assert np.max(np.abs(studentTCDF(x, dof) - stdtr(dof, x))) < 1e-14
+
+    model = FinModelStudentTCopula()
+    tau1 = model.default_times(issuer_curves, correlationMatrix, 5, 1000, 42)
+    tau2 = model.default_times(issuer_curves, correlationMatrix, 5.0, 1000,
+                               42)
+    tau3 = model.default_times(issuer_curves, correlationMatrix, 5.5, 1000,
+                               42)
+    assert tau1.shape == tau3.shape == (num_credits, 2000)
+    assert np.all(tau1 == tau2)
+    assert np.all(tau3 >= 0.0)
+
+
+def test_nth_default_times():
+
+    np.random.seed(7)
+    tau = np.random.exponential(10.0, size=(num_credits, 2000))
+    tau[:, 0] = 3.0
+
+    for n in range(1, num_credits + 1):
+        (nthTimes, nthCredits) = _nthDefaultTimes(tau, n)
+        assert np.all(nthTimes == np.sort(tau, axis=0)[n - 1])
+        assert np.all(tau[nthCredits, np.arange(2000)] == nthTimes)
+        assert nthCredits[0] == 0
+
+
+def test_basket_chunking():
+
+    basket = FinCDSBasket(valuation_date, valuation_date.addYears(5))
+
+    for n in [1, 3]:
+        v1 = basket.valueGaussian_MC(valuation_date, n, issuer_curves,
+                                     correlationMatrix, libor_curve, 2000, 42)
+        v2 = basket.valueGaussian_MC(valuation_date, n, issuer_curves,
+                                     correlationMatrix, libor_curve, 2000, 42,
+                                     500)
+
+        # Different chunks draw different numbers so only agree statistically
+        assert abs(v1[2] / v2[2] - 1.0) < 0.1
+        assert v1[1] > 0.0 and v2[1] > 0.0
+
+    v1 = basket.valueStudentT_MC(valuation_date, 1, issuer_curves,
+                                 correlationMatrix, 5, libor_curve, 2000, 42)
+    v2 = basket.valueStudentT_MC(valuation_date, 1, issuer_curves,
+                                 correlationMatrix, 5, libor_curve, 2000, 42,
+                                 500)
+    assert abs(v1[2] / v2[2] - 1.0) < 0.1
@@ -0,0 +1,174 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+from copy import deepcopy
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.products.rates.FinIborDeposit import FinIborDeposit
+from financepy.products.rates.IborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import IborSingleCurve
+from financepy.products.credit.cds import FinCDS
+from financepy.products.credit.cds_curve import FinCDSCurve
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.market.discount.interpolator import FinInterpTypes
+
+valuation_date = Date(20, 6, 2018)
+dcType = DayCountTypes.ACT_360
+rateQuotes = np.array([0.020, 0.022, 0.025, 0.028, 0.031])
+cdsQuotes = np.array([0.005, 0.0055, 0.0065, 0.0073])
+cdsMonths = [12, 36, 60, 120]
+
+
+def buildLiborCurve(quotes, interp_type=FinInterpTypes.FLAT_FWD_RATES):
+
+    depos = [FinIborDeposit(valuation_date, tenor, quotes[i], dcType)
+             for i, tenor in enumerate(["1M", "6M"])]
+
+    swaps = [FinIborSwap(valuation_date, tenor, FinSwapTypes.PAY,
+                         quotes[2 + i], FrequencyTypes.SEMI_ANNUAL,
+                         DayCountTypes.THIRTY_E_360_ISDA)
+             for i, tenor in enumerate(["2Y", "5Y", "10Y"])]
+
+    return IborSingleCurve(valuation_date, depos, [], swaps, interp_type)
+
+
+def buildIssuerCurve(quotes, libor_curve):
+
+    cds_contracts = [FinCDS(valuation_date, valuation_date.addMonths(m),
+                            quotes[i])
+                     for i, m in enumerate(cdsMonths)]
+
+    return FinCDSCurve(valuation_date, cds_contracts, libor_curve, 0.40)
+
+
+def test_rates_curve_jacobian():
+
+    trade = FinIborSwap(valuation_date, "7Y", FinSwapTypes.RECEIVE, 0.03,
+                        FrequencyTypes.SEMI_ANNUAL,
+                        DayCountTypes.THIRTY_E_360_ISDA)
+
+    for interp_type in [FinInterpTypes.FLAT_FWD_RATES,
+                        FinInterpTypes.PCHIP_LOG_DISCOUNT]:
+
+        curve = buildLiborCurve(rateQuotes, interp_type)
+        jacobian = curve.curveJacobian()
+        bucketedPV01 = trade.bucketedPV01(valuation_date, curve)
+
+        h = 1e-6
+        for k in range(len(rateQuotes)):
+            upQuotes = rateQuotes.copy()
+            upQuotes[k] += h
+            downQuotes = rateQuotes.copy()
+            downQuotes[k] -= h
+            upCurve = buildLiborCurve(upQuotes, interp_type)
+            downCurve = buildLiborCurve(downQuotes, interp_type)
+
+            dDfs = (upCurve._dfs - downCurve._dfs) / (2.0 * h)
+            assert np.allclose(jacobian[:, k], dDfs, atol=1e-6)
+
+            dv = trade.value(valuation_date, upCurve) - \
+                trade.value(valuation_date, downCurve)
+            assert abs(bucketedPV01[k] - dv / (2.0 * h) * 1e-4) < 1e-5
+
+        # Discount factors at the grid dates are the grid points themselves
+        gridDates = [curve._usedDeposits[1]._maturity_date,
+                     curve._usedSwaps[-1]._fixed_leg._payment_dates[-1]]
+        sens = curve.dfQuoteSensitivity(gridDates)
+        assert np.allclose(sens, jacobian[[2, -1]], atol=1e-8)
+
+
+def test_flat_curve_has_no_jacobian():
+
+    curve = DiscountCurveFlat(valuation_date, 0.03)
+    with pytest.raises(FinError):
+        curve.curveJacobian()
+
+
+def test_cds_bucketed_credit_and_interest_dv01():
+
+    libor_curve = buildLiborCurve(rateQuotes)
+    issuer_curve = buildIssuerCurve(cdsQuotes, libor_curve)
+    trade = FinCDS(valuation_date, valuation_date.addMonths(72), 0.01)
+
+    creditDV01 = trade.bucketedCreditDV01(valuation_date, issuer_curve)
+    interestDV01 = trade.bucketedInterestDV01(valuation_date, issuer_curve)
+
+    h = 1e-6
+    for k in range(len(cdsQuotes)):
+        upQuotes = cdsQuotes.copy()
+        upQuotes[k] += h
+        downQuotes = cdsQuotes.copy()
+        downQuotes[k] -= h
+        vUp = trade.value(valuation_date,
+                          buildIssuerCurve(upQuotes, libor_curve))['full_pv']
+        vDown = trade.value(valuation_date,
+                            buildIssuerCurve(downQuotes, libor_curve))['full_pv']
+        assert abs(creditDV01[k] - (vUp - vDown) / (2.0 * h) * 1e-4) < 1e-3
+
+    for k in range(len(rateQuotes)):
+        upQuotes = rateQuotes.copy()
+        upQuotes[k] += h
+        downQuotes = rateQuotes.copy()
+        downQuotes[k] -= h
+        upCurve = buildIssuerCurve(cdsQuotes, buildLiborCurve(upQuotes))
+        downCurve = buildIssuerCurve(cdsQuotes, buildLiborCurve(downQuotes))
+        vUp = trade.value(valuation_date, upCurve)['full_pv']
+        vDown = trade.value(valuation_date, downCurve)['full_pv']
+        assert abs(interestDV01[k] - (vUp - vDown) / (2.0 * h) * 1e-4) < 1e-4
+
+    # The buckets add up to the parallel credit DV01 up to convexity
+    parallel = trade.creditDV01(valuation_date, issuer_curve)
+    assert abs(np.sum(creditDV01) - parallel) < 1e-3 * abs(parallel)
+
+
+def test_cds_grid_derivatives():
+
+    libor_curve = buildLiborCurve(rateQuotes)
+    issuer_curve = buildIssuerCurve(cdsQuotes, libor_curve)
+    survValues = issuer_curve._values.copy()
+    liborDfs = libor_curve._dfs.copy()
+
+    # Maturities before, between and after the curve points
+    for months in [9, 48, 150]:
+
+        trade = FinCDS(valuation_date, valuation_date.addMonths(months),
+                       0.01)
+        (dvdq, dvdz) = trade._gridDerivatives(valuation_date, issuer_curve)
+
+        # The finite differences bump a copy of the curves
+        bumped = deepcopy(issuer_curve)
+
+        for (grid, derivatives) in [(bumped._values, dvdq),
+                                    (bumped._libor_curve._dfs, dvdz)]:
+            for k in range(1, len(grid)):
+                x = grid[k]
+                h = 1e-6 * x
+                grid[k] = x + h
+                vUp = trade.value(valuation_date, bumped)['full_pv']
+                grid[k] = x - h
+                vDown = trade.value(valuation_date, bumped)['full_pv']
+                grid[k] = x
+                dv = (vUp - vDown) / (2.0 * h)
+                assert abs(derivatives[k] - dv) < 1e-6 * (1.0 + abs(dv))
+
+        trade.bucketedCreditDV01(valuation_date, issuer_curve)
+        trade.bucketedInterestDV01(valuation_date, issuer_curve)
+
+        # Only the market standard pricing methods are differentiated
+        with pytest.raises(FinError):
+            trade.bucketedCreditDV01(valuation_date, issuer_curve,
+                                     pv01_method=1)
+        with pytest.raises(FinError):
+            trade.bucketedInterestDV01(valuation_date, issuer_curve,
+                                       prot_method=1)
+
+    # The risk calculations leave the curves as they were
+    assert np.all(issuer_curve._values == survValues)
+    assert np.all(libor_curve._dfs == liborDfs)
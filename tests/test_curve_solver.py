@@ -0,0 +1,119 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.products.rates.FinIborDeposit import FinIborDeposit
+from financepy.products.rates.FinIborFRA import FinIborFRA
+from financepy.products.rates.IborSwap import FinIborSwap
+from financepy.products.rates.FinOIS import FinOIS
+from financepy.products.rates.FinIborSingleCurve import IborSingleCurve
+from financepy.products.rates.FinIborDualCurve import IborDualCurve
+from financepy.products.rates.FinOISCurve import OISCurve
+from financepy.market.discount.interpolator import FinInterpTypes
+from financepy.market.discount.interpolator import FinInterpolator
+from financepy.market.discount.interpolator import _interpolateSensitivities
+
+valuation_date = Date(6, 6, 2018)
+settlement_date = valuation_date.addWeekDays(2)
+dcType = DayCountTypes.ACT_360
+
+splineTypes = [FinInterpTypes.FINCUBIC_ZERO_RATES,
+               FinInterpTypes.NATCUBIC_LOG_DISCOUNT,
+               FinInterpTypes.PCHIP_LOG_DISCOUNT]
+
+depos = [FinIborDeposit(settlement_date, tenor, rate, dcType)
+         for tenor, rate in [("1M", 0.021), ("3M", 0.022), ("6M", 0.023)]]
+
+fras = [FinIborFRA(settlement_date.addTenor("6M"), "3M", 0.024, dcType)]
+
+swaps = [FinIborSwap(settlement_date, tenor, FinSwapTypes.PAY, rate,
+                     FrequencyTypes.SEMI_ANNUAL,
+                     DayCountTypes.THIRTY_E_360_ISDA)
+         for tenor, rate in [("2Y", 0.026), ("5Y", 0.029), ("10Y", 0.033)]]
+
+oisSwaps = [FinOIS(valuation_date, tenor, FinSwapTypes.PAY, rate,
+                   FrequencyTypes.ANNUAL, DayCountTypes.ACT_360)
+            for tenor, rate in [("1Y", 0.019), ("3Y", 0.021), ("7Y", 0.024),
+                                ("15Y", 0.027)]]
+
+
+def test_interpolate_sensitivities():
+
+    times = np.array([0.0, 0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 10.0])
+    dfs = np.exp(-0.03 * times - 0.001 * times * times)
+    t = np.linspace(0.0, 12.0, 50)
+
+    for interp_type in FinInterpTypes:
+        values, sens = _interpolateSensitivities(t, times, dfs, interp_type)
+
+        interpolator = FinInterpolator(interp_type)
+        interpolator.fit(times, dfs)
+        assert np.allclose(values, interpolator.interpolate(t), atol=1e-14)
+
+        for i in [1, 4, 7]:
+            h = 1e-6 * dfs[i]
+            bumped = dfs.copy()
+            bumped[i] += h
+            interpolator.fit(times, bumped)
+            up = interpolator.interpolate(t)
+            bumped[i] -= 2.0 * h
+            interpolator.fit(times, bumped)
+            down = interpolator.interpolate(t)
+            assert np.allclose(sens[:, i], (up - down) / (2.0 * h), atol=1e-7)
+
+
+def test_single_curve_global_solver():
+
+    for interp_type in splineTypes:
+        curve = IborSingleCurve(valuation_date, depos, fras, swaps,
+                                interp_type)
+
+        report = curve._solverReport
+        assert report._converged is True
+        assert report._maxResidual < 1e-10
+        assert "CONVERGED" in repr(report)
+
+        for depo in depos:
+            v = depo.value(valuation_date, curve) / depo._notional
+            assert abs(v - 1.0) < 1e-10
+
+        for fra in fras:
+            v = fra.value(valuation_date, curve) / fra._notional
+            assert abs(v) < 1e-10
+
+        for swap in swaps:
+            v = swap.value(valuation_date, curve, curve, None)
+            assert abs(v) / swap._fixed_leg._notional < 1e-10
+
+
+def test_ois_and_dual_curve_global_solver():
+
+    for interp_type in splineTypes:
+        oisCurve = OISCurve(valuation_date, [], [], oisSwaps, interp_type)
+        assert oisCurve._solverReport._converged is True
+
+        for swap in oisSwaps:
+            v = swap.value(valuation_date, oisCurve)
+            assert abs(v) / swap._fixed_leg._notional < 1e-10
+
+        dualCurve = IborDualCurve(valuation_date, oisCurve, depos, fras,
+                                  swaps, interp_type)
+        assert dualCurve._solverReport._converged is True
+
+        for fra in fras:
+            v = fra.value(valuation_date, oisCurve, dualCurve) / fra._notional
+            assert abs(v) < 1e-10
+
+        for swap in swaps:
+            v = swap.value(valuation_date, oisCurve, dualCurve, None)
+            assert abs(v) / swap._fixed_leg._notional < 1e-10
+
+    # The local schemes are still bootstrapped without the global solver
+    oisCurve = OISCurve(valuation_date, [], [], oisSwaps)
+    assert oisCurve._solverReport is None
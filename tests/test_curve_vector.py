@@ -0,0 +1,54 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.date_vector import DateVector
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.market.discount.curve import DiscountCurve
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+
+valuation_date = Date(1, 1, 2020)
+df_dates = [valuation_date.addYears(i) for i in range(1, 11)]
+df_values = np.exp(-0.03 * np.arange(1, 11))
+curve = DiscountCurve(valuation_date, df_dates, df_values)
+flatCurve = DiscountCurveFlat(valuation_date, 0.04,
+                              FrequencyTypes.SEMI_ANNUAL,
+                              DayCountTypes.ACT_ACT_ISDA)
+
+dates = [valuation_date.addMonths(5 * i) for i in range(1, 30)]
+dateVector = DateVector(dates)
+
+
+def test_dfVector():
+    for discCurve in [curve, flatCurve]:
+        expected = discCurve.df(dates)
+        assert np.allclose(discCurve.dfVector(dateVector), expected)
+        serials = dateVector.excelDates()
+        assert np.allclose(discCurve.dfVector(serials), expected)
+        assert np.allclose(discCurve.dfVector(serials * 1.0), expected)
+
+
+def test_zeroRateVector():
+    for freq_type in [FrequencyTypes.CONTINUOUS, FrequencyTypes.ANNUAL,
+                      FrequencyTypes.SIMPLE]:
+        zeroRates = curve.zeroRateVector(dateVector, freq_type,
+                                         DayCountTypes.ACT_365F)
+        expected = curve.zeroRate(dates, freq_type, DayCountTypes.ACT_365F)
+        assert np.allclose(zeroRates, expected)
+
+
+def test_fwdVector():
+    assert np.allclose(curve.fwdVector(dateVector), curve.fwd(dates))
+    assert np.allclose(curve.fwd(dateVector), curve.fwd(dates))
+
+
+def test_fwd_rateVector():
+    assert np.allclose(curve.fwd_rateVector(dateVector, "3M"),
+                       curve.fwd_rate(dates, "3M"))
+    end_date = Date(1, 1, 2035)
+    assert np.allclose(curve.fwd_rate(dateVector, end_date),
+                       curve.fwd_rate(dates, end_date))
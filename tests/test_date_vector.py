@@ -0,0 +1,80 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.date_vector import DateVector
+from financepy.utils.day_count import DayCount, DayCountTypes
+from financepy.utils.helpers import timesFromDates
+from financepy.utils.schedule import Schedule
+
+dates = [Date(31, 1, 2020), Date(29, 2, 2020), Date(15, 6, 2021),
+         Date(31, 12, 2021), Date(28, 2, 2023)]
+dateVector = DateVector(dates)
+
+
+def test_excel_dates():
+    assert list(dateVector.excelDates()) == [int(dt._excelDate) for dt in dates]
+    assert dateVector[1] == Date(29, 2, 2020)
+
+
+def test_addTenor():
+    for tenor in ["5D", "2W", "1M", "13M", "3Y"]:
+        newDates = dateVector.addTenor(tenor)
+        assert newDates.toDates() == [dt.addTenor(tenor) for dt in dates]
+
+
+def test_EOM_and_weekday():
+    assert dateVector.EOM().toDates() == [dt.EOM() for dt in dates]
+    assert list(dateVector.isEOM()) == [dt.isEOM() for dt in dates]
+    assert list(dateVector.weekday()) == [dt._weekday for dt in dates]
+
+
+def test_comparisons():
+    valuation_date = Date(1, 1, 2021)
+    assert list(dateVector > valuation_date) == [False, False, True, True, True]
+    assert list(valuation_date < dateVector) == [False, False, True, True, True]
+    assert list(dateVector - valuation_date) == \
+        [dt - valuation_date for dt in dates]
+
+
+def test_day_count():
+    endVector = dateVector.addMonths(7)
+    for dcType in [DayCountTypes.THIRTY_E_360_ISDA, DayCountTypes.ACT_ACT_ISDA,
+                   DayCountTypes.ACT_360]:
+        dayCount = DayCount(dcType)
+        fracs = dayCount.year_frac(dateVector, endVector)[0]
+        expected = [dayCount.year_frac(dt, dt.addMonths(7))[0] for dt in dates]
+        assert np.allclose(fracs, expected)
+
+
+def test_times_from_dates():
+    valuation_date = Date(1, 1, 2020)
+    times = timesFromDates(dateVector, valuation_date)
+    assert np.allclose(times, timesFromDates(dates, valuation_date))
+
+
+def test_schedule():
+    schedule = Schedule(Date(1, 1, 2020), Date(1, 1, 2023))
+    assert schedule.scheduleDateVector().toDates() == schedule.scheduleDates()
+
+
+def test_intraday_and_date_range():
+
+    # A time of day cannot be held as a whole day serial
+    with pytest.raises(FinError):
+        DateVector([Date(1, 1, 2021), Date(1, 1, 2021, 12)])
+
+    # Years past the end of the date list extend it as Date does
+    farDates = DateVector.fromDMY([15, 31], [6, 12], [2150, 2160])
+    assert farDates.toDates() == [Date(15, 6, 2150), Date(31, 12, 2160)]
+
+    later = DateVector([Date(1, 3, 2100)]).addYears(70)
+    assert later[0] == Date(1, 3, 2170)
+
+    with pytest.raises(FinError):
+        DateVector.fromDMY([1], [1], [1899])
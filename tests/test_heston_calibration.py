@@ -0,0 +1,76 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.market.volatility.FinEquityVolSurface import \
+    FinEquityVolSurface
+from financepy.models.volatility_fns import FinVolFunctionTypes
+from financepy.models.heston import FinModelHeston
+from financepy.models.heston_calibrator import FinHestonCalibrator
+
+taus = np.array([0.1, 0.25, 0.5, 1.0, 2.0])
+strikes = np.linspace(75.0, 130.0, 10)
+
+
+def test_recovers_parameters_and_warm_starts():
+
+    trueModel = FinModelHeston(0.03, 1.8, 0.05, 0.45, -0.65)
+    prices = trueModel.valueGrid_COS(100.0, 0.02, 0.01, taus, strikes)
+
+    calibrator = FinHestonCalibrator(100.0, taus, strikes, prices, 0.02, 0.01)
+    model = calibrator.calibrate()
+
+    fitted = [model._v0, model._kappa, model._theta, model._sigma,
+              model._rho]
+    assert np.allclose(fitted, [0.03, 1.8, 0.05, 0.45, -0.65], atol=1e-6)
+    assert np.all(calibrator.checkCalibration(False) < 1e-8)
+
+    # The next day's surface starts from the previous fit
+    nextModel = FinModelHeston(0.032, 1.7, 0.051, 0.47, -0.63)
+    nextPrices = nextModel.valueGrid_COS(100.0, 0.02, 0.01, taus, strikes)
+    nextCalibrator = FinHestonCalibrator(100.0, taus, strikes, nextPrices,
+                                         0.02, 0.01)
+    nextCalibrator.calibrate(model)
+    assert nextCalibrator._result.nfev <= calibrator._result.nfev
+    assert np.all(nextCalibrator.checkCalibration(False) < 1e-8)
+
+
+def test_calibrates_to_equity_vol_surface():
+
+    valuation_date = Date(11, 1, 2021)
+    expiry_dates = [Date(11, 3, 2021), Date(11, 7, 2021), Date(11, 1, 2022)]
+    surfaceStrikes = np.array([3418.0, 3608.0, 3798.0, 3988.0, 4178.0])
+    vols = np.array([[28.25, 24.19, 19.57, 15.89, 15.34],
+                     [26.25, 23.51, 20.61, 18.03, 16.01],
+                     [25.24, 23.03, 20.81, 18.69, 16.76]]) / 100.0
+
+    surface = FinEquityVolSurface(valuation_date, 3800.0,
+                                  DiscountCurveFlat(valuation_date, 0.02),
+                                  DiscountCurveFlat(valuation_date, 0.01),
+                                  expiry_dates, surfaceStrikes, vols,
+                                  FinVolFunctionTypes.SVI)
+
+    calibrator = FinHestonCalibrator.fromEquityVolSurface(surface)
+    calibrator.calibrate()
+
+    assert np.allclose(calibrator._marketVols, vols, atol=1e-6)
+
+    # Heston cannot fit every smile exactly but gets within a vol point
+    assert np.all(calibrator.checkCalibration(False) < 0.01)
+
+
+def test_calibrator_validation():
+
+    prices = np.ones((len(taus), len(strikes)))
+
+    with pytest.raises(FinError):
+        FinHestonCalibrator(100.0, taus, strikes, prices[:-1], 0.02, 0.01)
+
+    with pytest.raises(FinError):
+        FinHestonCalibrator(100.0, -taus, strikes, prices, 0.02, 0.01)
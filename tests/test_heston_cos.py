@@ -0,0 +1,78 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.global_types import FinOptionTypes
+from financepy.products.equity.FinEquityVanillaOption import \
+    FinEquityVanillaOption
+from financepy.models.heston import FinModelHeston
+
+valuation_date = Date(1, 1, 2020)
+stock_price = 100.0
+r = 0.03
+q = 0.01
+
+
+def test_cos_matches_quadrature():
+
+    for params in [(0.04, 2.0, 0.04, 0.3, -0.7),
+                   (0.0175, 1.5768, 0.0398, 0.5751, -0.5711)]:
+
+        model = FinModelHeston(*params)
+
+        for expiry_date in [Date(1, 2, 2020), Date(1, 1, 2021),
+                            Date(1, 1, 2025)]:
+            for strike in [70.0, 95.0, 100.0, 110.0, 140.0]:
+                call = FinEquityVanillaOption(expiry_date, strike,
+                                              FinOptionTypes.EUROPEAN_CALL)
+                put = FinEquityVanillaOption(expiry_date, strike,
+                                             FinOptionTypes.EUROPEAN_PUT)
+
+                vQuad = model.value_Gatheral(valuation_date, call,
+                                             stock_price, r, q)
+                vCall = model.value_COS(valuation_date, call, stock_price,
+                                        r, q)
+                vPut = model.value_COS(valuation_date, put, stock_price,
+                                       r, q)
+
+                tau = (expiry_date - valuation_date) / 365.0
+                parity = stock_price * np.exp(-q * tau) - \
+                    strike * np.exp(-r * tau)
+
+                assert abs(vCall - vQuad) < 1e-5
+                assert abs(vCall - vPut - parity) < 1e-10
+
+
+def test_cos_grid():
+
+    model = FinModelHeston(0.04, 2.0, 0.04, 0.3, -0.7)
+    taus = np.array([0.25, 1.0, 3.0])
+    strikes = np.array([80.0, 100.0, 120.0])
+    rates = np.array([0.01, 0.02, 0.03])
+
+    grid = model.valueGrid_COS(stock_price, rates, q, taus, strikes,
+                               FinOptionTypes.EUROPEAN_PUT)
+    assert grid.shape == (3, 3)
+
+    for i, tau in enumerate(taus):
+        row = model.valueGrid_COS(stock_price, rates[i], q, [tau],
+                                  strikes * (1.0 + i),
+                                  FinOptionTypes.EUROPEAN_PUT)
+        strikeGrid = np.outer(1.0 + np.arange(3), strikes)
+        full = model.valueGrid_COS(stock_price, rates, q, taus, strikeGrid,
+                                   FinOptionTypes.EUROPEAN_PUT)
+        assert np.allclose(row[0], full[i], atol=1e-12)
+
+    # Put prices rise with the strike
+    assert np.all(np.diff(grid, axis=1) > 0.0)
+
+    with pytest.raises(FinError):
+        model.valueGrid_COS(stock_price, r, q, [0.0], strikes)
+
+    with pytest.raises(FinError):
+        model.valueGrid_COS(stock_price, r, q, taus, np.ones((2, 3)))
@@ -0,0 +1,82 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.products.rates.FinIborDeposit import FinIborDeposit
+from financepy.products.rates.FinIborFRA import FinIborFRA
+from financepy.products.rates.IborSwap import FinIborSwap
+from financepy.products.rates.FinIborSingleCurve import IborSingleCurve
+from financepy.market.discount.interpolator import FinInterpTypes
+from financepy.market.discount.interpolator import _uinterpolate
+from financepy.market.discount.interpolator import _uinterpolateLastDf
+
+valuation_date = Date(6, 6, 2018)
+
+
+def buildCurve(interp_type):
+
+    settlement_date = valuation_date.addWeekDays(2)
+    dcType = DayCountTypes.ACT_360
+
+    depos = []
+    for tenor, rate in [("1M", 0.021), ("3M", 0.022), ("6M", 0.023)]:
+        depos.append(FinIborDeposit(settlement_date, tenor, rate, dcType))
+
+    fras = [FinIborFRA(settlement_date.addTenor("6M"), "3M", 0.024, dcType)]
+
+    swaps = []
+    for tenor, rate in [("2Y", 0.026), ("5Y", 0.029), ("10Y", 0.033)]:
+        swap = FinIborSwap(settlement_date, tenor, FinSwapTypes.PAY, rate,
+                           FrequencyTypes.SEMI_ANNUAL,
+                           DayCountTypes.THIRTY_E_360_ISDA)
+        swaps.append(swap)
+
+    return IborSingleCurve(valuation_date, depos, fras, swaps, interp_type)
+
+
+def test_analytic_bootstrap():
+
+    for interp_type in [FinInterpTypes.FLAT_FWD_RATES,
+                        FinInterpTypes.LINEAR_ZERO_RATES]:
+
+        curve = buildCurve(interp_type)
+        analyticDfs = curve._dfs.copy()
+
+        for swap in curve._usedSwaps:
+            v = swap.value(valuation_date, curve) / swap._fixed_leg._notional
+            assert abs(v) < 1e-12
+
+        curve._buildCurveUsing1DSolver()
+        assert np.allclose(analyticDfs, curve._dfs, atol=1e-9)
+
+
+def test_last_df_derivative():
+
+    times = np.array([0.0, 0.5, 1.0, 2.0, 5.0])
+    dfs = np.exp(-0.03 * times - 0.002 * times * times)
+    bump = 1e-7
+
+    for interp_type in [FinInterpTypes.FLAT_FWD_RATES,
+                        FinInterpTypes.LINEAR_ZERO_RATES,
+                        FinInterpTypes.LINEAR_FWD_RATES]:
+
+        method = interp_type.value
+
+        for t in [0.25, 1.5, 3.0, 5.0, 7.0]:
+            df, dfdx = _uinterpolateLastDf(t, times, dfs, method)
+            assert df == _uinterpolate(t, times, dfs, method)
+
+            dfsUp = dfs.copy()
+            dfsUp[-1] += bump
+            dfsDown = dfs.copy()
+            dfsDown[-1] -= bump
+            dfUp = _uinterpolate(t, times, dfsUp, method)
+            dfDown = _uinterpolate(t, times, dfsDown, method)
+            fdDerivative = (dfUp - dfDown) / (2.0 * bump)
+            assert abs(dfdx - fdDerivative) < 1e-6
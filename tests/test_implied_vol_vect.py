@@ -0,0 +1,130 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+from scipy.stats import norm
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinOptionTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes_analytic import bsImpliedVolatility
+from financepy.models.black_scholes_analytic import bsImpliedVolatilityVect
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.products.equity.FinEquityVanillaOption import \
+    FinEquityVanillaOption
+from financepy.products.fx.FinFXVanillaOption import FinFXVanillaOption
+
+callType = FinOptionTypes.EUROPEAN_CALL.value
+putType = FinOptionTypes.EUROPEAN_PUT.value
+
+
+def exactPrice(s, t, k, r, q, v, optionTypes):
+    """ Black-Scholes prices with the exact normal distribution. """
+
+    fwd = s * np.exp((r - q) * t)
+    vsqrtT = v * np.sqrt(t)
+    d1 = np.log(fwd / k) / vsqrtT + 0.5 * vsqrtT
+    d2 = d1 - vsqrtT
+    phi = np.where(optionTypes == callType, 1.0, -1.0)
+    return np.exp(-r * t) * phi * (fwd * norm.cdf(phi * d1)
+                                   - k * norm.cdf(phi * d2))
+
+
+def test_chain_round_trip():
+
+    rng = np.random.default_rng(7)
+    n = 20000
+
+    t = rng.uniform(0.02, 5.0, n)
+    v = rng.uniform(0.03, 1.5, n)
+    k = 100.0 * np.exp(rng.uniform(-3.0, 3.0, n) * v * np.sqrt(t))
+    r = rng.uniform(-0.01, 0.05, n)
+    q = rng.uniform(0.0, 0.03, n)
+    optionTypes = rng.integers(callType, putType + 1, n)
+
+    prices = exactPrice(100.0, t, k, r, q, v, optionTypes)
+    vols = bsImpliedVolatilityVect(100.0, t, k, r, q, prices, optionTypes)
+
+    assert np.all(np.isfinite(vols))
+    assert np.max(np.abs(vols - v)) < 1e-8
+
+
+def test_failures_are_flagged():
+
+    s, t, k, r, q = 100.0, 1.0, 100.0, 0.0, 0.0
+    prices = np.array([-1.0, 0.0, 100.0, 150.0])
+
+    vols = bsImpliedVolatilityVect(s, t, k, r, q, prices, callType)
+
+    # Negative prices and prices at or above the stock price have no vol
+    assert np.isnan(vols[0])
+    assert vols[1] == 0.0
+    assert np.isnan(vols[2])
+    assert np.isnan(vols[3])
+
+    # A deep in the money option whose time value is lost in rounding
+    price = exactPrice(100.0, 1.0, 20.0, 0.0, 0.0, 0.05, callType)
+    assert np.isnan(bsImpliedVolatilityVect(s, t, 20.0, r, q, price,
+                                            callType))
+
+
+def test_matches_scalar_solver():
+
+    valuation_date = Date(1, 1, 2021)
+    option = FinEquityVanillaOption(Date(1, 7, 2021), 105.0,
+                                    FinOptionTypes.EUROPEAN_PUT)
+    discount_curve = DiscountCurveFlat(valuation_date, 0.03)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+
+    prices = np.array([4.0, 6.5, 9.0, 12.0])
+    vols = option.impliedVolatility(valuation_date, 100.0, discount_curve,
+                                    dividend_curve, prices)
+
+    for price, vol in zip(prices, vols):
+        scalarVol = option.impliedVolatility(valuation_date, 100.0,
+                                             discount_curve, dividend_curve,
+                                             price)
+        # The scalar solver inverts an approximate normal distribution
+        assert abs(vol - scalarVol) < 1e-5
+
+    t = 0.5
+    vol = bsImpliedVolatility(100.0, t, 105.0, 0.03, 0.01, 6.5, putType)
+    assert abs(bsImpliedVolatilityVect(100.0, t, 105.0, 0.03, 0.01, 6.5,
+                                       putType) - vol) < 1e-5
+
+
+def test_fx_option_round_trip():
+
+    valuation_date = Date(1, 1, 2021)
+    dom_curve = DiscountCurveFlat(valuation_date, 0.03)
+    for_curve = DiscountCurveFlat(valuation_date, 0.01)
+
+    for optionType in [FinOptionTypes.EUROPEAN_CALL,
+                       FinOptionTypes.EUROPEAN_PUT,
+                       FinOptionTypes.AMERICAN_PUT]:
+
+        option = FinFXVanillaOption(Date(1, 7, 2021), 1.25, "EURUSD",
+                                    optionType, 1000000, "USD")
+
+        value = option.value(valuation_date, 1.2, dom_curve, for_curve,
+                             FinModelBlackScholes(0.13))['v']
+        vol = option.impliedVolatility(valuation_date, 1.2, dom_curve,
+                                       for_curve, value)
+        assert abs(vol - 0.13) < 1e-6
+
+    # A strip of spot rates and prices gives a vector of volatilities
+    spotFXRates = np.array([1.0, 1.1, 1.2, 1.3, 1.4])
+    vols = np.array([0.10, 0.12, 0.14, 0.16, 0.18])
+
+    option = FinFXVanillaOption(Date(1, 7, 2021), 1.25, "EURUSD",
+                                FinOptionTypes.EUROPEAN_CALL, 1000000, "USD")
+    prices = option.value(valuation_date, spotFXRates, dom_curve, for_curve,
+                          FinModelBlackScholes(vols))['v']
+    impliedVols = option.impliedVolatility(valuation_date, spotFXRates,
+                                           dom_curve, for_curve, prices)
+    assert np.max(np.abs(impliedVols - vols)) < 1e-8
+
+    # A negative price has no volatility
+    assert np.isnan(option.impliedVolatility(valuation_date, 1.2, dom_curve,
+                                             for_curve, -0.01))
@@ -0,0 +1,59 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.market.discount.interpolator import FinInterpTypes
+from financepy.market.discount.interpolator import FinInterpolator
+from financepy.market.discount.interpolator import _uinterpolate
+from financepy.market.discount.interpolator import _vinterpolate
+from financepy.market.discount.interpolator import _intervalIndices
+
+localTypes = [FinInterpTypes.FLAT_FWD_RATES,
+              FinInterpTypes.LINEAR_FWD_RATES,
+              FinInterpTypes.LINEAR_ZERO_RATES]
+
+
+def test_interval_indices():
+
+    times = np.array([0.0, 0.5, 1.0, 2.0, 5.0])
+    t = np.array([0.0, 0.25, 0.5, 0.75, 2.0, 4.0, 5.0, 7.0])
+
+    expected = np.searchsorted(times, t)
+    assert np.array_equal(_intervalIndices(t, times), expected)
+    assert np.array_equal(_intervalIndices(t[::-1], times), expected[::-1])
+
+
+def test_vectorised_matches_scalar_interpolation():
+
+    rng = np.random.default_rng(1234)
+
+    # A long grid such as a daily OIS curve
+    times = np.concatenate(([0.0], np.sort(rng.uniform(0.01, 30.0, 250))))
+    dfs = np.exp(-0.02 * times - 0.0005 * times * times)
+
+    t = np.concatenate((rng.uniform(0.0, 35.0, 500), times))
+
+    for interp_type in localTypes:
+
+        scalar = np.array([_uinterpolate(x, times, dfs, interp_type.value)
+                           for x in t])
+
+        assert np.allclose(_vinterpolate(t, times, dfs, interp_type.value),
+                           scalar, rtol=1e-13, atol=0.0)
+
+        tSorted = np.sort(t)
+        scalarSorted = np.array([_uinterpolate(x, times, dfs,
+                                               interp_type.value)
+                                 for x in tSorted])
+
+        interpolator = FinInterpolator(interp_type)
+        interpolator.fit(times, dfs)
+        assert np.allclose(interpolator.interpolate(tSorted), scalarSorted,
+                           rtol=1e-13, atol=0.0)
+
+        # The grid values are recovered up to the small offset that the
+        # linear forward scheme uses in its first interval
+        assert np.allclose(interpolator.interpolate(times), dfs,
+                           rtol=1e-9, atol=0.0)
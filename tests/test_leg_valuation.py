@@ -0,0 +1,131 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.products.rates.FinFixedLeg import FinFixedLeg
+from financepy.products.rates.FinFloatLeg import FinFloatLeg
+from financepy.market.discount.curve_zeros import DiscountCurveZeros
+from financepy.market.discount.interpolator import FinInterpTypes
+
+valuation_date = Date(15, 3, 2021)
+effective_date = Date(10, 11, 2019)
+termination_date = Date(10, 11, 2027)
+
+zeroDates = [valuation_date.addYears(t) for t in [1, 2, 3, 5, 7, 10]]
+zeroRates = [0.010, 0.012, 0.015, 0.018, 0.020, 0.022]
+
+discount_curve = DiscountCurveZeros(valuation_date, zeroDates, zeroRates,
+                                    FrequencyTypes.ANNUAL,
+                                    DayCountTypes.ACT_365F,
+                                    FinInterpTypes.FLAT_FWD_RATES)
+
+index_curve = DiscountCurveZeros(valuation_date, zeroDates,
+                                 [r + 0.002 for r in zeroRates],
+                                 FrequencyTypes.ANNUAL,
+                                 DayCountTypes.ACT_365F,
+                                 FinInterpTypes.FLAT_FWD_RATES)
+
+
+def test_fixed_leg_value():
+
+    leg = FinFixedLeg(effective_date, termination_date, FinSwapTypes.PAY,
+                      0.02, FrequencyTypes.SEMI_ANNUAL,
+                      DayCountTypes.THIRTY_E_360, principal=1.0)
+
+    v = leg.value(valuation_date, discount_curve)
+
+    # Reference valuation one payment at a time
+    dfValue = discount_curve.df(valuation_date)
+    expected = 0.0
+    for dt, payment in zip(leg._payment_dates, leg._payments):
+        if dt > valuation_date:
+            expected += payment * discount_curve.df(dt) / dfValue
+
+    expected += leg._notional * \
+        discount_curve.df(leg._payment_dates[-1]) / dfValue
+    assert abs(v + expected) < 1e-6
+
+    # The flow values are only built when they are printed
+    assert len(leg._paymentPVs) == 0
+    leg._valueFlows()
+    assert leg._paymentPVs[0] == 0.0
+    assert abs(np.sum(leg._paymentPVs) + v) < 1e-6
+
+
+def test_float_leg_value():
+
+    leg = FinFloatLeg(effective_date, termination_date, FinSwapTypes.RECEIVE,
+                      0.001, FrequencyTypes.QUARTERLY, DayCountTypes.ACT_360)
+
+    firstFixing = 0.005
+    dfValue = discount_curve.df(valuation_date)
+
+    for curve in [discount_curve, index_curve]:
+
+        v = leg.value(valuation_date, discount_curve, curve, firstFixing)
+
+        expected = 0.0
+        firstPayment = True
+        for i, dt in enumerate(leg._payment_dates):
+            if dt > valuation_date:
+                alpha = leg._year_fracs[i]
+                if firstPayment:
+                    fwd = firstFixing
+                    firstPayment = False
+                else:
+                    fwd = (curve.df(leg._startAccruedDates[i]) /
+                           curve.df(leg._endAccruedDates[i]) - 1.0) / alpha
+                expected += (fwd + 0.001) * alpha * leg._notional * \
+                    discount_curve.df(dt) / dfValue
+
+        assert abs(v - expected) < 1e-6
+
+        assert len(leg._paymentPVs) == 0
+        leg._valueFlows()
+        assert abs(np.sum(leg._paymentPVs) - v) < 1e-6
+
+        live = np.array([dt > valuation_date for dt in leg._payment_dates])
+        assert leg._rates[np.argmax(live)] == firstFixing
+        assert np.all(leg._payments[~live] == 0.0)
+
+    # The printed report values the flows of the last valuation
+    leg.printValuation()
+
+
+class _DFOnlyCurve():
+    """ A curve that only has the df method of a DiscountCurve. """
+
+    def __init__(self, curve):
+        self._curve = curve
+
+    def df(self, dt):
+        return self._curve.df(dt)
+
+
+def test_curve_without_df_vector():
+
+    fixedLeg = FinFixedLeg(effective_date, termination_date,
+                           FinSwapTypes.PAY, 0.02,
+                           FrequencyTypes.SEMI_ANNUAL,
+                           DayCountTypes.THIRTY_E_360)
+
+    floatLeg = FinFloatLeg(effective_date, termination_date,
+                           FinSwapTypes.RECEIVE, 0.001,
+                           FrequencyTypes.QUARTERLY, DayCountTypes.ACT_360)
+
+    dfOnly = _DFOnlyCurve(discount_curve)
+    indexOnly = _DFOnlyCurve(index_curve)
+
+    v1 = fixedLeg.value(valuation_date, discount_curve)
+    v2 = fixedLeg.value(valuation_date, dfOnly)
+    assert abs(v1 - v2) < 1e-8
+
+    v1 = floatLeg.value(valuation_date, discount_curve, index_curve, 0.005)
+    v2 = floatLeg.value(valuation_date, dfOnly, indexOnly, 0.005)
+    assert abs(v1 - v2) < 1e-8
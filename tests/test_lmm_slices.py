@@ -0,0 +1,100 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.models.rates_libor_market_model import LMMSimulateFwds1F
+from financepy.models.rates_libor_market_model import LMMSimulateFwdsMF
+from financepy.models.rates_libor_market_model import LMMSimulateFwdsNF
+from financepy.models.rates_libor_market_model import LMMSimulateFwdSlices1F
+from financepy.models.rates_libor_market_model import LMMSimulateFwdSlicesMF
+from financepy.models.rates_libor_market_model import LMMSimulateFwdSlicesNF
+from financepy.models.rates_libor_market_model import LMMSwaptionPricer
+from financepy.models.rates_libor_market_model import LMMSwaptionPricerSlice
+
+numFwds = 12
+num_paths = 1000
+taus = np.full(numFwds, 0.25)
+fwd0 = np.linspace(0.02, 0.035, numFwds)
+gammas = np.concatenate(([0.0], np.full(numFwds - 1, 0.2)))
+seed = 42
+
+
+def checkSlices(fwds, fwdSlices, spotFwds, obsIndices):
+
+    for iObs, iTime in enumerate(obsIndices):
+        # Forwards that have fixed are not defined in the full simulation
+        assert np.allclose(fwdSlices[:, iObs, iTime:], fwds[:, iTime, iTime:],
+                           rtol=1e-12, atol=0.0)
+
+    for iTime in range(0, obsIndices[-1] + 1):
+        assert np.allclose(spotFwds[:, iTime], fwds[:, iTime, iTime],
+                           rtol=1e-12, atol=0.0)
+
+
+def test_one_factor_slices_match_full_simulation():
+
+    obsIndices = [2, 5]
+
+    for useSobol in [0, 1]:
+
+        fwds = LMMSimulateFwds1F(numFwds, num_paths, 0, fwd0, gammas, taus,
+                                 useSobol, seed)
+
+        fwdSlices, spotFwds = LMMSimulateFwdSlices1F(numFwds, num_paths, 0,
+                                                     fwd0, gammas, taus,
+                                                     useSobol, seed,
+                                                     obsIndices,
+                                                     chunkSize=100)
+
+        assert fwdSlices.shape == (num_paths, 2, numFwds)
+        assert spotFwds.shape == (num_paths, 6)
+        checkSlices(fwds, fwdSlices, spotFwds, obsIndices)
+
+        v = LMMSwaptionPricer(0.03, 5, numFwds, num_paths, fwd0, fwds, taus,
+                              1)
+        vSlice = LMMSwaptionPricerSlice(0.03, 5, numFwds, num_paths,
+                                        fwdSlices[:, 1, :], spotFwds, taus, 1)
+        assert abs(v - vSlice) < 1e-12
+
+
+def test_multi_factor_and_full_factor_slices():
+
+    lambdas = np.array([gammas, 0.5 * gammas])
+
+    fwds = LMMSimulateFwdsMF(numFwds, 2, num_paths, 0, fwd0, lambdas, taus,
+                             1, seed)
+    fwdSlices, spotFwds = LMMSimulateFwdSlicesMF(numFwds, 2, num_paths, 0,
+                                                 fwd0, lambdas, taus, 1, seed,
+                                                 [3])
+    checkSlices(fwds, fwdSlices, spotFwds, [3])
+
+    # Single precision storage halves the memory
+    fwdSlices32, _ = LMMSimulateFwdSlicesMF(numFwds, 2, num_paths, 0, fwd0,
+                                            lambdas, taus, 1, seed, [3], True)
+    assert fwdSlices32.dtype == np.float32
+    assert np.allclose(fwdSlices32, fwdSlices, rtol=1e-6)
+
+    correl = np.array([[np.exp(-0.1 * abs(i - j)) for i in range(numFwds)]
+                       for j in range(numFwds)])
+
+    fwds = LMMSimulateFwdsNF(numFwds, num_paths, fwd0, gammas, correl, taus,
+                             seed)
+    fwdSlices, spotFwds = LMMSimulateFwdSlicesNF(numFwds, num_paths, fwd0,
+                                                 gammas, correl, taus, seed,
+                                                 [1, 4])
+    checkSlices(fwds, fwdSlices, spotFwds, [1, 4])
+
+
+def test_slice_validation():
+
+    with pytest.raises(FinError):
+        LMMSimulateFwdSlices1F(numFwds, num_paths, 0, fwd0, gammas, taus, 0,
+                               seed, [5, 2])
+
+    with pytest.raises(FinError):
+        LMMSimulateFwdSlices1F(numFwds, num_paths, 0, fwd0, gammas, taus, 0,
+                               seed, [numFwds])
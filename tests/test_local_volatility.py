@@ -0,0 +1,119 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.market.volatility.FinEquityVolSurface import \
+    FinEquityVolSurface
+from financepy.market.volatility.FinFXVolSurfacePlus import \
+    FinFXVolSurfacePlus, FinFXATMMethod, FinFXDeltaMethod
+from financepy.models.volatility_fns import FinVolFunctionTypes
+from financepy.models.black_scholes_analytic import bsValue
+from financepy.models.local_volatility import FinModelLocalVolatility
+
+valuation_date = Date(11, 1, 2021)
+r = 0.02
+q = 0.01
+discount_curve = DiscountCurveFlat(valuation_date, r)
+dividend_curve = DiscountCurveFlat(valuation_date, q)
+
+expiry_dates = [Date(11, 2, 2021), Date(11, 4, 2021), Date(11, 10, 2021),
+                Date(11, 1, 2022), Date(11, 1, 2023)]
+strikes = np.array([3037, 3418, 3608, 3703, 3798, 3893, 3988, 4178, 4557])
+
+
+def equitySurface(volGrid):
+
+    return FinEquityVolSurface(valuation_date, 3800.0, discount_curve,
+                               dividend_curve, expiry_dates, strikes, volGrid,
+                               FinVolFunctionTypes.SABR_BETA_HALF,
+                               FinSolverTypes.LEVENBERG_MARQUARDT)
+
+
+def test_flat_surface_has_flat_local_vol():
+
+    surface = equitySurface(np.full((5, 9), 0.25))
+    model = FinModelLocalVolatility(surface, numStdDevs=3.0)
+
+    vols = model.localVolatility([[0.1], [0.7], [1.5]],
+                                 [3000.0, 3500.0, 3800.0, 4200.0, 4800.0])
+    assert vols.shape == (3, 5)
+    assert np.max(np.abs(vols - 0.25)) < 1e-3
+
+
+def test_local_vol_paths_reprice_the_smile():
+
+    volGrid = np.array([[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31,
+                         17.54, 25.67],
+                        [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52,
+                         15.31, 18.94],
+                        [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62,
+                         16.63, 14.94],
+                        [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69,
+                         16.76, 14.63],
+                        [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71,
+                         18.36, 16.26]]) / 100.0
+
+    surface = equitySurface(volGrid)
+    model = FinModelLocalVolatility(surface)
+
+    # The grid is read back exactly at its nodes
+    t = model._times[10]
+    fwd = 3800.0 * np.exp((r - q) * t)
+    stock_prices = fwd * np.exp(model._logMoneyness)
+    assert np.allclose(model.localVolatility(t, stock_prices),
+                       model._localVols[10], rtol=1e-12)
+
+    texp = 1.0
+    paths = model.getPaths(50000, 100, texp, 42)
+    assert paths.shape == (100000, 101)
+    assert np.all(paths[:, 0] == 3800.0)
+
+    sT = paths[:, -1]
+    df = np.exp(-r * texp)
+
+    for k in [3200.0, 3500.0, 3800.0, 4100.0, 4400.0]:
+        payoffs = df * np.maximum(sT - k, 0.0)
+        se = np.std(payoffs) / np.sqrt(len(payoffs))
+        vol = surface.volatilityFromStrikeTimeVect(k, texp)
+        v = bsValue(3800.0, texp, k, r, q, float(vol), 1)
+        assert abs(np.mean(payoffs) - v) < 3.0 * se
+
+
+def test_fx_surface():
+
+    surface = FinFXVolSurfacePlus(valuation_date, 1.3465, "EURUSD", "EUR",
+                                  DiscountCurveFlat(valuation_date, 0.0294),
+                                  DiscountCurveFlat(valuation_date, 0.0346),
+                                  ['1M', '3M', '1Y', '2Y'],
+                                  [21.00, 20.750, 18.250, 17.677],
+                                  [0.65, 0.85, 0.95, 0.85],
+                                  [-0.20, -0.30, -0.60, -0.562],
+                                  [2.433, 3.228, 3.806, 3.208],
+                                  [-1.258, -1.332, -1.359, -1.208],
+                                  0.5,
+                                  FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                                  FinFXDeltaMethod.SPOT_DELTA,
+                                  FinVolFunctionTypes.CLARK)
+
+    model = FinModelLocalVolatility(surface, numStdDevs=3.0)
+
+    paths = model.getPaths(20000, 50, 1.0, 42)
+    fwd = 1.3465 * np.exp((0.0294 - 0.0346) * 1.0)
+    assert abs(np.mean(paths[:, -1]) / fwd - 1.0) < 0.005
+
+    for k in [1.25, 1.35, 1.45]:
+        payoffs = np.exp(-0.0294) * np.maximum(paths[:, -1] - k, 0.0)
+        se = np.std(payoffs) / np.sqrt(len(payoffs))
+        vol = surface.volatilityFromStrikeTimeVect(k, 1.0)
+        v = bsValue(1.3465, 1.0, k, 0.0294, 0.0346, float(vol), 1)
+        assert abs(np.mean(payoffs) - v) < 3.0 * se
+
+    with pytest.raises(FinError):
+        FinModelLocalVolatility(discount_curve)
@@ -0,0 +1,180 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinOptionTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.products.equity.FinEquityVanillaOption import \
+    FinEquityVanillaOption
+from financepy.products.equity.FinEquityBasketOption import \
+    FinEquityBasketOption
+from financepy.products.equity.FinEquityRainbowOption import \
+    FinEquityRainbowOption, FinEquityRainbowOptionTypes
+from financepy.products.equity.FinEquityAsianOption import \
+    FinEquityAsianOption
+from financepy.products.equity.FinEquityDigitalOption import \
+    FinEquityDigitalOption, FinDigitalOptionTypes
+from financepy.products.equity.FinEquityBarrierOption import \
+    FinEquityBarrierOption, FinEquityBarrierTypes
+
+valuation_date = Date(1, 1, 2021)
+expiry_date = Date(1, 1, 2022)
+discount_curve = DiscountCurveFlat(valuation_date, 0.04)
+dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+model = FinModelBlackScholes(0.25)
+
+
+def test_single_asset_basket_matches_black_scholes():
+
+    option = FinEquityBasketOption(expiry_date, 105.0,
+                                   FinOptionTypes.EUROPEAN_PUT, 1)
+    greeks = option.valueMCGreeks(valuation_date, np.array([100.0]),
+                                  discount_curve, [dividend_curve],
+                                  np.array([0.25]), np.eye(1), 200000)
+
+    vanilla = FinEquityVanillaOption(expiry_date, 105.0,
+                                     FinOptionTypes.EUROPEAN_PUT)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve, model)
+
+    assert abs(greeks['value'] - vanilla.value(*args)) < 0.05
+    assert abs(greeks['delta'][0] - vanilla.delta(*args)) < 0.005
+    assert abs(greeks['gamma'][0] - vanilla.gamma(*args)) < 0.0005
+    assert abs(greeks['vega'][0] - vanilla.vega(*args)) < 0.5
+    assert abs(greeks['rho'] - vanilla.rho(*args)) < 0.5
+
+
+def test_basket_greeks_match_common_random_number_bumps():
+
+    option = FinEquityBasketOption(expiry_date, 100.0,
+                                   FinOptionTypes.EUROPEAN_CALL, 3)
+    stock_prices = np.array([100.0, 95.0, 110.0])
+    volatilities = np.array([0.2, 0.3, 0.25])
+    corrMatrix = np.array([[1.0, 0.5, 0.3], [0.5, 1.0, 0.4],
+                           [0.3, 0.4, 1.0]])
+    curves = [dividend_curve] * 3
+
+    def value(s, vols):
+        return option.valueMCGreeks(valuation_date, s, discount_curve,
+                                    curves, vols, corrMatrix)
+
+    greeks = value(stock_prices, volatilities)
+    bump = 1e-4
+
+    for i in range(0, 3):
+        s = stock_prices.copy()
+        s[i] += bump
+        delta = (value(s, volatilities)['value'] - greeks['value']) / bump
+        assert abs(greeks['delta'][i] - delta) < 1e-4
+
+        vols = volatilities.copy()
+        vols[i] += bump
+        vega = (value(stock_prices, vols)['value'] - greeks['value']) / bump
+        assert abs(greeks['vega'][i] - vega) < 1e-2
+
+    # The value agrees with the price-only simulation
+    v = option.valueMC(valuation_date, stock_prices, discount_curve, curves,
+                       volatilities, corrMatrix)
+    assert abs(greeks['value'] - v) < 0.1
+
+
+def test_rainbow_greeks_match_analytic_values():
+
+    option = FinEquityRainbowOption(expiry_date,
+                                    FinEquityRainbowOptionTypes.CALL_ON_MAXIMUM,
+                                    [100.0], 2)
+    stock_prices = np.array([100.0, 100.0])
+    volatilities = np.array([0.3, 0.3])
+    corrMatrix = np.array([[1.0, 0.5], [0.5, 1.0]])
+    curves = [dividend_curve] * 2
+
+    greeks = option.valueMCGreeks(valuation_date, stock_prices,
+                                  discount_curve, curves, volatilities,
+                                  corrMatrix, 200000)
+
+    bump = 1e-3
+    v = option.value(valuation_date, stock_prices, discount_curve, curves,
+                     volatilities, corrMatrix)
+    vUp = option.value(valuation_date, stock_prices + [bump, 0.0],
+                       discount_curve, curves, volatilities, corrMatrix)
+
+    assert abs(greeks['value'] - v) < 0.1
+    assert abs(greeks['delta'][0] - (vUp - v) / bump) < 0.005
+    assert abs(greeks['delta'][0] - greeks['delta'][1]) < 0.005
+
+
+def test_asian_greeks_match_common_random_number_bumps():
+
+    option = FinEquityAsianOption(Date(1, 4, 2021), expiry_date, 100.0,
+                                  FinOptionTypes.EUROPEAN_CALL, 50)
+
+    def value(s, vol):
+        return option.valueMCGreeks(valuation_date, s, discount_curve,
+                                    dividend_curve, FinModelBlackScholes(vol),
+                                    50000, 42, None)
+
+    greeks = value(100.0, 0.25)
+    h = 1.0
+    vUp = value(100.0 + h, 0.25)['value']
+    vDn = value(100.0 - h, 0.25)['value']
+
+    assert abs(greeks['delta'] - (vUp - vDn) / 2.0 / h) < 1e-3
+    assert abs(greeks['gamma'] - (vUp - 2.0 * greeks['value'] + vDn) / h / h) \
+        < 1e-3
+    vega = (value(100.0, 0.2501)['value'] - greeks['value']) / 1e-4
+    assert abs(greeks['vega'] - vega) < 1e-2
+
+    v = option.valueMC(valuation_date, 100.0, discount_curve, dividend_curve,
+                       model, 50000, 42, None)
+    assert abs(greeks['value'] - v) < 0.05
+
+
+def test_digital_greeks_match_analytic_greeks():
+
+    for underlyingType in FinDigitalOptionTypes:
+
+        option = FinEquityDigitalOption(expiry_date, 105.0,
+                                        FinOptionTypes.EUROPEAN_CALL,
+                                        underlyingType)
+        args = (valuation_date, 100.0, discount_curve, dividend_curve, model)
+        greeks = option.valueMCGreeks(*args, num_paths=200000)
+
+        scale = option.value(*args) + option.delta(*args)
+        assert abs(greeks['value'] - option.value(*args)) < 0.01 * scale
+        assert abs(greeks['delta'] - option.delta(*args)) < 0.01 * scale
+        assert abs(greeks['vega'] - option.vega(*args)) < 0.1 * scale
+
+
+def test_barrier_in_out_parity():
+
+    vanilla = FinEquityVanillaOption(expiry_date, 100.0,
+                                     FinOptionTypes.EUROPEAN_CALL)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve, model)
+
+    greeks = {}
+    for optionType in [FinEquityBarrierTypes.DOWN_AND_IN_CALL,
+                       FinEquityBarrierTypes.DOWN_AND_OUT_CALL]:
+        option = FinEquityBarrierOption(expiry_date, 100.0, optionType, 90.0)
+        greeks[optionType] = option.valueMCGreeks(*args, numAnnObs=52,
+                                                  num_paths=100000)
+
+    inGreeks = greeks[FinEquityBarrierTypes.DOWN_AND_IN_CALL]
+    outGreeks = greeks[FinEquityBarrierTypes.DOWN_AND_OUT_CALL]
+
+    # The knock-in and knock-out paths add up to the vanilla paths
+    assert abs(inGreeks['value'] + outGreeks['value'] -
+               vanilla.value(*args)) < 0.1
+    assert abs(inGreeks['delta'] + outGreeks['delta'] -
+               vanilla.delta(*args)) < 0.02
+    assert abs(inGreeks['rho'] + outGreeks['rho'] -
+               vanilla.rho(*args)) < 1.0
+
+    # Once knocked out the option has no value or risk
+    option = FinEquityBarrierOption(expiry_date, 100.0,
+                                    FinEquityBarrierTypes.DOWN_AND_OUT_CALL,
+                                    90.0)
+    args = (valuation_date, 85.0, discount_curve, dividend_curve, model)
+    assert option.valueMCGreeks(*args)['value'] == 0.0
@@ -0,0 +1,150 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+from numba import njit, config
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.global_types import FinOptionTypes
+from financepy.products.equity.FinEquityVanillaOption import \
+    FinEquityVanillaOption
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.models.black_scholes_mc import _blackScholesChunk
+from financepy.models.black_scholes_mc import _valueMC_NUMBA_ONLY
+from financepy.models.black_scholes_mc import _valueMC_NUMBA_PARALLEL
+from financepy.models.heston import FinModelHeston
+from financepy.models.heston import FinHestonNumericalScheme
+from financepy.models.monte_carlo_engine import FinMonteCarloEngine
+from financepy.models.monte_carlo_engine import getChunkSeeds
+from financepy.models.rates_libor_market_model import LMMSimulateFwdSlicesMF
+from financepy.models.rates_libor_market_model import LMMSwaptionPricerSlice
+from financepy.models.rates_libor_market_model import LMMSwaptionPricerMC
+
+valuation_date = Date(1, 1, 2020)
+option = FinEquityVanillaOption(Date(1, 1, 2021), 100.0,
+                                FinOptionTypes.EUROPEAN_CALL)
+params = np.array([100.0, 1.0, 100.0,
+                   float(FinOptionTypes.EUROPEAN_CALL.value),
+                   0.03, 0.01, 0.20])
+
+
+@njit
+def seededChunk(seed, num_paths):
+    np.random.seed(seed)
+    return _blackScholesChunk(params, num_paths)
+
+
+def test_chunk_seeds_are_independent():
+
+    seeds = getChunkSeeds(42, 1000)
+    assert len(np.unique(seeds)) == 1000
+
+    # The same seed gives the same streams and a new seed new streams
+    assert np.array_equal(getChunkSeeds(42, 4), seeds[:4])
+    assert len(np.intersect1d(getChunkSeeds(43, 1000), seeds)) == 0
+
+
+def test_engine_is_independent_of_threads():
+
+    values = []
+    for numThreads in sorted({1, config.NUMBA_NUM_THREADS}):
+        engine = FinMonteCarloEngine(1000, numThreads)
+        values.append(engine.run(_blackScholesChunk, params, 20001, 7))
+
+    assert values[0] == values[-1]
+
+    # The chunks are the same as running each one on its own
+    seeds = getChunkSeeds(7, 21)
+    total = 0.0
+    for iChunk in range(21):
+        n = min(1000, 20001 - iChunk * 1000)
+        total += seededChunk(seeds[iChunk], n)[0]
+
+    assert abs(values[0][0] - total / 20001) < 1e-12
+
+
+def test_engine_prices_converge():
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.03)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+    model = FinModelBlackScholes(0.20)
+
+    exact = option.value(valuation_date, 100.0, discount_curve,
+                         dividend_curve, model)
+
+    v = option.valueMC_NUMBA_PARALLEL(valuation_date, 100.0, discount_curve,
+                                      dividend_curve, model, 200000, 42)
+    assert abs(v - exact) < 0.05
+
+    heston = FinModelHeston(0.04, 2.0, 0.04, 0.3, -0.5)
+    engine = FinMonteCarloEngine(500)
+    v1 = heston.value_MC(valuation_date, option, 100.0, 0.03, 0.01, 4000,
+                         52, 42, engine=engine)
+    v2 = heston.value_MC(valuation_date, option, 100.0, 0.03, 0.01, 4000,
+                         52, 42, engine=FinMonteCarloEngine(500, 1))
+    assert v1 == v2
+
+    # The simulated paths stop one time step before expiry
+    exact = heston.value_COS(valuation_date, option, 100.0, 0.03, 0.01)
+    v = heston.value_MC(valuation_date, option, 100.0, 0.03, 0.01, 40000,
+                        52, 42, FinHestonNumericalScheme.QUADEXP,
+                        engine=engine)
+    assert abs(v - exact) < 0.3
+
+
+def test_lmm_swaption_engine():
+
+    numFwds = 12
+    taus = np.full(numFwds, 0.25)
+    fwd0 = np.linspace(0.02, 0.035, numFwds)
+    gammas = np.concatenate(([0.0], np.full(numFwds - 1, 0.2)))
+    lambdas = np.array([gammas, 0.5 * gammas])
+
+    (v1, stdError) = LMMSwaptionPricerMC(0.03, 4, numFwds, 20000, fwd0,
+                                         lambdas, taus, 1, 42,
+                                         FinMonteCarloEngine(1000))
+    (v2, _) = LMMSwaptionPricerMC(0.03, 4, numFwds, 20000, fwd0, lambdas,
+                                  taus, 1, 42, FinMonteCarloEngine(1000, 1))
+    assert v1 == v2
+    assert 0.0 < stdError < 0.01 * v1
+
+    # Agrees with the Sobol slice simulation to within the sampling error
+    fwdSlices, spotFwds = LMMSimulateFwdSlicesMF(numFwds, 2, 40000, 0, fwd0,
+                                                 lambdas, taus, 1, 42, [4])
+    v3 = LMMSwaptionPricerSlice(0.03, 4, numFwds, 40000, fwdSlices[:, 0, :],
+                                spotFwds, taus, 1)
+    assert abs(v1 - v3) < 4.0 * stdError
+
+    with pytest.raises(FinError):
+        LMMSwaptionPricerMC(0.03, 4, numFwds + 1, 100, fwd0, lambdas, taus,
+                            1, 42)
+
+
+def test_engine_validation():
+
+    with pytest.raises(FinError):
+        FinMonteCarloEngine(0)
+
+    with pytest.raises(FinError):
+        FinMonteCarloEngine(100, 0)
+
+    with pytest.raises(FinError):
+        FinMonteCarloEngine(100).run(_blackScholesChunk, params, 0, 1)
+
+
+def test_parallel_value_keeps_its_random_stream():
+
+    # The parallel method draws the same normals as the serial method and
+    # only sums them in chunks
+    for optionType in [FinOptionTypes.EUROPEAN_CALL.value,
+                       FinOptionTypes.EUROPEAN_PUT.value]:
+        for useSobol in [0, 1]:
+            v1 = _valueMC_NUMBA_ONLY(100.0, 1.0, 100.0, optionType, 0.03,
+                                     0.01, 0.20, 50001, 42, useSobol)
+            v2 = _valueMC_NUMBA_PARALLEL(100.0, 1.0, 100.0, optionType, 0.03,
+                                         0.01, 0.20, 50001, 42, useSobol)
+            assert abs(v1 - v2) < 1e-12
@@ -0,0 +1,154 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import FinProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.models.process_simulator import FinHestonNumericalScheme
+from financepy.models.process_simulator import FinVasicekNumericalScheme
+from financepy.models.process_simulator import FinCIRNumericalScheme
+from financepy.models.random_draw_cache import FinRandomDrawCache
+from financepy.models.process_simulator import FinPathAccumulatorTypes
+from financepy.models.gbm_process_simulator import FinGBMProcess
+
+accumulators = [FinPathAccumulatorTypes.TERMINAL,
+                FinPathAccumulatorTypes.MINIMUM,
+                FinPathAccumulatorTypes.MAXIMUM,
+                FinPathAccumulatorTypes.SUM]
+
+
+def checkStatistics(stats, paths):
+
+    assert stats.shape == (paths.shape[0], len(accumulators))
+    np.testing.assert_allclose(stats[:, 0], paths[:, -1], rtol=1e-13)
+    np.testing.assert_allclose(stats[:, 1], np.min(paths, axis=1),
+                               rtol=1e-13)
+    np.testing.assert_allclose(stats[:, 2], np.max(paths, axis=1),
+                               rtol=1e-13)
+    assert np.allclose(stats[:, 3], np.sum(paths[:, 1:], axis=1),
+                       rtol=1e-12)
+
+
+def test_process_simulator_statistics_match_paths():
+
+    process = FinProcessSimulator()
+
+    for scheme in FinGBMNumericalScheme:
+        modelParams = (100.0, 0.03, 0.25, scheme)
+        paths = process.getProcess(FinProcessTypes.GBM, 1.5, modelParams,
+                                   52, 501, 1234)
+
+        # Chunks smaller than the number of paths use the same randoms
+        for chunkSize in [1, 64, 10000]:
+            stats = process.getPathStatistics(FinProcessTypes.GBM, 1.5,
+                                              modelParams, 52, 501, 1234,
+                                              accumulators, chunkSize)
+            checkStatistics(stats, paths)
+
+
+def test_rate_and_heston_statistics_match_paths():
+
+    process = FinProcessSimulator()
+
+    models = []
+    for scheme in FinHestonNumericalScheme:
+        models.append((FinProcessTypes.HESTON,
+                       (100.0, 0.02, 0.04, 1.5, 0.05, 0.3, -0.7, scheme)))
+    for scheme in FinVasicekNumericalScheme:
+        models.append((FinProcessTypes.VASICEK,
+                       (0.03, 0.4, 0.04, 0.01, scheme)))
+    for scheme in FinCIRNumericalScheme:
+        if scheme == FinCIRNumericalScheme.EXACT:
+            continue
+        models.append((FinProcessTypes.CIR,
+                       (0.03, 0.4, 0.04, 0.05, scheme)))
+
+    for (processType, modelParams) in models:
+        paths = process.getProcess(processType, 1.0, modelParams, 24, 101, 5)
+
+        for chunkSize in [1, 40, 10000]:
+            stats = process.getPathStatistics(processType, 1.0, modelParams,
+                                              24, 101, 5, accumulators,
+                                              chunkSize)
+            checkStatistics(stats, paths)
+
+
+def test_multi_asset_statistics_match_paths():
+
+    model = FinGBMProcess()
+    numAssets = 3
+    mus = np.array([0.01, 0.02, 0.03])
+    stock_prices = np.array([100.0, 50.0, 80.0])
+    volatilities = np.array([0.2, 0.3, 0.25])
+    corrMatrix = 0.4 * np.ones((3, 3)) + 0.6 * np.eye(3)
+
+    paths = model.getPathsAssets(numAssets, 200, 12, 1.0, mus, stock_prices,
+                                 volatilities, corrMatrix, 11)
+
+    for chunkSize in [1, 64, 10000]:
+        stats = model.getPathStatisticsAssets(numAssets, 200, 12, 1.0, mus,
+                                              stock_prices, volatilities,
+                                              corrMatrix, 11, accumulators,
+                                              chunkSize)
+        assert stats.shape == (400, numAssets, len(accumulators))
+        for ia in range(0, numAssets):
+            checkStatistics(stats[:, ia, :], paths[:, :, ia])
+
+    cache = FinRandomDrawCache()
+    paths = model.getPathsAssets(numAssets, 200, 12, 1.0, mus, stock_prices,
+                                 volatilities, corrMatrix, 11, cache)
+    stats = model.getPathStatisticsAssets(numAssets, 200, 12, 1.0, mus,
+                                          stock_prices, volatilities,
+                                          corrMatrix, 11, accumulators, 64,
+                                          cache)
+    for ia in range(0, numAssets):
+        checkStatistics(stats[:, ia, :], paths[:, :, ia])
+
+
+def test_gbm_process_statistics_match_paths():
+
+    model = FinGBMProcess()
+    paths = model.getPaths(300, 40, 0.75, 0.02, 50.0, 0.3, 99)
+    stats = model.getPathStatistics(300, 40, 0.75, 0.02, 50.0, 0.3, 99,
+                                    accumulators, 7)
+    checkStatistics(stats, paths)
+
+
+def test_path_statistics_validation():
+
+    process = FinProcessSimulator()
+    modelParams = (100.0, 0.03, 0.25, FinGBMNumericalScheme.NORMAL)
+
+    with pytest.raises(FinError):
+        process.getPathStatistics(FinProcessTypes.GBM, 1.0, modelParams,
+                                  12, 10, 1, [])
+
+    with pytest.raises(FinError):
+        process.getPathStatistics(FinProcessTypes.GBM, 1.0, modelParams,
+                                  12, 10, 1, accumulators, 0)
+
+    with pytest.raises(FinError):
+        process.getPathStatistics(FinProcessTypes.CIR, 1.0,
+                                  (0.03, 0.4, 0.04, 0.05,
+                                   FinCIRNumericalScheme.EULER),
+                                  12, 10, 1, accumulators, 100,
+                                  FinRandomDrawCache())
+
+    with pytest.raises(FinError):
+        process.getPathStatistics(FinProcessTypes.CIR, 1.0,
+                                  (0.03, 0.4, 0.04, 0.05,
+                                   FinCIRNumericalScheme.EXACT),
+                                  12, 10, 1, accumulators)
+
+    with pytest.raises(FinError):
+        process.getPathStatistics(FinProcessTypes.CEV, 1.0,
+                                  modelParams, 12, 10, 1, accumulators)
+
+    with pytest.raises(FinError):
+        FinGBMProcess().getPathStatistics(10, 12, 1.0, 0.03, 100.0, 0.25, 1,
+                                          accumulators, 0)
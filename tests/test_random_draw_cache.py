@@ -0,0 +1,138 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinOptionTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.models.random_draw_cache import FinRandomDrawCache
+from financepy.models.process_simulator import FinProcessSimulator
+from financepy.models.process_simulator import FinProcessTypes
+from financepy.models.process_simulator import FinGBMNumericalScheme
+from financepy.products.equity.FinEquityBasketOption import \
+    FinEquityBasketOption
+from financepy.products.equity.FinEquityBarrierOption import \
+    FinEquityBarrierOption, FinEquityBarrierTypes
+from financepy.products.equity.FinEquityFixedLookbackOption import \
+    FinEquityFixedLookbackOption
+from financepy.products.equity.FinEquityDigitalOption import \
+    FinEquityDigitalOption, FinDigitalOptionTypes
+from financepy.products.equity.FinEquityAsianOption import \
+    FinEquityAsianOption
+
+valuation_date = Date(1, 1, 2021)
+expiry_date = Date(1, 1, 2022)
+discount_curve = DiscountCurveFlat(valuation_date, 0.04)
+dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+
+
+def test_cached_values_match_seeded_values():
+
+    cache = FinRandomDrawCache()
+
+    basket = FinEquityBasketOption(expiry_date, 100.0,
+                                   FinOptionTypes.EUROPEAN_CALL, 2)
+    args = (valuation_date, np.array([100.0, 90.0]), discount_curve,
+            [dividend_curve] * 2, np.array([0.2, 0.3]),
+            np.array([[1.0, 0.4], [0.4, 1.0]]), 5000, 42)
+    assert abs(basket.valueMC(*args) -
+               basket.valueMC(*args, randomCache=cache)) < 1e-10
+
+    barrier = FinEquityBarrierOption(expiry_date, 100.0,
+                                     FinEquityBarrierTypes.UP_AND_OUT_CALL,
+                                     130.0)
+    modelParams = (100.0, 0.03, 0.25, FinGBMNumericalScheme.ANTITHETIC)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve,
+            FinProcessTypes.GBM, modelParams, 52, 5000, 42)
+    assert abs(barrier.valueMC(*args) -
+               barrier.valueMC(*args, randomCache=cache)) < 1e-10
+
+    lookback = FinEquityFixedLookbackOption(expiry_date,
+                                            FinOptionTypes.EUROPEAN_CALL,
+                                            105.0)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve, 0.25,
+            100.0, 5000, 52, 42)
+    assert abs(lookback.valueMC(*args) -
+               lookback.valueMC(*args, randomCache=cache)) < 1e-10
+
+    digital = FinEquityDigitalOption(expiry_date, 105.0,
+                                     FinOptionTypes.EUROPEAN_CALL,
+                                     FinDigitalOptionTypes.CASH_OR_NOTHING)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve,
+            FinModelBlackScholes(0.25), 5000, 42)
+    assert abs(digital.valueMC(*args) -
+               digital.valueMC(*args, randomCache=cache)) < 1e-10
+
+    # The second valuation reads the block back from the cache
+    asian = FinEquityAsianOption(Date(1, 10, 2020), expiry_date, 100.0,
+                                 FinOptionTypes.EUROPEAN_PUT, 50)
+    args = (valuation_date, 100.0, discount_curve, dividend_curve,
+            FinModelBlackScholes(0.25), 5000, 42, 101.0)
+    v = asian.valueMC(*args)
+    assert abs(v - asian.valueMC(*args, randomCache=cache)) < 1e-10
+    assert abs(v - asian.valueMC(*args, randomCache=cache)) < 1e-10
+
+
+def test_bumped_revaluations_reuse_the_draws():
+
+    cache = FinRandomDrawCache()
+    option = FinEquityDigitalOption(expiry_date, 105.0,
+                                    FinOptionTypes.EUROPEAN_CALL,
+                                    FinDigitalOptionTypes.CASH_OR_NOTHING)
+
+    for stock_price in [99.0, 100.0, 101.0]:
+        option.valueMC(valuation_date, stock_price, discount_curve,
+                       dividend_curve, FinModelBlackScholes(0.25), 5000, 42,
+                       cache)
+
+    assert cache._numMisses == 1
+    assert cache._numHits == 2
+
+    # A new seed is a different block
+    cache.getGaussians(43, 5000, 1, 1)
+    assert cache._numMisses == 2
+    assert len(cache._draws) == 2
+
+
+def test_least_recently_used_blocks_are_evicted():
+
+    # Room for two blocks of 100 normals
+    cache = FinRandomDrawCache(1600)
+
+    a = cache.getGaussians(1, 100, 1, 1)
+    cache.getGaussians(2, 100, 1, 1)
+    assert cache.getGaussians(1, 100, 1, 1) is a
+
+    # Stored blocks are shared and so cannot be changed
+    with pytest.raises(ValueError):
+        a[0] = 0.0
+
+    cache.getGaussians(3, 100, 1, 1)
+    assert cache._numBytes == 1600
+    assert cache.drawKey(1, 100, 1, 1) in cache._draws
+    assert cache.drawKey(2, 100, 1, 1) not in cache._draws
+
+    # A block that is larger than the cache is not stored
+    g = cache.getGaussians(4, 1000, 1, 1)
+    assert len(g) == 1000
+    assert len(cache._draws) == 2
+
+    np.random.seed(4)
+    assert np.array_equal(g, np.random.standard_normal(1000))
+
+
+def test_invalid_cache_use():
+
+    with pytest.raises(FinError):
+        FinRandomDrawCache(0)
+
+    modelParams = (100.0, 0.03, 0.04, 2.0, 0.04, 0.3, -0.5, 0)
+    with pytest.raises(FinError):
+        FinProcessSimulator().getProcess(FinProcessTypes.HESTON, 1.0,
+                                         modelParams, 52, 100, 42,
+                                         FinRandomDrawCache())
@@ -0,0 +1,159 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinExerciseTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.models.rates_hull_white_tree import FinModelRatesHW
+from financepy.models.rates_bk_tree import FinModelRatesBK
+from financepy.models.rates_bdt_tree import FinModelRatesBDT
+from financepy.models.rates_tree_cache import FinRatesTreeCache
+from financepy.products.bonds.bond_embedded_option import BondEmbeddedOption
+from financepy.products.bonds.bond_embedded_option_portfolio import \
+    BondEmbeddedOptionPortfolio
+
+dfTimes = np.linspace(0.0, 12.0, 49)
+dfValues = np.exp(-0.03 * dfTimes - 0.001 * dfTimes**2)
+
+
+def buildModels(cache=None):
+    return [FinModelRatesHW(0.01, 0.05, 100, treeCache=cache),
+            FinModelRatesBK(0.20, 0.05, 100, treeCache=cache),
+            FinModelRatesBDT(0.20, 100, treeCache=cache)]
+
+
+def buildSchedules():
+
+    schedules = []
+
+    for i, tmat in enumerate([3.0, 5.2, 7.5, 10.0]):
+        cpnTimes = np.arange(tmat, 0.0, -0.5)[::-1]
+        cpnFlows = np.full(len(cpnTimes), 0.02 + 0.002 * i)
+        callTimes = cpnTimes[cpnTimes > 1.0][::2]
+        callPrices = np.full(len(callTimes), 100.0 + i)
+        putTimes = cpnTimes[cpnTimes > 2.0][::3]
+        putPrices = np.full(len(putTimes), 97.0)
+        schedules.append((cpnTimes, cpnFlows, callTimes, callPrices,
+                          putTimes, putPrices, 100.0))
+
+    return schedules
+
+
+def test_batched_bonds_match_single_bonds():
+
+    schedules = buildSchedules()
+    args = [list(x) for x in zip(*schedules)]
+
+    for model in buildModels():
+
+        model.buildTree(10.0, dfTimes, dfValues)
+        v = model.callablePuttableBonds_Tree(*args)
+
+        for i, schedule in enumerate(schedules):
+            single = model.callablePuttableBond_Tree(*schedule)
+            assert abs(v['bondwithoption'][i] -
+                       single['bondwithoption']) < 1e-10
+            assert abs(v['bondpure'][i] - single['bondpure']) < 1e-10
+
+
+def test_batched_swaptions_match_single_swaptions():
+
+    schedules = buildSchedules()
+    cpnTimes = [s[0] for s in schedules]
+    cpnFlows = [s[1] / 100.0 for s in schedules]
+    texps = [1.0, 2.0, 1.5, 3.0]
+    strikes = [1.0, 1.0, 0.99, 1.01]
+    faces = [1.0, 2.0, 1.0, 1.0]
+    exerciseTypes = [FinExerciseTypes.EUROPEAN, FinExerciseTypes.BERMUDAN,
+                     FinExerciseTypes.BERMUDAN, FinExerciseTypes.EUROPEAN]
+
+    for model in buildModels():
+
+        model.buildTree(10.0, dfTimes, dfValues)
+        v = model.bermudanSwaptions(texps, strikes, faces, cpnTimes,
+                                    cpnFlows, exerciseTypes)
+
+        for i in range(0, len(texps)):
+            single = model.bermudanSwaption(texps[i], cpnTimes[i][-1],
+                                            strikes[i], faces[i],
+                                            cpnTimes[i], cpnFlows[i],
+                                            exerciseTypes[i])
+            assert abs(v['pay'][i] - single['pay']) < 1e-10
+            assert abs(v['rec'][i] - single['rec']) < 1e-10
+
+
+def test_tree_cache_reuses_trees():
+
+    cache = FinRatesTreeCache(maxSize=2)
+    models = buildModels(cache)
+
+    for model in models:
+        model.buildTree(10.0, dfTimes, dfValues)
+
+    # The oldest tree has been dropped to keep two trees
+    assert cache._numMisses == 3
+    assert len(cache._trees) == 2
+
+    Q = models[2]._Q
+    rebuilt = FinModelRatesBDT(0.20, 100, treeCache=cache)
+    rebuilt.buildTree(10.0, dfTimes, dfValues)
+    assert cache._numHits == 1
+    assert rebuilt._Q is Q
+
+    # A different curve or volatility needs a new tree
+    rebuilt.buildTree(10.0, dfTimes, dfValues * 0.999)
+    FinModelRatesBDT(0.21, 100, treeCache=cache).buildTree(10.0, dfTimes,
+                                                          dfValues)
+    assert cache._numHits == 1
+    assert cache._numMisses == 5
+
+    with pytest.raises(FinError):
+        FinRatesTreeCache(0)
+
+
+def test_bond_portfolio_matches_bonds():
+
+    settlement_date = Date(1, 12, 2020)
+    discount_curve = DiscountCurveFlat(settlement_date, 0.03)
+
+    bonds = []
+    for i, years in enumerate([5, 7, 10]):
+        maturity_date = settlement_date.addYears(years)
+        call_dates = [settlement_date.addYears(y) for y in range(2, years)]
+        put_dates = [settlement_date.addYears(y) for y in range(3, years, 2)]
+        bonds.append(BondEmbeddedOption(settlement_date.addDays(-90),
+                                        maturity_date, 0.03 + 0.005 * i,
+                                        FrequencyTypes.SEMI_ANNUAL,
+                                        DayCountTypes.ACT_ACT_ICMA,
+                                        call_dates,
+                                        [100.0] * len(call_dates),
+                                        put_dates,
+                                        [98.0] * len(put_dates)))
+
+    model = FinModelRatesHW(0.01, 0.1, 200)
+
+    # A single bond is valued on the same trees as by the bond itself
+    v = BondEmbeddedOptionPortfolio(bonds[-1:]).value(settlement_date,
+                                                      discount_curve, model)
+    single = bonds[-1].value(settlement_date, discount_curve, model)
+    assert abs(v['bondwithoption'][0] - single['bondwithoption']) < 1e-10
+    assert abs(v['bondpure'][0] - single['bondpure']) < 1e-10
+
+    # Other bonds differ by the tree discretisation error
+    v = BondEmbeddedOptionPortfolio(bonds).value(settlement_date,
+                                                 discount_curve, model)
+
+    for i, bond in enumerate(bonds):
+        single = bond.value(settlement_date, discount_curve, model)
+        assert abs(v['bondwithoption'][i] - single['bondwithoption']) < 0.1
+        assert abs(v['bondpure'][i] - single['bondpure']) < 0.1
+
+    with pytest.raises(FinError):
+        BondEmbeddedOptionPortfolio([])
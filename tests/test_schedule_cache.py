@@ -0,0 +1,112 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+import financepy.utils.schedule as scheduleModule
+from financepy.utils.date import Date
+from financepy.utils.day_count import DayCount, DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.calendar import Calendar, CalendarTypes
+from financepy.utils.calendar import BusDayAdjustTypes, DateGenRuleTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.utils.schedule import Schedule
+from financepy.utils.schedule import cachedScheduleDates, cachedAccrualTable
+from financepy.utils.schedule import clearScheduleCache
+from financepy.products.rates.FinFixedLeg import FinFixedLeg
+from financepy.products.rates.FinFloatLeg import FinFloatLeg
+
+effective_date = Date(20, 6, 2018)
+termination_date = Date(20, 6, 2028)
+terms = (FrequencyTypes.QUARTERLY,
+         CalendarTypes.TARGET,
+         BusDayAdjustTypes.MODIFIED_FOLLOWING,
+         DateGenRuleTypes.BACKWARD)
+
+
+def test_cached_schedule_dates():
+
+    clearScheduleCache()
+
+    dates = cachedScheduleDates(effective_date, termination_date, *terms)
+    assert isinstance(dates, tuple)
+    assert list(dates) == Schedule(effective_date, termination_date,
+                                   *terms)._adjusted_dates
+
+    # A second request returns the same object from the cache
+    assert cachedScheduleDates(effective_date, termination_date,
+                               *terms) is dates
+
+
+def test_schedule_cache_eviction():
+
+    clearScheduleCache()
+    oldSize = scheduleModule.gScheduleCacheSize
+    scheduleModule.gScheduleCacheSize = 3
+
+    try:
+        first = cachedScheduleDates(effective_date, termination_date, *terms)
+
+        for years in [2, 3, 4]:
+            cachedScheduleDates(effective_date,
+                                effective_date.addYears(years), *terms)
+
+        assert len(scheduleModule.gScheduleCache) == 3
+        assert cachedScheduleDates(effective_date, termination_date,
+                                   *terms) is not first
+    finally:
+        scheduleModule.gScheduleCacheSize = oldSize
+        clearScheduleCache()
+
+
+def test_accrual_table():
+
+    dayCountType = DayCountTypes.ACT_360
+    table = cachedAccrualTable(effective_date, termination_date, *terms,
+                               dayCountType, 2)
+
+    dates = cachedScheduleDates(effective_date, termination_date, *terms)
+    dayCount = DayCount(dayCountType)
+    calendar = Calendar(CalendarTypes.TARGET)
+
+    assert len(table) == len(dates) - 1
+    assert list(table._startAccruedDates) == list(dates[:-1])
+    assert list(table._endAccruedDates) == list(dates[1:])
+    assert list(table._payment_dates) == \
+        [calendar.addBusinessDays(dt, 2) for dt in dates[1:]]
+
+    yearFracs = [dayCount.year_frac(d1, d2)[0]
+                 for d1, d2 in zip(dates[:-1], dates[1:])]
+    assert np.array_equal(table._yearFracArray, yearFracs)
+
+    excelDates = [dt._excelDate for dt in table._payment_dates]
+    assert np.array_equal(table._paymentDateVector._excelDate, excelDates)
+
+    # The shared arrays cannot be changed by a product
+    with pytest.raises(ValueError):
+        table._yearFracArray[0] = 0.0
+
+
+def test_legs_use_accrual_table():
+
+    fixedLeg = FinFixedLeg(effective_date, termination_date,
+                           FinSwapTypes.PAY, 0.03, FrequencyTypes.ANNUAL,
+                           DayCountTypes.THIRTY_E_360, payment_lag=1)
+
+    floatLeg = FinFloatLeg(effective_date, termination_date,
+                           FinSwapTypes.RECEIVE, 0.0,
+                           FrequencyTypes.QUARTERLY, DayCountTypes.ACT_360)
+
+    assert np.array_equal(fixedLeg._yearFracArray, fixedLeg._year_fracs)
+    assert len(fixedLeg._paymentDateVector) == len(fixedLeg._payment_dates)
+    assert np.allclose(fixedLeg._payments,
+                       fixedLeg._yearFracArray * fixedLeg._notional * 0.03)
+
+    # Generating the payments again does not duplicate them
+    fixedLeg.generatePayments()
+    assert len(fixedLeg._payments) == len(fixedLeg._payment_dates)
+
+    assert np.array_equal(floatLeg._yearFracArray, floatLeg._year_fracs)
+    assert floatLeg._endAccruedDates[-1] == floatLeg._payment_dates[-1]
@@ -0,0 +1,208 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_types import FinSolverTypes
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.market.volatility.FinEquityVolSurface import \
+    FinEquityVolSurface
+from financepy.market.volatility.FinSwaptionVolSurface import \
+    FinSwaptionVolSurface
+from financepy.market.volatility.FinFXVolSurfacePlus import \
+    FinFXVolSurfacePlus
+from financepy.products.fx.FinFXMktConventions import FinFXATMMethod
+from financepy.products.fx.FinFXMktConventions import FinFXDeltaMethod
+from financepy.models.volatility_fns import FinVolFunctionTypes
+from financepy.models.smile_calibration import volFunctionAndGrad
+
+valuation_date = Date(11, 1, 2021)
+discount_curve = DiscountCurveFlat(valuation_date, 0.02)
+dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+
+expiry_dates = [Date(11, 2, 2021), Date(11, 4, 2021), Date(11, 10, 2021),
+                Date(11, 1, 2022), Date(11, 1, 2023)]
+strikes = np.array([3037, 3418, 3608, 3703, 3798, 3893, 3988, 4178, 4557])
+vols = np.array([[42.94, 31.30, 25.88, 22.94, 19.72, 16.90, 15.31, 17.54,
+                  25.67],
+                 [34.68, 27.38, 23.82, 21.85, 19.83, 17.98, 16.52, 15.31,
+                  18.94],
+                 [29.91, 25.58, 23.21, 22.01, 20.83, 19.70, 18.62, 16.63,
+                  14.94],
+                 [29.26, 25.24, 23.03, 21.91, 20.81, 19.73, 18.69, 16.76,
+                  14.63],
+                 [27.59, 24.33, 22.72, 21.93, 21.17, 20.43, 19.71, 18.36,
+                  16.26]]) / 100.0
+
+
+def equitySurface(volGrid, volFunctionType, finSolverType,
+                  initialParameters=None):
+
+    return FinEquityVolSurface(valuation_date, 3800.0, discount_curve,
+                               dividend_curve, expiry_dates, strikes, volGrid,
+                               volFunctionType, finSolverType,
+                               initialParameters)
+
+
+def fitError(surface, volGrid):
+
+    err = 0.0
+    for i, expiry_date in enumerate(surface._expiry_dates):
+        for j, k in enumerate(strikes):
+            vol = surface.volatilityFromStrikeDate(k, expiry_date)
+            err += (vol - volGrid[i][j])**2
+    return err
+
+
+def test_analytic_gradients_match_finite_differences():
+
+    cases = [(FinVolFunctionTypes.SVI,
+              np.array([0.02, 0.1, -0.4, 0.05, 0.2])),
+             (FinVolFunctionTypes.SABR, np.array([0.3, 0.6, -0.3, 0.8])),
+             (FinVolFunctionTypes.SABR_BETA_HALF, np.array([0.2, -0.3, 0.8]))]
+
+    for volFunctionType, params in cases:
+        for k in [0.7, 1.0, 1.3]:
+            grad = np.zeros(len(params))
+            volFunctionAndGrad(volFunctionType.value, params, 1.0, k, 0.8,
+                               grad)
+            for i in range(0, len(params)):
+                h = 1e-6
+                up = params.copy()
+                up[i] += h
+                dn = params.copy()
+                dn[i] -= h
+                gUp = np.zeros(len(params))
+                gDn = np.zeros(len(params))
+                vUp = volFunctionAndGrad(volFunctionType.value, up, 1.0, k,
+                                         0.8, gUp)
+                vDn = volFunctionAndGrad(volFunctionType.value, dn, 1.0, k,
+                                         0.8, gDn)
+                assert abs(grad[i] - (vUp - vDn) / 2.0 / h) < 1e-7
+
+
+def test_levenberg_marquardt_fits_as_well_as_nelder_mead():
+
+    for volFunctionType in [FinVolFunctionTypes.SVI,
+                            FinVolFunctionTypes.SABR_BETA_HALF]:
+
+        nm = equitySurface(vols, volFunctionType, FinSolverTypes.NELDER_MEAD)
+        lm = equitySurface(vols, volFunctionType,
+                           FinSolverTypes.LEVENBERG_MARQUARDT)
+
+        assert fitError(lm, vols) < fitError(nm, vols) * 1.01
+
+
+def test_warm_start_resnap():
+
+    surface = equitySurface(vols, FinVolFunctionTypes.SVI,
+                            FinSolverTypes.LEVENBERG_MARQUARDT)
+
+    # A small move in the market is refitted from the earlier parameters
+    newVols = vols + 0.002
+    cold = equitySurface(newVols, FinVolFunctionTypes.SVI,
+                         FinSolverTypes.LEVENBERG_MARQUARDT)
+    warm = equitySurface(newVols, FinVolFunctionTypes.SVI,
+                         FinSolverTypes.LEVENBERG_MARQUARDT,
+                         surface._parameters)
+
+    assert abs(fitError(warm, newVols) - fitError(cold, newVols)) < 1e-8
+
+    # The Nelder-Mead fit can also be warm started
+    nm = equitySurface(newVols, FinVolFunctionTypes.SVI,
+                       FinSolverTypes.NELDER_MEAD, surface._parameters)
+    assert fitError(nm, newVols) < fitError(cold, newVols) * 1.1
+
+    with pytest.raises(FinError):
+        equitySurface(vols, FinVolFunctionTypes.SVI,
+                      FinSolverTypes.LEVENBERG_MARQUARDT,
+                      surface._parameters[1:])
+
+
+def test_swaption_surface_fit():
+
+    expiry_dates = [Date(11, 4, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2024), Date(11, 1, 2026)]
+    volGrid = np.array([[57.6, 49.4, 44.1, 41.1],
+                        [35.9, 39.6, 37.2, 34.7],
+                        [34.1, 37.8, 35.0, 31.9],
+                        [41.0, 39.5, 36.0, 32.6],
+                        [50.3, 44.0, 37.5, 33.8]]) / 100.0
+    strikeGrid = np.array([[1.00, 1.68, 2.26, 2.41],
+                           [2.00, 2.68, 3.26, 3.41],
+                           [2.50, 3.18, 3.76, 3.91],
+                           [3.00, 3.68, 4.26, 4.41],
+                           [4.00, 4.68, 5.26, 5.41]]) / 100.0
+
+    def fitError(surface):
+        err = 0.0
+        for j, expiry_date in enumerate(expiry_dates):
+            for i in range(0, len(strikeGrid)):
+                vol = surface.volatilityFromStrikeDate(strikeGrid[i, j],
+                                                       expiry_date)
+                err += (vol - volGrid[i, j])**2
+        return err
+
+    errors = []
+    for finSolverType in [FinSolverTypes.NELDER_MEAD,
+                          FinSolverTypes.LEVENBERG_MARQUARDT]:
+        surface = FinSwaptionVolSurface(valuation_date, expiry_dates,
+                                        strikeGrid[2], strikeGrid, volGrid,
+                                        FinVolFunctionTypes.SABR_BETA_HALF,
+                                        finSolverType)
+        errors.append(fitError(surface))
+
+    assert errors[1] < errors[0] * 1.01
+
+
+def test_fx_surface_fit():
+
+    fxValuationDate = Date(10, 4, 2020)
+    domDiscountCurve = DiscountCurveFlat(fxValuationDate, 0.02940)
+    forDiscountCurve = DiscountCurveFlat(fxValuationDate, 0.03460)
+    tenors = ['1M', '2M', '3M', '6M', '1Y', '2Y']
+    atmVols = [21.00, 21.00, 20.750, 19.400, 18.250, 17.677]
+    ms25DVols = [0.65, 0.75, 0.85, 0.90, 0.95, 0.85]
+    rr25DVols = [-0.20, -0.25, -0.30, -0.50, -0.60, -0.562]
+    ms10DVols = [2.433, 2.83, 3.228, 3.485, 3.806, 3.208]
+    rr10DVols = [-1.258, -1.297, -1.332, -1.408, -1.359, -1.208]
+
+    def fitError(surface):
+        err = 0.0
+        for i, expiry_date in enumerate(surface._expiry_dates):
+            vol = surface.volatilityFromStrikeDate(surface._K_ATM[i],
+                                                   expiry_date)
+            err += (vol - atmVols[i] / 100.0)**2
+            rr = surface.volatilityFromStrikeDate(surface._K_25D_C[i],
+                                                  expiry_date) \
+                - surface.volatilityFromStrikeDate(surface._K_25D_P[i],
+                                                   expiry_date)
+            err += (rr - rr25DVols[i] / 100.0)**2
+            rr = surface.volatilityFromStrikeDate(surface._K_10D_C[i],
+                                                  expiry_date) \
+                - surface.volatilityFromStrikeDate(surface._K_10D_P[i],
+                                                   expiry_date)
+            err += (rr - rr10DVols[i] / 100.0)**2
+        return err
+
+    for volFunctionType in [FinVolFunctionTypes.CLARK5,
+                            FinVolFunctionTypes.SABR]:
+
+        errors = []
+        for finSolverType in [FinSolverTypes.NELDER_MEAD,
+                              FinSolverTypes.LEVENBERG_MARQUARDT]:
+            surface = FinFXVolSurfacePlus(fxValuationDate, 1.3465, "EURUSD",
+                                          "EUR", domDiscountCurve,
+                                          forDiscountCurve, tenors, atmVols,
+                                          ms25DVols, rr25DVols, ms10DVols,
+                                          rr10DVols, 0.5,
+                                          FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                                          FinFXDeltaMethod.SPOT_DELTA,
+                                          volFunctionType, finSolverType)
+            errors.append(fitError(surface))
+
+        assert errors[1] < errors[0] * 1.01 + 1e-12
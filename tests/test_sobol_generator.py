@@ -0,0 +1,91 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.global_types import FinOptionTypes
+from financepy.models.sobol import getUniformSobol
+from financepy.models.sobol import FinSobolGenerator, FinSobolScrambleTypes
+from financepy.models.sobol import FinBrownianBridge
+from financepy.models.black_scholes import FinModelBlackScholes
+from financepy.products.equity.FinEquityAsianOption import \
+    FinEquityAsianOption
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+
+
+def test_unscrambled_sequence_and_skip_ahead():
+
+    points = getUniformSobol(1000, 20)
+
+    generator = FinSobolGenerator(20)
+    assert np.array_equal(generator.getUniforms(1000), points)
+
+    # Chunks from skipped generators join up to the full sequence
+    chunks = []
+    for start in [0, 350, 700]:
+        generator = FinSobolGenerator(20)
+        generator.skipTo(start)
+        chunks.append(generator.getUniforms(min(350, 1000 - start)))
+
+    assert np.array_equal(np.vstack(chunks), points)
+
+
+def test_scrambled_sequences_are_stratified():
+
+    for scrambleType in [FinSobolScrambleTypes.DIGITAL_SHIFT,
+                         FinSobolScrambleTypes.LINEAR_MATRIX]:
+
+        u1 = FinSobolGenerator(8, scrambleType, 1).getUniforms(1024)
+        u2 = FinSobolGenerator(8, scrambleType, 2).getUniforms(1024)
+
+        assert not np.array_equal(u1, u2)
+        assert np.all((u1 >= 0.0) & (u1 < 1.0))
+
+        # Points 1 to 1024 fill all but one of the 1024 intervals of each
+        # coordinate as the scrambles preserve the net structure
+        for j in range(8):
+            cells = np.unique(np.floor(u1[:, j] * 1024).astype(int))
+            assert len(cells) == 1023
+
+        g = FinSobolGenerator(8, scrambleType, 3).getGaussians(4096)
+        assert np.all(np.isfinite(g))
+        assert np.all(np.abs(np.mean(g, axis=0)) < 0.01)
+
+
+def test_brownian_bridge_covariance():
+
+    times = np.array([0.1, 0.25, 0.3, 0.9, 1.0, 1.7, 2.0])
+    bridge = FinBrownianBridge(times)
+
+    # The paths are linear in the normals so unit vectors give the map
+    a = bridge.buildPaths(np.eye(len(times)))
+    assert np.allclose(a.T @ a, np.minimum.outer(times, times), atol=1e-14)
+
+    with pytest.raises(FinError):
+        FinBrownianBridge([0.5, 0.4])
+
+    with pytest.raises(FinError):
+        bridge.buildPaths(np.zeros((10, 3)))
+
+
+def test_asian_option_qmc():
+
+    valuation_date = Date(1, 1, 2020)
+    option = FinEquityAsianOption(Date(1, 4, 2020), Date(1, 1, 2021), 100.0,
+                                  FinOptionTypes.EUROPEAN_CALL, 52)
+
+    discount_curve = DiscountCurveFlat(valuation_date, 0.03)
+    dividend_curve = DiscountCurveFlat(valuation_date, 0.01)
+    model = FinModelBlackScholes(0.20)
+
+    values = [option.valueQMC(valuation_date, 100.0, discount_curve,
+                              dividend_curve, model, 4096, seed, None)
+              for seed in range(5)]
+
+    # Agrees with a large Monte-Carlo run of 10 million paths
+    assert abs(np.mean(values) - 6.1886) < 0.01
+    assert np.std(values) < 0.01
@@ -0,0 +1,60 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from financepy.utils.math import N
+from financepy.utils.FinSolvers1D import newton_secant
+
+script = """
+from numba import njit
+from financepy.utils.math import N
+from financepy.utils.FinSolvers1D import newton_secant
+
+@njit(fastmath=True, cache=True)
+def _f(x, *args):
+    return N(x) - args[0]
+
+print(newton_secant(_f, x0=0.3, args=(0.6,)))
+"""
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_newton_secant_solves():
+
+    from numba import njit
+
+    @njit
+    def f(x, *args):
+        return N(x) - args[0]
+
+    x = newton_secant(f, x0=0.3, args=(0.6,))
+    assert abs(N(x) - 0.6) < 1e-10
+
+
+def test_newton_secant_runs_from_a_warm_numba_cache(tmp_path):
+
+    # A jitted function passed to a cached newton_secant fails to type when
+    # both are reloaded from the numba cache in a new process
+    env = os.environ.copy()
+    env["NUMBA_CACHE_DIR"] = str(tmp_path)
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    scriptFile = tmp_path / "solve.py"
+    scriptFile.write_text(script)
+
+    roots = []
+    for run in range(0, 2):
+        out = subprocess.run([sys.executable, str(scriptFile)], env=env,
+                             cwd=str(tmp_path), capture_output=True,
+                             text=True)
+        assert out.returncode == 0, out.stderr
+        roots.append(float(out.stdout.split()[-1]))
+
+    assert np.isclose(roots[0], roots[1])
@@ -0,0 +1,109 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.date import Date
+from financepy.utils.FinError import FinError
+from financepy.utils.day_count import DayCountTypes
+from financepy.utils.frequency import FrequencyTypes
+from financepy.utils.global_types import FinSwapTypes
+from financepy.products.rates.IborSwap import FinIborSwap
+from financepy.products.rates.FinIborSwapPortfolio import FinIborSwapPortfolio
+from financepy.market.discount.curve_zeros import DiscountCurveZeros
+from financepy.market.discount.interpolator import FinInterpTypes
+
+valuation_date = Date(15, 3, 2021)
+
+zeroDates = [valuation_date.addYears(t) for t in [0.25, 1, 2, 5, 10, 30]]
+zeroRates = [0.010, 0.011, 0.013, 0.017, 0.021, 0.024]
+
+discount_curve = DiscountCurveZeros(valuation_date, zeroDates, zeroRates,
+                                    FrequencyTypes.ANNUAL,
+                                    DayCountTypes.ACT_365F,
+                                    FinInterpTypes.FLAT_FWD_RATES)
+
+index_curve = DiscountCurveZeros(valuation_date, zeroDates,
+                                 [r + 0.0015 for r in zeroRates],
+                                 FrequencyTypes.ANNUAL,
+                                 DayCountTypes.ACT_365F,
+                                 FinInterpTypes.FLAT_FWD_RATES)
+
+
+def buildSwaps():
+
+    swaps = []
+    legTypes = [FinSwapTypes.PAY, FinSwapTypes.RECEIVE]
+
+    for i, tenor in enumerate(["1Y", "2Y", "5Y", "7Y", "10Y", "20Y"]):
+        swaps.append(FinIborSwap(valuation_date.addDays(2), tenor,
+                                 legTypes[i % 2], 0.01 + 0.002 * i,
+                                 FrequencyTypes.SEMI_ANNUAL,
+                                 DayCountTypes.THIRTY_E_360,
+                                 notional=1e6 * (i + 1),
+                                 floatSpread=0.0005 * i))
+
+    # Seasoned swaps that are partly fixed and a matured swap
+    for start in [Date(10, 11, 2019), Date(1, 6, 2017)]:
+        swaps.append(FinIborSwap(start, "3Y", FinSwapTypes.RECEIVE, 0.015,
+                                 FrequencyTypes.ANNUAL,
+                                 DayCountTypes.ACT_360))
+
+    return swaps
+
+
+def test_portfolio_matches_single_swaps():
+
+    swaps = buildSwaps()
+    portfolio = FinIborSwapPortfolio(swaps)
+
+    fixings = np.full(len(swaps), np.nan)
+    fixings[-2] = 0.004
+
+    for curve in [discount_curve, index_curve]:
+
+        values, pv01s, parRates = \
+            portfolio.valuationArrays(valuation_date, discount_curve, curve,
+                                      fixings)
+
+        for i, swap in enumerate(swaps):
+
+            fixing = None if np.isnan(fixings[i]) else fixings[i]
+            v = swap.value(valuation_date, discount_curve, curve, fixing)
+            assert abs(values[i] - v) < 1e-6
+
+            if swap._maturity_date > valuation_date:
+                pv01 = swap.pv01(valuation_date, discount_curve)
+                assert abs(pv01s[i] - pv01) < 1e-12
+
+                # A swap at its par rate is worth zero
+                parSwap = FinIborSwap(swap._effective_date,
+                                      swap._termination_date,
+                                      swap._fixed_leg._leg_type,
+                                      parRates[i],
+                                      swap._fixed_leg._freq_type,
+                                      swap._fixed_leg._day_count_type,
+                                      swap._fixed_leg._notional,
+                                      swap._floatLeg._spread,
+                                      swap._floatLeg._freq_type,
+                                      swap._floatLeg._day_count_type)
+
+                v = parSwap.value(valuation_date, discount_curve, curve,
+                                  fixing)
+                assert abs(v) < 1e-6
+            else:
+                assert values[i] == 0.0
+                assert parRates[i] == 0.0
+
+
+def test_portfolio_validation():
+
+    with pytest.raises(FinError):
+        FinIborSwapPortfolio([])
+
+    portfolio = FinIborSwapPortfolio(buildSwaps())
+
+    with pytest.raises(FinError):
+        portfolio.value(valuation_date, discount_curve, None, [0.01])
@@ -0,0 +1,105 @@
+###############################################################################
+# Copyright (C) 2018, 2019, 2020 Dominic O'Kane
+###############################################################################
+
+import numpy as np
+import pytest
+
+from financepy.utils.FinError import FinError
+from financepy.utils.date import Date
+from financepy.utils.global_vars import gDaysInYear
+from financepy.market.discount.curve_flat import DiscountCurveFlat
+from financepy.market.volatility.FinEquityVolSurface import \
+    FinEquityVolSurface
+from financepy.market.volatility.FinFXVolSurfacePlus import \
+    FinFXVolSurfacePlus, FinFXATMMethod, FinFXDeltaMethod
+from financepy.market.volatility.FinSwaptionVolSurface import \
+    FinSwaptionVolSurface
+from financepy.models.volatility_fns import FinVolFunctionTypes
+
+valuation_date = Date(11, 1, 2021)
+
+
+def checkSurface(surface, strikes, days):
+    """ Compare the array lookup with the scalar lookup on a grid of strikes
+    and expiry dates that lie before, between, on and after the slices. """
+
+    times = np.array(days) / gDaysInYear
+    vols = surface.volatilityFromStrikeTimeVect(strikes, times[:, None])
+
+    assert vols.shape == (len(days), len(strikes))
+
+    for i, d in enumerate(days):
+        expiry_date = surface._valuation_date.addDays(d)
+        for j, k in enumerate(strikes):
+            vol = surface.volatilityFromStrikeDate(k, expiry_date)
+            assert abs(vols[i, j] - vol) < 1e-12
+
+
+def test_equity_surface_vect():
+
+    expiry_dates = [Date(11, 2, 2021), Date(11, 4, 2021),
+                    Date(11, 1, 2022), Date(11, 1, 2023)]
+    strikes = np.array([3037, 3418, 3608, 3798, 3988, 4178, 4557])
+    vols = np.array([[42.94, 31.30, 25.88, 19.72, 15.31, 17.54, 25.67],
+                     [34.68, 27.38, 23.82, 19.83, 16.52, 15.31, 18.94],
+                     [29.26, 25.24, 23.03, 20.81, 18.69, 16.76, 14.63],
+                     [27.59, 24.33, 22.72, 21.17, 19.71, 18.36, 16.26]])
+
+    surface = FinEquityVolSurface(valuation_date, 3800.0,
+                                  DiscountCurveFlat(valuation_date, 0.02),
+                                  DiscountCurveFlat(valuation_date, 0.01),
+                                  expiry_dates, strikes, vols / 100.0,
+                                  FinVolFunctionTypes.SVI)
+
+    days = [10, 31, 45, 90, 200, 365, 500, 730, 1000]
+    checkSurface(surface, np.linspace(3000.0, 4600.0, 9), days)
+
+    # Scalars and mismatched shapes are broadcast
+    assert surface.volatilityFromStrikeTimeVect(3800.0, 0.5).shape == ()
+
+    with pytest.raises(FinError):
+        surface.volatilityFromStrikeTimeVect([3800.0], [0.0])
+
+
+def test_fx_surface_vect():
+
+    surface = FinFXVolSurfacePlus(valuation_date, 1.3465, "EURUSD", "EUR",
+                                  DiscountCurveFlat(valuation_date, 0.0294),
+                                  DiscountCurveFlat(valuation_date, 0.0346),
+                                  ['1M', '3M', '1Y', '2Y'],
+                                  [21.00, 20.750, 18.250, 17.677],
+                                  [0.65, 0.85, 0.95, 0.85],
+                                  [-0.20, -0.30, -0.60, -0.562],
+                                  [2.433, 3.228, 3.806, 3.208],
+                                  [-1.258, -1.332, -1.359, -1.208],
+                                  0.5,
+                                  FinFXATMMethod.FWD_DELTA_NEUTRAL,
+                                  FinFXDeltaMethod.SPOT_DELTA,
+                                  FinVolFunctionTypes.CLARK5)
+
+    days = [10, 31, 60, 200, 365, 500, 800]
+    checkSurface(surface, np.linspace(1.1, 1.6, 11), days)
+
+
+def test_swaption_surface_vect():
+
+    expiry_dates = [Date(11, 4, 2021), Date(11, 1, 2022),
+                    Date(11, 1, 2024), Date(11, 1, 2026)]
+    vols = np.array([[57.6, 49.4, 44.1, 41.1],
+                     [35.9, 39.6, 37.2, 34.7],
+                     [34.1, 37.8, 35.0, 31.9],
+                     [41.0, 39.5, 36.0, 32.6],
+                     [50.3, 44.0, 37.5, 33.8]]) / 100.0
+    strikes = np.array([[1.00, 1.68, 2.26, 2.41],
+                        [2.00, 2.68, 3.26, 3.41],
+                        [2.50, 3.18, 3.76, 3.91],
+                        [3.00, 3.68, 4.26, 4.41],
+                        [4.00, 4.68, 5.26, 5.41]]) / 100.0
+
+    surface = FinSwaptionVolSurface(valuation_date, expiry_dates, strikes[2],
+                                    strikes, vols,
+                                    FinVolFunctionTypes.SABR_BETA_HALF)
+
+    days = [30, 90, 200, 365, 1000, 1826, 2500]
+    checkSurface(surface, np.linspace(0.015, 0.05, 8), days)